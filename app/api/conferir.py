@@ -13,9 +13,18 @@ backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__
 sys.path.insert(0, backend_dir)
 
 from app.services.supabase_client import SupabaseClient
+from core.conferencia import conferir
 
 router = APIRouter(prefix="", tags=["Conferência"])
 
+TABELA_PREMIOS = {
+    15: 1900000.0,  # Prêmio médio 15 acertos
+    14: 1200.0,     # Prêmio médio 14 acertos
+    13: 30.0,       # Prêmio médio 13 acertos
+    12: 12.0,       # Prêmio médio 12 acertos
+    11: 6.0         # Prêmio médio 11 acertos
+}
+
 
 class ConferirRequest(BaseModel):
     concurso: int = Field(..., description="Número do concurso a conferir")
@@ -77,35 +86,11 @@ async def conferir_jogos(request: ConferirRequest):
         # Extrair apenas as dezenas de cada jogo
         jogos_list = [j["jogo"] for j in jogos_list_raw]
 
-        # 4. Conferir cada jogo
-        acertos_por_jogo = []
-        for jogo in jogos_list:
-            acertos = len(set(jogo) & resultado_oficial)
-            acertos_por_jogo.append(acertos)
-
-        # 5. Calcular distribuição de acertos
-        distribuicao = {
-            "15": acertos_por_jogo.count(15),
-            "14": acertos_por_jogo.count(14),
-            "13": acertos_por_jogo.count(13),
-            "12": acertos_por_jogo.count(12),
-            "11": acertos_por_jogo.count(11),
-            "0-10": sum(1 for a in acertos_por_jogo if a <= 10)
-        }
-
-        # 6. Calcular prêmios (tabela Lotofácil simplificada)
-        tabela_premios = {
-            15: 1900000.0,  # Prêmio médio 15 acertos
-            14: 1200.0,     # Prêmio médio 14 acertos
-            13: 30.0,       # Prêmio médio 13 acertos
-            12: 12.0,       # Prêmio médio 12 acertos
-            11: 6.0         # Prêmio médio 11 acertos
-        }
-
-        premio_total = sum(
-            tabela_premios.get(acertos, 0.0) 
-            for acertos in acertos_por_jogo
-        )
+        # 4-6. Conferência vetorizada: acertos, distribuição e prêmios (tabela Lotofácil simplificada)
+        conferencia = conferir(jogos_list, sorted(resultado_oficial), TABELA_PREMIOS)
+        acertos_por_jogo = conferencia["acertos"].tolist()
+        distribuicao = conferencia["distribuicao_acertos"]
+        premio_total = conferencia["premio_total"]
 
         total_gasto = len(jogos_list) * request.valor_aposta_por_jogo
         lucro = premio_total - total_gasto
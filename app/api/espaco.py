@@ -0,0 +1,111 @@
+"""
+Endpoint de contagem exata do espaço de jogos (calibração de restrições)
+"""
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+import sys
+import os
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, backend_dir)
+
+from app.services.supabase_client import SupabaseClient
+from app.services.espaco_jogos import EspacoJogos
+
+router = APIRouter(prefix="/espaco", tags=["Espaço de Jogos"])
+
+
+class ContarEspacoRequest(BaseModel):
+    soma_min: Optional[int] = Field(None, ge=120, le=270, description="Soma mínima das dezenas")
+    soma_max: Optional[int] = Field(None, ge=120, le=270, description="Soma máxima das dezenas")
+    pares_min: Optional[int] = Field(None, ge=0, le=15, description="Mínimo de números pares")
+    pares_max: Optional[int] = Field(None, ge=0, le=15, description="Máximo de números pares")
+    primos_min: Optional[int] = Field(None, ge=0, le=9, description="Mínimo de números primos")
+    primos_max: Optional[int] = Field(None, ge=0, le=9, description="Máximo de números primos")
+    moldura_min: Optional[int] = Field(None, ge=0, le=16, description="Mínimo de dezenas na moldura")
+    moldura_max: Optional[int] = Field(None, ge=0, le=16, description="Máximo de dezenas na moldura")
+    max_consecutivo: Optional[int] = Field(None, ge=1, le=15, description="Maior sequência de consecutivos permitida")
+    repetidas_min: Optional[int] = Field(None, ge=0, le=15, description="Mínimo de repetidas do concurso anterior")
+    repetidas_max: Optional[int] = Field(None, ge=0, le=15, description="Máximo de repetidas do concurso anterior")
+    ultimo_concurso: Optional[List[int]] = Field(None, description="Dezenas de referência para repetidas (padrão: último concurso do banco)")
+    dezenas_fixas: List[int] = Field(default_factory=list, description="Dezenas obrigatórias")
+    dezenas_excluidas: List[int] = Field(default_factory=list, description="Dezenas proibidas")
+    detalhar: bool = Field(False, description="Inclui a contagem de cada restrição isolada")
+
+
+class ContarEspacoResponse(BaseModel):
+    total: int
+    total_espaco: int
+    fracao: float
+    tempo_ms: float
+    restricoes: Dict[str, Any]
+    por_restricao: Optional[Dict[str, int]] = None
+
+
+_espaco: Optional[EspacoJogos] = None
+
+
+def _obter_espaco() -> EspacoJogos:
+    global _espaco
+    if _espaco is None:
+        try:
+            _espaco = EspacoJogos()
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+    return _espaco
+
+
+def _faixa(minimo: Optional[int], maximo: Optional[int], limite: int) -> Optional[tuple]:
+    if minimo is None and maximo is None:
+        return None
+    return (minimo if minimo is not None else 0, maximo if maximo is not None else limite)
+
+
+@router.post("/contar", response_model=ContarEspacoResponse)
+async def contar_espaco(request: ContarEspacoRequest):
+    """
+    Conta exatamente quantos jogos satisfazem as restrições e a fração do espaço total.
+    Restrições omitidas não filtram nada.
+    """
+    espaco = _obter_espaco()
+
+    constraints: Dict[str, Any] = {}
+    for nome, minimo, maximo, limite in (
+        ("soma", request.soma_min, request.soma_max, 270),
+        ("pares", request.pares_min, request.pares_max, 15),
+        ("primos", request.primos_min, request.primos_max, 15),
+        ("moldura", request.moldura_min, request.moldura_max, 15),
+        ("repetidas", request.repetidas_min, request.repetidas_max, 15),
+    ):
+        faixa = _faixa(minimo, maximo, limite)
+        if faixa is not None:
+            constraints[nome] = faixa
+
+    if request.max_consecutivo is not None:
+        constraints["max_consecutivo"] = request.max_consecutivo
+    if request.dezenas_fixas:
+        constraints["dezenas_fixas"] = sorted(set(request.dezenas_fixas))
+    if request.dezenas_excluidas:
+        constraints["dezenas_excluidas"] = sorted(set(request.dezenas_excluidas))
+
+    if "repetidas" in constraints:
+        ultimo = request.ultimo_concurso
+        if not ultimo:
+            client = SupabaseClient()
+            try:
+                concurso = await client.get_ultimo_concurso()
+            finally:
+                await client.close()
+            if not concurso:
+                raise HTTPException(status_code=404, detail="Nenhum concurso encontrado para calcular repetidas")
+            ultimo = concurso["dezenas"]
+        constraints["ultimo_concurso"] = sorted(ultimo)
+
+    try:
+        resultado = espaco.contar(constraints, detalhar=request.detalhar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ContarEspacoResponse(restricoes=constraints, **resultado)
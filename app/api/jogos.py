@@ -4,7 +4,7 @@ Endpoints para geração de jogos da Lotofácil
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import sys
 import os
 
@@ -13,6 +13,12 @@ sys.path.insert(0, backend_dir)
 
 from app.services.supabase_client import SupabaseClient
 from app.services.gerador_jogos import GeradorJogos
+from core.amostrador import obter_amostrador
+from core.coocorrencia import obter_coocorrencia
+from core.historico import HistoricoSorteios, obter_historico
+from core.indice_frequencias import obter_indice_frequencias
+from core.jogos_jogados import RegistroJogados, obter_registro_jogados
+from core.portfolio import obter_otimizador
 
 router = APIRouter(prefix="/jogos", tags=["Jogos"])
 
@@ -27,6 +33,15 @@ class GerarJogosRequest(BaseModel):
     pares_min: int = Field(6, ge=0, le=15, description="Mínimo de números pares")
     pares_max: int = Field(9, ge=0, le=15, description="Máximo de números pares")
     janela_historica: int = Field(10, ge=1, le=100, description="Janela de concursos históricos para análise")
+    objetivo_portfolio: Optional[str] = Field(
+        None,
+        pattern="^(cobertura|premio_esperado|misto)$",
+        description="Escolhe o lote pelo objetivo conjunto (cobertura, premio_esperado, misto) em vez do top por score"
+    )
+
+
+class DesempenhoJogoRequest(BaseModel):
+    jogo: List[int] = Field(..., min_length=15, max_length=15, description="As 15 dezenas do jogo")
 
 
 class GerarJogosResponse(BaseModel):
@@ -36,6 +51,34 @@ class GerarJogosResponse(BaseModel):
     jogos: List[Dict[str, Any]]
 
 
+async def _historico_atualizado(client: SupabaseClient, ultimo: Dict[str, Any]) -> Optional[HistoricoSorteios]:
+    """
+    Histórico em memória (CSV) completado com os concursos do banco que ainda não estão nele.
+    Os concursos entram em ordem crescente (append no store) e com a data do sorteio;
+    um concurso sem data fica de fora e é completado na próxima leitura do CSV.
+    """
+    historico = obter_historico()
+    if historico is None:
+        return None
+    faltantes = ultimo["numero"] - (historico.ultimo_numero or 0)
+    if faltantes > 0:
+        concursos = await client.get_ultimos_concursos(faltantes)
+        for concurso in sorted(concursos, key=lambda c: c["numero"]):
+            if not concurso.get("data"):
+                print(f"⚠️ Concurso {concurso['numero']} sem data no banco; fora do histórico local")
+                continue
+            historico.adicionar(concurso["numero"], concurso["dezenas"], concurso["data"])
+    return historico
+
+
+async def _registro_do_concurso(client: SupabaseClient, concurso_alvo: int) -> RegistroJogados:
+    """Registro de jogos emitidos; na primeira vez para o concurso, semeado com os lotes já no banco."""
+    registro = obter_registro_jogados()
+    if not registro.existe(concurso_alvo):
+        registro.registrar(concurso_alvo, await client.get_jogos_emitidos(concurso_alvo))
+    return registro
+
+
 @router.get("/ultimo")
 async def obter_ultimo_concurso():
     """Retorna informações do último concurso cadastrado"""
@@ -60,6 +103,26 @@ async def obter_estatisticas():
         await client.close()
 
 
+@router.post("/desempenho")
+async def desempenho_historico(request: DesempenhoJogoRequest):
+    """
+    Quantas vezes o jogo teria feito 11, 12, 13, 14 e 15 pontos em todos os
+    concursos passados, e os concursos em que fez 13 ou mais.
+    """
+    if len(set(request.jogo)) != 15 or any(not 1 <= d <= 25 for d in request.jogo):
+        raise HTTPException(status_code=400, detail="O jogo deve ter 15 dezenas distintas entre 1 e 25")
+
+    client = SupabaseClient()
+    try:
+        ultimo = await client.get_ultimo_concurso()
+        historico = await _historico_atualizado(client, ultimo) if ultimo else obter_historico()
+        if historico is None:
+            raise HTTPException(status_code=503, detail="Histórico de concursos indisponível")
+        return {"jogo": sorted(request.jogo), **historico.desempenho(request.jogo)}
+    finally:
+        await client.close()
+
+
 @router.post("/gerar", response_model=GerarJogosResponse)
 async def gerar_jogos(request: GerarJogosRequest):
     """
@@ -94,13 +157,22 @@ async def gerar_jogos(request: GerarJogosRequest):
             dezenas_saidas.update(c["dezenas"])
         ausentes_ultimos = list(todas_dezenas - dezenas_saidas)
 
-        # 5. Buscar duques fortes
-        duques_fortes = await client.calcular_duques_fortes(ultimos_n=50)
+        # 5. Histórico completo (desempenho por jogo, combinações já sorteadas, coocorrências)
+        historico = await _historico_atualizado(client, ultimo)
+
+        # 5b. Duques fortes dos últimos 50 (matriz de coocorrência incremental; sem histórico local, do banco)
+        if historico is not None:
+            duques_fortes = obter_coocorrencia(historico).duques_fortes(top=10, janela=50)
+        else:
+            duques_fortes = await client.calcular_duques_fortes(ultimos_n=50)
 
         # 6. Buscar pesos atuais da IA
         pesos_ia = await client.get_pesos_ia_atuais()
         pesos = pesos_ia.get("pesos", {})
 
+        # 6c. Jogos já emitidos para este concurso em outros lotes (nunca repetir)
+        registro = await _registro_do_concurso(client, request.concurso_alvo)
+
         # 7. Instanciar GeradorJogos com assinatura correta
         gerador = GeradorJogos(
             dezenas_ultimo=dezenas_ultimo,        # ← Parâmetro obrigatório
@@ -113,11 +185,16 @@ async def gerar_jogos(request: GerarJogosRequest):
             repetidas_max=request.repetidas_max,
             pares_min=request.pares_min,
             pares_max=request.pares_max,
-            janela_historica=request.janela_historica
+            janela_historica=request.janela_historica,
+            amostrador=obter_amostrador(),
+            otimizador_portfolio=obter_otimizador() if request.objetivo_portfolio else None,
+            ja_sorteados=historico.sorteados if historico is not None else None,
+            ja_jogados=registro.bitmap(request.concurso_alvo),
+            indice_frequencias=obter_indice_frequencias(historico) if historico is not None else None
         )
 
         # 8. Gerar jogos
-        jogos = gerador.gerar_jogos(quantidade=request.quantidade)
+        jogos = gerador.gerar_jogos(quantidade=request.quantidade, objetivo_portfolio=request.objetivo_portfolio)
 
         # 9. Preparar parâmetros de geração (para auditoria)
         parametros_geracao = {
@@ -128,16 +205,28 @@ async def gerar_jogos(request: GerarJogosRequest):
             "pares_min": request.pares_min,
             "pares_max": request.pares_max,
             "janela_historica": request.janela_historica,
+            "objetivo_portfolio": request.objetivo_portfolio,
             "versao_pesos_ia": pesos_ia.get("versao", 1)
         }
 
-        # 10. Salvar no banco
-        jogos_id = await client.salvar_jogos_gerados(
-            concurso_base=concurso_base,
-            concurso_alvo=request.concurso_alvo,
-            parametros=parametros_geracao,
-            jogos=jogos
-        )
+        # 10. Reservar os jogos no registro do concurso e salvar no banco
+        emitidos = [j["jogo"] for j in jogos]
+        registro.registrar(request.concurso_alvo, emitidos)
+        try:
+            jogos_id = await client.salvar_jogos_gerados(
+                concurso_base=concurso_base,
+                concurso_alvo=request.concurso_alvo,
+                parametros=parametros_geracao,
+                jogos=jogos
+            )
+        except Exception:
+            registro.liberar(request.concurso_alvo, emitidos)
+            raise
+
+        # 11. Desempenho de cada jogo em todo o histórico (um popcount por jogo)
+        if historico is not None:
+            for jogo, desempenho in zip(jogos, historico.desempenho_lote([j["jogo"] for j in jogos])):
+                jogo["desempenho_historico"] = desempenho
 
         print(f"✅ Jogos salvos com sucesso! ID do lote: {jogos_id}")
         print(f"   Concurso base: {concurso_base}, Concurso alvo: {request.concurso_alvo}")
@@ -15,6 +15,7 @@ if backend_path not in sys.path:
 # Importações corrigidas com base na estrutura da documentação e imagens
 from core.lotofacil_ai_v3 import LotofacilAIv3 # Motor IA está em backend/core/lotofacil_ai_v3.py
 from app.services.supabase_client import SupabaseClient # SupabaseClient está em backend/app/services/supabase_client.py
+from core.conferencia import conferir
 
 app = FastAPI(
     title="Lotofácil AI API",
@@ -169,6 +170,10 @@ async def gerar_jogos(request: GerarJogosRequest):
 # ==========================
 # ENDPOINT: CONFERIR JOGOS
 # ==========================
+# Prêmio 15 é simbólico, ajustar conforme prêmio real
+PREMIOS_CONFERENCIA = {11: 6.00, 12: 12.00, 13: 30.00, 14: 1500.00, 15: 1000000.00}
+
+
 @app.post("/conferir", response_model=ConferirResponse)
 async def conferir_jogos(request: ConferirRequest):
     """
@@ -201,28 +206,11 @@ async def conferir_jogos(request: ConferirRequest):
             # Se não há jogos gerados, não podemos salvar a conferência no resultados_conferencia
             # pois 'jogos_gerados_id' é NOT NULL. Apenas retornamos a resposta da API.
 
-        # 3) Conferência
-        acertos_por_jogo: List[int] = []
-        distribuicao_acertos = {"0-10": 0, "11": 0, "12": 0, "13": 0, "14": 0, "15": 0}
-        premio_total = 0.0
-        for jogo in jogos_ia:
-            dezenas_jogo = set(jogo["dezenas"])
-            acertos = len(dezenas_jogo.intersection(dezenas_sorteadas))
-            acertos_por_jogo.append(acertos)
-            if acertos >= 11:
-                distribuicao_acertos[str(acertos)] += 1
-            else:
-                distribuicao_acertos["0-10"] += 1
-            if acertos == 11:
-                premio_total += 6.00
-            elif acertos == 12:
-                premio_total += 12.00
-            elif acertos == 13:
-                premio_total += 30.00
-            elif acertos == 14:
-                premio_total += 1500.00
-            elif acertos == 15:
-                premio_total += 1000000.00 # Valor simbólico, ajustar conforme prêmio real
+        # 3) Conferência (vetorizada: matriz de dezenas x resultado oficial)
+        conferencia = conferir([jogo["dezenas"] for jogo in jogos_ia], dezenas_sorteadas, PREMIOS_CONFERENCIA)
+        acertos_por_jogo: List[int] = conferencia["acertos"].tolist()
+        distribuicao_acertos = conferencia["distribuicao_acertos"]
+        premio_total = conferencia["premio_total"]
 
         lucro = premio_total - total_gasto
 
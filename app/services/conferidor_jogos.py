@@ -3,7 +3,15 @@ Conferidor de jogos da Lotofácil
 Calcula acertos, distribuição, custo, prêmio e lucro
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Union
+
+import numpy as np
+
+from core.bitmask import jogos_para_masks, normalizar_mask
+from core.combinadic import unrank_jogos
+from core.conferencia import conferir
+from core.distribuicao_acertos import AvaliadorDistribuicao
+from core.feature_index import obter_indice
 
 
 class ConferidorJogos:
@@ -13,35 +21,28 @@ class ConferidorJogos:
         self.valor_aposta_por_jogo = valor_aposta_por_jogo
         self.premios_estimados = premios_estimados
 
-    def conferir_jogos(self, resultado: List[int], jogos: List[List[int]]) -> Dict[str, Any]:
-        resultado_set = set(resultado)
-        acertos_por_jogo = [len(resultado_set.intersection(set(jogo))) for jogo in jogos]
-        distribuicao = {"15": 0, "14": 0, "13": 0, "12": 0, "11": 0, "0-10": 0}
-        premio_total = 0.0
-        for acertos in acertos_por_jogo:
-            if acertos >= 15:
-                distribuicao["15"] += 1
-                premio_total += self.premios_estimados.get(15, 0.0)
-            elif acertos == 14:
-                distribuicao["14"] += 1
-                premio_total += self.premios_estimados.get(14, 0.0)
-            elif acertos == 13:
-                distribuicao["13"] += 1
-                premio_total += self.premios_estimados.get(13, 0.0)
-            elif acertos == 12:
-                distribuicao["12"] += 1
-                premio_total += self.premios_estimados.get(12, 0.0)
-            elif acertos == 11:
-                distribuicao["11"] += 1
-                premio_total += self.premios_estimados.get(11, 0.0)
-            else:
-                distribuicao["0-10"] += 1
-        total_gasto = len(jogos) * self.valor_aposta_por_jogo
-        lucro = premio_total - total_gasto
+    def conferir_jogos(self, resultado: Union[List[int], int], jogos: Sequence[Union[List[int], int]]) -> Dict[str, Any]:
+        """Confere jogos (listas de dezenas, bitmasks ou array uint32 de bitmasks) contra o resultado."""
+        masks = jogos if isinstance(jogos, np.ndarray) and jogos.ndim == 1 else jogos_para_masks(jogos)
+        conferencia = conferir(masks, normalizar_mask(resultado), self.premios_estimados, self.valor_aposta_por_jogo)
         return {
-            "acertos_por_jogo": acertos_por_jogo,
-            "distribuicao_acertos": distribuicao,
-            "total_gasto": round(total_gasto, 2),
-            "premio_total": round(premio_total, 2),
-            "lucro": round(lucro, 2),
+            "acertos_por_jogo": conferencia["acertos"].tolist(),
+            "distribuicao_acertos": conferencia["distribuicao_acertos"],
+            "total_gasto": round(conferencia["total_gasto"], 2),
+            "premio_total": round(conferencia["premio_total"], 2),
+            "lucro": round(conferencia["lucro"], 2),
         }
+
+    def conferir_ranks(self, resultado: List[int], ranks: List[int]) -> Dict[str, Any]:
+        """Confere jogos armazenados como rank (0..3.268.759) em vez de lista de dezenas."""
+        jogos = unrank_jogos(ranks).tolist()
+        return self.conferir_jogos(resultado, jogos)
+
+    def avaliar_distribuicao(self, jogos: Sequence[Union[List[int], int]], avaliador: Optional[AvaliadorDistribuicao] = None) -> Dict[str, Any]:
+        """
+        Desempenho exato do lote sobre todos os sorteios possíveis, com a tabela de
+        premios_estimados: P(pelo menos 11..15), prêmio esperado e distribuição do prêmio.
+        """
+        if avaliador is None:
+            avaliador = AvaliadorDistribuicao(obter_indice(), self.premios_estimados, self.valor_aposta_por_jogo)
+        return avaliador.avaliar(jogos)
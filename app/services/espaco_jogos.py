@@ -0,0 +1,95 @@
+"""
+Contagem exata do espaço de jogos da Lotofácil
+Quantos dos 3.268.760 jogos possíveis satisfazem um conjunto de restrições
+(soma, pares, primos, moldura, consecutivos, repetidas, dezenas fixas/excluídas)
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from core.bitmask import mask_para_jogo
+from core.feature_index import COLUNAS_FAIXA, FeatureIndex, obter_indice
+
+
+class EspacoJogos:
+    def __init__(self, feature_index: Optional[FeatureIndex] = None):
+        self.indice = feature_index if feature_index is not None else obter_indice()
+        if self.indice is None:
+            raise FileNotFoundError("Índice de features não construído (python -m core.feature_index)")
+
+    def validar_restricoes(self, constraints: Dict[str, Any]) -> Dict[str, Any]:
+        """Confere faixas e dezenas; levanta ValueError com a primeira inconsistência."""
+        for nome in COLUNAS_FAIXA + ('repetidas',):
+            if nome in constraints:
+                minimo, maximo = constraints[nome]
+                if minimo > maximo:
+                    raise ValueError(f"Faixa inválida para {nome}: {minimo} > {maximo}")
+
+        if 'repetidas' in constraints and not constraints.get('ultimo_concurso'):
+            raise ValueError("'repetidas' exige 'ultimo_concurso'")
+
+        ultimo = constraints.get('ultimo_concurso')
+        if ultimo is not None:
+            dezenas = mask_para_jogo(ultimo) if isinstance(ultimo, (int, np.integer)) else list(ultimo)
+            if len(dezenas) != 15 or len(set(dezenas)) != 15 or any(not 1 <= d <= 25 for d in dezenas):
+                raise ValueError("ultimo_concurso deve conter 15 dezenas distintas entre 1 e 25")
+
+        fixas = set(constraints.get('dezenas_fixas') or [])
+        excluidas = set(constraints.get('dezenas_excluidas') or [])
+        for nome, dezenas in (('dezenas_fixas', fixas), ('dezenas_excluidas', excluidas)):
+            if any(not 1 <= d <= 25 for d in dezenas):
+                raise ValueError(f"{nome} deve conter dezenas entre 1 e 25")
+        if fixas & excluidas:
+            raise ValueError(f"Dezenas fixas e excluídas ao mesmo tempo: {sorted(fixas & excluidas)}")
+        if len(fixas) > 15 or len(excluidas) > 10:
+            raise ValueError("No máximo 15 dezenas fixas e 10 excluídas")
+        return constraints
+
+    def selecoes_isoladas(self, constraints: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Máscara booleana de cada restrição sozinha ('repetidas' leva junto 'ultimo_concurso')."""
+        selecoes = {}
+        for nome, valor in constraints.items():
+            if nome == 'ultimo_concurso':
+                continue
+            isolada = {nome: valor}
+            if nome == 'repetidas':
+                isolada['ultimo_concurso'] = constraints['ultimo_concurso']
+            selecoes[nome] = self.indice.filtrar(isolada)
+        return selecoes
+
+    def contar(self, constraints: Dict[str, Any], detalhar: bool = False) -> Dict[str, Any]:
+        """
+        Conta os jogos que satisfazem todas as restrições.
+
+        Args:
+            constraints: Formato de FeatureIndex.filtrar
+            detalhar: Se True, inclui quantos jogos satisfazem cada restrição isoladamente
+
+        Returns:
+            {'total', 'total_espaco', 'fracao', 'tempo_ms'[, 'por_restricao']}
+        """
+        inicio = time.perf_counter()
+        constraints = self.validar_restricoes(constraints)
+        total_espaco = len(self.indice)
+
+        por_restricao = None
+        if detalhar:
+            # Cada restrição é avaliada uma vez: o total é o E das máscaras isoladas
+            selecoes = self.selecoes_isoladas(constraints)
+            por_restricao = {nome: int(np.count_nonzero(sel)) for nome, sel in selecoes.items()}
+            total = int(np.count_nonzero(np.logical_and.reduce(list(selecoes.values())))) if selecoes else total_espaco
+        else:
+            total = self.indice.contar(constraints)
+
+        resultado = {
+            "total": total,
+            "total_espaco": total_espaco,
+            "fracao": total / total_espaco,
+        }
+        if por_restricao is not None:
+            resultado["por_restricao"] = por_restricao
+
+        resultado["tempo_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+        return resultado
@@ -0,0 +1,213 @@
+"""
+Gerador de fechamentos (bolão) da Lotofácil
+Dado um pool de N dezenas, monta poucos jogos de 15 que garantem ao menos
+k acertos em algum jogo sempre que ao menos d dezenas sorteadas caírem no pool.
+Construção gulosa sobre bitsets + refinamento por simulated annealing,
+com verificação exaustiva da garantia.
+"""
+
+import math
+import time
+from itertools import combinations
+from math import comb
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.bitmask import jogo_para_mask, popcount_array
+
+TAMANHO_JOGO = 15
+LIMITE_ALVOS = 2_000_000
+
+
+def _masks_subconjuntos(n: int, k: int) -> np.ndarray:
+    """Bitmasks (bits 0..n-1) de todos os subconjuntos de tamanho k, em ordem lexicográfica."""
+    pesos = [1 << i for i in range(n)]
+    return np.fromiter(
+        (sum(pesos[i] for i in c) for c in combinations(range(n), k)),
+        dtype=np.uint32, count=comb(n, k)
+    )
+
+
+class GeradorFechamento:
+    """
+    Os jogos são subconjuntos de 15 do pool. Basta cobrir os subconjuntos de
+    exatamente d dezenas do pool ("alvos"): se o sorteio tem m >= d dezenas no
+    pool, qualquer d delas formam um alvo, e o jogo que o cobre acerta ao menos k.
+    Tudo é representado como bitmask sobre as posições do pool.
+    """
+
+    def __init__(
+        self,
+        dezenas: Sequence[int],
+        acertos_no_pool: int,
+        acertos_garantidos: int,
+        candidatos_por_passo: int = 64,
+        seed: Optional[int] = None,
+    ):
+        self.dezenas = sorted(set(dezenas))
+        self.n = len(self.dezenas)
+        self.d = acertos_no_pool
+        self.k = acertos_garantidos
+
+        if any(not 1 <= x <= 25 for x in self.dezenas):
+            raise ValueError("O pool deve conter dezenas entre 1 e 25")
+        if self.n < TAMANHO_JOGO:
+            raise ValueError(f"O pool precisa de ao menos {TAMANHO_JOGO} dezenas (recebeu {self.n})")
+        if not 1 <= self.k <= self.d <= TAMANHO_JOGO:
+            raise ValueError("É preciso 1 <= acertos_garantidos <= acertos_no_pool <= 15")
+        if comb(self.n, self.d) > LIMITE_ALVOS:
+            raise ValueError(f"Pool grande demais para d={self.d}: {comb(self.n, self.d)} subconjuntos a cobrir")
+
+        self.candidatos_por_passo = candidatos_por_passo
+        self.rng = np.random.default_rng(seed)
+        self.alvos = _masks_subconjuntos(self.n, self.d)
+
+    def _cobertura(self, bloco: int) -> np.ndarray:
+        """Alvos em que o jogo (bitmask de posições) faz ao menos k acertos."""
+        return popcount_array(self.alvos & np.uint32(bloco)) >= self.k
+
+    def _posicoes(self, mask: int) -> List[int]:
+        return [i for i in range(self.n) if mask >> i & 1]
+
+    def _para_jogo(self, bloco: int) -> List[int]:
+        return [self.dezenas[i] for i in self._posicoes(bloco)]
+
+    def _candidatos(self, alvo: int, descobertos: np.ndarray) -> np.ndarray:
+        """
+        Jogos que cobrem 'alvo': k posições dele + complemento sorteado com peso
+        pela frequência de cada posição nos alvos ainda descobertos.
+        """
+        no_alvo = np.array(self._posicoes(alvo))
+        frequencia = ((descobertos[:, None] >> np.arange(self.n, dtype=np.uint32)) & 1).sum(axis=0) + 1.0
+        log_freq = np.log(frequencia)
+
+        candidatos = np.empty(self.candidatos_por_passo, dtype=np.uint32)
+        for c in range(self.candidatos_por_passo):
+            escolhidas = self.rng.choice(no_alvo, self.k, replace=False)
+            chave = log_freq + self.rng.gumbel(size=self.n)
+            chave[escolhidas] = np.inf
+            posicoes = np.argpartition(-chave, TAMANHO_JOGO - 1)[:TAMANHO_JOGO]
+            candidatos[c] = np.bitwise_or.reduce(np.left_shift(np.uint32(1), posicoes.astype(np.uint32)))
+        return candidatos
+
+    def construir_guloso(self, bloco_avaliacao: int = 8_000_000) -> List[int]:
+        """
+        A cada passo sorteia candidatos que cobrem um alvo descoberto e fica
+        com o que cobre mais alvos descobertos.
+        """
+        descobertos = self.alvos
+        blocos: List[int] = []
+        while len(descobertos):
+            alvo = int(descobertos[self.rng.integers(len(descobertos))])
+            candidatos = self._candidatos(alvo, descobertos)
+
+            ganhos = np.zeros(len(candidatos), dtype=np.int64)
+            passo = max(1, bloco_avaliacao // len(candidatos))
+            for ini in range(0, len(descobertos), passo):
+                parte = descobertos[ini:ini + passo, None] & candidatos[None, :]
+                ganhos += (popcount_array(parte) >= self.k).sum(axis=0)
+
+            melhor = int(candidatos[ganhos.argmax()])
+            blocos.append(melhor)
+            descobertos = descobertos[popcount_array(descobertos & np.uint32(melhor)) < self.k]
+        return blocos
+
+    def refinar(self, blocos: List[int], tempo_max: float = 5.0) -> List[int]:
+        """
+        Tenta cobrir com um jogo a menos: descarta o jogo de menor cobertura
+        exclusiva e faz simulated annealing (troca de uma dezena) até zerar os
+        alvos descobertos. Repete enquanto houver tempo; devolve a menor cobertura completa.
+        """
+        limite = time.perf_counter() + tempo_max
+        melhor = list(blocos)
+        atual = list(blocos)
+        coberturas = [self._cobertura(b) for b in atual]
+
+        while len(atual) > 1 and time.perf_counter() < limite:
+            contagem = np.sum(coberturas, axis=0, dtype=np.int16)
+            exclusivos = [np.count_nonzero(c & (contagem == 1)) for c in coberturas]
+            i = int(np.argmin(exclusivos))
+            contagem -= coberturas[i]
+            del atual[i], coberturas[i]
+
+            descobertos = int(np.count_nonzero(contagem == 0))
+            temperatura = 2.0
+            while descobertos and time.perf_counter() < limite:
+                alvo = int(self.alvos[self.rng.choice(np.flatnonzero(contagem == 0))])
+                j = int(self.rng.integers(len(atual)))
+                bloco = atual[j]
+                entra = int(self.rng.choice(self._posicoes(alvo & ~bloco)))
+                sai = int(self.rng.choice(self._posicoes(bloco & ~alvo)))
+                novo = (bloco | 1 << entra) & ~(1 << sai)
+
+                cobertura = self._cobertura(novo)
+                perdidos = np.count_nonzero(coberturas[j] & ~cobertura & (contagem == 1))
+                ganhos = np.count_nonzero(cobertura & ~coberturas[j] & (contagem == 0))
+                delta = perdidos - ganhos
+                if delta <= 0 or self.rng.random() < math.exp(-delta / temperatura):
+                    contagem += cobertura
+                    contagem -= coberturas[j]
+                    atual[j], coberturas[j] = novo, cobertura
+                    descobertos += delta
+                temperatura = max(0.05, temperatura * 0.995)
+
+            if descobertos == 0:
+                melhor = list(atual)
+        return melhor
+
+    def verificar(self, jogos: Sequence[Sequence[int]]) -> bool:
+        """
+        Verificação exaustiva: todo subconjunto de d dezenas do pool tem algum
+        jogo com ao menos k acertos (independe do estado interno do gerador).
+        """
+        if not jogos or any(len(set(j)) != TAMANHO_JOGO or not set(j) <= set(self.dezenas) for j in jogos):
+            return False
+        masks_jogos = np.array([jogo_para_mask(j) for j in jogos], dtype=np.uint32)
+        pool = np.array(self.dezenas)
+        for ini in range(0, len(self.alvos), 200_000):
+            posicoes = self.alvos[ini:ini + 200_000]
+            alvos = np.zeros(len(posicoes), dtype=np.uint32)
+            for i, dezena in enumerate(pool):
+                alvos |= ((posicoes >> np.uint32(i)) & 1) << np.uint32(dezena - 1)
+            melhores = np.zeros(len(alvos), dtype=np.uint8)
+            for m in masks_jogos:
+                np.maximum(melhores, popcount_array(alvos & m), out=melhores)
+            if (melhores < self.k).any():
+                return False
+        return True
+
+    def gerar(self, tempo_max: float = 5.0) -> Dict[str, Any]:
+        """
+        Monta o fechamento.
+
+        Args:
+            tempo_max: Tempo (s) dedicado ao refinamento após a construção gulosa
+
+        Returns:
+            {'jogos', 'quantidade', 'quantidade_gulosa', 'dezenas', 'garantia',
+             'verificado', 'tempo_s'}
+        """
+        inicio = time.perf_counter()
+        gulosos = self.construir_guloso()
+        blocos = self.refinar(gulosos, tempo_max)
+        jogos = sorted(self._para_jogo(b) for b in blocos)
+        verificado = self.verificar(jogos)
+
+        return {
+            "jogos": jogos,
+            "quantidade": len(jogos),
+            "quantidade_gulosa": len(gulosos),
+            "dezenas": self.dezenas,
+            "garantia": {"acertos_no_pool": self.d, "acertos_garantidos": self.k},
+            "verificado": verificado,
+            "tempo_s": round(time.perf_counter() - inicio, 2),
+        }
+
+
+if __name__ == "__main__":
+    for pool, d, k, tempo in ((range(1, 19), 15, 14, 2.0), (range(1, 21), 15, 13, 3.0), (range(1, 22), 14, 12, 5.0)):
+        gerador = GeradorFechamento(list(pool), d, k, seed=1)
+        r = gerador.gerar(tempo_max=tempo)
+        print(f"{len(r['dezenas'])} dezenas, {d} no pool -> {k} acertos: {r['quantidade']} jogos "
+              f"(guloso {r['quantidade_gulosa']}), verificado={r['verificado']}, {r['tempo_s']}s")
@@ -13,10 +13,15 @@ Critérios principais (baseados em insights do usuário):
 Score total = soma ponderada (0-1). Jogos ranqueados pelos top 30.
 """
 
-from typing import List, Dict, Any, Set, Tuple
+from typing import List, Dict, Any, Set, Tuple, Optional
 import random
 from collections import Counter
 
+import numpy as np
+
+from core.bitmask import jogo_para_mask, popcount_array, soma_array
+from core.coocorrencia import contar_pares_fortes, matriz_pares
+
 
 class GeradorJogos:
     def __init__(
@@ -32,11 +37,29 @@ class GeradorJogos:
         pares_min: int = 6,
         pares_max: int = 9,
         janela_historica: int = 10,
+        amostrador: Optional[Any] = None,
+        otimizador_portfolio: Optional[Any] = None,
+        ja_sorteados: Optional[Any] = None,
+        ja_jogados: Optional[Any] = None,
+        indice_frequencias: Optional[Any] = None,
     ):
         self.dezenas_ultimo: Set[int] = set(dezenas_ultimo)
         self.ausentes_ultimos: Set[int] = set(ausentes_ultimos)
         self.ultimos_concursos = ultimos_concursos or []
         self.duques_fortes = duques_fortes or []
+        self._matriz_duques = matriz_pares(self.duques_fortes)
+        # core.amostrador.AmostradorRestrito (opcional): sorteia só jogos dentro das restrições
+        self.amostrador = amostrador
+        # core.portfolio.OtimizadorPortfolio (opcional): escolhe o lote pelo objetivo conjunto
+        self.otimizador_portfolio = otimizador_portfolio
+        # core.historico.BitmapCombinacoes (opcionais): descartam combinações já sorteadas
+        # e jogos já emitidos em outros lotes para o mesmo concurso (core.jogos_jogados)
+        self.ja_sorteados = ja_sorteados
+        self.ja_jogados = ja_jogados
+        self._excluidos = [b for b in (ja_sorteados, ja_jogados) if b is not None]
+        # core.indice_frequencias.IndiceFrequencias (opcional): frequência da janela sem recontar os concursos
+        self.indice_frequencias = indice_frequencias
+        self._ranks_aceitos: Optional[np.ndarray] = None
 
         self.SOMA_MIN = soma_min
         self.SOMA_MAX = soma_max
@@ -49,6 +72,9 @@ class GeradorJogos:
         self.PARES_MIN = pares_min
         self.PARES_MAX = pares_max
 
+        # Qualidade mínima: round(score_total, 2) >= SCORE_MINIMO
+        self.SCORE_MINIMO = 0.70
+
         self.TODAS_DEZENAS = list(range(1, 26))
         self.PARES = {d for d in self.TODAS_DEZENAS if d % 2 == 0}
         self.IMPARES = {d for d in self.TODAS_DEZENAS if d % 2 != 0}
@@ -59,12 +85,16 @@ class GeradorJogos:
         self.MULTIPLOS_3 = {3, 6, 9, 12, 15, 18, 21, 24}
 
         # Calcular frequência nos últimos N (quentes/frias)
-        self.frequencia_dezenas = self._calcular_frequencia(ultimos_concursos)
+        self.frequencia_dezenas = self._calcular_frequencia(self.ultimos_concursos)
         self.dezenas_quentes = self._classificar_quentes(self.frequencia_dezenas)
         self.dezenas_frias = self._classificar_frias(self.frequencia_dezenas)
 
     def _calcular_frequencia(self, ultimos: List[Dict[str, Any]]) -> Counter:
         """Calcula frequência de cada dezena nos últimos N concursos."""
+        if self.indice_frequencias is not None:
+            frequencia = self.indice_frequencias.janela([c["numero"] for c in ultimos if "numero" in c])
+            if frequencia is not None:
+                return self.indice_frequencias.contador(frequencia)
         freq = Counter()
         for concurso in ultimos:
             for dezena in concurso["dezenas"]:
@@ -166,8 +196,10 @@ class GeradorJogos:
 
     def _calcular_score_frequencia(self, jogo: List[int]) -> float:
         """Score para mix quente/frio (ideal: 3-5 frias, 2-4 quentes)."""
-        q_frias = len(set(jogo) & self.dezenas_frias)
-        q_quentes = len(set(jogo) & self.dezenas_quentes)
+        return self._nota_frequencia(len(set(jogo) & self.dezenas_frias), len(set(jogo) & self.dezenas_quentes))
+
+    @staticmethod
+    def _nota_frequencia(q_frias: int, q_quentes: int) -> float:
         if 3 <= q_frias <= 5 and 2 <= q_quentes <= 4:
             return 1.0
         elif 2 <= q_frias <= 6 and 1 <= q_quentes <= 5:
@@ -188,10 +220,10 @@ class GeradorJogos:
             return 1.0 - abs(pares - 7.5) / (self.PARES_MAX - self.PARES_MIN)
         return 0.0
 
-    def _calcular_score_duques(self, jogo: List[int]) -> float:
+    def _calcular_score_duques(self, jogo: List[int], q_duques: Optional[int] = None) -> float:
         """Score para duques fortes (ideal 2-3)."""
-        jogo_set = set(jogo)
-        q_duques = sum(1 for d1, d2, _ in self.duques_fortes if d1 in jogo_set and d2 in jogo_set)
+        if q_duques is None:
+            q_duques = int(contar_pares_fortes([jogo], self._matriz_duques)[0])
         if 2 <= q_duques <= 3:
             return 1.0
         elif 1 <= q_duques <= 4:
@@ -200,18 +232,23 @@ class GeradorJogos:
 
     def _calcular_score_secundarios(self, jogo: List[int]) -> float:
         """Score para primos/Fibonacci/múltiplos de 3 (ideal: 5-7 primos, 3-4 Fib, 4-6 mult3)."""
-        q_primos = len(set(jogo) & self.PRIMOS)
-        q_fib = len(set(jogo) & self.FIBONACCI)
-        q_mult3 = len(set(jogo) & self.MULTIPLOS_3)
+        return self._nota_secundarios(
+            len(set(jogo) & self.PRIMOS), len(set(jogo) & self.FIBONACCI), len(set(jogo) & self.MULTIPLOS_3)
+        )
 
+    @staticmethod
+    def _nota_secundarios(q_primos: int, q_fib: int, q_mult3: int) -> float:
         score_primos = 1.0 if 5 <= q_primos <= 7 else 0.5 if 4 <= q_primos <= 8 else 0.0
         score_fib = 1.0 if 3 <= q_fib <= 4 else 0.5 if 2 <= q_fib <= 5 else 0.0
         score_mult3 = 1.0 if 4 <= q_mult3 <= 6 else 0.5 if 3 <= q_mult3 <= 7 else 0.0
 
         return (score_primos + score_fib + score_mult3) / 3
 
-    def avaliar_jogo(self, jogo: List[int]) -> Dict[str, Any]:
-        """Avalia jogo com score ponderado expandido."""
+    def avaliar_jogo(self, jogo: List[int], q_duques: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Avalia jogo com score ponderado expandido.
+        q_duques: duques fortes no jogo, quando já contados para o lote inteiro.
+        """
         soma = sum(jogo)
         repetidas = len(set(jogo) & self.dezenas_ultimo)
         pares = len([d for d in jogo if d % 2 == 0])
@@ -229,7 +266,7 @@ class GeradorJogos:
         s_frequencia = self._calcular_score_frequencia(jogo)
         s_soma = self._calcular_score_soma(soma)
         s_pares = self._calcular_score_pares(pares)
-        s_duques = self._calcular_score_duques(jogo)
+        s_duques = self._calcular_score_duques(jogo, q_duques)
         s_secundarios = self._calcular_score_secundarios(jogo)
 
         # Score total ponderado
@@ -267,22 +304,126 @@ class GeradorJogos:
             "breakdown_score": breakdown,
         }
 
-    def gerar_jogos(self, quantidade: int = 30, max_tentativas: int = 10000) -> List[Dict[str, Any]]:
-        """Gera quantidade jogos (default 30), ranqueados por score_total."""
+    def scores_lote(self, masks: np.ndarray) -> np.ndarray:
+        """
+        score_total (sem arredondar) de avaliar_jogo para um array de bitmasks.
+        As contagens por conjunto (repetidas, ausentes, frias, quentes, pares,
+        primos, Fibonacci, múltiplos de 3) saem empacotadas em 4 bits cada de
+        duas tabelas (13 bits baixos / 12 altos), e cada critério é uma tabela
+        montada com os próprios _calcular_score_*: o resultado é idêntico ao escalar.
+        """
+        masks = np.asarray(masks, dtype=np.uint32)
+        conjuntos = (
+            self.dezenas_ultimo, self.ausentes_ultimos, self.dezenas_frias, self.dezenas_quentes,
+            self.PARES, self.PRIMOS, self.FIBONACCI, self.MULTIPLOS_3,
+        )
+        baixa = np.zeros(1 << 13, dtype=np.uint32)
+        alta = np.zeros(1 << 12, dtype=np.uint32)
+        for k, conjunto in enumerate(conjuntos):
+            mask = jogo_para_mask(conjunto)
+            baixa |= popcount_array(np.arange(1 << 13, dtype=np.uint32) & (mask & 0x1FFF)).astype(np.uint32) << np.uint32(4 * k)
+            alta |= popcount_array(np.arange(1 << 12, dtype=np.uint32) & (mask >> 13)).astype(np.uint32) << np.uint32(4 * k)
+        contagens = baixa[masks & 0x1FFF] + alta[masks >> 13]
+        repetidas, ausentes, frias, quentes, pares, primos, fib, mult3 = (
+            (contagens >> np.uint32(4 * k)) & 0xF for k in range(len(conjuntos))
+        )
+
+        q_duques = np.zeros(len(masks), dtype=np.intp)
+        for i, j in np.argwhere(self._matriz_duques).tolist():
+            par = np.uint32((1 << i) | (1 << j))
+            q_duques += (masks & par) == par
+
+        faixa = range(16)
+        t_repetidas = np.array([0.25 * self._calcular_score_repetidas(q) for q in faixa])
+        t_ausentes = np.array([0.15 * self._calcular_score_ausentes(q) for q in faixa])
+        t_frequencia = np.array([[0.20 * self._nota_frequencia(f, q) for q in faixa] for f in faixa])
+        t_soma = np.array([0.15 * self._calcular_score_soma(q) for q in range(326)])
+        t_pares = np.array([0.10 * self._calcular_score_pares(q) for q in faixa])
+        t_duques = np.array([0.10 * self._calcular_score_duques([], q) for q in range(len(self.duques_fortes) + 1)])
+        t_secundarios = np.array([[[0.05 * self._nota_secundarios(p, f, m) for m in faixa] for f in faixa] for p in faixa])
+
+        return (
+            t_repetidas[repetidas] +
+            t_ausentes[ausentes] +
+            t_frequencia[frias, quentes] +
+            t_soma[soma_array(masks)] +
+            t_pares[pares] +
+            t_duques[q_duques] +
+            t_secundarios[primos, fib, mult3]
+        )
+
+    def aceitos_lote(self, scores: np.ndarray) -> np.ndarray:
+        """
+        O mesmo corte de gerar_jogos, round(score_total, 2) >= SCORE_MINIMO, para
+        scores sem arredondar. Como round() é monótono, o corte vira um limiar: o
+        menor score logo abaixo de SCORE_MINIMO que o round() de Python já leva a ele.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        faixa = np.unique(scores[(scores >= self.SCORE_MINIMO - 0.01) & (scores < self.SCORE_MINIMO)])
+        limiar = next((v for v in faixa.tolist() if round(v, 2) >= self.SCORE_MINIMO), self.SCORE_MINIMO)
+        return scores >= limiar
+
+    def ranks_aceitos(self) -> np.ndarray:
+        """
+        Ranks de todos os jogos que passam no corte de qualidade de avaliar_jogo,
+        fora os já sorteados/emitidos. Soma, pares e repetidas fora da faixa só
+        zeram o próprio critério, então o score é calculado sobre o índice inteiro
+        (uma vez por gerador) e todo sorteio desse conjunto é aceito.
+        """
+        if self._ranks_aceitos is None:
+            aceitos = np.flatnonzero(self.aceitos_lote(self.scores_lote(self.amostrador.indice['mask'])))
+            for excluidos in self._excluidos:
+                aceitos = aceitos[~excluidos.contem_ranks(aceitos)]
+            self._ranks_aceitos = aceitos
+        return self._ranks_aceitos
+
+    def _candidatos_amostrados(self, alvo: int) -> List[Dict[str, Any]]:
+        """alvo candidatos sorteados uniformemente, sem rejeição, de ranks_aceitos()."""
+        jogos = self.amostrador.indice.jogos(self.amostrador.sortear(self.ranks_aceitos(), alvo))
+        # Duques fortes do lote inteiro numa multiplicação de matrizes
+        return [
+            self.avaliar_jogo(jogo, q_duques)
+            for jogo, q_duques in zip(jogos, contar_pares_fortes(jogos, self._matriz_duques).tolist())
+        ]
+
+    def gerar_jogos(
+        self,
+        quantidade: int = 30,
+        max_tentativas: int = 10000,
+        objetivo_portfolio: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Gera quantidade jogos (default 30), ranqueados por score_total.
+        Com objetivo_portfolio ('cobertura', 'premio_esperado', 'misto') e um
+        otimizador_portfolio, o lote sai de um conjunto 5x maior de candidatos
+        escolhido pelo objetivo conjunto em vez do top individual.
+        """
         candidatos: List[Dict[str, Any]] = []
+        otimizar = objetivo_portfolio is not None and self.otimizador_portfolio is not None
+        alvo = quantidade * (5 if otimizar else 2)
 
-        tentativas = 0
-        while tentativas < max_tentativas and len(candidatos) < quantidade * 2:
-            tentativas += 1
-            jogo = self.gerar_jogo_candidato()
-            aval = self.avaliar_jogo(jogo)
+        if self.amostrador is not None:
+            candidatos = self._candidatos_amostrados(alvo)
+        else:
+            tentativas = 0
+            while tentativas < max_tentativas and len(candidatos) < alvo:
+                tentativas += 1
+                jogo = self.gerar_jogo_candidato()
+                aval = self.avaliar_jogo(jogo)
 
-            # Filtra só jogos com score_total >= 0.70 (qualidade mínima)
-            if aval["score_total"] >= 0.70:
-                candidatos.append(aval)
+                # Filtra só jogos com a qualidade mínima ainda não sorteados/emitidos
+                if aval["score_total"] >= self.SCORE_MINIMO and not any(jogo in excluidos for excluidos in self._excluidos):
+                    candidatos.append(aval)
 
         # Ranqueia: score_total desc, soma próxima de 202.5 (centro miolo)
         alvo_soma = (self.SOMA_MIOLO_MIN + self.SOMA_MIOLO_MAX) / 2
         candidatos.sort(key=lambda x: (-x["score_total"], abs(x["soma"] - alvo_soma)))
 
+        if otimizar and len(candidatos) > quantidade:
+            selecao = self.otimizador_portfolio.otimizar(
+                [c["jogo"] for c in candidatos], quantidade, objetivo=objetivo_portfolio,
+                tempo_max=5.0, avaliar_exato=False
+            )
+            return [candidatos[i] for i in selecao["indices"]]
+
         return candidatos[:quantidade]
@@ -1,16 +1,26 @@
 import random
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
 from collections import Counter
+import numpy as np
 from app.services.supabase_client import SupabaseClient
+from core.coocorrencia import MatrizCoocorrencia, contar_pares_fortes, matriz_pares, obter_coocorrencia
+from core.historico import obter_historico
 
 class LotofacilGenerator:
-    def __init__(self, supabase_client: SupabaseClient):
+    def __init__(self, supabase_client: SupabaseClient, indice_frequencias=None, historico=None):
         self.supabase_client = supabase_client
         self.dezenas_lotofacil = list(range(1, 26))
+        # core.indice_frequencias.IndiceFrequencias (opcional): frequência da janela sem recontar os concursos
+        self.indice_frequencias = indice_frequencias
+        # core.historico.HistoricoSorteios (opcional): coocorrência compartilhada e incremental da janela
+        self.historico = historico
 
     async def gerar_jogos_ia(self, concurso_alvo: int, quantidade_jogos: int, concursos_base_analise: int) -> List[Dict[str, Any]]:
         print(f"🤖 Gerando {quantidade_jogos} jogos para o concurso {concurso_alvo} usando os últimos {concursos_base_analise} concursos como base.")
 
+        if self.historico is None:
+            self.historico = obter_historico()
+
         pesos_ia = await self.supabase_client.get_pesos_ia_atuais()
         pesos = pesos_ia.get("pesos", {})
         print(f"🧠 Pesos da IA utilizados: {pesos}")
@@ -61,24 +71,40 @@ class LotofacilGenerator:
             estatisticas["pares"].append(concurso.get("pares", 0))
             estatisticas["repetidas_anterior"].append(concurso.get("repetidas_anterior", 0))
 
-            for i in range(len(dezenas)):
-                for j in range(i + 1, len(dezenas)):
-                    par = tuple(sorted([dezenas[i], dezenas[j]]))
-                    estatisticas["duques_fortes"][par] += 1
+        coocorrencia, janela = self._coocorrencia(concursos)
+        estatisticas["duques_fortes"] = coocorrencia.contador_pares(janela)
 
-        estatisticas["frequencia_dezenas"] = Counter(todas_dezenas_sorteadas)
+        frequencia = None
+        if self.indice_frequencias is not None:
+            frequencia = self.indice_frequencias.janela([c["numero"] for c in concursos if c.get("dezenas") and "numero" in c])
+        if frequencia is not None:
+            estatisticas["frequencia_dezenas"] = self.indice_frequencias.contador(frequencia)
+        else:
+            estatisticas["frequencia_dezenas"] = Counter(todas_dezenas_sorteadas)
 
-        dezenas_presentes_recentes = set(todas_dezenas_sorteadas)
+        dezenas_presentes_recentes = set(estatisticas["frequencia_dezenas"])
         estatisticas["dezenas_ausentes_recentes"] = set(self.dezenas_lotofacil) - dezenas_presentes_recentes
 
         estatisticas["media_soma"] = sum(estatisticas["somas"]) / len(estatisticas["somas"]) if estatisticas["somas"] else 0
         estatisticas["media_pares"] = sum(estatisticas["pares"]) / len(estatisticas["pares"]) if estatisticas["pares"] else 0
         estatisticas["media_repetidas"] = sum(estatisticas["repetidas_anterior"]) / len(estatisticas["repetidas_anterior"]) if estatisticas["repetidas_anterior"] else 0
 
-        estatisticas["top_duques"] = [par for par, freq in estatisticas["duques_fortes"].most_common(10)]
+        estatisticas["top_duques"] = [(d1, d2) for d1, d2, _ in coocorrencia.duques_fortes(10, janela)]
 
         return estatisticas
 
+    def _coocorrencia(self, concursos: List[Dict[str, Any]]) -> Tuple[MatrizCoocorrencia, Optional[int]]:
+        """
+        Matriz de coocorrência dos concursos e a janela a consultar nela: a
+        compartilhada do histórico (incremental) quando os concursos são os
+        últimos dele; senão, montada só com eles (janela None = todos).
+        """
+        numeros = sorted(c["numero"] for c in concursos if c.get("dezenas") and "numero" in c)
+        janela = len(numeros)
+        if self.historico is not None and janela and np.array_equal(self.historico.numeros[-janela:], numeros):
+            return obter_coocorrencia(self.historico, janelas=(janela,)), janela
+        return MatrizCoocorrencia.dos_concursos(concursos), None
+
     def _gerar_jogo_inteligente(self, pesos: Dict[str, float], estatisticas: Dict[str, Any]) -> Set[int]:
         jogo = set()
         candidatas = list(self.dezenas_lotofacil)
@@ -136,13 +162,7 @@ class LotofacilGenerator:
         elif (num_pares == 6 and num_impares == 9) or (num_pares == 9 and num_impares == 6):
             score_total += pesos.get("pares", 0) * 0.5
 
-        duques_no_jogo = 0
-        dezenas_list = list(jogo)
-        for i in range(len(dezenas_list)):
-            for j in range(i + 1, len(dezenas_list)):
-                par = tuple(sorted([dezenas_list[i], dezenas_list[j]]))
-                if par in estatisticas["top_duques"]:
-                    duques_no_jogo += 1
+        duques_no_jogo = int(contar_pares_fortes([sorted(jogo)], matriz_pares(estatisticas["top_duques"]))[0])
         score_total += duques_no_jogo * pesos.get("duques", 0) * 0.1
 
         return score_total
@@ -9,6 +9,8 @@ import asyncpg
 from datetime import datetime, date # Importar date também
 from dotenv import load_dotenv
 
+from core.coocorrencia import MatrizCoocorrencia
+
 # Carregar variáveis de ambiente do .env
 load_dotenv()
 
@@ -163,6 +165,11 @@ class SupabaseClient:
             print(f"Erro ao buscar últimos {qtd} concursos: {e}")
             raise
 
+    async def calcular_duques_fortes(self, ultimos_n: int = 50, top: int = 10) -> List[Tuple[int, int, int]]:
+        """Pares de dezenas que mais saíram juntos nos últimos N concursos, como (d1, d2, vezes)."""
+        concursos = await self.get_ultimos_concursos(ultimos_n)
+        return MatrizCoocorrencia.dos_concursos(concursos).duques_fortes(top)
+
     async def inserir_ou_atualizar_concurso(self, concurso_data: Dict[str, Any]) -> bool:
         """
         Insere um novo concurso ou atualiza um existente.
@@ -311,6 +318,31 @@ class SupabaseClient:
             print(f"Erro ao buscar jogos gerados para concurso {concurso_alvo}: {e}")
             raise
 
+    async def get_jogos_emitidos(self, concurso_alvo: int) -> List[List[int]]:
+        """
+        Todos os jogos de todos os lotes gerados para um concurso (qualquer status).
+        Aceita lotes salvos como listas de dezenas ou dicts com 'jogo'/'dezenas'.
+        """
+        try:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                print(f"Buscando jogos já emitidos para o concurso {concurso_alvo}...")
+                rows = await conn.fetch("""
+                    SELECT jogos FROM jogos_gerados WHERE concurso_alvo = $1;
+                """, concurso_alvo)
+                emitidos = []
+                for row in rows:
+                    jogos = json.loads(row["jogos"]) if isinstance(row["jogos"], str) else row["jogos"]
+                    for jogo in jogos or []:
+                        dezenas = jogo.get("jogo") or jogo.get("dezenas") if isinstance(jogo, dict) else jogo
+                        if dezenas and len(dezenas) == 15:
+                            emitidos.append([int(d) for d in dezenas])
+                print(f"{len(emitidos)} jogos já emitidos em {len(rows)} lotes.")
+                return emitidos
+        except Exception as e:
+            print(f"Erro ao buscar jogos emitidos para o concurso {concurso_alvo}: {e}")
+            raise
+
     # ============================================================================
     # MÉTODOS PARA RESULTADOS DA CONFERÊNCIA
     # ============================================================================
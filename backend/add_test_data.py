@@ -3,6 +3,7 @@ import asyncpg
 import json
 from datetime import date
 from config_supabase import SUPABASE_DB_URL
+from core.estatisticas import estatisticas_do_banco
 
 # Dados de exemplo (concursos fictícios para teste)
 CONCURSOS_TESTE = [
@@ -61,35 +62,15 @@ async def adicionar_concursos_teste():
             print(f"   Dezenas: {dezenas[:5]}... (15 total)")
             print(f"   Soma: {soma} | Pares: {pares} | Ímpares: {impares}\n")
 
-        # Atualiza frequências
+        # Atualiza frequências (uma leitura dos concursos, um UPDATE para as 25 dezenas)
         print("📊 Atualizando frequências...")
-        for dezena in range(1, 26):
-            count = await conn.fetchval("""
-                SELECT COUNT(*) FROM concursos c, jsonb_array_elements(c.dezenas) AS d
-                WHERE d::int = $1
-            """, dezena)
-
-            ultima_aparicao = await conn.fetchval("""
-                SELECT MAX(c.numero) FROM concursos c, jsonb_array_elements(c.dezenas) AS d
-                WHERE d::int = $1
-            """, dezena)
-
-            await conn.execute("""
-                UPDATE frequencias 
-                SET ocorrencias = $1, ultima_aparicao = $2, updated_at = NOW()
-                WHERE dezena = $3
-            """, count, ultima_aparicao, dezena)
+        estatisticas = await estatisticas_do_banco(conn)
+        await estatisticas.gravar_frequencias(conn)
 
         print("✅ Frequências atualizadas!")
 
         # Calcula dezenas quentes e frias
-        freq_data = await conn.fetch("""
-            SELECT dezena, ocorrencias FROM frequencias ORDER BY ocorrencias DESC, dezena
-        """)
-
-        dezenas_ordenadas = [row["dezena"] for row in freq_data]
-        dezenas_quentes = dezenas_ordenadas[:15]
-        dezenas_frias = dezenas_ordenadas[-5:]
+        dezenas_quentes, dezenas_frias = estatisticas.quentes_frias()
 
         # Converte para JSON antes de inserir
         quentes_json = json.dumps(dezenas_quentes)
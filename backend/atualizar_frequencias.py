@@ -45,28 +45,23 @@ async def atualizar_frequencias():
                     ocorrencias[d_int] += 1
                     ultima_aparicao[d_int] = numero
 
-        # Montar lista de updates: (ocorrencias, ultima_aparicao, dezena)
-        updates = []
-        for d in range(1, 26):
-            updates.append(
-                (
-                    ocorrencias[d],
-                    ultima_aparicao[d],
-                    d,
-                )
-            )
-
         print("Aplicando atualização na tabela 'frequencias'...")
 
-        update_sql = """
-            UPDATE frequencias
-               SET ocorrencias = $1,
-                   ultima_aparicao = $2,
+        # Um único UPDATE para as 25 dezenas
+        dezenas = list(range(1, 26))
+        await conn.execute(
+            """
+            UPDATE frequencias AS f
+               SET ocorrencias = u.ocorrencias,
+                   ultima_aparicao = u.ultima_aparicao,
                    updated_at = NOW()
-             WHERE dezena = $3;
-        """
-
-        await conn.executemany(update_sql, updates)
+              FROM unnest($1::int[], $2::int[], $3::int[]) AS u(dezena, ocorrencias, ultima_aparicao)
+             WHERE f.dezena = u.dezena;
+            """,
+            dezenas,
+            [ocorrencias[d] for d in dezenas],
+            [ultima_aparicao[d] for d in dezenas],
+        )
 
         print("Atualização de frequências concluída com sucesso.")
 
@@ -0,0 +1,192 @@
+"""
+Lotofacil AI Engine v3.0 - Representação de Jogos em Bitmask
+Cada jogo é um inteiro de 25 bits: o bit (d - 1) indica a presença da dezena d.
+Contagens viram AND + popcount e acertos viram popcount(jogo & sorteio).
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+N_DEZENAS = 25
+MASK_TODAS = (1 << N_DEZENAS) - 1
+
+PRIMOS = {2, 3, 5, 7, 11, 13, 17, 19, 23}
+FIBONACCI = {1, 2, 3, 5, 8, 13, 21}
+MULTIPLOS_3 = {3, 6, 9, 12, 15, 18, 21, 24}
+MOLDURA = {1, 2, 3, 4, 5, 6, 10, 11, 15, 16, 20, 21, 22, 23, 24, 25}
+CENTRO = {7, 8, 9, 12, 13, 14, 17, 18, 19}
+
+Jogo = Union[int, Sequence[int]]
+
+try:
+    popcount = int.bit_count  # Python 3.10+
+except AttributeError:  # pragma: no cover
+    def popcount(x: int) -> int:
+        return bin(x).count("1")
+
+
+def jogo_para_mask(jogo: Iterable[int]) -> int:
+    """Converte uma lista de dezenas (1-25) em bitmask."""
+    mask = 0
+    for d in jogo:
+        mask |= 1 << (int(d) - 1)
+    return mask
+
+
+def mask_para_jogo(mask: int) -> List[int]:
+    """Converte um bitmask em lista ordenada de dezenas."""
+    mask = int(mask)
+    return [d for d in range(1, N_DEZENAS + 1) if mask >> (d - 1) & 1]
+
+
+def normalizar_mask(jogo: Jogo) -> int:
+    """Aceita jogo como bitmask ou lista de dezenas e devolve o bitmask."""
+    if isinstance(jogo, (int, np.integer)):
+        return int(jogo)
+    return jogo_para_mask(jogo)
+
+
+def eh_mask(jogo) -> bool:
+    """True se o jogo está representado como bitmask (int)."""
+    return isinstance(jogo, (int, np.integer)) and not isinstance(jogo, bool)
+
+
+MASK_PRIMOS = jogo_para_mask(PRIMOS)
+MASK_FIBONACCI = jogo_para_mask(FIBONACCI)
+MASK_MULTIPLOS_3 = jogo_para_mask(MULTIPLOS_3)
+MASK_MOLDURA = jogo_para_mask(MOLDURA)
+MASK_CENTRO = jogo_para_mask(CENTRO)
+MASK_PARES = jogo_para_mask(range(2, N_DEZENAS + 1, 2))
+
+# Linhas do volante: 1-5, 6-10, 11-15, 16-20, 21-25
+MASK_LINHAS = [jogo_para_mask(range(5 * r + 1, 5 * r + 6)) for r in range(5)]
+# Dezenas agrupadas pelo resto da divisão por 5 (chave = d % 5)
+MASK_RESTO_5 = {r: jogo_para_mask(d for d in range(1, N_DEZENAS + 1) if d % 5 == r) for r in range(5)}
+
+# Soma das dezenas em O(1): bits 0-12 (dezenas 1-13) e bits 13-24 (dezenas 14-25)
+_SOMA_BAIXA = [sum(d + 1 for d in range(13) if m >> d & 1) for m in range(1 << 13)]
+_SOMA_ALTA = [sum(d + 14 for d in range(12) if m >> d & 1) for m in range(1 << 12)]
+
+
+def soma_mask(mask: int) -> int:
+    """Soma das dezenas do bitmask."""
+    return _SOMA_BAIXA[mask & 0x1FFF] + _SOMA_ALTA[mask >> 13]
+
+
+def max_consecutivo_mask(mask: int) -> int:
+    """Maior sequência de dezenas consecutivas (0 para máscara vazia)."""
+    tamanho = 0
+    while mask:
+        mask &= mask >> 1
+        tamanho += 1
+    return tamanho
+
+
+def spread_mask(mask: int) -> int:
+    """Diferença entre a maior e a menor dezena."""
+    if not mask:
+        return 0
+    return mask.bit_length() - (mask & -mask).bit_length()
+
+
+# ============================================================================
+# VERSÕES VETORIZADAS (arrays uint32 de bitmasks)
+# ============================================================================
+
+_POPCOUNT_16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+_SOMA_BAIXA_NP = np.array(_SOMA_BAIXA, dtype=np.uint16)
+_SOMA_ALTA_NP = np.array(_SOMA_ALTA, dtype=np.uint16)
+_BITS = np.arange(N_DEZENAS, dtype=np.uint32)
+
+
+def popcount_array(masks) -> np.ndarray:
+    """Popcount vetorizado para arrays de inteiros de até 32 bits."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return _POPCOUNT_16[masks & 0xFFFF] + _POPCOUNT_16[masks >> 16]
+
+
+def soma_array(masks) -> np.ndarray:
+    """Soma das dezenas de cada bitmask."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return _SOMA_BAIXA_NP[masks & 0x1FFF] + _SOMA_ALTA_NP[masks >> 13]
+
+
+def max_consecutivo_array(masks) -> np.ndarray:
+    """Maior sequência de consecutivos de cada bitmask."""
+    masks = np.asarray(masks, dtype=np.uint32).copy()
+    tamanho = np.zeros(masks.shape, dtype=np.uint8)
+    while masks.any():
+        tamanho += masks != 0
+        masks &= masks >> 1
+    return tamanho
+
+
+def spread_array(masks) -> np.ndarray:
+    """Diferença entre a maior e a menor dezena de cada bitmask."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    menor_bit = masks & (~masks + np.uint32(1))
+    # frexp devolve o expoente e com x = m * 2**e, m em [0.5, 1): e == bit_length(x)
+    _, maior = np.frexp(masks.astype(np.float64))
+    _, menor = np.frexp(menor_bit.astype(np.float64))
+    return (maior - menor).astype(np.uint8)
+
+
+@lru_cache(maxsize=32)
+def _tabelas_ponderadas(valores: Tuple[float, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    valores = np.asarray(valores, dtype=np.float64)
+    baixa = masks_para_matriz(np.arange(1 << 13))[:, :13] @ valores[:13]
+    alta = masks_para_matriz(np.arange(1 << 12))[:, :12] @ valores[13:]
+    return baixa, alta
+
+
+def soma_ponderada_array(masks, valores: Sequence[float]) -> np.ndarray:
+    """
+    Soma de valores[d - 1] para cada dezena d presente no bitmask.
+    Usa as mesmas duas tabelas (13 + 12 bits) de soma_array, montadas para os valores dados.
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    baixa, alta = _tabelas_ponderadas(tuple(float(v) for v in valores))
+    return baixa[masks & 0x1FFF] + alta[masks >> 13]
+
+
+def jogos_para_masks(jogos) -> np.ndarray:
+    """Converte matriz (N, 15) de dezenas ou lista de listas em array uint32."""
+    if isinstance(jogos, np.ndarray) and jogos.ndim == 2:
+        shifts = jogos.astype(np.uint32) - 1
+        return np.left_shift(np.uint32(1), shifts).sum(axis=1, dtype=np.uint32)
+    return np.array([normalizar_mask(j) for j in jogos], dtype=np.uint32)
+
+
+def masks_para_matriz(masks) -> np.ndarray:
+    """Converte bitmasks em matriz booleana (N, 25) de presença."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return ((masks[..., None] >> _BITS) & 1).astype(bool)
+
+
+def matriz_para_masks(matriz) -> np.ndarray:
+    """Converte matriz de presença (N, 25) em bitmasks uint32."""
+    matriz = np.asarray(matriz).astype(np.uint32)
+    return (matriz << _BITS).sum(axis=-1, dtype=np.uint32)
+
+
+def masks_para_jogos(masks) -> List[List[int]]:
+    """Converte bitmasks em listas ordenadas de dezenas."""
+    return [(np.flatnonzero(linha) + 1).tolist() for linha in masks_para_matriz(masks)]
+
+
+def features_array(masks) -> Dict[str, np.ndarray]:
+    """Features usadas pelo validador/fitness para um array de bitmasks."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return {
+        'soma': soma_array(masks),
+        'pares': popcount_array(masks & MASK_PARES),
+        'primos': popcount_array(masks & MASK_PRIMOS),
+        'fibonacci': popcount_array(masks & MASK_FIBONACCI),
+        'multiplos_3': popcount_array(masks & MASK_MULTIPLOS_3),
+        'moldura': popcount_array(masks & MASK_MOLDURA),
+        'centro': popcount_array(masks & MASK_CENTRO),
+        'max_consecutivo': max_consecutivo_array(masks),
+        'consecutivos': popcount_array(masks & (masks >> 1)),
+    }
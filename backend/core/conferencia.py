@@ -0,0 +1,172 @@
+"""
+Lotofacil AI Engine v3.0 - Conferência Vetorizada
+Núcleo único de conferência: jogos como matriz de presença (T x 25) e um ou
+vários sorteios; acertos, distribuição e prêmios saem de operações de array
+em vez de len(set(jogo) & resultado) jogo a jogo.
+Depende apenas de numpy (o mesmo módulo é usado pelo backend).
+"""
+
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+N_DEZENAS = 25
+FAIXAS = ("15", "14", "13", "12", "11")
+_BITS = np.arange(N_DEZENAS, dtype=np.uint32)
+
+Jogos = Union[np.ndarray, Sequence[Sequence[int]], Sequence[int]]
+
+
+def _como_array(jogos: Jogos) -> np.ndarray:
+    if isinstance(jogos, np.ndarray):
+        return jogos
+    try:
+        return np.asarray(jogos)
+    except ValueError:
+        # Jogos de tamanhos diferentes (apostas com mais de 15 dezenas): presença linha a linha
+        presenca = np.zeros((len(jogos), N_DEZENAS), dtype=bool)
+        for i, jogo in enumerate(jogos):
+            presenca[i, np.asarray(jogo, dtype=np.intp) - 1] = True
+        return presenca
+
+
+def matriz_presenca(jogos: Jogos) -> np.ndarray:
+    """
+    Matriz booleana (T, 25) de presença.
+
+    Aceita a própria matriz (T, 25), uma matriz/lista de dezenas (T, 15)
+    ou bitmasks (bit d-1 = dezena d) como inteiros ou array 1-D.
+    """
+    arr = _como_array(jogos)
+    if arr.ndim == 2 and arr.shape[1] == N_DEZENAS and arr.dtype in (np.bool_, np.uint8):
+        return arr.astype(bool, copy=False)
+    if arr.ndim == 1:
+        masks = arr.astype(np.uint32)
+        return ((masks[:, None] >> _BITS) & 1).astype(bool)
+    if arr.ndim != 2:
+        raise ValueError("Jogos devem ser uma matriz (T, 25), (T, 15) de dezenas ou bitmasks")
+    presenca = np.zeros((len(arr), N_DEZENAS), dtype=bool)
+    presenca[np.arange(len(arr))[:, None], arr.astype(np.intp) - 1] = True
+    return presenca
+
+
+def _presenca_sorteio(sorteio: Union[Sequence[int], int]) -> np.ndarray:
+    if isinstance(sorteio, (int, np.integer)):
+        return ((np.uint32(sorteio) >> _BITS) & 1).astype(bool)
+    presenca = np.zeros(N_DEZENAS, dtype=bool)
+    presenca[np.asarray(list(sorteio), dtype=np.intp) - 1] = True
+    return presenca
+
+
+def contar_acertos(jogos: Jogos, sorteio: Union[Sequence[int], int]) -> np.ndarray:
+    """Acertos (uint8, um por jogo) contra um sorteio (dezenas ou bitmask)."""
+    presenca = _presenca_sorteio(sorteio)
+    arr = _como_array(jogos)
+    if arr.ndim == 2 and arr.shape[1] != N_DEZENAS:
+        # Matriz de dezenas: consulta direta, sem montar a presença (T, 25)
+        return presenca[arr.astype(np.intp) - 1].sum(axis=1, dtype=np.uint8)
+    return matriz_presenca(arr)[:, presenca].sum(axis=1, dtype=np.uint8)
+
+
+def contar_acertos_sorteios(jogos: Jogos, sorteios: Sequence[Sequence[int]], bloco: int = 65_536) -> np.ndarray:
+    """Acertos (uint8, T x D) de cada jogo contra cada um de D sorteios, em blocos de jogos."""
+    presenca_sorteios = matriz_presenca(sorteios).T.astype(np.float32)
+    presenca_jogos = matriz_presenca(jogos)
+    acertos = np.empty((len(presenca_jogos), presenca_sorteios.shape[1]), dtype=np.uint8)
+    for ini in range(0, len(presenca_jogos), bloco):
+        parte = presenca_jogos[ini:ini + bloco].astype(np.float32)
+        acertos[ini:ini + bloco] = parte @ presenca_sorteios
+    return acertos
+
+
+def tabela_premios(premios: Optional[Mapping[Any, float]]) -> np.ndarray:
+    """
+    Vetor de 16 posições (acertos -> prêmio). Aceita chaves int ou str ('11'..'15');
+    chaves que não são número de acertos são ignoradas.
+    """
+    tabela = np.zeros(16, dtype=np.float64)
+    for acertos, valor in (premios or {}).items():
+        if str(acertos).isdigit() and int(acertos) < len(tabela):
+            tabela[int(acertos)] = float(valor or 0.0)
+    return tabela
+
+
+def distribuicao(acertos: np.ndarray) -> Dict[str, int]:
+    """Distribuição no formato {"15", "14", "13", "12", "11", "0-10"}."""
+    contagem = np.bincount(np.asarray(acertos, dtype=np.intp).ravel(), minlength=16)
+    resultado = {faixa: int(contagem[int(faixa)]) for faixa in FAIXAS}
+    resultado["0-10"] = int(contagem[:11].sum())
+    return resultado
+
+
+def conferir(
+    jogos: Jogos,
+    sorteio: Union[Sequence[int], int],
+    premios: Optional[Mapping[Any, float]] = None,
+    valor_aposta: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Confere um lote contra um sorteio.
+
+    Returns:
+        {'acertos' (array uint8), 'distribuicao_acertos', 'premio_total',
+         'total_gasto', 'lucro'}
+    """
+    acertos = contar_acertos(jogos, sorteio)
+    premio_total = float(tabela_premios(premios)[acertos].sum())
+    total_gasto = len(acertos) * valor_aposta
+    return {
+        "acertos": acertos,
+        "distribuicao_acertos": distribuicao(acertos),
+        "premio_total": premio_total,
+        "total_gasto": total_gasto,
+        "lucro": premio_total - total_gasto,
+    }
+
+
+def conferir_sorteios(
+    jogos: Jogos,
+    sorteios: Sequence[Sequence[int]],
+    premios: Optional[Mapping[Any, float]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Confere um lote contra vários sorteios.
+
+    Returns:
+        {'acertos' (T x D), 'contagem' (D x 16: jogos com k acertos em cada sorteio),
+         'premio_total' (D,)}
+    """
+    acertos = contar_acertos_sorteios(jogos, sorteios)
+    contagem = np.zeros((acertos.shape[1], 16), dtype=np.int64)
+    for k in range(16):
+        contagem[:, k] = (acertos == k).sum(axis=0)
+    return {
+        "acertos": acertos,
+        "contagem": contagem,
+        "premio_total": contagem @ tabela_premios(premios),
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    jogos = np.argsort(rng.random((1_000_000, N_DEZENAS)), axis=1)[:, :15] + 1
+    sorteio = list(range(1, 16))
+
+    inicio = time.perf_counter()
+    r = conferir(jogos, sorteio, {11: 6.0, 12: 12.0, 13: 30.0, 14: 2000.0, 15: 1800000.0}, 3.0)
+    print(f"1.000.000 jogos (dezenas) em {(time.perf_counter() - inicio) * 1000:.0f} ms: {r['distribuicao_acertos']}")
+
+    presenca = matriz_presenca(jogos)
+    inicio = time.perf_counter()
+    r2 = conferir(presenca, sorteio)
+    print(f"1.000.000 jogos (matriz 25) em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    assert (r["acertos"] == r2["acertos"]).all()
+    assert all(r["acertos"][i] == len(set(jogos[i]) & set(sorteio)) for i in range(1000))
+
+    sorteios = [sorted(rng.choice(np.arange(1, 26), 15, replace=False)) for _ in range(100)]
+    inicio = time.perf_counter()
+    lote = conferir_sorteios(jogos[:10_000], sorteios)
+    print(f"10.000 jogos x 100 sorteios em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    assert (lote["acertos"][:, 0] == contar_acertos(jogos[:10_000], sorteios[0])).all()
@@ -0,0 +1,199 @@
+"""
+Lotofacil AI Engine v3.0 - Estatísticas Incrementais
+Por dezena: ocorrências, último concurso em que saiu, atraso atual e atraso
+máximo; e o estado do ciclo das dezenas (ausentes desde o início do ciclo
+corrente). Cada concurso novo atualiza tudo em O(25), sem reler o histórico,
+e a tabela frequencias é gravada num único UPDATE.
+Depende apenas de numpy; a conexão (asyncpg) é recebida pronta.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.bitmask import Jogo, mask_para_jogo, normalizar_mask
+
+logger = logging.getLogger(__name__)
+
+N_DEZENAS = 25
+TODAS = (1 << N_DEZENAS) - 1
+_BITS = np.arange(N_DEZENAS, dtype=np.uint32)
+
+SQL_ATUALIZAR_FREQUENCIAS = """
+    UPDATE frequencias AS f
+       SET ocorrencias = u.ocorrencias,
+           ultima_aparicao = u.ultima_aparicao,
+           updated_at = NOW()
+      FROM unnest($1::int[], $2::int[], $3::int[]) AS u(dezena, ocorrencias, ultima_aparicao)
+     WHERE f.dezena = u.dezena
+"""
+
+
+class EstatisticasDezenas:
+    """
+    Estado acumulado dos concursos já vistos, em arrays de 25 posições
+    (índice d-1 = dezena d). Concursos entram em ordem crescente; um
+    concurso igual ou anterior ao último já contabilizado é ignorado.
+
+    Ciclo: começa com as 25 dezenas ausentes e fecha no concurso em que a
+    última ausente sai; o seguinte abre um ciclo novo. ciclo_numero segue a
+    numeração do Ciclo_das_Dezenas_Completo.csv (o primeiro fechamento é o 2).
+    """
+
+    def __init__(self):
+        self.ocorrencias = np.zeros(N_DEZENAS, dtype=np.int64)
+        self.ultima_aparicao = np.zeros(N_DEZENAS, dtype=np.int64)  # 0 = nunca saiu
+        self.atraso = np.zeros(N_DEZENAS, dtype=np.int64)
+        self.atraso_max = np.zeros(N_DEZENAS, dtype=np.int64)
+        self.concursos = 0
+        self.ultimo_numero: Optional[int] = None
+        self.ausentes_ciclo = TODAS
+        self.ciclo_numero = 1
+        self.ciclo_qtd = 0
+        self.ultimo_fechamento: Optional[Tuple[int, int]] = None  # (concurso, qtd de concursos)
+
+    @classmethod
+    def dos_concursos(cls, concursos: Iterable[Tuple[int, Jogo]]) -> "EstatisticasDezenas":
+        """Monta a partir de pares (numero, dezenas ou mask), em qualquer ordem."""
+        estatisticas = cls()
+        for numero, dezenas in sorted(concursos, key=lambda c: c[0]):
+            estatisticas.atualizar(numero, dezenas)
+        return estatisticas
+
+    @classmethod
+    def das_masks(cls, numeros: Sequence[int], masks: Sequence[int]) -> "EstatisticasDezenas":
+        """Monta a partir das colunas (crescentes) do HistoricoSorteios."""
+        estatisticas = cls()
+        for numero, mask in zip(np.asarray(numeros).tolist(), np.asarray(masks).tolist()):
+            estatisticas.atualizar(numero, mask)
+        return estatisticas
+
+    def atualizar(self, numero: int, dezenas: Jogo) -> bool:
+        """
+        Contabiliza um concurso em O(25).
+        Retorna False se ele não é posterior ao último já contabilizado.
+        """
+        if self.ultimo_numero is not None and numero <= self.ultimo_numero:
+            return False
+        mask = normalizar_mask(dezenas)
+        saiu = ((np.uint32(mask) >> _BITS) & 1).astype(bool)
+
+        self.ocorrencias += saiu
+        self.ultima_aparicao[saiu] = numero
+        self.atraso += 1
+        self.atraso[saiu] = 0
+        np.maximum(self.atraso_max, self.atraso, out=self.atraso_max)
+        self.concursos += 1
+        self.ultimo_numero = int(numero)
+
+        self.ausentes_ciclo &= ~mask
+        self.ciclo_qtd += 1
+        if self.ausentes_ciclo == 0:
+            self.ciclo_numero += 1
+            self.ultimo_fechamento = (self.ultimo_numero, self.ciclo_qtd)
+            self.ausentes_ciclo = TODAS
+            self.ciclo_qtd = 0
+        return True
+
+    @property
+    def ciclo_fechou(self) -> bool:
+        """True se o último concurso contabilizado fechou um ciclo."""
+        return self.ultimo_fechamento is not None and self.ultimo_fechamento[0] == self.ultimo_numero
+
+    def ausentes(self) -> List[int]:
+        """Dezenas que ainda não saíram no ciclo corrente ([] logo após um fechamento)."""
+        return [] if self.ciclo_fechou else mask_para_jogo(self.ausentes_ciclo)
+
+    def quentes_frias(self, quentes: int = 15, frias: int = 5) -> Tuple[List[int], List[int]]:
+        """Dezenas por ocorrências (desempate pela menor dezena), como em padroes_gerais."""
+        ordem = np.lexsort((np.arange(N_DEZENAS), -self.ocorrencias)) + 1
+        return ordem[:quentes].tolist(), ordem[-frias:].tolist()
+
+    def por_dezena(self) -> Dict[int, Dict[str, Any]]:
+        return {
+            d: {
+                "ocorrencias": int(self.ocorrencias[d - 1]),
+                "ultima_aparicao": int(self.ultima_aparicao[d - 1]) or None,
+                "atraso": int(self.atraso[d - 1]),
+                "atraso_max": int(self.atraso_max[d - 1]),
+            }
+            for d in range(1, N_DEZENAS + 1)
+        }
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            "concursos": self.concursos,
+            "ultimo_numero": self.ultimo_numero,
+            "dezenas": self.por_dezena(),
+            "ciclo": {
+                "numero": self.ciclo_numero,
+                "qtd": self.ciclo_qtd,
+                "ausentes": self.ausentes(),
+                "ultimo_fechamento": self.ultimo_fechamento,
+            },
+        }
+
+    async def gravar_frequencias(self, conn) -> None:
+        """Grava ocorrências e última aparição das 25 dezenas num único UPDATE."""
+        await conn.execute(
+            SQL_ATUALIZAR_FREQUENCIAS,
+            list(range(1, N_DEZENAS + 1)),
+            self.ocorrencias.tolist(),
+            [int(u) or None for u in self.ultima_aparicao],
+        )
+
+
+async def estatisticas_do_banco(conn) -> EstatisticasDezenas:
+    """Monta a partir da tabela concursos com uma única leitura (numero, dezenas)."""
+    rows = await conn.fetch("SELECT numero, dezenas FROM concursos ORDER BY numero")
+    return EstatisticasDezenas.dos_concursos(
+        (row["numero"], json.loads(row["dezenas"]) if isinstance(row["dezenas"], str) else row["dezenas"])
+        for row in rows
+    )
+
+
+if __name__ == "__main__":
+    import csv
+    import time
+    import timeit
+
+    from core.historico import obter_historico
+
+    logging.basicConfig(level=logging.INFO)
+
+    historico = obter_historico()
+    inicio = time.perf_counter()
+    estatisticas = EstatisticasDezenas.das_masks(historico.numeros, historico.masks)
+    print(f"{estatisticas.concursos} concursos contabilizados em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    # Conferência com a contagem direta
+    presenca = historico.presenca()
+    assert (estatisticas.ocorrencias == presenca.sum(axis=0)).all()
+    for d in range(N_DEZENAS):
+        saidas = historico.numeros[presenca[:, d]]
+        assert estatisticas.ultima_aparicao[d] == saidas[-1]
+        assert estatisticas.atraso[d] == len(historico) - 1 - np.flatnonzero(presenca[:, d])[-1]
+
+    # Ciclos e ausentes batem com a planilha de ciclos
+    with open("data/Ciclo_das_Dezenas_Completo.csv", encoding="utf-8-sig") as f:
+        linhas = {int(l[0]): l for l in csv.reader(f, delimiter=";") if l and l[0].isdigit()}
+    parcial = EstatisticasDezenas()
+    for numero, mask in zip(historico.numeros.tolist(), historico.masks.tolist()):
+        parcial.atualizar(numero, mask)
+        linha = linhas.get(numero)
+        if linha is None:
+            continue
+        if linha[4].strip():
+            assert parcial.ciclo_fechou and parcial.ultimo_fechamento == (numero, int(linha[5])), numero
+            assert parcial.ciclo_numero == int(linha[4]), numero
+        assert parcial.ausentes() == sorted(int(a) for a in linha[6:] if a.strip()), numero
+    print(f"Ciclo atual: {estatisticas.resumo()['ciclo']}")
+
+    n = 10_000
+    copia = EstatisticasDezenas.das_masks(historico.numeros, historico.masks)
+    proximo = iter(range(estatisticas.ultimo_numero + 1, estatisticas.ultimo_numero + 1 + n))
+    sorteio = mask_para_jogo(int(historico.masks[-1]))
+    print(f"atualizar(): {timeit.timeit(lambda: copia.atualizar(next(proximo), sorteio), number=n) / n * 1e6:.1f} µs")
+    print(f"Quentes/frias: {estatisticas.quentes_frias()}")
@@ -6,6 +6,8 @@ from typing import List, Dict, Any, Optional
 
 # Importa o SupabaseClient para interagir com o banco de dados
 from app.services.supabase_client import SupabaseClient
+from core.conferencia import conferir
+from core.indice_frequencias import IndiceFrequencias
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,7 @@ class LotofacilAIv3:
         self.modo_offline = modo_offline
         self.mazusoft_data_path = mazusoft_data_path
         self.historico_concursos: List[Dict[str, Any]] = []
+        self.indice_frequencias: Optional[IndiceFrequencias] = None
         self.ultimo_concurso_sorteado: Optional[Dict[str, Any]] = None
         self.tabela_premios: Dict[str, float] = {}
         self.config_lotofacil: Dict[str, Any] = {}
@@ -97,18 +100,26 @@ class LotofacilAIv3:
         """Calcula quantas dezenas do jogo estavam ausentes no concurso anterior."""
         return len(set(jogo) - set(concurso_anterior_dezenas))
 
+    def _indice(self) -> IndiceFrequencias:
+        """Índice de frequências do histórico carregado (remontado quando muda o tamanho ou o último concurso)."""
+        ultimo = self.historico_concursos[-1]['numero'] if self.historico_concursos else None
+        if (self.indice_frequencias is None
+                or len(self.indice_frequencias) != len(self.historico_concursos)
+                or self.indice_frequencias.ultimo_numero != ultimo):
+            self.indice_frequencias = IndiceFrequencias(
+                [concurso['numero'] for concurso in self.historico_concursos],
+                [self._get_dezenas_sorteadas(concurso) for concurso in self.historico_concursos]
+            )
+        return self.indice_frequencias
+
     def _calcular_frequencia(self, jogo: List[int]) -> float:
         """Calcula a frequência média das dezenas no histórico."""
         if not self.historico_concursos:
             return 0.0
 
-        contagem_dezenas = {dezena: 0 for dezena in range(1, 26)}
-        for concurso in self.historico_concursos:
-            dezenas_sorteadas = self._get_dezenas_sorteadas(concurso)
-            for dezena in dezenas_sorteadas:
-                contagem_dezenas[dezena] += 1
-
-        frequencia_total = sum(contagem_dezenas.get(dezena, 0) for dezena in jogo)
+        indice = self._indice()
+        contagem_dezenas = indice.ultimos(len(indice))
+        frequencia_total = sum(int(contagem_dezenas[dezena - 1]) for dezena in jogo)
         return frequencia_total / len(jogo) if jogo else 0.0
 
     def _calcular_ciclo_dezenas(self, jogo: List[int]) -> float:
@@ -251,20 +262,11 @@ class LotofacilAIv3:
         Confere um lote de jogos contra as dezenas sorteadas.
         Retorna a distribuição de acertos, prêmios e lucro.
         """
-        distribuicao_acertos = {"0-10": 0, "11": 0, "12": 0, "13": 0, "14": 0, "15": 0}
-        acertos_por_jogo: List[int] = []
-        premio_total = 0.0
         custo_jogo = self.config_lotofacil.get("custo_jogo", 3.50) # Pega o custo do jogo da config
-
-        for jogo in jogos:
-            acertos = len(set(jogo).intersection(dezenas_sorteadas))
-            acertos_por_jogo.append(acertos)
-
-            if acertos >= 11:
-                distribuicao_acertos[str(acertos)] += 1
-                premio_total += self.tabela_premios.get(str(acertos), 0.0)
-            else:
-                distribuicao_acertos["0-10"] += 1
+        conferencia = conferir(jogos, dezenas_sorteadas, self.tabela_premios)
+        acertos_por_jogo: List[int] = conferencia["acertos"].tolist()
+        distribuicao_acertos = conferencia["distribuicao_acertos"]
+        premio_total = conferencia["premio_total"]
 
         total_gasto = len(jogos) * custo_jogo
         lucro = premio_total - total_gasto
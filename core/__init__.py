@@ -8,6 +8,7 @@ from .fitness_modules import FitnessCalculator
 from .mazusoft_integration import MazusoftAnalyzer
 from .event_detector import EventDetector
 from .reinforcement_learning import QLearningAgent
+from .feature_index import FeatureIndex
 
 __all__ = [
     'LotofacilAIv3',
@@ -15,5 +16,6 @@ __all__ = [
     'FitnessCalculator',
     'MazusoftAnalyzer',
     'EventDetector',
-    'QLearningAgent'
+    'QLearningAgent',
+    'FeatureIndex'
 ]
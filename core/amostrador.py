@@ -0,0 +1,176 @@
+"""
+Lotofacil AI Engine v3.0 - Amostrador Restrito
+Sorteia jogos diretamente do conjunto exato que satisfaz as restrições
+(via FeatureIndex), de forma uniforme ou ponderada por prob_matrix.
+Todo jogo sorteado é válido: não há rejeição nem número variável de tentativas.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from core.bitmask import N_DEZENAS, masks_para_jogos, soma_ponderada_array
+from core.feature_index import DIRETORIO_PADRAO, FeatureIndex, obter_indice
+from core.fitness_cache import FitnessCache, ImpressaoDigital
+
+logger = logging.getLogger(__name__)
+
+ProbMatrix = Union[Dict[int, float], Sequence[float]]
+
+
+class AmostradorRestrito:
+    """
+    Amostragem sem rejeição sobre o FeatureIndex.
+    O conjunto válido de cada combinação de restrições (e os pesos de cada
+    prob_matrix) ficam em cache LRU, então sorteios repetidos custam O(n_validos).
+    """
+
+    def __init__(self, feature_index: FeatureIndex, max_cache: int = 16, seed: Optional[int] = None):
+        self.indice = feature_index
+        self.max_cache = max_cache
+        self.rng = np.random.default_rng(seed)
+        self._validos: "OrderedDict[ImpressaoDigital, np.ndarray]" = OrderedDict()
+        self._log_pesos: "OrderedDict[ImpressaoDigital, np.ndarray]" = OrderedDict()
+
+    @staticmethod
+    def _guardar(cache: OrderedDict, chave: ImpressaoDigital, valor: np.ndarray, limite: int) -> np.ndarray:
+        cache[chave] = valor
+        if len(cache) > limite:
+            cache.popitem(last=False)
+        return valor
+
+    def validos(self, constraints: Optional[Dict] = None) -> np.ndarray:
+        """Linhas do índice (ranks) que satisfazem as restrições, em ordem crescente."""
+        chave = FitnessCache.fingerprint(constraints=constraints)
+        if chave in self._validos:
+            self._validos.move_to_end(chave)
+            return self._validos[chave]
+        return self._guardar(self._validos, chave, self.indice.indices_validos(constraints), self.max_cache)
+
+    def contar(self, constraints: Optional[Dict] = None) -> int:
+        """Quantidade de jogos que satisfazem as restrições."""
+        return len(self.validos(constraints))
+
+    def _log_pesos_validos(self, constraints: Optional[Dict], prob_matrix: ProbMatrix) -> np.ndarray:
+        """log do peso de cada jogo válido: soma de log(p_d) das suas dezenas."""
+        if isinstance(prob_matrix, dict):
+            probs = [prob_matrix.get(d, 0.0) for d in range(1, N_DEZENAS + 1)]
+        else:
+            probs = list(prob_matrix)
+        chave = FitnessCache.fingerprint(constraints=constraints, probs=probs)
+        if chave in self._log_pesos:
+            self._log_pesos.move_to_end(chave)
+            return self._log_pesos[chave]
+
+        log_p = np.log(np.clip(np.asarray(probs, dtype=np.float64), 1e-12, None))
+        masks = self.indice['mask'][self.validos(constraints)]
+        return self._guardar(self._log_pesos, chave, soma_ponderada_array(masks, log_p), self.max_cache)
+
+    def amostrar_ranks(
+        self,
+        n: int,
+        constraints: Optional[Dict] = None,
+        prob_matrix: Optional[ProbMatrix] = None,
+        excluir: Optional[Iterable[int]] = None
+    ) -> np.ndarray:
+        """
+        Sorteia n jogos distintos do conjunto válido.
+
+        Args:
+            n: Quantidade desejada (limitada ao total disponível)
+            constraints: Restrições no formato de FeatureIndex.filtrar
+            prob_matrix: {dezena: p} ou vetor de 25 posições. Se informado, cada jogo
+                tem peso proporcional ao produto de p das suas dezenas; senão, uniforme
+            excluir: Ranks que não podem ser sorteados
+
+        Returns:
+            Array com os ranks (linhas do índice) sorteados
+        """
+        validos = self.validos(constraints)
+        disponivel = np.ones(len(validos), dtype=bool)
+        if excluir is not None:
+            excluir = np.fromiter(excluir, dtype=np.int64)
+            posicoes = np.searchsorted(validos, excluir)
+            dentro = posicoes < len(validos)
+            posicoes, excluir = posicoes[dentro], excluir[dentro]
+            disponivel[posicoes[validos[posicoes] == excluir]] = False
+
+        n = min(n, int(disponivel.sum()))
+        if n <= 0:
+            logger.warning("⚠️ Nenhum jogo satisfaz as restrições")
+            return np.zeros(0, dtype=np.int64)
+
+        if prob_matrix is None:
+            if excluir is None:
+                return self.sortear(validos, n)
+            # Sorteia n + len(excluir) posições e fica com as n primeiras disponíveis:
+            # uniforme entre as disponíveis, sem copiar o conjunto válido
+            extra = min(n + len(excluir), len(validos))
+            posicoes = self.rng.choice(len(validos), size=extra, replace=False)
+            return validos[posicoes[disponivel[posicoes]][:n]]
+
+        # Sorteio ponderado sem reposição: top-n de log(peso) + ruído Gumbel
+        chave = self._log_pesos_validos(constraints, prob_matrix) + self.rng.gumbel(size=len(validos))
+        chave[~disponivel] = -np.inf
+        return validos[np.argpartition(-chave, n - 1)[:n]]
+
+    def sortear(self, conjunto: np.ndarray, n: int) -> np.ndarray:
+        """n elementos distintos e uniformes de conjunto, sorteando posições (sem permutar o conjunto)."""
+        n = min(n, len(conjunto))
+        return conjunto[self.rng.choice(len(conjunto), size=n, replace=False)]
+
+    def amostrar(
+        self,
+        n: int,
+        constraints: Optional[Dict] = None,
+        prob_matrix: Optional[ProbMatrix] = None,
+        excluir: Optional[Iterable[int]] = None
+    ) -> List[List[int]]:
+        """Como amostrar_ranks, mas devolve os jogos como listas ordenadas de dezenas."""
+        ranks = self.amostrar_ranks(n, constraints, prob_matrix, excluir)
+        return masks_para_jogos(self.indice['mask'][ranks])
+
+
+_amostrador_padrao: Optional[AmostradorRestrito] = None
+
+
+def obter_amostrador(diretorio: str = DIRETORIO_PADRAO) -> Optional[AmostradorRestrito]:
+    """
+    Amostrador compartilhado sobre o índice em 'diretorio'.
+    Retorna None se o índice ainda não foi construído (python -m core.feature_index).
+    """
+    global _amostrador_padrao
+    if _amostrador_padrao is None or _amostrador_padrao.indice.diretorio != diretorio:
+        indice = obter_indice(diretorio)
+        if indice is None:
+            logger.warning("⚠️ Amostrador restrito indisponível")
+            return None
+        _amostrador_padrao = AmostradorRestrito(indice)
+    return _amostrador_padrao
+
+
+if __name__ == "__main__":
+    import time
+
+    from utils.validators import GameValidator
+
+    logging.basicConfig(level=logging.INFO)
+
+    amostrador = AmostradorRestrito(FeatureIndex.carregar_ou_construir(), seed=7)
+    restricoes = {
+        'soma': (175, 235), 'pares': (6, 9), 'fibonacci': (3, 5), 'multiplos_3': (4, 6),
+        'primos': (4, 7), 'moldura': (10, 12), 'centro': (3, 5), 'max_consecutivo': 7
+    }
+    print(f"\nJogos válidos: {amostrador.contar(restricoes)}")
+
+    prob = {d: 0.3 + 0.02 * d for d in range(1, 26)}
+    for nome, p in (("uniforme", None), ("ponderado", prob)):
+        amostrador.amostrar(10, restricoes, p)
+        inicio = time.perf_counter()
+        jogos = amostrador.amostrar(50, restricoes, p)
+        duracao = (time.perf_counter() - inicio) * 1000
+        validador = GameValidator()
+        assert all(validador.validar_completo(j, restricoes)[0] for j in jogos)
+        print(f"{nome}: 50 jogos válidos em {duracao:.1f} ms, ex.: {jogos[0]}")
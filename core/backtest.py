@@ -0,0 +1,451 @@
+"""
+Lotofacil AI Engine v3.0 - Backtest Walk-Forward
+Reexecuta estratégias de geração para cada concurso do histórico usando
+apenas os concursos anteriores, confere o lote contra o sorteio real e
+agrega distribuição de acertos, ROI e estatísticas por estratégia.
+Os concursos são processados em blocos por um ProcessPoolExecutor. Os jogos
+gerados ficam num cache local por configuração de estratégia (hash dos
+parâmetros, quantidade, semente e código dos módulos usados): repetir uma
+configuração não gera nada de novo, e uma execução interrompida continua de
+onde parou. A conferência (barata) é sempre refeita, então mudar a tabela de
+prêmios ou o valor da aposta não invalida o cache.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import random
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from math import comb
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.bitmask import jogos_para_masks
+from core.conferencia import conferir
+from core.distribuicao_acertos import PREMIOS_PADRAO
+from core.historico import CAMINHO_HISTORICO, Concurso, carregar_historico_csv
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_CACHE = "data/backtest_cache"
+VERSAO_CACHE = 1  # incrementar quando mudar a forma como os lotes são gerados/semeados aqui
+
+
+# ----------------------------------------------------------------------
+# Estratégias: cada uma vê apenas os concursos anteriores ao alvo
+# ----------------------------------------------------------------------
+
+class Estrategia:
+    """Gera um lote para o concurso alvo a partir apenas dos concursos anteriores."""
+
+    nome = "base"
+    modulos: Tuple[str, ...] = ()  # módulos cujo código entra na chave do cache
+
+    def configuracao(self) -> Dict[str, Any]:
+        """Parâmetros que determinam os jogos gerados (atributos públicos da instância)."""
+        return {k: v for k, v in vars(self).items() if not k.startswith("_")}
+
+    def gerar(self, anteriores: List[Concurso], quantidade: int, semente: int) -> List[List[int]]:
+        raise NotImplementedError
+
+
+class EstrategiaAleatoria(Estrategia):
+    """Referência: jogos uniformes, sem usar o histórico."""
+
+    nome = "aleatoria"
+
+    def gerar(self, anteriores: List[Concurso], quantidade: int, semente: int) -> List[List[int]]:
+        rng = random.Random(semente)
+        return [sorted(rng.sample(range(1, 26), 15)) for _ in range(quantidade)]
+
+
+def _duques_fortes(anteriores: List[Concurso], janela: int, top: int = 10) -> List[Tuple[int, int, int]]:
+    contagem: Counter = Counter()
+    for _, dezenas in anteriores[-janela:]:
+        contagem.update(combinations(dezenas, 2))
+    return [(d1, d2, freq) for (d1, d2), freq in contagem.most_common(top)]
+
+
+class EstrategiaGeradorJogos(Estrategia):
+    """app.services.gerador_jogos.GeradorJogos alimentado pelo histórico anterior."""
+
+    nome = "gerador"
+    modulos = ("app.services.gerador_jogos",)
+
+    def __init__(self, janela: int = 10, janela_duques: int = 50, **parametros: Any):
+        self.janela = janela
+        self.janela_duques = janela_duques
+        self.parametros = parametros
+
+    def gerar(self, anteriores: List[Concurso], quantidade: int, semente: int) -> List[List[int]]:
+        from app.services.gerador_jogos import GeradorJogos
+
+        ultimos = anteriores[-self.janela:]
+        saidas = {d for _, dezenas in ultimos for d in dezenas}
+        gerador = GeradorJogos(
+            dezenas_ultimo=anteriores[-1][1],
+            ausentes_ultimos=sorted(set(range(1, 26)) - saidas),
+            ultimos_concursos=[{"numero": n, "dezenas": d} for n, d in reversed(ultimos)],
+            duques_fortes=_duques_fortes(anteriores, self.janela_duques),
+            janela_historica=self.janela,
+            **self.parametros,
+        )
+        return [c["jogo"] for c in gerador.gerar_jogos(quantidade=quantidade)]
+
+
+class EstrategiaLotofacilGenerator(Estrategia):
+    """app.services.lotofacil_generator.LotofacilGenerator, sem o acesso ao banco."""
+
+    nome = "lotofacil_generator"
+    modulos = ("app.services.lotofacil_generator",)
+
+    def __init__(self, janela: int = 10, pesos: Optional[Dict[str, float]] = None):
+        self.janela = janela
+        self.pesos = pesos or {"frequencia_10": 1.0, "ausentes": 1.0, "soma": 1.0, "pares": 1.0, "duques": 1.0}
+
+    def gerar(self, anteriores: List[Concurso], quantidade: int, semente: int) -> List[List[int]]:
+        from app.services.lotofacil_generator import LotofacilGenerator
+
+        gerador = LotofacilGenerator(supabase_client=None)
+        concursos = []
+        ultimos = anteriores[-(self.janela + 1):]
+        for (_, previo), (numero, dezenas) in zip(ultimos, ultimos[1:]):
+            concursos.append({
+                "numero": numero,
+                "dezenas": dezenas,
+                "soma_dezenas": sum(dezenas),
+                "pares": sum(1 for d in dezenas if d % 2 == 0),
+                "repetidas_anterior": len(set(dezenas) & set(previo)),
+            })
+        estatisticas = gerador._calcular_estatisticas_tendencias(list(reversed(concursos)))
+        return [sorted(gerador._gerar_jogo_inteligente(self.pesos, estatisticas)) for _ in range(quantidade)]
+
+
+class EstrategiaGA(Estrategia):
+    """
+    Motor genético do LotofacilAIv3 (VectorizedGeneticOptimizer + FitnessCalculator)
+    com frequências da janela anterior e o concurso anterior como contexto.
+    """
+
+    nome = "ga"
+    modulos = ("core.genetic_numpy", "core.fitness_modules", "core.bitmask")
+
+    def __init__(
+        self,
+        janela: int = 100,
+        populacao: int = 300,
+        geracoes: int = 60,
+        pesos: Optional[Dict[str, float]] = None
+    ):
+        self.janela = janela
+        self.populacao = populacao
+        self.geracoes = geracoes
+        self.pesos = pesos or {}
+        self._fitness_calc = None
+
+    def gerar(self, anteriores: List[Concurso], quantidade: int, semente: int) -> List[List[int]]:
+        from core.fitness_modules import FitnessCalculator
+        from core.genetic_numpy import VectorizedGeneticOptimizer
+
+        if self._fitness_calc is None:
+            self._fitness_calc = FitnessCalculator()
+        frequencias = Counter(d for _, dezenas in anteriores[-self.janela:] for d in dezenas)
+        total = sum(frequencias.values()) or 1
+        prob_matrix = {d: (frequencias.get(d, 0) + 1) / total for d in range(1, 26)}
+
+        ga = VectorizedGeneticOptimizer({"ga_population_size": self.populacao}, self._fitness_calc, seed=semente)
+        jogos = ga.evoluir(
+            ga.gerar_populacao_inicial(self.populacao, prob_matrix),
+            self._fitness_calc.calcular_fitness,
+            self.geracoes,
+            self.pesos,
+            historico={"frequencias": dict(frequencias)},
+            concurso_anterior=anteriores[-1][1],
+        )
+        return jogos[:quantidade]
+
+
+ESTRATEGIAS = {
+    EstrategiaAleatoria.nome: EstrategiaAleatoria,
+    EstrategiaGeradorJogos.nome: EstrategiaGeradorJogos,
+    EstrategiaLotofacilGenerator.nome: EstrategiaLotofacilGenerator,
+    EstrategiaGA.nome: EstrategiaGA,
+}
+
+
+# ----------------------------------------------------------------------
+# Cache por configuração
+# ----------------------------------------------------------------------
+
+def _hash_modulos(modulos: Sequence[str]) -> str:
+    """Hash do código-fonte dos módulos (localizados sem importá-los)."""
+    h = hashlib.sha256()
+    for nome in sorted(modulos):
+        spec = importlib.util.find_spec(nome)
+        if spec is None or not spec.origin:
+            raise ImportError(f"Módulo não encontrado: {nome}")
+        with open(spec.origin, "rb") as f:
+            h.update(nome.encode() + b"\0" + f.read())
+    return h.hexdigest()
+
+
+def chave_estrategia(estrategia: Estrategia, quantidade: int, semente: int) -> str:
+    """
+    Chave do cache: muda quando muda qualquer coisa que altera os jogos gerados
+    (configuração, quantidade, semente ou código dos módulos da estratégia).
+    """
+    conteudo = json.dumps({
+        "estrategia": estrategia.nome,
+        "configuracao": estrategia.configuracao(),
+        "quantidade": quantidade,
+        "semente": semente,
+        "codigo": _hash_modulos(estrategia.modulos),
+        "versao": VERSAO_CACHE,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode()).hexdigest()[:16]
+
+
+class CacheBacktest:
+    """
+    Lotes gerados por (estratégia, chave, concurso): um JSONL por chave com
+    {"concurso", "jogos" (bitmasks), "tempo_s"} e um .json com a configuração.
+    Os arquivos só recebem append; linha truncada por interrupção é ignorada.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_CACHE):
+        self.diretorio = diretorio
+
+    def _caminho(self, estrategia: Estrategia, chave: str, extensao: str = "jsonl") -> str:
+        return os.path.join(self.diretorio, f"{estrategia.nome}-{chave}.{extensao}")
+
+    def carregar(self, estrategia: Estrategia, chave: str) -> Dict[int, Dict[str, Any]]:
+        caminho = self._caminho(estrategia, chave)
+        if not os.path.exists(caminho):
+            return {}
+        registros = {}
+        with open(caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    continue
+                registros[registro["concurso"]] = registro
+        return registros
+
+    def gravar(self, estrategia: Estrategia, chave: str, registros: List[Dict[str, Any]]):
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = self._caminho(estrategia, chave)
+        if not os.path.exists(caminho):
+            with open(self._caminho(estrategia, chave, "json"), "w", encoding="utf-8") as f:
+                json.dump({"estrategia": estrategia.nome, "configuracao": estrategia.configuracao()},
+                          f, indent=2, default=str)
+        with open(caminho, "a+b") as f:
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")  # fecha a linha truncada por uma interrupção anterior
+            f.write("".join(json.dumps(r) + "\n" for r in registros).encode("utf-8"))
+
+
+# ----------------------------------------------------------------------
+# Execução
+# ----------------------------------------------------------------------
+
+def _gerar_bloco(
+    estrategia: Estrategia,
+    historico: List[Concurso],
+    posicoes: List[int],
+    quantidade: int,
+    semente: int
+) -> List[Dict[str, Any]]:
+    """Gera os lotes dos concursos historico[posicoes] (função de topo, para o pool)."""
+    registros = []
+    for posicao in posicoes:
+        numero = historico[posicao][0]
+        semente_concurso = (semente * 1_000_003 + zlib.crc32(estrategia.nome.encode()) + numero) % 2**32
+        random.seed(semente_concurso)
+        np.random.seed(semente_concurso)
+
+        inicio = time.perf_counter()
+        jogos = estrategia.gerar(historico[:posicao], quantidade, semente_concurso)
+        registros.append({
+            "concurso": numero,
+            "jogos": jogos_para_masks(jogos).tolist() if jogos else [],
+            "tempo_s": round(time.perf_counter() - inicio, 4),
+        })
+    return registros
+
+
+class Backtester:
+    """
+    Walk-forward sobre o histórico: para cada concurso a partir de min_historico,
+    cada estratégia gera 'quantidade' jogos com os concursos anteriores e o lote
+    é conferido contra o sorteio real.
+    """
+
+    def __init__(
+        self,
+        estrategias: Sequence[Estrategia],
+        historico: Optional[List[Concurso]] = None,
+        quantidade: int = 30,
+        premios: Optional[Dict[int, float]] = None,
+        valor_aposta: float = 3.0,
+        min_historico: int = 50,
+        workers: Optional[int] = None,
+        bloco: int = 25,
+        cache: Optional[str] = DIRETORIO_CACHE,
+        semente: int = 0
+    ):
+        nomes = [e.nome for e in estrategias]
+        if len(set(nomes)) != len(nomes):
+            raise ValueError(f"Nomes de estratégia repetidos: {nomes}")
+        self.estrategias = list(estrategias)
+        self.historico = historico if historico is not None else carregar_historico_csv()
+        self.quantidade = quantidade
+        self.premios = dict(premios) if premios is not None else dict(PREMIOS_PADRAO)
+        self.valor_aposta = valor_aposta
+        self.min_historico = min_historico
+        self.workers = workers or os.cpu_count() or 1
+        self.bloco = bloco
+        self.cache = CacheBacktest(cache) if cache else None
+        self.semente = semente
+        self.chaves = {e.nome: chave_estrategia(e, quantidade, semente) for e in self.estrategias}
+        self.resultados: List[Dict[str, Any]] = []
+
+    def _posicoes(self, inicio: Optional[int], fim: Optional[int]) -> List[int]:
+        return [
+            p for p, (numero, _) in enumerate(self.historico)
+            if p >= self.min_historico
+            and (inicio is None or numero >= inicio)
+            and (fim is None or numero <= fim)
+        ]
+
+    def _gerar(self, tarefas: List[Tuple[Estrategia, List[int]]]):
+        """Gera os blocos pendentes, sequencialmente ou no pool; produz (estratégia, registros)."""
+        extras = (self.quantidade, self.semente)
+        if self.workers <= 1 or len(tarefas) <= 1:
+            for estrategia, posicoes in tarefas:
+                yield estrategia, _gerar_bloco(estrategia, self.historico, posicoes, *extras)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futuros = {
+                executor.submit(_gerar_bloco, estrategia, self.historico, posicoes, *extras): estrategia
+                for estrategia, posicoes in tarefas
+            }
+            for futuro in as_completed(futuros):
+                yield futuros[futuro], futuro.result()
+
+    def executar(self, inicio: Optional[int] = None, fim: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Executa o backtest para os concursos de número em [inicio, fim].
+        Só são gerados os lotes que não estão no cache da configuração atual.
+
+        Returns:
+            Resumo por estratégia (ver resumo())
+        """
+        posicoes = self._posicoes(inicio, fim)
+        lotes: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        tarefas: List[Tuple[Estrategia, List[int]]] = []
+        for estrategia in self.estrategias:
+            chave = self.chaves[estrategia.nome]
+            lotes[estrategia.nome] = self.cache.carregar(estrategia, chave) if self.cache else {}
+            pendentes = [p for p in posicoes if self.historico[p][0] not in lotes[estrategia.nome]]
+            tarefas.extend((estrategia, pendentes[i:i + self.bloco]) for i in range(0, len(pendentes), self.bloco))
+            logger.info(f"🔁 {estrategia.nome} [{chave}]: {len(posicoes) - len(pendentes)} concursos no cache, "
+                        f"{len(pendentes)} a gerar")
+
+        inicio_execucao = time.perf_counter()
+        gerados = 0
+        total = sum(len(p) for _, p in tarefas)
+        for estrategia, registros in self._gerar(tarefas):
+            lotes[estrategia.nome].update((r["concurso"], r) for r in registros)
+            if self.cache:
+                self.cache.gravar(estrategia, self.chaves[estrategia.nome], registros)
+            gerados += len(registros)
+            logger.info(f"   {gerados}/{total} gerados ({time.perf_counter() - inicio_execucao:.0f}s)")
+
+        self.resultados = [
+            self._conferir(estrategia.nome, lotes[estrategia.nome][self.historico[p][0]], self.historico[p][1])
+            for estrategia in self.estrategias
+            for p in posicoes
+        ]
+        return self.resumo()
+
+    def _conferir(self, estrategia: str, registro: Dict[str, Any], sorteio: List[int]) -> Dict[str, Any]:
+        conferencia = conferir(registro["jogos"], sorteio, self.premios, self.valor_aposta)
+        return {
+            "estrategia": estrategia,
+            "concurso": registro["concurso"],
+            "jogos": len(registro["jogos"]),
+            "contagem": np.bincount(conferencia["acertos"], minlength=16).tolist(),
+            "premio": conferencia["premio_total"],
+            "custo": conferencia["total_gasto"],
+            "tempo_s": registro["tempo_s"],
+        }
+
+    def resumo(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Agregado por estratégia: concursos, jogos, distribuição de acertos,
+        prêmio, custo, ROI, concursos premiados e a taxa de jogos com 11+
+        comparada à de jogos aleatórios (hipergeométrica).
+        """
+        esperado_11 = sum(comb(15, k) * comb(10, 15 - k) for k in range(11, 16)) / comb(25, 15)
+        resumo: Dict[str, Dict[str, Any]] = {}
+        for estrategia in sorted({r["estrategia"] for r in self.resultados}):
+            linhas = [r for r in self.resultados if r["estrategia"] == estrategia]
+            contagem = np.sum([r["contagem"] for r in linhas], axis=0)
+            jogos = int(contagem.sum())
+            premio = sum(r["premio"] for r in linhas)
+            custo = sum(r["custo"] for r in linhas)
+            melhores = [max(k for k, c in enumerate(r["contagem"]) if c) for r in linhas if r["jogos"]]
+            resumo[estrategia] = {
+                "concursos": len(linhas),
+                "jogos": jogos,
+                "distribuicao_acertos": {str(k): int(contagem[k]) for k in range(11, 16)} | {"0-10": int(contagem[:11].sum())},
+                "media_acertos": round(float(np.dot(np.arange(16), contagem) / jogos), 4) if jogos else 0.0,
+                "taxa_11_mais": round(float(contagem[11:].sum() / jogos), 6) if jogos else 0.0,
+                "taxa_11_mais_aleatorio": round(esperado_11, 6),
+                "concursos_premiados": sum(1 for m in melhores if m >= 11),
+                "melhor_acerto": max(melhores) if melhores else 0,
+                "premio_total": round(premio, 2),
+                "custo_total": round(custo, 2),
+                "lucro": round(premio - custo, 2),
+                "roi": round((premio - custo) / custo, 4) if custo else 0.0,
+                "tempo_medio_s": round(float(np.mean([r["tempo_s"] for r in linhas])), 4),
+            }
+        return resumo
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Backtest walk-forward das estratégias de geração")
+    parser.add_argument("--estrategias", default="aleatoria,gerador", help=f"Entre: {', '.join(ESTRATEGIAS)}")
+    parser.add_argument("--csv", default=CAMINHO_HISTORICO)
+    parser.add_argument("--quantidade", type=int, default=30)
+    parser.add_argument("--inicio", type=int, default=None, help="Primeiro concurso")
+    parser.add_argument("--fim", type=int, default=None, help="Último concurso")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=DIRETORIO_CACHE, help="Diretório do cache ('' desativa)")
+    args = parser.parse_args()
+
+    backtester = Backtester(
+        [ESTRATEGIAS[nome]() for nome in args.estrategias.split(",")],
+        historico=carregar_historico_csv(args.csv),
+        quantidade=args.quantidade,
+        workers=args.workers,
+        cache=args.cache or None,
+    )
+    for nome, estatisticas in backtester.executar(args.inicio, args.fim).items():
+        print(f"\n{nome}:")
+        for chave, valor in estatisticas.items():
+            print(f"  {chave}: {valor}")
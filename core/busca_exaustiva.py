@@ -0,0 +1,200 @@
+"""
+Lotofacil AI Engine v3.0 - Busca Exaustiva
+Para pesos fixos o fitness é função determinística do jogo: avaliando as
+3.268.760 combinações do FeatureIndex obtém-se o ótimo global exato,
+que serve também de referência para medir a distância do resultado do GA.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.bitmask import jogos_para_masks, masks_para_jogos, popcount_array
+from core.feature_index import FeatureIndex
+from core.fitness_cache import FitnessCache, ImpressaoDigital
+from core.fitness_modules import FitnessCalculator
+
+logger = logging.getLogger(__name__)
+
+
+class BuscaExaustiva:
+    """
+    Pontua todo o espaço de jogos com FitnessCalculator.calcular_fitness_lote
+    e devolve o top-K exato (opcionalmente com diversidade mínima entre os jogos).
+    """
+
+    def __init__(
+        self,
+        feature_index: FeatureIndex,
+        fitness_calc: Optional[FitnessCalculator] = None,
+        bloco: int = 1_000_000
+    ):
+        self.indice = feature_index
+        self.fitness_calc = fitness_calc or FitnessCalculator()
+        self.bloco = bloco
+        self._ultimo: Optional[Tuple[ImpressaoDigital, np.ndarray]] = None
+        logger.info("✅ Busca exaustiva inicializada")
+
+    def pontuar(
+        self,
+        pesos: Dict[str, float],
+        constraints: Optional[Dict] = None,
+        **fitness_kwargs: Any
+    ) -> np.ndarray:
+        """
+        Fitness de todos os jogos (linha i = rank i do índice).
+        Jogos fora das restrições recebem -inf. O último resultado fica em cache.
+
+        Args:
+            pesos: Pesos dos critérios
+            constraints: Restrições no formato de GameValidator.validar_completo (opcional)
+            **fitness_kwargs: historico, concurso_anterior (temperatura é ignorada)
+
+        Returns:
+            Array float64 com um fitness por jogo
+        """
+        fitness_kwargs.pop('temperatura', None)
+        fingerprint = FitnessCache.fingerprint(pesos=pesos, constraints=constraints, **fitness_kwargs)
+        if self._ultimo is not None and self._ultimo[0] == fingerprint:
+            return self._ultimo[1]
+
+        masks = self.indice['mask']
+        scores = np.empty(len(masks), dtype=np.float64)
+        for ini in range(0, len(masks), self.bloco):
+            fim = min(ini + self.bloco, len(masks))
+            scores[ini:fim] = self.fitness_calc.calcular_fitness_lote(masks[ini:fim], pesos, **fitness_kwargs)
+
+        if constraints:
+            scores[~self.indice.filtrar(constraints)] = -np.inf
+
+        self._ultimo = (fingerprint, scores)
+        return scores
+
+    def top_k(
+        self,
+        k: int,
+        pesos: Dict[str, float],
+        constraints: Optional[Dict] = None,
+        max_sobreposicao: Optional[int] = None,
+        **fitness_kwargs: Any
+    ) -> List[Tuple[List[int], float]]:
+        """
+        Os k jogos de maior fitness (empates resolvidos pela ordem lexicográfica).
+
+        Args:
+            k: Quantidade de jogos
+            pesos: Pesos dos critérios
+            constraints: Restrições (opcional)
+            max_sobreposicao: Se definido, dois jogos escolhidos compartilham no máximo
+                esse número de dezenas (seleção gulosa na ordem do fitness)
+            **fitness_kwargs: historico, concurso_anterior
+
+        Returns:
+            Lista de (jogo, fitness) em ordem decrescente de fitness
+        """
+        scores = self.pontuar(pesos, constraints, **fitness_kwargs)
+        validos = int(np.isfinite(scores).sum())
+        k = min(k, validos)
+        if k <= 0:
+            return []
+
+        if max_sobreposicao is None:
+            limiar = np.partition(scores, len(scores) - k)[len(scores) - k]
+            acima = np.flatnonzero(scores > limiar)
+            empatados = np.flatnonzero(scores == limiar)[:k - len(acima)]
+            candidatos = np.concatenate([acima, empatados])
+            escolhidos = candidatos[np.lexsort((candidatos, -scores[candidatos]))]
+        else:
+            escolhidos = self._selecionar_diversos(scores, k, max_sobreposicao, validos)
+
+        masks = self.indice['mask'][escolhidos]
+        return list(zip(masks_para_jogos(masks), scores[escolhidos].tolist()))
+
+    def _selecionar_diversos(
+        self,
+        scores: np.ndarray,
+        k: int,
+        max_sobreposicao: int,
+        validos: int,
+        lote: int = 20_000
+    ) -> np.ndarray:
+        """Seleção gulosa por fitness respeitando a sobreposição máxima entre jogos."""
+        ordem = np.argsort(-scores, kind='stable')[:validos]
+        masks = self.indice['mask']
+        escolhidos: List[int] = []
+        masks_escolhidas = np.zeros(0, dtype=np.uint32)
+
+        for ini in range(0, len(ordem), lote):
+            candidatos = ordem[ini:ini + lote]
+            m_cand = np.asarray(masks[candidatos], dtype=np.uint32)
+            # Descarta em lote os que já conflitam com os escolhidos
+            if len(masks_escolhidas):
+                conflito = popcount_array(m_cand[:, None] & masks_escolhidas[None, :]).max(axis=1)
+                livres = conflito <= max_sobreposicao
+                candidatos, m_cand = candidatos[livres], m_cand[livres]
+
+            for idx, mask in zip(candidatos.tolist(), m_cand.tolist()):
+                if len(masks_escolhidas) and popcount_array(masks_escolhidas & mask).max() > max_sobreposicao:
+                    continue
+                escolhidos.append(idx)
+                masks_escolhidas = np.append(masks_escolhidas, np.uint32(mask))
+                if len(escolhidos) >= k:
+                    return np.array(escolhidos)
+
+        if len(escolhidos) < k:
+            logger.warning(f"⚠️ Apenas {len(escolhidos)}/{k} jogos com sobreposição <= {max_sobreposicao}")
+        return np.array(escolhidos, dtype=np.int64)
+
+    def comparar(
+        self,
+        jogos: Sequence[Union[List[int], int]],
+        pesos: Dict[str, float],
+        constraints: Optional[Dict] = None,
+        **fitness_kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Distância entre um conjunto de jogos (ex.: saída do GA) e o ótimo exato.
+
+        Returns:
+            Dicionário com fitness_otimo, fitness_melhor (dos jogos), gap,
+            gap_percentual e jogos_melhores (quantos jogos do espaço superam o melhor recebido)
+        """
+        scores = self.pontuar(pesos, constraints, **fitness_kwargs)
+        otimo = float(scores.max())
+
+        masks = jogos_para_masks(jogos)
+        fitness_jogos = self.fitness_calc.calcular_fitness_lote(masks, pesos, **fitness_kwargs)
+        melhor = float(fitness_jogos.max()) if len(fitness_jogos) else 0.0
+
+        return {
+            'fitness_otimo': round(otimo, 4),
+            'fitness_melhor': round(melhor, 4),
+            'gap': round(otimo - melhor, 4),
+            'gap_percentual': round(100 * (otimo - melhor) / otimo, 2) if otimo > 0 else 0.0,
+            'jogos_melhores': int((scores > melhor).sum()),
+            'jogos_otimos': int((scores == otimo).sum()),
+        }
+
+
+if __name__ == "__main__":
+    import time
+
+    logging.basicConfig(level=logging.INFO)
+
+    busca = BuscaExaustiva(FeatureIndex.carregar_ou_construir())
+    pesos = {'soma': 1.5, 'frequencia': 2.0}
+    historico = {'frequencias': {d: 900 + 7 * d for d in range(1, 26)}}
+
+    inicio = time.perf_counter()
+    melhores = busca.top_k(5, pesos, historico=historico)
+    print(f"\nTop 5 exato em {time.perf_counter() - inicio:.2f}s:")
+    for jogo, fitness in melhores:
+        print(f"  {jogo} -> {fitness:.4f}")
+
+    diversos = busca.top_k(5, pesos, max_sobreposicao=10, historico=historico)
+    print("\nTop 5 com no máximo 10 dezenas em comum:")
+    for jogo, fitness in diversos:
+        print(f"  {jogo} -> {fitness:.4f}")
+
+    print(f"\nComparação: {busca.comparar([j for j, _ in diversos], pesos, historico=historico)}")
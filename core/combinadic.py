@@ -0,0 +1,146 @@
+"""
+Lotofacil AI Engine v3.0 - Rank/Unrank de Jogos (Combinadic)
+Mapeia cada jogo ordenado de 15 dezenas para sua posição lexicográfica
+em 0..3.268.759 (um inteiro de 22 bits) e vice-versa.
+
+A ordem é a mesma de itertools.combinations(range(1, 26), 15), portanto
+o rank de um jogo é também a sua linha no FeatureIndex.
+"""
+
+from math import comb
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+N_DEZENAS = 25
+TAMANHO_JOGO = 15
+TOTAL_JOGOS = comb(N_DEZENAS, TAMANHO_JOGO)  # 3.268.760
+
+# _BINOM[a, k] = C(a, k) para a, k em 0..25
+_BINOM = np.array(
+    [[comb(a, k) for k in range(N_DEZENAS + 1)] for a in range(N_DEZENAS + 1)],
+    dtype=np.int64
+)
+
+# _PESO[i, d] = C(25 - d, 15 - i) para a posição i (0-based) ocupada pela dezena d
+_PESO = np.zeros((TAMANHO_JOGO, N_DEZENAS + 1), dtype=np.int64)
+for _i in range(TAMANHO_JOGO):
+    for _d in range(1, N_DEZENAS + 1):
+        _PESO[_i, _d] = _BINOM[N_DEZENAS - _d, TAMANHO_JOGO - _i]
+
+
+def _validar_jogo(jogo: Sequence[int]) -> List[int]:
+    jogo_sorted = sorted(int(d) for d in jogo)
+    if len(jogo_sorted) != TAMANHO_JOGO or len(set(jogo_sorted)) != TAMANHO_JOGO:
+        raise ValueError(f"Jogo deve ter {TAMANHO_JOGO} dezenas únicas: {list(jogo)}")
+    if jogo_sorted[0] < 1 or jogo_sorted[-1] > N_DEZENAS:
+        raise ValueError(f"Dezenas devem estar entre 1 e {N_DEZENAS}: {list(jogo)}")
+    return jogo_sorted
+
+
+def rank_jogo(jogo: Sequence[int]) -> int:
+    """
+    Retorna a posição lexicográfica do jogo (0 = [1..15], TOTAL_JOGOS - 1 = [11..25]).
+
+    Args:
+        jogo: 15 dezenas únicas entre 1 e 25 (qualquer ordem)
+
+    Returns:
+        Inteiro em 0..TOTAL_JOGOS - 1
+    """
+    jogo_sorted = _validar_jogo(jogo)
+    return TOTAL_JOGOS - 1 - sum(
+        int(_PESO[i, d]) for i, d in enumerate(jogo_sorted)
+    )
+
+
+def unrank_jogo(rank: int) -> List[int]:
+    """
+    Inverso de rank_jogo.
+
+    Args:
+        rank: Inteiro em 0..TOTAL_JOGOS - 1
+
+    Returns:
+        Lista ordenada de 15 dezenas
+    """
+    if not 0 <= rank < TOTAL_JOGOS:
+        raise ValueError(f"Rank fora do intervalo [0, {TOTAL_JOGOS - 1}]: {rank}")
+    return unrank_jogos(np.array([rank]))[0].tolist()
+
+
+def rank_jogos(jogos) -> np.ndarray:
+    """
+    Versão vetorizada de rank_jogo.
+
+    Args:
+        jogos: Matriz (N, 15) de dezenas (cada linha em ordem crescente)
+
+    Returns:
+        Array uint32 com N ranks
+    """
+    jogos = np.asarray(jogos, dtype=np.int64)
+    if jogos.ndim != 2 or jogos.shape[1] != TAMANHO_JOGO:
+        raise ValueError(f"Esperada matriz (N, {TAMANHO_JOGO}), recebido {jogos.shape}")
+    if len(jogos) == 0:
+        return np.zeros(0, dtype=np.uint32)
+    if jogos.min() < 1 or jogos.max() > N_DEZENAS or np.any(np.diff(jogos, axis=1) <= 0):
+        raise ValueError("Cada jogo deve ter dezenas únicas entre 1 e 25 em ordem crescente")
+
+    soma = _PESO[np.arange(TAMANHO_JOGO), jogos].sum(axis=1)
+    return (TOTAL_JOGOS - 1 - soma).astype(np.uint32)
+
+
+def unrank_jogos(ranks) -> np.ndarray:
+    """
+    Versão vetorizada de unrank_jogo.
+
+    Args:
+        ranks: Array com N ranks em 0..TOTAL_JOGOS - 1
+
+    Returns:
+        Matriz uint8 (N, 15) com as dezenas em ordem crescente
+    """
+    ranks = np.asarray(ranks, dtype=np.int64).ravel()
+    if len(ranks) and (ranks.min() < 0 or ranks.max() >= TOTAL_JOGOS):
+        raise ValueError(f"Ranks devem estar em [0, {TOTAL_JOGOS - 1}]")
+
+    restante = TOTAL_JOGOS - 1 - ranks
+    jogos = np.empty((len(ranks), TAMANHO_JOGO), dtype=np.uint8)
+    for i in range(TAMANHO_JOGO):
+        k = TAMANHO_JOGO - i
+        # Maior a tal que C(a, k) <= restante; a dezena é 25 - a
+        a = np.searchsorted(_BINOM[:N_DEZENAS, k], restante, side='right') - 1
+        restante = restante - _BINOM[a, k]
+        jogos[:, i] = N_DEZENAS - a
+    return jogos
+
+
+def deduplicar_jogos(jogos: Iterable[Sequence[int]]) -> List[List[int]]:
+    """Remove jogos repetidos (mesmas dezenas) preservando a ordem original."""
+    vistos = set()
+    unicos = []
+    for jogo in jogos:
+        rank = rank_jogo(jogo)
+        if rank not in vistos:
+            vistos.add(rank)
+            unicos.append(sorted(int(d) for d in jogo))
+    return unicos
+
+
+if __name__ == "__main__":
+    import itertools
+    import random
+
+    print("=== TESTE COMBINADIC ===")
+    print(f"Total de jogos: {TOTAL_JOGOS}")
+    print(f"rank([1..15]) = {rank_jogo(range(1, 16))}")
+    print(f"rank([11..25]) = {rank_jogo(range(11, 26))}")
+
+    amostra = sorted(random.sample(range(TOTAL_JOGOS), 1000))
+    jogos = unrank_jogos(amostra)
+    assert rank_jogos(jogos).tolist() == amostra
+
+    primeiros = list(itertools.islice(itertools.combinations(range(1, 26), 15), 500))
+    assert rank_jogos(np.array(primeiros)).tolist() == list(range(500))
+    print("✅ Testes concluídos!")
@@ -1,10 +1,14 @@
 """Contest Writer - Módulo para inserir novos concursos no Supabase"""
 import asyncio
 import asyncpg
+import copy
 import json
 import logging
 from datetime import date
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from core.estatisticas import EstatisticasDezenas, estatisticas_do_banco
+from core.historico import obter_historico
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +19,7 @@ class ContestWriter:
         self.db_url = db_url
         self.pool = None
         self._initialized = False
+        self._estatisticas: Optional[EstatisticasDezenas] = None
 
     async def initialize(self):
         """Inicializa o pool de conexões."""
@@ -69,59 +74,67 @@ class ContestWriter:
 
         async with self.pool.acquire() as conn:
             try:
-                # Verifica se já existe
-                existing = await conn.fetchval(
-                    "SELECT numero FROM concursos WHERE numero = $1",
-                    numero
-                )
-                if existing:
-                    logger.warning(f"[ContestWriter] Concurso {numero} já existe")
-                    return False
-
-                # Calcula estatísticas
-                soma_dezenas = sum(dezenas_sorted)
-                pares = sum(1 for d in dezenas_sorted if d % 2 == 0)
-                impares = 15 - pares
-                primos_set = {2, 3, 5, 7, 11, 13, 17, 19, 23}
-                primos = sum(1 for d in dezenas_sorted if d in primos_set)
-                fibonacci_set = {1, 2, 3, 5, 8, 13, 21}
-                fibonacci = sum(1 for d in dezenas_sorted if d in fibonacci_set)
-
-                moldura_set = {1,2,3,4,5,6,10,11,15,16,20,21,22,23,24,25}
-                centro_set = {7,8,9,12,13,14,17,18,19}
-                moldura = sum(1 for d in dezenas_sorted if d in moldura_set)
-                centro = sum(1 for d in dezenas_sorted if d in centro_set)
-
-                # Repetições do concurso anterior
-                repetidas_anterior = 0
-                ultimo = await conn.fetchrow(
-                    "SELECT numero, dezenas FROM concursos ORDER BY numero DESC LIMIT 1"
-                )
-                if ultimo and ultimo["numero"] == numero - 1:
-                    dezenas_anteriores = set(json.loads(ultimo["dezenas"]))
-                    repetidas_anterior = len(set(dezenas_sorted) & dezenas_anteriores)
-
-                # Converte dezenas para JSON
-                dezenas_json = json.dumps(dezenas_sorted)
-
-                # Insere o concurso
-                await conn.execute(
-                    """
-                    INSERT INTO concursos 
-                    (numero, data, dezenas, soma_dezenas, pares, impares, 
-                     primos, fibonacci, repetidas_anterior, moldura, centro)
-                    VALUES ($1, $2, $3::jsonb, $4, $5, $6, $7, $8, $9, $10, $11)
-                    """,
-                    numero, data_sorteio, dezenas_json, soma_dezenas, 
-                    pares, impares, primos, fibonacci, repetidas_anterior, 
-                    moldura, centro
-                )
+                # Tudo numa transação: se frequências ou padrões falharem, o concurso não fica no banco
+                async with conn.transaction():
+                    # Verifica se já existe
+                    existing = await conn.fetchval(
+                        "SELECT numero FROM concursos WHERE numero = $1",
+                        numero
+                    )
+                    if existing:
+                        logger.warning(f"[ContestWriter] Concurso {numero} já existe")
+                        return False
+
+                    # Calcula estatísticas
+                    soma_dezenas = sum(dezenas_sorted)
+                    pares = sum(1 for d in dezenas_sorted if d % 2 == 0)
+                    impares = 15 - pares
+                    primos_set = {2, 3, 5, 7, 11, 13, 17, 19, 23}
+                    primos = sum(1 for d in dezenas_sorted if d in primos_set)
+                    fibonacci_set = {1, 2, 3, 5, 8, 13, 21}
+                    fibonacci = sum(1 for d in dezenas_sorted if d in fibonacci_set)
+
+                    moldura_set = {1,2,3,4,5,6,10,11,15,16,20,21,22,23,24,25}
+                    centro_set = {7,8,9,12,13,14,17,18,19}
+                    moldura = sum(1 for d in dezenas_sorted if d in moldura_set)
+                    centro = sum(1 for d in dezenas_sorted if d in centro_set)
+
+                    # Repetições do concurso anterior
+                    repetidas_anterior = 0
+                    ultimo = await conn.fetchrow(
+                        "SELECT numero, dezenas FROM concursos ORDER BY numero DESC LIMIT 1"
+                    )
+                    if ultimo and ultimo["numero"] == numero - 1:
+                        dezenas_anteriores = set(json.loads(ultimo["dezenas"]))
+                        repetidas_anterior = len(set(dezenas_sorted) & dezenas_anteriores)
+
+                    # Converte dezenas para JSON
+                    dezenas_json = json.dumps(dezenas_sorted)
+
+                    # Insere o concurso
+                    await conn.execute(
+                        """
+                        INSERT INTO concursos 
+                        (numero, data, dezenas, soma_dezenas, pares, impares, 
+                         primos, fibonacci, repetidas_anterior, moldura, centro)
+                        VALUES ($1, $2, $3::jsonb, $4, $5, $6, $7, $8, $9, $10, $11)
+                        """,
+                        numero, data_sorteio, dezenas_json, soma_dezenas, 
+                        pares, impares, primos, fibonacci, repetidas_anterior, 
+                        moldura, centro
+                    )
+
+                    # Atualiza frequências e padrões
+                    estatisticas = await self._update_frequencies(conn, numero, dezenas_sorted)
+                    await self._update_patterns(conn, estatisticas)
 
                 logger.info(f"[ContestWriter] ✅ Concurso {numero} inserido!")
 
-                # Atualiza frequências e padrões
-                await self._update_frequencies(conn)
-                await self._update_patterns(conn)
+                # Só depois do commit: estatísticas em memória, histórico local e seu store em disco
+                self._estatisticas = estatisticas
+                historico = obter_historico()
+                if historico is not None:
+                    historico.adicionar(numero, dezenas_sorted, data_sorteio)
 
                 return True
 
@@ -131,78 +144,65 @@ class ContestWriter:
                 traceback.print_exc()
                 return False
 
-    async def _update_frequencies(self, conn):
-        """Atualiza a tabela de frequências."""
-        try:
-            for dezena in range(1, 26):
-                count = await conn.fetchval(
-                    """
-                    SELECT COUNT(*) 
-                    FROM concursos c, jsonb_array_elements(c.dezenas) AS d
-                    WHERE d::int = $1
-                    """,
-                    dezena
-                )
-
-                ultima_aparicao = await conn.fetchval(
-                    """
-                    SELECT MAX(c.numero) 
-                    FROM concursos c, jsonb_array_elements(c.dezenas) AS d
-                    WHERE d::int = $1
-                    """,
-                    dezena
-                )
-
-                await conn.execute(
-                    """
-                    UPDATE frequencias 
-                    SET ocorrencias = $1, ultima_aparicao = $2, updated_at = NOW()
-                    WHERE dezena = $3
-                    """,
-                    count, ultima_aparicao, dezena
-                )
-
-            logger.info("[ContestWriter] Frequências atualizadas")
-        except Exception as e:
-            logger.error(f"[ContestWriter] Erro ao atualizar frequências: {e}")
-
-    async def _update_patterns(self, conn):
-        """Atualiza padrões gerais (dezenas quentes/frias)."""
-        try:
-            freq_data = await conn.fetch(
-                "SELECT dezena, ocorrencias FROM frequencias ORDER BY ocorrencias DESC, dezena"
-            )
-
-            dezenas_ordenadas = [row["dezena"] for row in freq_data]
-            dezenas_quentes = dezenas_ordenadas[:15]
-            dezenas_frias = dezenas_ordenadas[-5:]
-
-            quentes_json = json.dumps(dezenas_quentes)
-            frias_json = json.dumps(dezenas_frias)
-
-            await conn.execute(
-                """
-                INSERT INTO padroes_gerais (tipo, valor, updated_at) 
-                VALUES ('dezenas_quentes', $1::jsonb, NOW())
-                ON CONFLICT (tipo) DO UPDATE 
-                SET valor = EXCLUDED.valor, updated_at = NOW()
-                """,
-                quentes_json
-            )
-
-            await conn.execute(
-                """
-                INSERT INTO padroes_gerais (tipo, valor, updated_at) 
-                VALUES ('dezenas_frias', $1::jsonb, NOW())
-                ON CONFLICT (tipo) DO UPDATE 
-                SET valor = EXCLUDED.valor, updated_at = NOW()
-                """,
-                frias_json
-            )
-
-            logger.info("[ContestWriter] Padrões atualizados")
-        except Exception as e:
-            logger.error(f"[ContestWriter] Erro ao atualizar padrões: {e}")
+    async def _estatisticas_atualizadas(self, conn, numero: int, dezenas: list) -> EstatisticasDezenas:
+        """
+        Estatísticas por dezena já incluindo o concurso inserido (ainda não
+        confirmado): uma cópia das do histórico local, ou das últimas mantidas
+        em memória, mais este concurso em O(25) quando elas têm exatamente os
+        demais concursos do banco (mesma quantidade e mesmo último número);
+        senão, uma leitura do banco. Nada compartilhado é alterado antes do commit.
+        """
+        anteriores = await conn.fetchrow(
+            "SELECT COUNT(*) AS total, MAX(numero) AS ultimo FROM concursos WHERE numero <> $1",
+            numero
+        )
+        historico = obter_historico()
+        for base in (historico.estatisticas if historico is not None else None, self._estatisticas):
+            if (base is not None and base.concursos == anteriores["total"]
+                    and base.ultimo_numero == anteriores["ultimo"]):
+                estatisticas = copy.deepcopy(base)
+                if estatisticas.atualizar(numero, dezenas):
+                    return estatisticas
+        return await estatisticas_do_banco(conn)
+
+    async def _update_frequencies(self, conn, numero: int, dezenas: list) -> EstatisticasDezenas:
+        """
+        Atualiza a tabela de frequências (um único UPDATE para as 25 dezenas).
+        Erros sobem para desfazer a transação do concurso.
+        """
+        estatisticas = await self._estatisticas_atualizadas(conn, numero, dezenas)
+        await estatisticas.gravar_frequencias(conn)
+        logger.info("[ContestWriter] Frequências atualizadas")
+        return estatisticas
+
+    async def _update_patterns(self, conn, estatisticas: EstatisticasDezenas):
+        """Atualiza padrões gerais (dezenas quentes/frias). Erros sobem para desfazer a transação."""
+        dezenas_quentes, dezenas_frias = estatisticas.quentes_frias()
+
+        quentes_json = json.dumps(dezenas_quentes)
+        frias_json = json.dumps(dezenas_frias)
+
+        await conn.execute(
+            """
+            INSERT INTO padroes_gerais (tipo, valor, updated_at) 
+            VALUES ('dezenas_quentes', $1::jsonb, NOW())
+            ON CONFLICT (tipo) DO UPDATE 
+            SET valor = EXCLUDED.valor, updated_at = NOW()
+            """,
+            quentes_json
+        )
+
+        await conn.execute(
+            """
+            INSERT INTO padroes_gerais (tipo, valor, updated_at) 
+            VALUES ('dezenas_frias', $1::jsonb, NOW())
+            ON CONFLICT (tipo) DO UPDATE 
+            SET valor = EXCLUDED.valor, updated_at = NOW()
+            """,
+            frias_json
+        )
+
+        logger.info("[ContestWriter] Padrões atualizados")
 
 
 # --- TESTE ---
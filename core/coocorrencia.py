@@ -0,0 +1,230 @@
+"""
+Lotofacil AI Engine v3.0 - Coocorrência de Dezenas
+Contagem de pares (25 x 25) e, opcionalmente, ternos (25 x 25 x 25) de
+dezenas sorteadas juntas, no histórico inteiro e em janelas móveis dos
+últimos N concursos. Cada concurso novo soma seu produto externo (e tira o
+do concurso que saiu da janela), sem recontar os 105 pares de cada sorteio.
+Quantos duques fortes cada jogo de um lote contém sai de uma multiplicação
+de matrizes sobre a presença (T x 25).
+"""
+
+from collections import Counter, deque
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.conferencia import Jogos, matriz_presenca
+
+N_DEZENAS = 25
+JANELAS_PADRAO = (50,)
+_PARES = np.triu_indices(N_DEZENAS, k=1)
+_TERNOS = np.array(list(combinations(range(N_DEZENAS), 3)), dtype=np.intp).T
+
+Duque = Tuple[int, int, int]  # (d1, d2, vezes), formato de GeradorJogos.duques_fortes
+
+
+def matriz_pares(pares: Iterable[Sequence[int]]) -> np.ndarray:
+    """Matriz (25, 25) triangular superior com 1 em cada par (d1, d2[, ...]) listado."""
+    matriz = np.zeros((N_DEZENAS, N_DEZENAS), dtype=np.float32)
+    for par in pares:
+        d1, d2 = sorted((int(par[0]), int(par[1])))
+        matriz[d1 - 1, d2 - 1] = 1.0
+    return matriz
+
+
+def contar_pares_fortes(jogos: Jogos, fortes: np.ndarray) -> np.ndarray:
+    """
+    Quantos pares marcados em fortes (matriz de matriz_pares) cada jogo contém.
+    Para a presença P (T x 25): soma de (P @ F) * P por linha.
+    """
+    presenca = matriz_presenca(jogos).astype(np.float32)
+    if len(presenca) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.rint(((presenca @ fortes) * presenca).sum(axis=1)).astype(np.int64)
+
+
+class MatrizCoocorrencia:
+    """
+    pares[i, j] = concursos em que as dezenas i+1 e j+1 saíram juntas
+    (diagonal = ocorrências da dezena); pares_janela[n] é o mesmo nos
+    últimos n concursos; ternos[i, j, k] (opcional) para três dezenas.
+    Concursos entram em ordem crescente de número.
+    """
+
+    def __init__(self, janelas: Sequence[int] = JANELAS_PADRAO, ternos: bool = False):
+        self.janelas = tuple(sorted({int(j) for j in janelas}))
+        self.pares = np.zeros((N_DEZENAS, N_DEZENAS), dtype=np.int64)
+        self.pares_janela: Dict[int, np.ndarray] = {j: np.zeros_like(self.pares) for j in self.janelas}
+        self.ternos: Optional[np.ndarray] = np.zeros((N_DEZENAS,) * 3, dtype=np.int32) if ternos else None
+        self.concursos = 0
+        self.ultimo_numero: Optional[int] = None
+        # Presença dos últimos max(janelas)+1 concursos, para tirar quem sai de cada janela
+        self._recentes: deque = deque(maxlen=(self.janelas[-1] + 1) if self.janelas else 1)
+
+    @classmethod
+    def das_masks(
+        cls,
+        numeros: Sequence[int],
+        masks: Sequence[int],
+        janelas: Sequence[int] = JANELAS_PADRAO,
+        ternos: bool = False
+    ) -> "MatrizCoocorrencia":
+        """Monta de uma vez a partir de colunas crescentes (HistoricoSorteios.numeros/masks)."""
+        matriz = cls(janelas, ternos)
+        numeros = np.asarray(numeros)
+        if len(numeros) == 0:
+            return matriz
+        presenca = matriz_presenca(np.asarray(masks, dtype=np.uint32)).astype(np.float64)
+        matriz.pares = np.rint(presenca.T @ presenca).astype(np.int64)
+        for j in matriz.janelas:
+            recorte = presenca[-j:]
+            matriz.pares_janela[j] = np.rint(recorte.T @ recorte).astype(np.int64)
+        if ternos:
+            duplas = (presenca[:, :, None] * presenca[:, None, :]).reshape(len(presenca), -1)
+            matriz.ternos = np.rint(duplas.T @ presenca).reshape((N_DEZENAS,) * 3).astype(np.int32)
+        matriz._recentes.extend(presenca[-matriz._recentes.maxlen:].astype(np.int64))
+        matriz.concursos = len(numeros)
+        matriz.ultimo_numero = int(numeros[-1])
+        return matriz
+
+    @classmethod
+    def dos_concursos(
+        cls,
+        concursos: Iterable[Dict[str, Any]],
+        janelas: Sequence[int] = (),
+        ternos: bool = False
+    ) -> "MatrizCoocorrencia":
+        """A partir de registros {'numero', 'dezenas'} (formato do SupabaseClient), em qualquer ordem."""
+        validos = sorted((c for c in concursos if c.get("dezenas")), key=lambda c: c["numero"])
+        masks = [sum(1 << (int(d) - 1) for d in c["dezenas"]) for c in validos]
+        return cls.das_masks([c["numero"] for c in validos], masks, janelas, ternos)
+
+    def atualizar(self, numero: int, dezenas: Any) -> bool:
+        """
+        Contabiliza um concurso: O(25²) nos pares (e O(25³) nos ternos).
+        Retorna False se ele não é posterior ao último já contabilizado.
+        """
+        if self.ultimo_numero is not None and numero <= self.ultimo_numero:
+            return False
+        lote = np.array([dezenas], dtype=np.uint32) if isinstance(dezenas, (int, np.integer)) else [list(dezenas)]
+        presenca = matriz_presenca(lote)[0].astype(np.int64)
+        produto = np.outer(presenca, presenca)
+
+        self.pares += produto
+        self._recentes.append(presenca)
+        for j in self.janelas:
+            self.pares_janela[j] += produto
+            if len(self._recentes) > j:
+                saiu = self._recentes[-j - 1]
+                self.pares_janela[j] -= np.outer(saiu, saiu)
+        if self.ternos is not None:
+            self.ternos += (produto[:, :, None] * presenca[None, None, :]).astype(np.int32)
+
+        self.concursos += 1
+        self.ultimo_numero = int(numero)
+        return True
+
+    def sincronizar(self, numeros: Sequence[int], masks: Sequence[int]) -> bool:
+        """
+        Acompanha colunas crescentes das quais esta matriz já contabilizou um
+        prefixo, somando só os concursos novos. False se não for prefixo.
+        """
+        if len(numeros) < self.concursos or (
+            self.concursos and numeros[self.concursos - 1] != self.ultimo_numero
+        ):
+            return False
+        for numero, mask in zip(np.asarray(numeros[self.concursos:]).tolist(), np.asarray(masks[self.concursos:]).tolist()):
+            self.atualizar(numero, mask)
+        return True
+
+    def matriz(self, janela: Optional[int] = None) -> np.ndarray:
+        """Contagens de pares do histórico inteiro (janela=None) ou de uma das janelas mantidas."""
+        if janela is None:
+            return self.pares
+        if janela not in self.pares_janela:
+            raise ValueError(f"Janela {janela} não é mantida (disponíveis: {self.janelas})")
+        return self.pares_janela[janela]
+
+    def duques_fortes(self, top: Optional[int] = 10, janela: Optional[int] = None) -> List[Duque]:
+        """Pares mais frequentes (desempate pelo menor par) como (d1, d2, vezes)."""
+        contagem = self.matriz(janela)[_PARES]
+        ordem = np.lexsort((_PARES[1], _PARES[0], -contagem))
+        ordem = ordem[contagem[ordem] > 0][:top]
+        return [(int(_PARES[0][i]) + 1, int(_PARES[1][i]) + 1, int(contagem[i])) for i in ordem]
+
+    def ternos_fortes(self, top: Optional[int] = 10) -> List[Tuple[int, int, int, int]]:
+        """Ternos mais frequentes do histórico inteiro como (d1, d2, d3, vezes)."""
+        if self.ternos is None:
+            raise ValueError("Contagem de ternos não habilitada (ternos=True)")
+        contagem = self.ternos[tuple(_TERNOS)]
+        ordem = np.lexsort((_TERNOS[2], _TERNOS[1], _TERNOS[0], -contagem))
+        ordem = ordem[contagem[ordem] > 0][:top]
+        return [(*(int(_TERNOS[k][i]) + 1 for k in range(3)), int(contagem[i])) for i in ordem]
+
+    def contador_pares(self, janela: Optional[int] = None) -> Counter:
+        """Counter {(d1, d2): vezes} dos pares que saíram (formato do LotofacilGenerator)."""
+        return Counter({(d1, d2): vezes for d1, d2, vezes in self.duques_fortes(None, janela)})
+
+    def contar_pares_fortes(self, jogos: Jogos, top: int = 10, janela: Optional[int] = None) -> np.ndarray:
+        """Quantos dos top duques fortes cada jogo do lote contém."""
+        return contar_pares_fortes(jogos, matriz_pares(self.duques_fortes(top, janela)))
+
+
+_matrizes: Dict[Tuple[int, Tuple[int, ...], bool], Tuple[Any, MatrizCoocorrencia]] = {}
+
+
+def obter_coocorrencia(
+    historico: Any,
+    janelas: Sequence[int] = JANELAS_PADRAO,
+    ternos: bool = False
+) -> MatrizCoocorrencia:
+    """
+    Coocorrência compartilhada de um histórico (HistoricoSorteios ou qualquer
+    objeto com colunas crescentes numeros/masks), acompanhando os concursos
+    adicionados a ele desde a última consulta.
+    """
+    chave = (id(historico), tuple(sorted({int(j) for j in janelas})), bool(ternos))
+    _, matriz = _matrizes.get(chave, (None, None))
+    if matriz is None or not matriz.sincronizar(historico.numeros, historico.masks):
+        matriz = MatrizCoocorrencia.das_masks(historico.numeros, historico.masks, janelas, ternos)
+        _matrizes[chave] = (historico, matriz)
+    return matriz
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    concursos = [{"numero": n, "dezenas": sorted(random.sample(range(1, 26), 15))} for n in range(1, 2001)]
+
+    def pares_diretos(janela):
+        contagem = Counter()
+        for c in janela:
+            contagem.update(combinations(c["dezenas"], 2))
+        return contagem
+
+    inicio = time.perf_counter()
+    matriz = MatrizCoocorrencia.dos_concursos(concursos[:1500], janelas=(10, 50), ternos=True)
+    print(f"1500 concursos (pares + ternos) em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    for c in concursos[1500:]:
+        assert matriz.atualizar(c["numero"], c["dezenas"])
+    assert not matriz.atualizar(2000, concursos[-1]["dezenas"])
+
+    completa = MatrizCoocorrencia.dos_concursos(concursos, janelas=(10, 50), ternos=True)
+    assert (matriz.pares == completa.pares).all() and (matriz.ternos == completa.ternos).all()
+    for j in (10, 50):
+        assert (matriz.pares_janela[j] == completa.pares_janela[j]).all()
+        assert matriz.contador_pares(j) == pares_diretos(concursos[-j:])
+    diretos = pares_diretos(concursos)
+    assert [(a, b) for a, b, _ in matriz.duques_fortes(5)] == [p for p, _ in sorted(diretos.items(), key=lambda x: (-x[1], x[0]))[:5]]
+    ternos = Counter(t for c in concursos for t in combinations(c["dezenas"], 3))
+    assert matriz.ternos_fortes(3)[0][3] == max(ternos.values())
+
+    jogos = np.argsort(np.random.default_rng(0).random((100_000, N_DEZENAS)), axis=1)[:, :15] + 1
+    inicio = time.perf_counter()
+    contagens = matriz.contar_pares_fortes(jogos, top=10, janela=50)
+    print(f"Duques fortes em 100.000 jogos: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    fortes = {(a, b) for a, b, _ in matriz.duques_fortes(10, 50)}
+    assert all(contagens[i] == sum(1 for p in combinations(sorted(jogos[i]), 2) if p in fortes) for i in range(300))
+    print(f"Top duques (50): {matriz.duques_fortes(5, 50)}")
@@ -0,0 +1,287 @@
+"""
+Lotofacil AI Engine v3.0 - Distribuição Exata de Acertos
+Avalia um lote de jogos contra TODOS os 3.268.760 sorteios possíveis
+(equiprováveis): distribuição do melhor acerto, P(pelo menos 11..15)
+e a distribuição exata do prêmio total do lote.
+Os acertos de cada bloco de sorteios saem de um produto matricial float32
+(presença dos sorteios x presença dos jogos), com memória limitada pelo bloco.
+EstadoCobertura mantém o mesmo resultado de forma incremental, para
+construção gulosa de lotes (adicionar/remover um jogo = uma passada).
+"""
+
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.bitmask import jogos_para_masks, masks_para_matriz, normalizar_mask, popcount_array
+from core.combinadic import TOTAL_JOGOS, unrank_jogos
+from core.conferencia import tabela_premios
+from core.feature_index import FeatureIndex, obter_indice
+
+logger = logging.getLogger(__name__)
+
+PREMIOS_PADRAO = {11: 6.0, 12: 12.0, 13: 30.0, 14: 2000.0, 15: 1800000.0}
+FAIXAS_PREMIADAS = (11, 12, 13, 14, 15)
+NIVEL_MINIMO = 5  # dois jogos de 15 dezenas em 25 sempre têm ao menos 5 em comum
+
+
+def matriz_jogos(jogos: Sequence[Union[Sequence[int], int]]) -> np.ndarray:
+    """Matriz float32 (25, T) de presença dos jogos (listas ou bitmasks)."""
+    masks = jogos if isinstance(jogos, np.ndarray) and jogos.ndim == 1 else jogos_para_masks(jogos)
+    return masks_para_matriz(masks).T.astype(np.float32)
+
+
+class AvaliadorDistribuicao:
+    """
+    Avaliador exato de lotes sobre o espaço completo de sorteios.
+    Usa a coluna 'mask' do FeatureIndex quando disponível; sem índice,
+    as bitmasks dos sorteios são geradas uma vez por unrank.
+    """
+
+    def __init__(
+        self,
+        feature_index: Optional[FeatureIndex] = None,
+        premios: Optional[Dict[int, float]] = None,
+        valor_aposta: float = 3.0,
+        bloco: int = 65_536
+    ):
+        self.indice = feature_index
+        self.premios = dict(premios) if premios is not None else dict(PREMIOS_PADRAO)
+        self.valor_aposta = valor_aposta
+        self.bloco = bloco
+        # Chaves int ou str (tabelas vindas de JSON)
+        self.tabela_premios = tabela_premios(self.premios)
+        self._masks: Optional[np.ndarray] = None
+
+    def masks_sorteios(self) -> np.ndarray:
+        """Bitmasks (uint32) de todos os sorteios, indexadas pelo rank."""
+        if self.indice is not None:
+            return self.indice['mask']
+        if self._masks is None:
+            self._masks = np.concatenate([
+                jogos_para_masks(unrank_jogos(np.arange(ini, min(ini + self.bloco, TOTAL_JOGOS))))
+                for ini in range(0, TOTAL_JOGOS, self.bloco)
+            ])
+        return self._masks
+
+    def sorteios(self, ini: int, fim: int) -> np.ndarray:
+        """Matriz float32 (fim - ini, 25) de presença dos sorteios com rank em [ini, fim)."""
+        return masks_para_matriz(self.masks_sorteios()[ini:fim]).astype(np.float32)
+
+    def blocos_acertos(
+        self,
+        jogos: Sequence[Union[Sequence[int], int]]
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Percorre o espaço de sorteios em blocos.
+
+        Yields:
+            (rank inicial do bloco, matriz uint8 (bloco, T) de acertos de cada jogo)
+        """
+        presenca_jogos = matriz_jogos(jogos)
+        for ini in range(0, TOTAL_JOGOS, self.bloco):
+            fim = min(ini + self.bloco, TOTAL_JOGOS)
+            yield ini, (self.sorteios(ini, fim) @ presenca_jogos).astype(np.uint8)
+
+    def acertos_jogo(self, jogo: Union[Sequence[int], int]) -> np.ndarray:
+        """Acertos de um jogo em cada um dos 3.268.760 sorteios (uint8, indexado pelo rank)."""
+        return popcount_array(self.masks_sorteios() & np.uint32(normalizar_mask(jogo)))
+
+    def resumo(
+        self,
+        contagem_melhor: np.ndarray,
+        premios_contagem: Dict[float, int],
+        total_jogos: int
+    ) -> Dict[str, Any]:
+        """Relatório a partir do histograma do melhor acerto e da contagem de sorteios por prêmio total."""
+        valores = np.array(sorted(premios_contagem), dtype=np.float64)
+        probs = np.array([premios_contagem[v] for v in valores.tolist()], dtype=np.float64) / TOTAL_JOGOS
+        esperado = float((valores * probs).sum())
+        desvio = float(np.sqrt(((valores - esperado) ** 2 * probs).sum()))
+        custo = total_jogos * self.valor_aposta
+
+        pelo_menos = np.cumsum(contagem_melhor[::-1])[::-1]
+        return {
+            "total_jogos": total_jogos,
+            "total_sorteios": TOTAL_JOGOS,
+            "distribuicao_melhor_acerto": {str(k): int(contagem_melhor[k]) for k in range(16) if contagem_melhor[k]},
+            "prob_pelo_menos": {str(k): float(pelo_menos[k] / TOTAL_JOGOS) for k in FAIXAS_PREMIADAS},
+            "premio_esperado": round(esperado, 4),
+            "desvio_premio": round(desvio, 4),
+            "custo": round(custo, 2),
+            "retorno_esperado": round(esperado - custo, 4),
+            "retorno_percentual": round(100 * esperado / custo, 4) if custo else 0.0,
+            "prob_premio": float(probs[valores > 0].sum()),
+            "prob_lucro": float(probs[valores > custo].sum()),
+            "distribuicao_premio": {float(v): float(p) for v, p in zip(valores, probs)},
+        }
+
+    def avaliar(self, jogos: Sequence[Union[Sequence[int], int]]) -> Dict[str, Any]:
+        """
+        Distribuição exata do desempenho do lote sobre todos os sorteios.
+
+        Returns:
+            Dicionário com distribuicao_melhor_acerto (contagens 0..15),
+            prob_pelo_menos (11..15), premio_esperado, desvio_premio, custo,
+            retorno_esperado, prob_premio, prob_lucro e distribuicao_premio
+            ({prêmio total: probabilidade})
+        """
+        inicio = time.perf_counter()
+        total_jogos = len(jogos)
+        if total_jogos == 0:
+            raise ValueError("Lote vazio")
+
+        contagem_melhor = np.zeros(16, dtype=np.int64)
+        premios_contagem: Counter = Counter()
+        for _, acertos in self.blocos_acertos(jogos):
+            contagem_melhor += np.bincount(acertos.max(axis=1), minlength=16)
+            premio = self.tabela_premios[acertos].sum(axis=1)
+            valores, contagens = np.unique(premio, return_counts=True)
+            premios_contagem.update(dict(zip(valores.tolist(), contagens.tolist())))
+
+        resultado = self.resumo(contagem_melhor, premios_contagem, total_jogos)
+        logger.info(f"📊 Lote de {total_jogos} jogos avaliado em {TOTAL_JOGOS} sorteios "
+                    f"({time.perf_counter() - inicio:.1f}s): E[prêmio] = {resultado['premio_esperado']:.2f}")
+        return resultado
+
+
+class EstadoCobertura:
+    """
+    Estado incremental de um lote sobre todos os sorteios: quantos jogos fazem
+    cada número de acertos (5..15) em cada sorteio, o melhor acerto e o prêmio total.
+    Adicionar ou remover um jogo é uma passada sobre os sorteios, sem reavaliar o lote.
+    """
+
+    def __init__(self, avaliador: Optional[AvaliadorDistribuicao] = None, capacidade: int = 255):
+        self.avaliador = avaliador or AvaliadorDistribuicao(obter_indice())
+        self.capacidade = capacidade
+        dtype = np.uint8 if capacidade <= np.iinfo(np.uint8).max else np.uint16
+        self.contagens = np.zeros((16 - NIVEL_MINIMO, TOTAL_JOGOS), dtype=dtype)
+        self.melhor = np.zeros(TOTAL_JOGOS, dtype=np.uint8)
+        self.premio = np.zeros(TOTAL_JOGOS, dtype=np.float64)
+        self.histograma = np.zeros(16, dtype=np.int64)
+        self.histograma[0] = TOTAL_JOGOS
+        self.jogos: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.jogos)
+
+    def _acertos(self, jogo: Union[Sequence[int], int], acertos: Optional[np.ndarray]) -> np.ndarray:
+        return acertos if acertos is not None else self.avaliador.acertos_jogo(jogo)
+
+    def _atualizar_melhor(self, idx: np.ndarray, novos: np.ndarray):
+        self.histograma -= np.bincount(self.melhor[idx], minlength=16)
+        self.melhor[idx] = novos
+        self.histograma += np.bincount(novos, minlength=16)
+
+    def adicionar(self, jogo: Union[Sequence[int], int], acertos: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Inclui um jogo no lote.
+
+        Args:
+            jogo: Lista de dezenas ou bitmask
+            acertos: Acertos do jogo em cada sorteio, se já calculados
+
+        Returns:
+            Os acertos do jogo em cada sorteio
+        """
+        if len(self.jogos) >= self.capacidade:
+            raise ValueError(f"Capacidade do estado esgotada ({self.capacidade} jogos)")
+        mask = normalizar_mask(jogo)
+        acertos = self._acertos(mask, acertos)
+
+        for nivel in range(NIVEL_MINIMO, 16):
+            self.contagens[nivel - NIVEL_MINIMO][acertos == nivel] += 1
+        self.premio += self.avaliador.tabela_premios[acertos]
+
+        idx = np.flatnonzero(acertos > self.melhor)
+        self._atualizar_melhor(idx, acertos[idx])
+        self.jogos.append(mask)
+        return acertos
+
+    def remover(self, jogo: Union[Sequence[int], int], acertos: Optional[np.ndarray] = None) -> np.ndarray:
+        """Retira um jogo do lote (uma ocorrência). Levanta ValueError se ele não estiver no lote."""
+        mask = normalizar_mask(jogo)
+        if mask not in self.jogos:
+            raise ValueError("Jogo não pertence ao lote")
+        acertos = self._acertos(mask, acertos)
+
+        for nivel in range(NIVEL_MINIMO, 16):
+            self.contagens[nivel - NIVEL_MINIMO][acertos == nivel] -= 1
+        self.premio -= self.avaliador.tabela_premios[acertos]
+        self.jogos.remove(mask)
+
+        # Só mudam os sorteios em que o jogo era o único com o melhor acerto
+        idx = np.flatnonzero(acertos == self.melhor)
+        idx = idx[self.contagens[self.melhor[idx].astype(np.intp) - NIVEL_MINIMO, idx] == 0]
+        if len(idx):
+            presentes = self.contagens[::-1, idx] > 0
+            novos = np.where(presentes.any(axis=0), 15 - presentes.argmax(axis=0), 0).astype(np.uint8)
+            self._atualizar_melhor(idx, novos)
+        return acertos
+
+    def ganho(self, jogo: Union[Sequence[int], int], nivel: int = 11, acertos: Optional[np.ndarray] = None) -> int:
+        """Sorteios que passariam a ter ao menos 'nivel' acertos se o jogo fosse adicionado."""
+        acertos = self._acertos(jogo, acertos)
+        return int(np.count_nonzero((acertos >= nivel) & (self.melhor < nivel)))
+
+    def perda(self, jogo: Union[Sequence[int], int], nivel: int = 11, acertos: Optional[np.ndarray] = None) -> int:
+        """Sorteios que deixariam de ter ao menos 'nivel' acertos se o jogo (do lote) fosse removido."""
+        acertos = self._acertos(jogo, acertos)
+        idx = np.flatnonzero(acertos >= nivel)
+        cobertos = self.contagens[nivel - NIVEL_MINIMO:, idx].sum(axis=0)
+        return int(np.count_nonzero(cobertos == 1))
+
+    def prob_pelo_menos(self, nivel: int) -> float:
+        """P(algum jogo do lote faz ao menos 'nivel' acertos)."""
+        return float(self.histograma[nivel:].sum() / TOTAL_JOGOS)
+
+    def premio_esperado(self) -> float:
+        return float(self.premio.mean())
+
+    def resumo(self) -> Dict[str, Any]:
+        """Mesmo relatório de AvaliadorDistribuicao.avaliar para o lote atual."""
+        valores, contagens = np.unique(self.premio, return_counts=True)
+        return self.avaliador.resumo(
+            self.histograma, dict(zip(valores.tolist(), contagens.tolist())), len(self.jogos)
+        )
+
+
+if __name__ == "__main__":
+    import random
+    from math import comb
+
+    logging.basicConfig(level=logging.INFO)
+
+    avaliador = AvaliadorDistribuicao(obter_indice())
+
+    # Um único jogo: as probabilidades são hipergeométricas
+    jogo = list(range(1, 16))
+    r = avaliador.avaliar([jogo])
+    for k in FAIXAS_PREMIADAS:
+        exato = sum(comb(15, a) * comb(10, 15 - a) for a in range(k, 16)) / TOTAL_JOGOS
+        assert abs(r["prob_pelo_menos"][str(k)] - exato) < 1e-12
+    print("✅ Jogo único confere com a hipergeométrica")
+
+    lote = [sorted(random.sample(range(1, 26), 15)) for _ in range(100)]
+    inicio = time.perf_counter()
+    r = avaliador.avaliar(lote)
+    print(f"\nLote de 100 jogos em {time.perf_counter() - inicio:.1f}s")
+    print(f"P(>=11..15): {r['prob_pelo_menos']}")
+    print(f"E[prêmio] = {r['premio_esperado']:.2f} para custo {r['custo']:.2f} ({r['retorno_percentual']:.1f}%)")
+
+    # Estado incremental: adiciona 30 jogos, remove 10 e confere com a avaliação completa
+    estado = EstadoCobertura(avaliador)
+    inicio = time.perf_counter()
+    for j in lote[:30]:
+        estado.adicionar(j)
+    for j in lote[:10]:
+        estado.remover(j)
+    print(f"\n40 atualizações incrementais em {time.perf_counter() - inicio:.1f}s")
+    incremental, completo = estado.resumo(), avaliador.avaliar(lote[10:30])
+    for chave in ("distribuicao_melhor_acerto", "prob_pelo_menos", "premio_esperado", "distribuicao_premio"):
+        assert incremental[chave] == completo[chave], chave
+    print("✅ Estado incremental confere com a avaliação completa")
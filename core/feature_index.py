@@ -0,0 +1,280 @@
+"""
+Lotofacil AI Engine v3.0 - Índice de Features Pré-computado
+Calcula uma única vez as features de todas as C(25,15) = 3.268.760 combinações
+e as armazena em colunas .npy que podem ser abertas com memory-map.
+"""
+
+import itertools
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.bitmask import PRIMOS, FIBONACCI, MOLDURA, CENTRO, masks_para_jogos, normalizar_mask, popcount_array
+from core.combinadic import rank_jogo
+
+logger = logging.getLogger(__name__)
+
+TOTAL_COMBINACOES = 3268760  # C(25, 15)
+VERSAO_INDICE = 1
+DIRETORIO_PADRAO = "data/feature_index"
+
+# Colunas escalares com faixa (min, max) aceitas em constraints
+COLUNAS_FAIXA = (
+    'soma', 'pares', 'primos', 'fibonacci', 'multiplos_3',
+    'moldura', 'centro', 'consecutivos', 'spread'
+)
+
+COLUNAS = {
+    'mask': np.uint32,
+    'soma': np.uint16,
+    'pares': np.uint8,
+    'primos': np.uint8,
+    'fibonacci': np.uint8,
+    'multiplos_3': np.uint8,
+    'moldura': np.uint8,
+    'centro': np.uint8,
+    'max_consecutivo': np.uint8,
+    'consecutivos': np.uint8,
+    'spread': np.uint8,
+    'linhas': np.uint8,   # (N, 5): dezenas 1-5, 6-10, 11-15, 16-20, 21-25
+    'colunas': np.uint8,  # (N, 5): colunas do volante (d - 1) % 5
+}
+
+
+def _tabela(conjunto: set) -> np.ndarray:
+    """Tabela de pertinência indexada pela dezena (0 não usado)."""
+    tabela = np.zeros(26, dtype=bool)
+    tabela[list(conjunto)] = True
+    return tabela
+
+
+def calcular_features(jogos: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Calcula as features de um bloco de jogos ordenados.
+
+    Args:
+        jogos: Matriz (N, 15) de dezenas em ordem crescente
+
+    Returns:
+        Dicionário coluna -> array com N linhas
+    """
+    jogos = np.asarray(jogos, dtype=np.uint8)
+    n = len(jogos)
+
+    diffs = np.diff(jogos.astype(np.int16), axis=1) == 1
+    seq_atual = np.zeros(n, dtype=np.uint8)
+    max_seq = np.zeros(n, dtype=np.uint8)
+    for i in range(diffs.shape[1]):
+        seq_atual = (seq_atual + 1) * diffs[:, i]
+        np.maximum(max_seq, seq_atual, out=max_seq)
+
+    linha = (jogos - 1) // 5
+    coluna = (jogos - 1) % 5
+
+    return {
+        'mask': np.left_shift(np.uint32(1), jogos - 1, dtype=np.uint32).sum(axis=1, dtype=np.uint32),
+        'soma': jogos.sum(axis=1, dtype=np.uint16),
+        'pares': (jogos % 2 == 0).sum(axis=1, dtype=np.uint8),
+        'primos': _tabela(PRIMOS)[jogos].sum(axis=1, dtype=np.uint8),
+        'fibonacci': _tabela(FIBONACCI)[jogos].sum(axis=1, dtype=np.uint8),
+        'multiplos_3': (jogos % 3 == 0).sum(axis=1, dtype=np.uint8),
+        'moldura': _tabela(MOLDURA)[jogos].sum(axis=1, dtype=np.uint8),
+        'centro': _tabela(CENTRO)[jogos].sum(axis=1, dtype=np.uint8),
+        'max_consecutivo': max_seq + 1,
+        'consecutivos': diffs.sum(axis=1, dtype=np.uint8),
+        'spread': jogos[:, -1] - jogos[:, 0],
+        'linhas': np.stack([(linha == r).sum(axis=1, dtype=np.uint8) for r in range(5)], axis=1),
+        'colunas': np.stack([(coluna == c).sum(axis=1, dtype=np.uint8) for c in range(5)], axis=1),
+    }
+
+
+def construir_indice(diretorio: str = DIRETORIO_PADRAO, bloco: int = 500_000) -> "FeatureIndex":
+    """
+    Enumera todas as combinações em ordem lexicográfica e grava uma coluna .npy por feature.
+    A linha i do índice corresponde à i-ésima combinação de itertools.combinations(1..25, 15).
+
+    Args:
+        diretorio: Pasta de destino
+        bloco: Quantidade de jogos processados por vez (limita memória intermediária)
+
+    Returns:
+        FeatureIndex aberto sobre os arquivos gravados
+    """
+    inicio = datetime.now()
+    logger.info(f"🧮 Construindo índice de features em {diretorio}...")
+    os.makedirs(diretorio, exist_ok=True)
+
+    jogos = np.fromiter(
+        itertools.combinations(range(1, 26), 15),
+        dtype=np.dtype((np.uint8, 15)),
+        count=TOTAL_COMBINACOES
+    )
+
+    saidas = {}
+    for nome, dtype in COLUNAS.items():
+        shape = (TOTAL_COMBINACOES, 5) if nome in ('linhas', 'colunas') else (TOTAL_COMBINACOES,)
+        saidas[nome] = np.lib.format.open_memmap(
+            os.path.join(diretorio, f"{nome}.npy"), mode='w+', dtype=dtype, shape=shape
+        )
+
+    for ini in range(0, TOTAL_COMBINACOES, bloco):
+        fim = min(ini + bloco, TOTAL_COMBINACOES)
+        for nome, valores in calcular_features(jogos[ini:fim]).items():
+            saidas[nome][ini:fim] = valores
+
+    for arr in saidas.values():
+        arr.flush()
+    del saidas
+
+    with open(os.path.join(diretorio, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            'versao': VERSAO_INDICE,
+            'total': TOTAL_COMBINACOES,
+            'colunas': list(COLUNAS),
+            'data_construcao': datetime.now().isoformat()
+        }, f, indent=2)
+
+    duracao = (datetime.now() - inicio).total_seconds()
+    logger.info(f"✅ Índice construído: {TOTAL_COMBINACOES} jogos em {duracao:.1f}s")
+    return FeatureIndex(diretorio)
+
+
+class FeatureIndex:
+    """
+    Índice colunar (memory-mapped) com as features de todos os jogos possíveis.
+    Permite filtrar candidatos com predicados vetorizados sobre as colunas.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_PADRAO, mmap: bool = True):
+        self.diretorio = diretorio
+        meta_path = os.path.join(diretorio, "meta.json")
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"Índice de features não encontrado em {diretorio}")
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get('versao') != VERSAO_INDICE:
+            raise ValueError(f"Versão do índice incompatível: {self.meta.get('versao')} != {VERSAO_INDICE}")
+
+        modo = 'r' if mmap else None
+        self.colunas = {
+            nome: np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode=modo)
+            for nome in COLUNAS
+        }
+        logger.info(f"✅ Índice de features carregado: {len(self)} jogos")
+
+    @classmethod
+    def carregar_ou_construir(cls, diretorio: str = DIRETORIO_PADRAO) -> "FeatureIndex":
+        """Abre o índice existente ou constrói um novo."""
+        try:
+            return cls(diretorio)
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"⚠️ {e}. Construindo índice...")
+            return construir_indice(diretorio)
+
+    def __len__(self) -> int:
+        return int(self.meta.get('total', TOTAL_COMBINACOES))
+
+    def __getitem__(self, coluna: str) -> np.ndarray:
+        return self.colunas[coluna]
+
+    def filtrar(self, constraints: Optional[Dict] = None) -> np.ndarray:
+        """
+        Avalia as restrições sobre todas as linhas do índice.
+
+        Args:
+            constraints: Mesmo formato de GameValidator.validar_completo
+                ({'soma': (min, max), ..., 'max_consecutivo': int}), mais
+                'repetidas': (min, max) em relação a 'ultimo_concurso' (lista ou bitmask),
+                'dezenas_fixas' e 'dezenas_excluidas' (listas de dezenas).
+                Chaves desconhecidas são ignoradas.
+
+        Returns:
+            Máscara booleana com uma posição por jogo
+        """
+        selecao = np.ones(len(self), dtype=bool)
+        if not constraints:
+            return selecao
+
+        for nome in COLUNAS_FAIXA:
+            if nome in constraints:
+                minimo, maximo = constraints[nome]
+                coluna = self.colunas[nome]
+                selecao &= (coluna >= minimo) & (coluna <= maximo)
+
+        if 'max_consecutivo' in constraints:
+            selecao &= self.colunas['max_consecutivo'] <= constraints['max_consecutivo']
+
+        if 'repetidas' in constraints and constraints.get('ultimo_concurso') is not None:
+            minimo, maximo = constraints['repetidas']
+            repetidas = popcount_array(self.colunas['mask'] & normalizar_mask(constraints['ultimo_concurso']))
+            selecao &= (repetidas >= minimo) & (repetidas <= maximo)
+
+        fixas = constraints.get('dezenas_fixas')
+        excluidas = constraints.get('dezenas_excluidas')
+        fixas = normalizar_mask(fixas) if fixas is not None else 0
+        excluidas = normalizar_mask(excluidas) if excluidas is not None else 0
+        if fixas or excluidas:
+            masks = self.colunas['mask']
+            selecao &= (masks & (fixas | excluidas)) == fixas
+
+        return selecao
+
+    def contar(self, constraints: Optional[Dict] = None) -> int:
+        """Quantidade exata de jogos que satisfazem as restrições."""
+        return int(np.count_nonzero(self.filtrar(constraints)))
+
+    def indices_validos(self, constraints: Optional[Dict] = None) -> np.ndarray:
+        """Retorna as posições (linhas do índice) que satisfazem as restrições."""
+        return np.flatnonzero(self.filtrar(constraints))
+
+    def linha(self, jogo: List[int]) -> int:
+        """Linha do índice correspondente ao jogo (igual ao rank lexicográfico)."""
+        return rank_jogo(jogo)
+
+    def jogos(self, indices: np.ndarray) -> List[List[int]]:
+        """Converte linhas do índice em listas ordenadas de dezenas."""
+        return masks_para_jogos(self.colunas['mask'][np.asarray(indices)])
+
+
+_indices_abertos: Dict[str, FeatureIndex] = {}
+
+
+def obter_indice(diretorio: str = DIRETORIO_PADRAO) -> Optional[FeatureIndex]:
+    """
+    FeatureIndex compartilhado (aberto uma vez por diretório).
+    Retorna None se o índice ainda não foi construído (python -m core.feature_index).
+    """
+    if diretorio not in _indices_abertos:
+        try:
+            _indices_abertos[diretorio] = FeatureIndex(diretorio)
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"⚠️ {e}")
+            return None
+    return _indices_abertos[diretorio]
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Constrói o índice de features de todos os jogos")
+    parser.add_argument("--destino", default=DIRETORIO_PADRAO)
+    args = parser.parse_args()
+
+    indice = construir_indice(args.destino)
+
+    restricoes = {
+        'soma': (175, 235), 'pares': (6, 9), 'fibonacci': (3, 5), 'multiplos_3': (4, 6),
+        'primos': (4, 7), 'moldura': (10, 12), 'centro': (3, 5), 'max_consecutivo': 7
+    }
+    t0 = time.perf_counter()
+    validos = indice.indices_validos(restricoes)
+    print(f"\n{len(validos)} jogos válidos em {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(f"Exemplos: {indice.jogos(validos[:3])}")
@@ -0,0 +1,175 @@
+"""
+Lotofacil AI Engine v3.0 - Cache de Fitness
+Memoização LRU do fitness por jogo (bitmask) + impressão digital dos
+pesos/contexto, evitando reavaliar elites e filhos repetidos a cada geração.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _congelar(valor: Any) -> Hashable:
+    """Converte dicts/listas/arrays em estruturas imutáveis comparáveis."""
+    if isinstance(valor, dict):
+        # Chaves congeladas com o tipo: {1: x} e {'1': x} são contextos diferentes
+        itens = ((_congelar(k), _congelar(v)) for k, v in valor.items())
+        return (dict,) + tuple(sorted(itens, key=lambda item: (type(item[0]).__name__, repr(item[0]))))
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        itens = sorted(valor) if isinstance(valor, (set, frozenset)) else valor
+        return tuple(_congelar(v) for v in itens)
+    if isinstance(valor, np.ndarray):
+        return (valor.dtype.str, valor.shape, valor.tobytes())
+    if isinstance(valor, np.generic):
+        return valor.item()
+    try:
+        hash(valor)
+    except TypeError:
+        # Objetos não hasheáveis entram pelo repr (o padrão já inclui o id do objeto)
+        return (type(valor).__qualname__, repr(valor))
+    return valor
+
+
+class ImpressaoDigital:
+    """
+    Contexto congelado usado como chave: igualdade pelo conteúdo (sem risco de
+    colisão) e hash calculado uma única vez, já que a mesma impressão é
+    consultada para cada jogo do lote.
+    """
+
+    __slots__ = ('valor', '_hash')
+
+    def __init__(self, valor: Hashable):
+        self.valor = valor
+        self._hash = hash(valor)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, outro: Any) -> bool:
+        if self is outro:
+            return True
+        if not isinstance(outro, ImpressaoDigital):
+            return NotImplemented
+        return self._hash == outro._hash and self.valor == outro.valor
+
+    def __getstate__(self) -> Hashable:
+        return self.valor
+
+    def __setstate__(self, valor: Hashable) -> None:
+        # hash() de str muda entre processos: recalculado ao desserializar
+        self.valor = valor
+        self._hash = hash(valor)
+
+    def __repr__(self) -> str:
+        return f"ImpressaoDigital({self._hash:#x})"
+
+
+class FitnessCache:
+    """
+    Cache LRU limitado: chave = (bitmask do jogo, impressão digital do contexto).
+    Mantém contadores de acertos/faltas para acompanhar a taxa de reaproveitamento.
+    """
+
+    def __init__(self, capacidade: int = 50_000):
+        self.capacidade = capacidade
+        self._dados: "OrderedDict[Tuple[int, ImpressaoDigital], Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidacoes = 0
+        self._funcao: Optional[Any] = None
+
+    def vincular(self, funcao: Any) -> None:
+        """Associa o cache a uma função de fitness; trocar de função invalida o cache."""
+        if self._funcao is not None and self._funcao != funcao:
+            self.invalidar()
+        self._funcao = funcao
+
+    @staticmethod
+    def fingerprint(**contexto: Any) -> ImpressaoDigital:
+        """Impressão digital dos argumentos da função de fitness (pesos, histórico...)."""
+        return ImpressaoDigital(_congelar(contexto))
+
+    def get(self, mask: int, fingerprint: Hashable) -> Optional[Any]:
+        """Valor em cache ou None (atualiza a ordem LRU e os contadores)."""
+        chave = (mask, fingerprint)
+        valor = self._dados.get(chave)
+        if valor is None:
+            self.misses += 1
+            return None
+        self._dados.move_to_end(chave)
+        self.hits += 1
+        return valor
+
+    def put(self, mask: int, fingerprint: Hashable, valor: Any) -> None:
+        """Armazena o fitness, descartando o item menos usado se necessário."""
+        chave = (mask, fingerprint)
+        self._dados[chave] = valor
+        self._dados.move_to_end(chave)
+        if len(self._dados) > self.capacidade:
+            self._dados.popitem(last=False)
+            self.evictions += 1
+
+    def obter_lote(
+        self,
+        masks: np.ndarray,
+        fingerprint: Hashable,
+        calcular: Callable[[np.ndarray], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Fitness de um lote de bitmasks: consulta o cache e calcula só os
+        ausentes, numa única chamada calcular(masks_faltantes).
+        """
+        valores = np.empty(len(masks), dtype=np.float64)
+        faltam = []
+        for i, mask in enumerate(masks.tolist()):
+            valor = self.get(mask, fingerprint)
+            if valor is None:
+                faltam.append(i)
+            else:
+                valores[i] = valor
+        if faltam:
+            novos = np.asarray(calcular(masks[faltam]), dtype=np.float64)
+            valores[faltam] = novos
+            for mask, valor in zip(masks[faltam].tolist(), novos.tolist()):
+                self.put(mask, fingerprint, valor)
+        return valores
+
+    def invalidar(self, *args: Any, **kwargs: Any) -> None:
+        """Descarta todas as entradas (usado como ouvinte de mudança de pesos)."""
+        if self._dados:
+            logger.debug(f"♻️ Cache de fitness invalidado ({len(self._dados)} entradas)")
+        self._dados.clear()
+        self.invalidacoes += 1
+
+    @property
+    def taxa_acerto(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores do cache."""
+        return {
+            'tamanho': len(self._dados),
+            'capacidade': self.capacidade,
+            'hits': self.hits,
+            'misses': self.misses,
+            'taxa_acerto': round(self.taxa_acerto, 4),
+            'evictions': self.evictions,
+            'invalidacoes': self.invalidacoes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Ao ser enviado a outro processo (modelo de ilhas) o cache segue vazio
+        estado = self.__dict__.copy()
+        estado['_dados'] = OrderedDict()
+        estado['_funcao'] = None
+        return estado
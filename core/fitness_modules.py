@@ -6,9 +6,15 @@ Data: Novembro 2025
 """
 
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
 import numpy as np
 
+from core.bitmask import (
+    PRIMOS, FIBONACCI, MASK_PARES, MASK_PRIMOS, MASK_FIBONACCI, MASK_LINHAS, MASK_RESTO_5,
+    eh_mask, jogo_para_mask, mask_para_jogo, normalizar_mask, popcount, soma_mask, spread_mask,
+    popcount_array, soma_array, soma_ponderada_array, spread_array
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,111 +25,212 @@ class FitnessCalculator:
     """
     
     def __init__(self):
-        self.primos = {2, 3, 5, 7, 11, 13, 17, 19, 23}
-        self.fibonacci = {1, 2, 3, 5, 8, 13, 21}
+        self.primos = set(PRIMOS)
+        self.fibonacci = set(FIBONACCI)
         logger.info("✅ Calculador de Fitness inicializado")
     
     def calcular_fitness(
         self,
-        jogo: List[int],
+        jogo: Union[List[int], int],
         pesos: Dict[str, float],
         historico: Optional[Dict[str, any]] = None,
-        concurso_anterior: Optional[List[int]] = None,
+        concurso_anterior: Optional[Union[List[int], int]] = None,
         temperatura: float = 1.0
     ) -> Tuple[float, Dict[str, float]]:
         """
         Calcula fitness total do jogo baseado em múltiplos critérios
         
         Args:
-            jogo: Lista de 15 dezenas
+            jogo: Lista de 15 dezenas ou bitmask de 25 bits
             pesos: Dicionário com pesos de cada critério
             historico: Dados históricos (pode ser None)
-            concurso_anterior: Resultado do concurso anterior (pode ser None)
+            concurso_anterior: Resultado do concurso anterior, lista ou bitmask (pode ser None)
             temperatura: Fator de aleatoriedade (1.0 = normal)
         
         Returns:
             (fitness_total, scores_detalhados)
         """
-        if len(jogo) != 15:
-            logger.warning(f"⚠️ Jogo inválido: {len(jogo)} dezenas")
-            return 0.0, {}
+        if eh_mask(jogo):
+            mask = int(jogo)
+            if popcount(mask) != 15:
+                logger.warning(f"⚠️ Jogo inválido: {popcount(mask)} dezenas")
+                return 0.0, {}
+        else:
+            if len(jogo) != 15:
+                logger.warning(f"⚠️ Jogo inválido: {len(jogo)} dezenas")
+                return 0.0, {}
+            mask = jogo_para_mask(jogo)
         
-        scores = {}
+        features = self.extrair_features(mask, historico, concurso_anterior)
+        return self.pontuar_features(features, pesos, historico, temperatura)
+    
+    # ------------------------------------------------------------------
+    # Vetor de features e avaliação incremental (delta)
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _frequencias(historico: Optional[Dict[str, any]]) -> Optional[Dict[int, float]]:
+        if historico and 'frequencias' in historico:
+            return historico['frequencias']
+        return None
+    
+    def extrair_features(
+        self,
+        jogo: Union[List[int], int],
+        historico: Optional[Dict[str, any]] = None,
+        concurso_anterior: Optional[Union[List[int], int]] = None
+    ) -> Dict[str, any]:
+        """
+        Vetor de features usado pelos critérios de fitness.
+        Pode ser atualizado em O(1) por atualizar_features após uma troca de dezena.
         
-        # Proteção contra histórico None
-        historico_safe = historico if historico is not None else {}
+        Returns:
+            Dicionário com mask, pares, primos, fibonacci, linhas (5), colunas
+            (5, indexadas por d % 5), consecutivos, soma, freq_soma, repeticoes
+            e anterior (bitmask do concurso anterior, 0 se ausente)
+        """
+        mask = normalizar_mask(jogo)
+        freq_dict = self._frequencias(historico)
+        anterior = normalizar_mask(concurso_anterior) if concurso_anterior else 0
+        return {
+            'mask': mask,
+            'pares': popcount(mask & MASK_PARES),
+            'primos': popcount(mask & MASK_PRIMOS),
+            'fibonacci': popcount(mask & MASK_FIBONACCI),
+            'linhas': [popcount(mask & m) for m in MASK_LINHAS],
+            'colunas': [popcount(mask & MASK_RESTO_5[r]) for r in range(5)],
+            'consecutivos': popcount(mask & (mask >> 1)),
+            'soma': soma_mask(mask),
+            'freq_soma': sum(freq_dict.get(d, 0) for d in mask_para_jogo(mask)) if freq_dict is not None else 0,
+            'repeticoes': popcount(mask & anterior),
+            'anterior': anterior,
+        }
+    
+    def atualizar_features(
+        self,
+        features: Dict[str, any],
+        removida: int,
+        adicionada: int,
+        historico: Optional[Dict[str, any]] = None
+    ) -> Dict[str, any]:
+        """
+        Features do jogo obtido trocando 'removida' por 'adicionada', em O(1).
+        
+        Args:
+            features: Resultado de extrair_features (não é modificado)
+            removida: Dezena presente no jogo
+            adicionada: Dezena ausente do jogo
+            historico: O mesmo usado para extrair as features
+        
+        Returns:
+            Novo dicionário de features
+        """
+        mask = features['mask']
+        bit_rem = 1 << (removida - 1)
+        bit_add = 1 << (adicionada - 1)
+        if not mask & bit_rem or mask & bit_add:
+            raise ValueError(f"Troca inválida: {removida} -> {adicionada}")
+        
+        # Consecutivos: pares vizinhos perdidos ao remover e ganhos ao adicionar
+        sem_removida = mask & ~bit_rem
+        vizinhos_rem = ((mask >> removida) & 1) + ((mask >> (removida - 2)) & 1 if removida > 1 else 0)
+        vizinhos_add = ((sem_removida >> adicionada) & 1) + (
+            (sem_removida >> (adicionada - 2)) & 1 if adicionada > 1 else 0
+        )
+        
+        linhas = list(features['linhas'])
+        linhas[(removida - 1) // 5] -= 1
+        linhas[(adicionada - 1) // 5] += 1
+        colunas = list(features['colunas'])
+        colunas[removida % 5] -= 1
+        colunas[adicionada % 5] += 1
+        
+        freq_dict = self._frequencias(historico)
+        freq_soma = features['freq_soma']
+        if freq_dict is not None:
+            freq_soma = freq_soma - freq_dict.get(removida, 0) + freq_dict.get(adicionada, 0)
+        
+        anterior = features['anterior']
+        
+        return {
+            'mask': sem_removida | bit_add,
+            'pares': features['pares'] - (removida % 2 == 0) + (adicionada % 2 == 0),
+            'primos': features['primos'] - (removida in PRIMOS) + (adicionada in PRIMOS),
+            'fibonacci': features['fibonacci'] - (removida in FIBONACCI) + (adicionada in FIBONACCI),
+            'linhas': linhas,
+            'colunas': colunas,
+            'consecutivos': features['consecutivos'] - vizinhos_rem + vizinhos_add,
+            'soma': features['soma'] - removida + adicionada,
+            'freq_soma': freq_soma,
+            'repeticoes': features['repeticoes'] - bool(anterior & bit_rem) + bool(anterior & bit_add),
+            'anterior': anterior,
+        }
+    
+    def pontuar_features(
+        self,
+        features: Dict[str, any],
+        pesos: Dict[str, float],
+        historico: Optional[Dict[str, any]] = None,
+        temperatura: float = 1.0
+    ) -> Tuple[float, Dict[str, float]]:
+        """Aplica os critérios de fitness a um vetor de features (ver calcular_fitness)."""
+        scores = {}
         
         # 1. Par/Ímpar
-        pares = sum(1 for d in jogo if d % 2 == 0)
-        impares = 15 - pares
+        pares = features['pares']
         scores['par_impar'] = pesos.get('par_impar', 1.0) * (
             1.0 if 6 <= pares <= 9 else 0.5
         )
         
         # 2. Primos
-        primos_count = sum(1 for d in jogo if d in self.primos)
         scores['primos'] = pesos.get('primos', 1.0) * (
-            1.0 if 5 <= primos_count <= 8 else 0.6
+            1.0 if 5 <= features['primos'] <= 8 else 0.6
         )
         
         # 3. Fibonacci
-        fib_count = sum(1 for d in jogo if d in self.fibonacci)
         scores['fibonacci'] = pesos.get('fibonacci', 1.0) * (
-            1.0 if 3 <= fib_count <= 6 else 0.7
+            1.0 if 3 <= features['fibonacci'] <= 6 else 0.7
         )
         
         # 4. Linhas (1-5, 6-10, 11-15, 16-20, 21-25)
-        linhas = [
-            sum(1 for d in jogo if 1 <= d <= 5),
-            sum(1 for d in jogo if 6 <= d <= 10),
-            sum(1 for d in jogo if 11 <= d <= 15),
-            sum(1 for d in jogo if 16 <= d <= 20),
-            sum(1 for d in jogo if 21 <= d <= 25)
-        ]
-        linhas_balanceadas = all(1 <= l <= 5 for l in linhas)
+        linhas_balanceadas = all(1 <= l <= 5 for l in features['linhas'])
         scores['linhas'] = pesos.get('linhas', 1.0) * (1.0 if linhas_balanceadas else 0.5)
         
-        # 5. Colunas (5 colunas)
+        # 5. Colunas (chaves 1..5 de d % 5; a chave 5 não existe e conta 0)
         colunas = [
-            sum(1 for d in jogo if d % 5 == i) for i in range(1, 6)
+            features['colunas'][i] if i in MASK_RESTO_5 else 0 for i in range(1, 6)
         ]
         colunas_balanceadas = all(1 <= c <= 5 for c in colunas)
         scores['colunas'] = pesos.get('colunas', 1.0) * (1.0 if colunas_balanceadas else 0.5)
         
         # 6. Consecutivos
-        jogo_sorted = sorted(jogo)
-        consecutivos = sum(
-            1 for i in range(len(jogo_sorted) - 1)
-            if jogo_sorted[i+1] - jogo_sorted[i] == 1
-        )
         scores['consecutivos'] = pesos.get('consecutivos', 1.0) * (
-            1.0 if consecutivos <= 3 else 0.6
+            1.0 if features['consecutivos'] <= 3 else 0.6
         )
         
         # 7. Frequência histórica (se disponível)
-        if historico_safe and 'frequencias' in historico_safe:
-            freq_dict = historico_safe['frequencias']
-            freq_media = np.mean([freq_dict.get(d, 0) for d in jogo])
+        freq_dict = self._frequencias(historico)
+        if freq_dict is not None:
+            freq_media = features['freq_soma'] / 15
             freq_max = max(freq_dict.values()) if freq_dict else 1
             scores['frequencia'] = pesos.get('frequencia', 1.0) * (freq_media / freq_max if freq_max > 0 else 0.5)
         else:
             scores['frequencia'] = pesos.get('frequencia', 1.0) * 0.5  # Neutro
         
         # 8. Diversidade (spread)
-        spread = max(jogo) - min(jogo)
+        spread = spread_mask(features['mask'])
         scores['diversidade'] = pesos.get('diversidade', 1.0) * (
             1.0 if 18 <= spread <= 24 else 0.7
         )
         
         # 9. Soma total
-        soma = sum(jogo)
         scores['soma'] = pesos.get('soma', 1.0) * (
-            1.0 if 170 <= soma <= 210 else 0.6
+            1.0 if 170 <= features['soma'] <= 210 else 0.6
         )
         
         # 10. Repetição do concurso anterior (se disponível)
-        if concurso_anterior:
-            repeticoes = len(set(jogo) & set(concurso_anterior))
+        if features['anterior']:
+            repeticoes = features['repeticoes']
             scores['repeticao'] = pesos.get('repeticao', 1.0) * (
                 1.0 if 6 <= repeticoes <= 10 else 0.5
             )
@@ -140,6 +247,146 @@ class FitnessCalculator:
         
         return fitness_total, scores
     
+    def calcular_fitness_delta(
+        self,
+        features: Dict[str, any],
+        removida: int,
+        adicionada: int,
+        pesos: Dict[str, float],
+        historico: Optional[Dict[str, any]] = None,
+        temperatura: float = 1.0
+    ) -> Tuple[float, Dict[str, float], Dict[str, any]]:
+        """
+        Fitness do jogo vizinho (troca removida -> adicionada) sem recalcular do zero.
+        
+        Returns:
+            (fitness_total, scores_detalhados, features do novo jogo)
+        """
+        novas = self.atualizar_features(features, removida, adicionada, historico)
+        fitness, scores = self.pontuar_features(novas, pesos, historico, temperatura)
+        return fitness, scores, novas
+    
+    def busca_local(
+        self,
+        jogo: Union[List[int], int],
+        pesos: Dict[str, float],
+        historico: Optional[Dict[str, any]] = None,
+        concurso_anterior: Optional[Union[List[int], int]] = None,
+        max_iteracoes: int = 50
+    ) -> Tuple[List[int], float]:
+        """
+        Subida de encosta: aplica a melhor troca de uma dezena enquanto o fitness melhorar.
+        Cada iteração avalia as 150 trocas possíveis com calcular_fitness_delta.
+        
+        Returns:
+            (melhor jogo encontrado, fitness)
+        """
+        features = self.extrair_features(jogo, historico, concurso_anterior)
+        fitness, _ = self.pontuar_features(features, pesos, historico)
+        
+        for _ in range(max_iteracoes):
+            dentro = mask_para_jogo(features['mask'])
+            fora = [d for d in range(1, 26) if d not in dentro]
+            melhor = None
+            for removida in dentro:
+                for adicionada in fora:
+                    candidato, _, novas = self.calcular_fitness_delta(
+                        features, removida, adicionada, pesos, historico
+                    )
+                    if candidato > fitness:
+                        fitness, melhor = candidato, novas
+            if melhor is None:
+                break
+            features = melhor
+        
+        return mask_para_jogo(features['mask']), fitness
+    
+    def calcular_fitness_lote(
+        self,
+        masks: np.ndarray,
+        pesos: Dict[str, float],
+        historico: Optional[Dict[str, any]] = None,
+        concurso_anterior: Optional[Union[List[int], int]] = None,
+        temperatura: float = 1.0
+    ) -> np.ndarray:
+        """
+        Versão vetorizada de calcular_fitness para um array de bitmasks.
+        Aplica exatamente os mesmos critérios e pesos (mesma ordem de soma),
+        então o resultado de cada posição é idêntico ao da versão escalar.
+        
+        Args:
+            masks: Array uint32 de bitmasks de 25 bits
+            pesos, historico, concurso_anterior, temperatura: como em calcular_fitness
+        
+        Returns:
+            Array float64 com o fitness de cada jogo (0.0 para jogos inválidos)
+        """
+        masks = np.asarray(masks, dtype=np.uint32)
+        historico_safe = historico if historico is not None else {}
+        
+        def criterio(nome: str, condicao: np.ndarray, senao: float) -> np.ndarray:
+            return pesos.get(nome, 1.0) * np.where(condicao, 1.0, senao)
+        
+        def entre(valores: np.ndarray, minimo: int, maximo: int) -> np.ndarray:
+            return (valores >= minimo) & (valores <= maximo)
+        
+        pares = popcount_array(masks & MASK_PARES)
+        total = criterio('par_impar', entre(pares, 6, 9), 0.5)
+        total = total + criterio('primos', entre(popcount_array(masks & MASK_PRIMOS), 5, 8), 0.6)
+        total = total + criterio('fibonacci', entre(popcount_array(masks & MASK_FIBONACCI), 3, 6), 0.7)
+        
+        linhas_balanceadas = np.ones(masks.shape, dtype=bool)
+        for m in MASK_LINHAS:
+            linhas_balanceadas &= entre(popcount_array(masks & m), 1, 5)
+        total = total + criterio('linhas', linhas_balanceadas, 0.5)
+        
+        colunas_balanceadas = np.ones(masks.shape, dtype=bool)
+        for i in range(1, 6):
+            colunas_balanceadas &= entre(popcount_array(masks & MASK_RESTO_5.get(i, 0)), 1, 5)
+        total = total + criterio('colunas', colunas_balanceadas, 0.5)
+        
+        total = total + criterio('consecutivos', popcount_array(masks & (masks >> 1)) <= 3, 0.6)
+        
+        if historico_safe and 'frequencias' in historico_safe:
+            freq_dict = historico_safe['frequencias']
+            freq_media = soma_ponderada_array(masks, [freq_dict.get(d, 0) for d in range(1, 26)]) / 15
+            freq_max = max(freq_dict.values()) if freq_dict else 1
+            total = total + pesos.get('frequencia', 1.0) * (freq_media / freq_max if freq_max > 0 else 0.5)
+        else:
+            total = total + pesos.get('frequencia', 1.0) * 0.5
+        
+        total = total + criterio('diversidade', entre(spread_array(masks), 18, 24), 0.7)
+        total = total + criterio('soma', entre(soma_array(masks), 170, 210), 0.6)
+        
+        if concurso_anterior:
+            repeticoes = popcount_array(masks & normalizar_mask(concurso_anterior))
+            total = total + criterio('repeticao', entre(repeticoes, 6, 10), 0.5)
+        else:
+            total = total + pesos.get('repeticao', 1.0) * 0.5
+        
+        if temperatura != 1.0:
+            total = total * (1 + np.random.normal(0, 0.1 * temperatura, size=masks.shape))
+        
+        invalidos = popcount_array(masks) != 15
+        if invalidos.any():
+            logger.warning(f"⚠️ {int(invalidos.sum())} jogos inválidos no lote")
+            total = np.where(invalidos, 0.0, total)
+        
+        return total
+    
+    def calcular_confianca(
+        self,
+        jogo: Union[List[int], int],
+        validacao: Optional[Dict] = None,
+        contexto: Optional[Dict] = None
+    ) -> float:
+        """
+        Confiança (0-1) de um jogo já validado: fitness com pesos neutros
+        dividido pela pontuação máxima possível.
+        """
+        fitness, scores = self.calcular_fitness(jogo, {})
+        return round(fitness / len(scores), 3) if scores else 0.0
+    
     def avaliar_jogo_completo(
         self,
         jogo: List[int],
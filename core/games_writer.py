@@ -9,6 +9,8 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from core.combinadic import rank_jogo
+
 logger = logging.getLogger(__name__)
 
 
@@ -72,6 +74,7 @@ class GamesWriter:
             return 0
 
         saved_count = 0
+        ranks_salvos = set()  # (concurso_alvo, rank) já inseridos neste lote
 
         async with self.pool.acquire() as conn:
             for game in games:
@@ -97,6 +100,11 @@ class GamesWriter:
                         logger.error(f"[GamesWriter] Dezenas fora do range: {dezenas_sorted}")
                         continue
 
+                    chave = (concurso_alvo, rank_jogo(dezenas_sorted))
+                    if chave in ranks_salvos:
+                        logger.warning(f"[GamesWriter] Jogo repetido ignorado: {dezenas_sorted}")
+                        continue
+
                     # Converte para JSON
                     dezenas_json = json.dumps(dezenas_sorted)
                     parametros_json = json.dumps(parametros) if parametros else None
@@ -112,6 +120,7 @@ class GamesWriter:
                         fitness_score, parametros_json
                     )
 
+                    ranks_salvos.add(chave)
                     saved_count += 1
 
                 except Exception as e:
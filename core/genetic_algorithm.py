@@ -5,13 +5,23 @@ Autor: Inner AI + Jose Eduardo França
 Data: Novembro 2025
 """
 
+import os
 import random
 import logging
-from typing import List, Dict, Tuple, Set, Callable, Any, Optional # Optional já está aqui!
+from typing import List, Dict, Tuple, Set, Callable, Any, Optional, Union # Optional já está aqui!
 import numpy as np
 
+from core.bitmask import eh_mask, jogo_para_mask, mask_para_jogo, normalizar_mask
+from core.fitness_cache import FitnessCache
+from core.combinadic import rank_jogo
+from core.historico import BitmapCombinacoes, obter_historico
+from core.ilhas import ModeloIlhas
+
 logger = logging.getLogger(__name__)
 
+Jogo = Union[List[int], int]
+
+
 class GeneticAlgorithm:
     """
     Algoritmo Genético com lógica de complementação robusta
@@ -24,13 +34,15 @@ class GeneticAlgorithm:
         generations: int = 50,
         mutation_rate: float = 0.15,
         elite_size: int = 10,
-        tournament_size: int = 5
+        tournament_size: int = 5,
+        fitness_cache: Optional[FitnessCache] = None
     ):
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
         self.elite_size = elite_size
         self.tournament_size = tournament_size
+        self.fitness_cache = fitness_cache
         
         # Pool de todas as dezenas válidas (1-25)
         self.todas_dezenas = list(range(1, 26))
@@ -142,8 +154,25 @@ class GeneticAlgorithm:
         fitness_function: Callable, 
         **kwargs: Any
     ) -> List[float]:
-        """Calcula o fitness para cada indivíduo na população."""
-        return [fitness_function(individuo, **kwargs) for individuo in populacao]
+        """
+        Calcula o fitness para cada indivíduo na população.
+        Com fitness_cache, jogos já avaliados no mesmo contexto (pesos, histórico...)
+        não são reavaliados; com temperatura != 1.0 o fitness é aleatório e o cache é ignorado.
+        """
+        if self.fitness_cache is None or kwargs.get('temperatura', 1.0) != 1.0:
+            return [fitness_function(individuo, **kwargs) for individuo in populacao]
+        
+        self.fitness_cache.vincular(getattr(fitness_function, '__wrapped__', fitness_function))
+        fingerprint = FitnessCache.fingerprint(**kwargs)
+        scores = []
+        for individuo in populacao:
+            mask = normalizar_mask(individuo)
+            score = self.fitness_cache.get(mask, fingerprint)
+            if score is None:
+                score = fitness_function(individuo, **kwargs)
+                self.fitness_cache.put(mask, fingerprint, score)
+            scores.append(score)
+        return scores
 
     def selecionar_elite(
         self, 
@@ -164,8 +193,12 @@ class GeneticAlgorithm:
         winner = max(competitors, key=lambda x: x[1])
         return winner[0]
 
-    def crossover(self, pai1: List[int], pai2: List[int]) -> Tuple[List[int], List[int]]:
-        """Realiza o crossover de dois pontos."""
+    def crossover(self, pai1: Jogo, pai2: Jogo) -> Tuple[Jogo, Jogo]:
+        """Realiza o crossover de dois pontos (aceita listas ou bitmasks)."""
+        if eh_mask(pai1) and eh_mask(pai2):
+            filho1, filho2 = self.crossover(mask_para_jogo(pai1), mask_para_jogo(pai2))
+            return jogo_para_mask(filho1), jogo_para_mask(filho2)
+        
         ponto1 = random.randint(1, 13)
         ponto2 = random.randint(ponto1 + 1, 14)
         
@@ -190,8 +223,11 @@ class GeneticAlgorithm:
         
         return filho1, filho2
 
-    def mutacao(self, individuo: List[int]) -> List[int]:
-        """Aplica mutação a um indivíduo."""
+    def mutacao(self, individuo: Jogo) -> Jogo:
+        """Aplica mutação a um indivíduo (aceita lista ou bitmask)."""
+        if eh_mask(individuo):
+            return jogo_para_mask(self.mutacao(mask_para_jogo(individuo)))
+        
         mutated_individuo = list(individuo)
         if random.random() < self.mutation_rate:
             idx_to_change = random.randint(0, 14)
@@ -210,11 +246,15 @@ class GeneticAlgorithm:
     
     def evolve(
         self, 
-        initial_population: List[List[int]], 
+        initial_population: List[Jogo], 
         fitness_function: Callable, 
         **fitness_kwargs: Any
-    ) -> Tuple[List[List[int]], List[float]]:
-        """Evolui a população ao longo das gerações."""
+    ) -> Tuple[List[Jogo], List[float]]:
+        """
+        Evolui a população ao longo das gerações.
+        Os indivíduos podem ser listas de dezenas ou bitmasks de 25 bits;
+        a representação recebida é mantida (e repassada à função de fitness).
+        """
         population = initial_population
         
         for generation in range(self.generations):
@@ -247,6 +287,17 @@ class GeneticAlgorithm:
         return population, final_fitness_scores
 
 
+class _FitnessEscalar:
+    """Devolve só o fitness de funções que retornam (fitness, detalhes); serializável para o modelo de ilhas."""
+
+    def __init__(self, funcao: Callable):
+        self.__wrapped__ = funcao
+
+    def __call__(self, jogo: Jogo, **kwargs: Any) -> float:
+        resultado = self.__wrapped__(jogo, **kwargs)
+        return resultado[0] if isinstance(resultado, tuple) else resultado
+
+
 class GeneticOptimizer:
     """
     Otimizador Genético que encapsula o GeneticAlgorithm e a lógica de execução.
@@ -257,15 +308,121 @@ class GeneticOptimizer:
         # Garante que config seja um dicionário, mesmo que venha como None
         config_safe = config if config is not None else {}
         
+        # Cache LRU de fitness (0 desativa)
+        tamanho_cache = config_safe.get("ga_fitness_cache_size", 50_000)
+        self.fitness_cache = FitnessCache(tamanho_cache) if tamanho_cache else None
+        
         self.ga = GeneticAlgorithm(
             population_size=config_safe.get("ga_population_size", 100),
             generations=config_safe.get("ga_generations", 50),
             mutation_rate=config_safe.get("ga_mutation_rate", 0.15),
             elite_size=config_safe.get("ga_elite_size", 10),
-            tournament_size=config_safe.get("ga_tournament_size", 5)
+            tournament_size=config_safe.get("ga_tournament_size", 5),
+            fitness_cache=self.fitness_cache
         )
+        
+        # Modelo de ilhas: N populações independentes em processos separados,
+        # trocando os melhores indivíduos a cada 'ga_migration_interval' gerações
+        self.n_ilhas = max(1, config_safe.get("ga_islands", 1))
+        self.modelo_ilhas = ModeloIlhas(
+            intervalo_migracao=config_safe.get("ga_migration_interval", 25),
+            n_migrantes=config_safe.get("ga_migrants", 2),
+            max_workers=config_safe.get("ga_workers") or min(self.n_ilhas, os.cpu_count() or 1)
+        )
+
+        # Combinações já sorteadas ficam fora do resultado de run() (consulta O(1) por rank)
+        self.ja_sorteados: Optional[BitmapCombinacoes] = None
+        if config_safe.get("ga_excluir_sorteados", False):
+            historico = obter_historico()
+            self.ja_sorteados = historico.sorteados if historico is not None else None
         logger.info("✅ GeneticOptimizer inicializado")
 
+    def gerar_populacao_inicial(
+        self,
+        tamanho: Optional[int] = None,
+        prob_matrix: Optional[Dict[int, float]] = None
+    ) -> List[List[int]]:
+        """População inicial estratificada (mesma interface do VectorizedGeneticOptimizer)."""
+        return self.ga.gerar_populacao_estratificada(prob_matrix, tamanho or self.ga.population_size)
+
+    def evoluir(
+        self,
+        populacao: List[Jogo],
+        fitness_func: Optional[Callable] = None,
+        geracoes: Optional[int] = None,
+        pesos: Optional[Dict[str, float]] = None,
+        **fitness_kwargs: Any
+    ) -> List[List[int]]:
+        """
+        Evolui a população com o algoritmo clássico e devolve os jogos
+        do maior para o menor fitness (mesma interface do VectorizedGeneticOptimizer).
+        """
+        if not fitness_func:
+            return [sorted(j) if not eh_mask(j) else mask_para_jogo(j) for j in populacao]
+
+        fitness = _FitnessEscalar(fitness_func)
+        if geracoes is not None:
+            self.ga.generations = geracoes
+
+        if self.n_ilhas > 1 and len(populacao) > 0:
+            # Uma população completa por ilha, como em run()
+            populacao_final, fitness_scores = self.evoluir_ilhas(
+                self._populacoes_ilhas(list(populacao)), fitness, pesos=pesos or {}, **fitness_kwargs
+            )
+        else:
+            self.ga.population_size = len(populacao)
+            populacao_final, fitness_scores = self.ga.evolve(
+                populacao, fitness, pesos=pesos or {}, **fitness_kwargs
+            )
+        ordem = sorted(range(len(fitness_scores)), key=lambda i: fitness_scores[i], reverse=True)
+        return [
+            mask_para_jogo(populacao_final[i]) if eh_mask(populacao_final[i]) else populacao_final[i]
+            for i in ordem
+        ]
+
+    def _populacoes_ilhas(self, populacao: List[Jogo]) -> List[List[Jogo]]:
+        """
+        Uma população completa por ilha: a primeira é a recebida e as demais são
+        geradas (estratificadas) com o mesmo tamanho, a partir da frequência de
+        cada dezena na população recebida.
+        """
+        frequencias = {d: 0 for d in self.ga.todas_dezenas}
+        for jogo in populacao:
+            for d in (mask_para_jogo(jogo) if eh_mask(jogo) else jogo):
+                frequencias[d] += 1
+        return [populacao] + [
+            self.ga.gerar_populacao_estratificada(frequencias, len(populacao))
+            for _ in range(self.n_ilhas - 1)
+        ]
+
+    def evoluir_ilhas(
+        self,
+        populacoes: List[List[Jogo]],
+        fitness_function: Callable,
+        **fitness_kwargs: Any
+    ) -> Tuple[List[Jogo], List[float]]:
+        """
+        Evolui uma população por ilha em paralelo (ModeloIlhas): cada processo
+        recebe o GeneticAlgorithm uma única vez e mantém suas ilhas (e o cache
+        de fitness) entre as épocas. A cada intervalo_migracao gerações os
+        n_migrantes melhores de cada ilha substituem os piores da ilha seguinte
+        (topologia em anel).
+        
+        Args:
+            populacoes: Uma população inicial por ilha
+            fitness_function: Função de fitness (precisa ser serializável via pickle fora do Linux)
+            **fitness_kwargs: Argumentos repassados à função de fitness
+        
+        Returns:
+            (populações finais concatenadas, fitness de cada indivíduo)
+        """
+        resultados = self.modelo_ilhas.evoluir(
+            self.ga, populacoes, fitness_function, self.ga.generations, **fitness_kwargs
+        )
+        populacao_final = [jogo for pop, _ in resultados for jogo in pop]
+        fitness_scores = [score for _, sc in resultados for score in sc]
+        return populacao_final, fitness_scores
+
     def run(
         self,
         num_jogos: int,
@@ -311,30 +468,57 @@ class GeneticOptimizer:
             
             # Caso 3: Com histórico E fitness - evolução completa
             logger.info("🎯 Modo evolução completa ativado!")
+            fitness_function = _FitnessEscalar(fitness_function)
             
-            # Gera população inicial estratificada
-            populacao_inicial = self.ga.gerar_populacao_estratificada(
-                historico_freq,
-                max(num_jogos * 2, 50)
-            )
-            
-            # Evolui a população
-            populacao_final, fitness_scores = self.ga.evolve(
-                populacao_inicial,
-                fitness_function,
-                pesos=pesos or {}, # Passa os pesos para a função de fitness
-                historico=historico_freq,
-                **fitness_kwargs
-            )
+            if self.n_ilhas > 1:
+                populacao_final, fitness_scores = self.evoluir_ilhas(
+                    [
+                        self.ga.gerar_populacao_estratificada(historico_freq, max(num_jogos * 2, 50))
+                        for _ in range(self.n_ilhas)
+                    ],
+                    fitness_function,
+                    pesos=pesos or {},
+                    historico=historico_freq,
+                    **fitness_kwargs
+                )
+            else:
+                # Gera população inicial estratificada
+                populacao_inicial = self.ga.gerar_populacao_estratificada(
+                    historico_freq,
+                    max(num_jogos * 2, 50)
+                )
+                
+                # Evolui a população
+                populacao_final, fitness_scores = self.ga.evolve(
+                    populacao_inicial,
+                    fitness_function,
+                    pesos=pesos or {}, # Passa os pesos para a função de fitness
+                    historico=historico_freq,
+                    **fitness_kwargs
+                )
             
-            # Seleciona os melhores jogos
-            melhores_indices = sorted(
+            # Seleciona os melhores jogos (sem repetição, identificados pelo rank)
+            ordem = sorted(
                 range(len(fitness_scores)),
                 key=lambda i: fitness_scores[i],
                 reverse=True
-            )[:num_jogos]
+            )
             
-            jogos = [populacao_final[i] for i in melhores_indices]
+            jogos = []
+            ranks_vistos = set()
+            for i in ordem:
+                jogo = populacao_final[i]
+                if len(jogo) != 15:
+                    continue
+                rank = rank_jogo(jogo)
+                if rank in ranks_vistos:
+                    continue
+                if self.ja_sorteados is not None and self.ja_sorteados.contem_ranks(rank):
+                    continue
+                ranks_vistos.add(rank)
+                jogos.append(jogo)
+                if len(jogos) >= num_jogos:
+                    break
             
             # VALIDAÇÃO FINAL
             jogos_validos = [j for j in jogos if len(j) == 15]
@@ -0,0 +1,351 @@
+"""
+Lotofacil AI Engine v3.0 - Algoritmo Genético Vetorizado (NumPy)
+A população inteira é uma matriz booleana (P, 25): seleção, crossover,
+mutação, reparo e fitness são operações em lote sobre essa matriz.
+Substitui o par gerar_populacao_inicial / evoluir usado pelo motor v3.0.
+"""
+
+import inspect
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.bitmask import N_DEZENAS, jogos_para_masks, masks_para_jogos, masks_para_matriz, matriz_para_masks
+from core.fitness_cache import FitnessCache
+from core.fitness_modules import FitnessCalculator
+from core.ilhas import ModeloIlhas
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_JOGO = 15
+
+Populacao = Union[np.ndarray, Sequence[Union[List[int], int]]]
+
+
+class VectorizedGeneticOptimizer:
+    """
+    Otimizador genético com a população representada como matriz (P, 25).
+    Aceita a mesma config do GeneticOptimizer (chaves ga_*).
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        fitness_calc: Optional[FitnessCalculator] = None,
+        seed: Optional[int] = None
+    ):
+        config_safe = config if config is not None else {}
+
+        self.population_size = config_safe.get("ga_population_size", 700)
+        self.generations = config_safe.get("ga_generations", 350)
+        self.mutation_rate = config_safe.get("ga_mutation_rate", 0.15)
+        self.elite_size = config_safe.get("ga_elite_size", 10)
+        self.tournament_size = config_safe.get("ga_tournament_size", 5)
+
+        # Modelo de ilhas (mesmas chaves do GeneticOptimizer): ga_islands
+        # populações completas evoluídas em processos separados
+        self.n_ilhas = max(1, config_safe.get("ga_islands", 1))
+        self.modelo_ilhas = ModeloIlhas(
+            intervalo_migracao=config_safe.get("ga_migration_interval", 25),
+            n_migrantes=config_safe.get("ga_migrants", 2),
+            max_workers=config_safe.get("ga_workers") or min(self.n_ilhas, os.cpu_count() or 1)
+        )
+
+        # Cache LRU de fitness (0 desativa), como no GeneticOptimizer
+        tamanho_cache = config_safe.get("ga_fitness_cache_size", 50_000)
+        self.fitness_cache = FitnessCache(tamanho_cache) if tamanho_cache else None
+
+        self.fitness_calc = fitness_calc
+        self.rng = np.random.default_rng(seed)
+        logger.info("✅ VectorizedGeneticOptimizer inicializado")
+
+    # ------------------------------------------------------------------
+    # Representação
+    # ------------------------------------------------------------------
+
+    def _top15(self, chave: np.ndarray) -> np.ndarray:
+        """Matriz booleana com as 15 maiores chaves de cada linha marcadas."""
+        indices = np.argpartition(-chave, TAMANHO_JOGO - 1, axis=1)[:, :TAMANHO_JOGO]
+        matriz = np.zeros(chave.shape, dtype=bool)
+        matriz[np.arange(len(chave))[:, None], indices] = True
+        return matriz
+
+    def reparar(self, matriz: np.ndarray) -> np.ndarray:
+        """
+        Garante exatamente 15 dezenas por linha: mantém as presentes
+        (sorteando quais sair se houver excesso) e completa com ausentes ao acaso.
+        """
+        matriz = np.asarray(matriz, dtype=bool)
+        contagem = matriz.sum(axis=1)
+        if np.all(contagem == TAMANHO_JOGO):
+            return matriz
+        chave = matriz * 2.0 + self.rng.random(matriz.shape)
+        return self._top15(chave)
+
+    def para_matriz(self, populacao: Populacao) -> np.ndarray:
+        """Converte lista de jogos, bitmasks ou matriz (P, 25) em matriz booleana válida."""
+        if isinstance(populacao, np.ndarray) and populacao.ndim == 2 and populacao.shape[1] == N_DEZENAS:
+            return self.reparar(populacao)
+        return self.reparar(masks_para_matriz(jogos_para_masks(populacao)))
+
+    # ------------------------------------------------------------------
+    # Operadores
+    # ------------------------------------------------------------------
+
+    def gerar_populacao_inicial(
+        self,
+        tamanho: Optional[int] = None,
+        prob_matrix: Optional[Union[Dict[int, float], Sequence[float]]] = None
+    ) -> np.ndarray:
+        """
+        Sorteia a população inicial sem reposição, ponderada por prob_matrix
+        (truque de Gumbel: top-15 de log(p) + ruído Gumbel).
+
+        Args:
+            tamanho: Número de indivíduos (padrão: ga_population_size)
+            prob_matrix: {dezena: probabilidade} ou vetor de 25 posições (None = uniforme)
+
+        Returns:
+            Matriz booleana (tamanho, 25)
+        """
+        tamanho = tamanho or self.population_size
+        if prob_matrix is None:
+            probs = np.ones(N_DEZENAS)
+        elif isinstance(prob_matrix, dict):
+            probs = np.array([prob_matrix.get(d, 0.0) for d in range(1, N_DEZENAS + 1)], dtype=np.float64)
+        else:
+            probs = np.asarray(prob_matrix, dtype=np.float64)
+
+        log_p = np.log(np.clip(probs, 1e-12, None))
+        chave = log_p + self.rng.gumbel(size=(tamanho, N_DEZENAS))
+        logger.info(f"🎯 População inicial vetorizada de {tamanho} jogos gerada.")
+        return self._top15(chave)
+
+    def selecionar_torneio(self, fitness: np.ndarray, quantidade: int) -> np.ndarray:
+        """Índices dos vencedores de 'quantidade' torneios independentes."""
+        k = min(self.tournament_size, len(fitness))
+        competidores = self.rng.integers(0, len(fitness), size=(quantidade, k))
+        vencedor = np.argmax(fitness[competidores], axis=1)
+        return competidores[np.arange(quantidade), vencedor]
+
+    def crossover(self, pais_a: np.ndarray, pais_b: np.ndarray) -> np.ndarray:
+        """
+        Crossover uniforme com reparo: o filho herda todas as dezenas comuns
+        aos dois pais e completa com dezenas sorteadas entre as não comuns.
+        """
+        comuns = pais_a & pais_b
+        exclusivas = pais_a ^ pais_b
+        chave = comuns * 3.0 + exclusivas * (1.0 + self.rng.random(pais_a.shape))
+        return self._top15(chave)
+
+    def mutacao(self, matriz: np.ndarray) -> np.ndarray:
+        """Com probabilidade mutation_rate, troca uma dezena presente por uma ausente."""
+        linhas = np.flatnonzero(self.rng.random(len(matriz)) < self.mutation_rate)
+        if len(linhas) == 0:
+            return matriz
+
+        sub = matriz[linhas]
+        ruido = self.rng.random(sub.shape)
+        sai = np.argmax(np.where(sub, ruido, -1.0), axis=1)
+        entra = np.argmax(np.where(sub, -1.0, ruido), axis=1)
+        matriz[linhas, sai] = False
+        matriz[linhas, entra] = True
+        return matriz
+
+    # ------------------------------------------------------------------
+    # Fitness
+    # ------------------------------------------------------------------
+
+    def _resolver_fitness(self, fitness_func: Optional[Callable]) -> Callable[..., np.ndarray]:
+        """
+        Devolve uma função masks -> array de fitness.
+        Usa a versão em lote quando existe: None usa o FitnessCalculator do motor;
+        um objeto ou função com atributo calcular_fitness_lote usa esse atributo;
+        um método (mesmo envolvido por decorators com functools.wraps) de um objeto
+        com calcular_fitness_lote, como FitnessCalculator.calcular_fitness, usa o
+        do objeto. Qualquer outra função escalar é aplicada jogo a jogo.
+        """
+        if fitness_func is None:
+            if self.fitness_calc is None:
+                self.fitness_calc = FitnessCalculator()
+            return self.fitness_calc.calcular_fitness_lote
+
+        original = inspect.unwrap(fitness_func)
+        for dono in (fitness_func, original, getattr(original, '__self__', None)):
+            lote = getattr(dono, 'calcular_fitness_lote', None)
+            if callable(lote):
+                return lote
+
+        def fitness_escalar(masks: np.ndarray, **kwargs: Any) -> np.ndarray:
+            valores = []
+            for mask in masks.tolist():
+                resultado = fitness_func(mask, **kwargs)
+                valores.append(resultado[0] if isinstance(resultado, tuple) else resultado)
+            return np.asarray(valores, dtype=np.float64)
+
+        return fitness_escalar
+
+    def _com_cache(
+        self,
+        fitness_lote: Callable[..., np.ndarray],
+        fitness_function: Optional[Callable],
+        fitness_kwargs: Dict[str, Any]
+    ) -> Callable[..., np.ndarray]:
+        """
+        Envolve fitness_lote no cache de fitness: só os jogos ainda não avaliados
+        no mesmo contexto são calculados. Com temperatura != 1.0 o fitness é
+        aleatório e o cache é ignorado.
+        """
+        if self.fitness_cache is None or fitness_kwargs.get('temperatura', 1.0) != 1.0:
+            return fitness_lote
+
+        self.fitness_cache.vincular(fitness_function if fitness_function is not None else fitness_lote)
+        fingerprint = FitnessCache.fingerprint(**fitness_kwargs)
+
+        def fitness_memoizado(masks: np.ndarray, **kwargs: Any) -> np.ndarray:
+            return self.fitness_cache.obter_lote(masks, fingerprint, lambda faltam: fitness_lote(faltam, **kwargs))
+
+        return fitness_memoizado
+
+    def avaliar(self, matriz: np.ndarray, fitness_lote: Callable[..., np.ndarray], **fitness_kwargs: Any) -> np.ndarray:
+        """Fitness de todas as linhas da matriz."""
+        return np.asarray(fitness_lote(matriz_para_masks(matriz), **fitness_kwargs), dtype=np.float64)
+
+    # ------------------------------------------------------------------
+    # Evolução
+    # ------------------------------------------------------------------
+
+    def evolve(
+        self,
+        populacao: Populacao,
+        fitness_function: Optional[Callable] = None,
+        geracoes: Optional[int] = None,
+        **fitness_kwargs: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evolui a população ao longo das gerações.
+
+        Returns:
+            (matriz final (P, 25), fitness de cada linha)
+        """
+        matriz = self.para_matriz(populacao)
+        fitness_lote = self._com_cache(self._resolver_fitness(fitness_function), fitness_function, fitness_kwargs)
+        geracoes = self.generations if geracoes is None else geracoes
+
+        tamanho = len(matriz)
+        if tamanho == 0:
+            return matriz, np.zeros(0, dtype=np.float64)
+        elite_size = min(self.elite_size, tamanho)
+        n_filhos = tamanho - elite_size
+
+        for geracao in range(geracoes):
+            fitness = self.avaliar(matriz, fitness_lote, **fitness_kwargs)
+
+            elite = matriz[np.argsort(-fitness, kind='stable')[:elite_size]]
+            pais = self.selecionar_torneio(fitness, 2 * n_filhos)
+            filhos = self.crossover(matriz[pais[:n_filhos]], matriz[pais[n_filhos:]])
+            matriz = np.concatenate([elite, self.mutacao(filhos)])
+
+            logger.debug(f"Geração {geracao + 1}/{geracoes}, Melhor Fitness: {fitness.max():.2f}")
+
+        return matriz, self.avaliar(matriz, fitness_lote, **fitness_kwargs)
+
+    def _populacoes_ilhas(self, matriz: np.ndarray) -> List[np.ndarray]:
+        """
+        Uma população completa por ilha: a primeira é a recebida e as demais são
+        sorteadas com o mesmo tamanho, ponderadas pela frequência de cada dezena
+        na população recebida (dezena ausente nela continua ausente).
+        """
+        frequencias = matriz.sum(axis=0).astype(np.float64)
+        return [matriz] + [
+            self.gerar_populacao_inicial(len(matriz), frequencias) for _ in range(self.n_ilhas - 1)
+        ]
+
+    def evoluir(
+        self,
+        populacao: Populacao,
+        fitness_func: Optional[Callable] = None,
+        geracoes: Optional[int] = None,
+        pesos: Optional[Dict[str, float]] = None,
+        **fitness_kwargs: Any
+    ) -> List[List[int]]:
+        """
+        Evolui a população e devolve os jogos distintos, do maior para o menor fitness.
+        Com ga_islands > 1 cada ilha evolui uma população completa (ModeloIlhas):
+        a recebida e ga_islands - 1 novas do mesmo tamanho (ver _populacoes_ilhas).
+
+        Args:
+            populacao: Matriz (P, 25), lista de jogos ou de bitmasks
+            fitness_func: FitnessCalculator.calcular_fitness, função com calcular_fitness_lote,
+                outra função escalar ou None
+            geracoes: Número de gerações (padrão: ga_generations)
+            pesos: Pesos dos critérios repassados à função de fitness
+            **fitness_kwargs: historico, concurso_anterior, temperatura...
+
+        Returns:
+            Lista de jogos (listas ordenadas de 15 dezenas)
+        """
+        matriz = self.para_matriz(populacao)
+        if len(matriz) == 0:
+            logger.warning("⚠️ População vazia: nada a evoluir")
+            return []
+        if self.n_ilhas > 1:
+            resultados = self.modelo_ilhas.evoluir(
+                self, self._populacoes_ilhas(matriz), fitness_func,
+                self.generations if geracoes is None else geracoes,
+                pesos=pesos or {}, **fitness_kwargs
+            )
+            matriz = np.concatenate([ilha for ilha, _ in resultados])
+            fitness = np.concatenate([scores for _, scores in resultados])
+        else:
+            matriz, fitness = self.evolve(
+                matriz, fitness_func, geracoes, pesos=pesos or {}, **fitness_kwargs
+            )
+
+        masks = matriz_para_masks(matriz)
+        ordem = np.argsort(-fitness, kind='stable')
+        _, primeiros = np.unique(masks[ordem], return_index=True)
+        ordem = ordem[np.sort(primeiros)]
+
+        logger.info(f"✅ Evolução vetorizada concluída: {len(ordem)} jogos distintos, "
+                    f"melhor fitness {fitness[ordem[0]]:.2f}")
+        return masks_para_jogos(masks[ordem])
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from core.genetic_algorithm import GeneticOptimizer
+
+    logging.basicConfig(level=logging.INFO)
+
+    calc = FitnessCalculator()
+    historico = {'frequencias': {d: random.randint(800, 1100) for d in range(1, 26)}}
+    pesos = {'soma': 1.5, 'frequencia': 2.0}
+
+    print("=== TESTE: PARIDADE DO FITNESS EM LOTE ===")
+    jogos = [sorted(random.sample(range(1, 26), 15)) for _ in range(2000)]
+    lote = calc.calcular_fitness_lote(jogos_para_masks(jogos), pesos, historico, jogos[0])
+    escalar = [calc.calcular_fitness(j, pesos, historico, jogos[0])[0] for j in jogos]
+    assert np.array_equal(lote, np.array(escalar))
+    print("✅ calcular_fitness_lote == calcular_fitness")
+
+    print("\n=== TESTE: 700 x 350 ===")
+    otimizador = VectorizedGeneticOptimizer(seed=42)
+    inicio = time.perf_counter()
+    populacao = otimizador.gerar_populacao_inicial(tamanho=700, prob_matrix={d: 0.5 for d in range(1, 26)})
+    melhores = otimizador.evoluir(populacao, calc.calcular_fitness, geracoes=350, pesos=pesos, historico=historico)
+    print(f"Vetorizado: {time.perf_counter() - inicio:.2f}s, {len(melhores)} jogos distintos")
+    for jogo in melhores[:3]:
+        print(f"  {jogo} -> {calc.calcular_fitness(jogo, pesos, historico)[0]:.2f}")
+
+    classico = GeneticOptimizer({"ga_elite_size": 10, "ga_tournament_size": 5})
+    inicio = time.perf_counter()
+    classico.evoluir(
+        classico.gerar_populacao_inicial(tamanho=700, prob_matrix=historico['frequencias']),
+        calc.calcular_fitness, geracoes=10, pesos=pesos, historico=historico
+    )
+    print(f"Clássico (10 gerações): {time.perf_counter() - inicio:.2f}s")
@@ -0,0 +1,436 @@
+"""
+Lotofacil AI Engine v3.0 - Histórico de Sorteios
+Store colunar local dos concursos: números, datas e sorteios como bitmasks
+uint32, em ordem crescente, em arquivos binários brutos que abrem com memmap
+(data/historico_store, montado a partir de historico_concursos_completo.csv).
+Os últimos k concursos são uma fatia; concurso novo é append nas colunas.
+O desempenho de um jogo em todo o histórico é um único popcount(masks & jogo)
+vetorizado, e "já foi sorteado?" é um bit num bitmap indexado pelo rank do jogo.
+"""
+
+import csv
+import json
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.bitmask import (
+    Jogo, eh_mask, jogo_para_mask, jogos_para_masks, mask_para_jogo, masks_para_jogos,
+    normalizar_mask, popcount_array
+)
+from core.combinadic import TOTAL_JOGOS, rank_jogo, rank_jogos
+from core.estatisticas import EstatisticasDezenas
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_HISTORICO = "data/historico_concursos_completo.csv"
+DIRETORIO_STORE = "data/historico_store"
+VERSAO_STORE = 1
+COLUNAS = {"numeros": np.int32, "datas": np.int32, "masks": np.uint32}
+SEM_DATA = -1  # dias desde 1970-01-01; -1 quando a data não é conhecida
+FAIXAS = (11, 12, 13, 14, 15)
+MINIMO_DESTAQUE = 13
+
+Concurso = Tuple[int, List[int]]
+
+
+Data = Union[None, int, str, date, datetime]
+
+
+def _dia(data: Data) -> int:
+    """Data (date, 'dd/mm/aaaa', 'dd-mm-aa', 'aaaa-mm-dd' ou dias já convertidos) em dias desde 1970-01-01."""
+    if data is None or data == "":
+        return SEM_DATA
+    if isinstance(data, (int, np.integer)):
+        return int(data)
+    if isinstance(data, str):
+        for formato in ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d-%m-%y"):
+            try:
+                data = datetime.strptime(data.strip(), formato)
+                break
+            except ValueError:
+                continue
+        else:
+            return SEM_DATA
+    if isinstance(data, datetime):
+        data = data.date()
+    return (data - date(1970, 1, 1)).days
+
+
+def _ler_csv(caminho: str) -> Dict[int, Tuple[int, List[int]]]:
+    """{numero: (dia, dezenas)} do CSV de concursos (Concurso;Data;bola 1..bola 15)."""
+    concursos: Dict[int, Tuple[int, List[int]]] = {}
+    with open(caminho, "r", encoding="utf-8-sig") as f:
+        amostra = f.read(1024)
+        f.seek(0)
+        delimitador = ";" if amostra.count(";") > amostra.count(",") else ","
+        leitor = csv.reader(f, delimiter=delimitador)
+        next(leitor, None)
+        for linha in leitor:
+            if len(linha) < 17 or not linha[0].strip().isdigit():
+                continue
+            try:
+                dezenas = sorted(int(d) for d in linha[2:17])
+            except ValueError:
+                continue
+            if len(set(dezenas)) == 15 and all(1 <= d <= 25 for d in dezenas):
+                concursos[int(linha[0])] = (_dia(linha[1]), dezenas)
+    return concursos
+
+
+def carregar_historico_csv(caminho: str = CAMINHO_HISTORICO) -> List[Concurso]:
+    """
+    Lê o CSV de concursos (Concurso;Data;bola 1..bola 15) em ordem crescente de número.
+    Linhas inválidas são ignoradas, como no importador do histórico.
+    """
+    return [(numero, dezenas) for numero, (_, dezenas) in sorted(_ler_csv(caminho).items())]
+
+
+def _rank(jogo: Jogo) -> int:
+    return rank_jogo(mask_para_jogo(jogo) if eh_mask(jogo) else jogo)
+
+
+class BitmapCombinacoes:
+    """
+    Um bit por jogo possível (3.268.760 bits, ~400 KB), indexado pelo rank
+    combinatório de core.combinadic: marcar e consultar um jogo é O(1).
+    """
+
+    def __init__(self, bits: Optional[np.ndarray] = None):
+        self.bits = np.zeros((TOTAL_JOGOS + 7) // 8, dtype=np.uint8) if bits is None else bits
+
+    def __len__(self) -> int:
+        return int(np.unpackbits(self.bits).sum())
+
+    def __contains__(self, jogo: Jogo) -> bool:
+        rank = _rank(jogo)
+        return bool(self.bits[rank >> 3] >> (rank & 7) & 1)
+
+    def marcar(self, jogo: Jogo) -> bool:
+        """Marca o jogo. Retorna False se ele já estava marcado."""
+        rank = _rank(jogo)
+        bit = np.uint8(1 << (rank & 7))
+        if self.bits[rank >> 3] & bit:
+            return False
+        self.bits[rank >> 3] |= bit
+        return True
+
+    def desmarcar(self, jogo: Jogo) -> None:
+        rank = _rank(jogo)
+        self.bits[rank >> 3] &= np.uint8(~(1 << (rank & 7)) & 0xFF)
+
+    def marcar_ranks(self, ranks) -> None:
+        ranks = np.asarray(ranks, dtype=np.int64)
+        np.bitwise_or.at(self.bits, ranks >> 3, (1 << (ranks & 7)).astype(np.uint8))
+
+    def contem_ranks(self, ranks) -> np.ndarray:
+        """Pertinência (bool) de um array de ranks."""
+        ranks = np.asarray(ranks, dtype=np.int64)
+        return ((self.bits[ranks >> 3] >> (ranks & 7)) & 1).astype(bool)
+
+    def contem_jogos(self, jogos: Sequence[Jogo]) -> np.ndarray:
+        """Pertinência (bool) de vários jogos (listas de dezenas ou bitmasks)."""
+        if not len(jogos):
+            return np.zeros(0, dtype=bool)
+        if isinstance(jogos[0], (int, np.integer)):
+            jogos = masks_para_jogos(jogos)
+        return self.contem_ranks(rank_jogos(np.sort(np.asarray(jogos), axis=1)))
+
+    def salvar(self, caminho: str) -> None:
+        """Grava comprimido (bitmaps esparsos ocupam poucos KB) com troca atômica do arquivo."""
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "wb") as f:
+            np.savez_compressed(f, bits=self.bits)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "BitmapCombinacoes":
+        with np.load(caminho) as dados:
+            bits = dados["bits"]
+        if bits.shape != ((TOTAL_JOGOS + 7) // 8,):
+            raise ValueError(f"Bitmap com tamanho inválido em {caminho}: {bits.shape}")
+        return cls(bits)
+
+
+class HistoricoSorteios:
+    """
+    Colunas alinhadas e em ordem crescente de número: numeros (int32), datas
+    (int32, dias desde 1970-01-01) e masks (uint32, bit d-1 = dezena d).
+    Em memória (construtor) ou persistido num diretório (salvar/abrir): um
+    arquivo binário bruto por coluna + meta.json com a quantidade de concursos.
+    """
+
+    def __init__(self, concursos: Iterable[Concurso] = (), datas: Optional[Dict[int, Data]] = None):
+        concursos = sorted(dict(concursos).items())
+        datas = datas or {}
+        self.numeros = np.array([n for n, _ in concursos], dtype=np.int32)
+        self.datas = np.array([_dia(datas.get(n)) for n, _ in concursos], dtype=np.int32)
+        self.masks = np.array([jogo_para_mask(d) for _, d in concursos], dtype=np.uint32)
+        self.diretorio: Optional[str] = None
+        self.meta: Dict[str, Any] = {}
+        self._sorteados: Optional[BitmapCombinacoes] = None
+        self._estatisticas: Optional[EstatisticasDezenas] = None
+
+    @classmethod
+    def do_csv(cls, caminho: str = CAMINHO_HISTORICO) -> "HistoricoSorteios":
+        concursos = _ler_csv(caminho)
+        historico = cls()
+        if concursos:
+            numeros = sorted(concursos)
+            historico.numeros = np.array(numeros, dtype=np.int32)
+            historico.datas = np.array([concursos[n][0] for n in numeros], dtype=np.int32)
+            historico.masks = np.array([jogo_para_mask(concursos[n][1]) for n in numeros], dtype=np.uint32)
+        return historico
+
+    @classmethod
+    def abrir(cls, diretorio: str = DIRETORIO_STORE, mmap: bool = True) -> "HistoricoSorteios":
+        """Abre um store salvo; com mmap=True as colunas são np.memmap somente leitura."""
+        with open(os.path.join(diretorio, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("versao") != VERSAO_STORE:
+            raise ValueError(f"Store de histórico em {diretorio} tem versão {meta.get('versao')} (esperada {VERSAO_STORE})")
+        historico = cls()
+        n = int(meta["concursos"])
+        for nome, dtype in COLUNAS.items():
+            caminho = os.path.join(diretorio, f"{nome}.bin")
+            if n == 0:
+                coluna = np.zeros(0, dtype=dtype)
+            elif mmap:
+                coluna = np.memmap(caminho, dtype=dtype, mode="r", shape=(n,))
+            else:
+                coluna = np.fromfile(caminho, dtype=dtype, count=n)
+            if len(coluna) != n:
+                raise ValueError(f"Coluna {nome} incompleta em {diretorio}")
+            setattr(historico, nome, coluna)
+        historico.diretorio = diretorio
+        historico.meta = meta
+        return historico
+
+    def salvar(self, diretorio: str = DIRETORIO_STORE, **meta: Any) -> None:
+        """Grava todas as colunas (troca atômica de cada arquivo) e passa a fazer append nesse diretório."""
+        os.makedirs(diretorio, exist_ok=True)
+        for nome, dtype in COLUNAS.items():
+            caminho = os.path.join(diretorio, f"{nome}.bin")
+            np.ascontiguousarray(getattr(self, nome), dtype=dtype).tofile(f"{caminho}.tmp")
+            os.replace(f"{caminho}.tmp", caminho)
+        self.diretorio = diretorio
+        self._gravar_meta(**meta)
+
+    def _gravar_meta(self, **meta: Any) -> None:
+        self.meta.update(meta, versao=VERSAO_STORE, concursos=len(self.numeros))
+        caminho = os.path.join(self.diretorio, "meta.json")
+        with open(f"{caminho}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(f"{caminho}.tmp", caminho)
+
+    def __len__(self) -> int:
+        return len(self.numeros)
+
+    @property
+    def ultimo_numero(self) -> Optional[int]:
+        return int(self.numeros[-1]) if len(self.numeros) else None
+
+    def ultimos(self, k: int) -> np.ndarray:
+        """Bitmasks dos últimos k concursos (fatia, sem cópia)."""
+        return self.masks[max(len(self.masks) - k, 0):]
+
+    def ultimos_jogos(self, k: int) -> List[List[int]]:
+        """Dezenas dos últimos k concursos, do mais antigo para o mais recente."""
+        return masks_para_jogos(self.ultimos(k))
+
+    def presenca(self, k: Optional[int] = None) -> np.ndarray:
+        """Matriz booleana (N x 25) de presença de todos os concursos (ou dos últimos k)."""
+        masks = self.masks if k is None else self.ultimos(k)
+        return ((masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1).astype(bool)
+
+    def adicionar(self, numero: int, dezenas: Sequence[int], data: Data = None) -> bool:
+        """
+        Inclui um concurso (mantendo a ordem). Se o histórico estiver persistido,
+        um concurso posterior ao último é append nas colunas; fora de ordem, regrava.
+        Retorna False se ele já estava no histórico.
+        """
+        posicao = int(np.searchsorted(self.numeros, numero))
+        if posicao < len(self.numeros) and self.numeros[posicao] == numero:
+            return False
+        valores = {"numeros": numero, "datas": _dia(data), "masks": jogo_para_mask(dezenas)}
+        # np.insert copia as colunas: os memmaps antigos são liberados antes de escrever nos arquivos
+        for nome, dtype in COLUNAS.items():
+            setattr(self, nome, np.insert(getattr(self, nome), posicao, dtype(valores[nome])))
+
+        if self.diretorio is not None:
+            if posicao == len(self.numeros) - 1:
+                for nome, dtype in COLUNAS.items():
+                    with open(os.path.join(self.diretorio, f"{nome}.bin"), "r+b") as f:
+                        f.seek(posicao * np.dtype(dtype).itemsize)
+                        f.write(np.array([valores[nome]], dtype=dtype).tobytes())
+                        f.truncate()
+                self._gravar_meta()
+            else:
+                self.salvar(self.diretorio)
+
+        if self._sorteados is not None:
+            self._sorteados.marcar(dezenas)
+        if self._estatisticas is not None and not self._estatisticas.atualizar(numero, dezenas):
+            # Concurso fora de ordem: atraso e ciclo dependem da sequência, recontabiliza
+            self._estatisticas = None
+        return True
+
+    @property
+    def sorteados(self) -> BitmapCombinacoes:
+        """Bitmap de todas as combinações já sorteadas (montado na primeira consulta)."""
+        if self._sorteados is None:
+            self._sorteados = BitmapCombinacoes()
+            if len(self.masks):
+                self._sorteados.marcar_ranks(rank_jogos(masks_para_jogos(self.masks)))
+        return self._sorteados
+
+    @property
+    def estatisticas(self) -> EstatisticasDezenas:
+        """Frequência, atraso e ciclo por dezena (montados na primeira consulta, O(25) por concurso novo)."""
+        if self._estatisticas is None:
+            self._estatisticas = EstatisticasDezenas.das_masks(self.numeros, self.masks)
+        return self._estatisticas
+
+    def ja_sorteado(self, jogo: Jogo) -> bool:
+        """True se a combinação já saiu em algum concurso do histórico."""
+        return jogo in self.sorteados
+
+    def acertos(self, jogo: Jogo) -> np.ndarray:
+        """Acertos (uint8) do jogo em cada concurso do histórico."""
+        return popcount_array(self.masks & np.uint32(normalizar_mask(jogo)))
+
+    def _resumo(self, acertos: np.ndarray) -> Dict[str, Any]:
+        contagem = np.bincount(acertos, minlength=16)
+        destaque = np.flatnonzero(acertos >= MINIMO_DESTAQUE)
+        return {
+            "concursos_analisados": len(acertos),
+            "acertos": {str(k): int(contagem[k]) for k in FAIXAS},
+            "vezes_premiado": int(contagem[FAIXAS[0]:].sum()),
+            "melhor_acerto": int(acertos.max()) if len(acertos) else 0,
+            "media_acertos": round(float(acertos.mean()), 4) if len(acertos) else 0.0,
+            f"concursos_{MINIMO_DESTAQUE}_mais": [
+                {"concurso": int(self.numeros[i]), "acertos": int(acertos[i])} for i in destaque
+            ],
+        }
+
+    def desempenho(self, jogo: Jogo) -> Dict[str, Any]:
+        """
+        Quantas vezes o jogo teria feito 11..15 em todos os concursos passados
+        e em quais concursos fez 13 ou mais.
+        """
+        return self._resumo(self.acertos(jogo))
+
+    def desempenho_lote(self, jogos: Sequence[Jogo]) -> List[Dict[str, Any]]:
+        """desempenho() para vários jogos com um único popcount (T x N)."""
+        if not len(jogos):
+            return []
+        masks = np.asarray(jogos, dtype=np.uint32) if isinstance(jogos[0], (int, np.integer)) else jogos_para_masks(jogos)
+        acertos = popcount_array(masks[:, None] & self.masks[None, :])
+        return [self._resumo(linha) for linha in acertos]
+
+
+def carregar_store(caminho_csv: str = CAMINHO_HISTORICO, diretorio: str = DIRETORIO_STORE) -> HistoricoSorteios:
+    """
+    Abre o store; se ele não existir ou o CSV tiver sido alterado depois da
+    última sincronização, inclui do CSV os concursos que faltam (append).
+    """
+    try:
+        historico = HistoricoSorteios.abrir(diretorio)
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        if not os.path.exists(caminho_csv):
+            raise FileNotFoundError(f"Nem store em {diretorio} nem CSV em {caminho_csv}") from e
+        historico = None
+
+    if os.path.exists(caminho_csv):
+        mtime = os.path.getmtime(caminho_csv)
+        if historico is None:
+            historico = HistoricoSorteios.do_csv(caminho_csv)
+            historico.salvar(diretorio, csv_mtime=mtime)
+            logger.info(f"🗄️ Store de histórico criado em {diretorio} ({len(historico)} concursos)")
+        elif mtime > historico.meta.get("csv_mtime", 0):
+            novos = 0
+            for numero, (dia, dezenas) in sorted(_ler_csv(caminho_csv).items()):
+                novos += historico.adicionar(numero, dezenas, dia)
+            historico._gravar_meta(csv_mtime=mtime)
+            logger.info(f"🗄️ Store de histórico sincronizado com o CSV: {novos} concursos novos")
+    return historico
+
+
+_historicos: Dict[Tuple[str, str], HistoricoSorteios] = {}
+
+
+def obter_historico(caminho: str = CAMINHO_HISTORICO, diretorio: str = DIRETORIO_STORE) -> Optional[HistoricoSorteios]:
+    """
+    Histórico compartilhado (aberto uma vez por store).
+    Retorna None se não houver store nem CSV de concursos.
+    """
+    chave = (caminho, diretorio)
+    if chave not in _historicos:
+        try:
+            _historicos[chave] = carregar_store(caminho, diretorio)
+        except FileNotFoundError as e:
+            logger.warning(f"⚠️ Histórico de sorteios indisponível: {e}")
+            return None
+        logger.info(f"📚 Histórico carregado: {len(_historicos[chave])} concursos "
+                    f"(último {_historicos[chave].ultimo_numero})")
+    return _historicos[chave]
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+    import timeit
+
+    logging.basicConfig(level=logging.INFO)
+
+    historico = obter_historico()
+    concursos = carregar_historico_csv()
+    jogo = concursos[-1][1]
+
+    r = historico.desempenho(jogo)
+    print(f"Último sorteio {jogo} contra {r['concursos_analisados']} concursos: {r['acertos']}, "
+          f"{len(r['concursos_13_mais'])} concursos com 13+")
+    assert r["acertos"]["15"] >= 1
+    assert all(historico.acertos(jogo)[i] == len(set(jogo) & set(d)) for i, (_, d) in enumerate(concursos[:200]))
+
+    n = 2000
+    print(f"desempenho(): {timeit.timeit(lambda: historico.desempenho(jogo), number=n) / n * 1e6:.0f} µs")
+    print(f"acertos(): {timeit.timeit(lambda: historico.acertos(jogo), number=n) / n * 1e6:.0f} µs")
+
+    lote = [c[1] for c in concursos[-30:]]
+    assert historico.desempenho_lote(lote)[5] == historico.desempenho(lote[5])
+
+    inicio = time.perf_counter()
+    sorteados = historico.sorteados
+    print(f"Bitmap de sorteados: {len(sorteados)} combinações, {sorteados.bits.nbytes // 1024} KB, "
+          f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+    assert len(sorteados) == len({tuple(d) for _, d in concursos})
+    assert historico.ja_sorteado(jogo) and historico.ja_sorteado(jogo_para_mask(jogo))
+    assert sorteados.contem_jogos(lote).all()
+    print(f"ja_sorteado(): {timeit.timeit(lambda: historico.ja_sorteado(jogo), number=n) / n * 1e6:.1f} µs")
+
+    novo = [2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 25, 23, 21]
+    print(f"ultimos_jogos(5): {timeit.timeit(lambda: historico.ultimos_jogos(5), number=n) / n * 1e6:.1f} µs")
+    assert historico.ultimos_jogos(3) == [d for _, d in concursos[-3:]]
+    assert historico.presenca(10).sum() == 150
+
+    # Store: append persistido e reabertura com memmap
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        store = carregar_store(CAMINHO_HISTORICO, diretorio)
+        print(f"Store criado do CSV em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        inicio = time.perf_counter()
+        reaberto = HistoricoSorteios.abrir(diretorio)
+        print(f"Store aberto (memmap) em {(time.perf_counter() - inicio) * 1000:.2f} ms")
+        assert isinstance(reaberto.masks, np.memmap) and (reaberto.masks == historico.masks).all()
+
+        if not reaberto.ja_sorteado(novo):
+            assert reaberto.adicionar(reaberto.ultimo_numero + 1, novo, "01/01/2030")
+            assert reaberto.ja_sorteado(novo) and reaberto.desempenho(novo)["acertos"]["15"] == 1
+            outra_vez = HistoricoSorteios.abrir(diretorio)
+            assert len(outra_vez) == len(historico) + 1 and outra_vez.ultimos_jogos(1) == [sorted(novo)]
+            assert outra_vez.datas[-1] == _dia(date(2030, 1, 1))
+            assert carregar_store(CAMINHO_HISTORICO, diretorio).ultimo_numero == outra_vez.ultimo_numero
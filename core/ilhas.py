@@ -0,0 +1,211 @@
+"""
+Lotofacil AI Engine v3.0 - Modelo de Ilhas
+Evolução paralela de N populações em processos de longa duração: cada
+processo recebe o motor genético, suas ilhas e a função de fitness uma única
+vez e os mantém (com o cache de fitness do motor) até o fim da evolução.
+A cada época só trafegam o número de gerações e os migrantes: os melhores
+de cada ilha substituem os piores da ilha seguinte (topologia em anel).
+Usado pelo GeneticOptimizer (clássico) e pelo VectorizedGeneticOptimizer.
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import traceback
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Migrante = Tuple[Any, float]
+
+
+def _melhores(populacao: Any, scores: Any, quantidade: int) -> List[Migrante]:
+    """Os 'quantidade' indivíduos de maior fitness da ilha, com o fitness."""
+    if quantidade <= 0 or scores is None or len(scores) == 0:
+        return []
+    ordem = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")[:quantidade]
+    return [(populacao[i], float(scores[i])) for i in ordem]
+
+
+def _receber(populacao: Any, scores: Any, migrantes: Sequence[Migrante]) -> None:
+    """Migrantes substituem os piores indivíduos da ilha (in-place)."""
+    if not migrantes or scores is None or len(scores) == 0:
+        return
+    piores = np.argsort(np.asarray(scores, dtype=np.float64), kind="stable")[:len(migrantes)]
+    for (jogo, score), i in zip(migrantes, piores):
+        populacao[i] = jogo
+        scores[i] = score
+
+
+def _trabalhador(
+    conexao: Any,
+    motor: Any,
+    ilhas: List[Any],
+    fitness_function: Optional[Callable],
+    fitness_kwargs: dict,
+    semente: int
+) -> None:
+    """
+    Processo de longa duração: guarda as ilhas (e o motor) entre as épocas.
+    Comandos: ('evoluir', geracoes, n_migrantes, migrantes por ilha) -> melhores
+    de cada ilha; ('resultado',) -> [(população, fitness)] e encerra.
+    """
+    random.seed(semente)
+    np.random.seed(semente % (2 ** 32))
+    if hasattr(motor, "rng"):
+        motor.rng = np.random.default_rng(semente)
+    scores: List[Any] = [None] * len(ilhas)
+    try:
+        while True:
+            comando, *argumentos = conexao.recv()
+            if comando == "evoluir":
+                geracoes, n_migrantes, chegando = argumentos
+                motor.generations = geracoes
+                saindo = []
+                for i in range(len(ilhas)):
+                    if chegando:
+                        _receber(ilhas[i], scores[i], chegando[i])
+                    motor.population_size = len(ilhas[i])
+                    ilhas[i], scores[i] = motor.evolve(ilhas[i], fitness_function, **fitness_kwargs)
+                    saindo.append(_melhores(ilhas[i], scores[i], n_migrantes))
+                conexao.send(("ok", saindo))
+            elif comando == "resultado":
+                conexao.send(("ok", list(zip(ilhas, scores))))
+                return
+    except Exception:
+        conexao.send(("erro", traceback.format_exc()))
+    finally:
+        conexao.close()
+
+
+class ModeloIlhas:
+    """
+    Evolui uma população por ilha, distribuindo as ilhas entre até
+    max_workers processos. O motor precisa ter 'generations' e
+    evolve(populacao, fitness_function, **kwargs) -> (populacao, fitness).
+    """
+
+    def __init__(
+        self,
+        intervalo_migracao: int = 25,
+        n_migrantes: int = 2,
+        max_workers: Optional[int] = None
+    ):
+        self.intervalo_migracao = max(1, intervalo_migracao)
+        self.n_migrantes = n_migrantes
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def evoluir(
+        self,
+        motor: Any,
+        populacoes: List[Any],
+        fitness_function: Optional[Callable],
+        geracoes: int,
+        **fitness_kwargs: Any
+    ) -> List[Tuple[Any, Any]]:
+        """
+        Args:
+            motor: GeneticAlgorithm ou VectorizedGeneticOptimizer (copiado uma vez para cada processo)
+            populacoes: Uma população inicial por ilha
+            fitness_function: Função de fitness (serializável via pickle fora do Linux)
+            geracoes: Total de gerações de cada ilha
+            **fitness_kwargs: Argumentos repassados à função de fitness
+
+        Returns:
+            [(população final, fitness de cada indivíduo)] na ordem das ilhas
+        """
+        n_ilhas = len(populacoes)
+        n_processos = max(1, min(self.max_workers, n_ilhas))
+        grupos = [list(range(w, n_ilhas, n_processos)) for w in range(n_processos)]
+        logger.info(f"🏝️ Modelo de ilhas: {n_ilhas} ilhas, {n_processos} processos, "
+                    f"migração a cada {self.intervalo_migracao} gerações")
+
+        contexto = multiprocessing.get_context()
+        conexoes, processos = [], []
+        try:
+            for grupo in grupos:
+                conexao, extremo = contexto.Pipe()
+                processo = contexto.Process(
+                    target=_trabalhador,
+                    args=(extremo, motor, [populacoes[j] for j in grupo], fitness_function,
+                          fitness_kwargs, random.getrandbits(63)),
+                    daemon=True
+                )
+                processo.start()
+                extremo.close()
+                conexoes.append(conexao)
+                processos.append(processo)
+
+            chegando: List[List[Migrante]] = [[] for _ in range(n_ilhas)]
+            geracao = 0
+            while geracao < geracoes:
+                etapa = min(self.intervalo_migracao, geracoes - geracao)
+                geracao += etapa
+                migrar = self.n_migrantes if geracao < geracoes else 0
+                for conexao, grupo in zip(conexoes, grupos):
+                    conexao.send(("evoluir", etapa, migrar, [chegando[j] for j in grupo]))
+                saindo: List[List[Migrante]] = [[] for _ in range(n_ilhas)]
+                for conexao, grupo in zip(conexoes, grupos):
+                    for j, melhores in zip(grupo, self._resposta(conexao)):
+                        saindo[j] = melhores
+                chegando = [saindo[j - 1] for j in range(n_ilhas)]
+
+            resultados: List[Any] = [None] * n_ilhas
+            for conexao in conexoes:
+                conexao.send(("resultado",))
+            for conexao, grupo in zip(conexoes, grupos):
+                for j, resultado in zip(grupo, self._resposta(conexao)):
+                    resultados[j] = resultado
+            return resultados
+        finally:
+            for conexao in conexoes:
+                conexao.close()
+            for processo in processos:
+                processo.join(timeout=5)
+                if processo.is_alive():
+                    processo.terminate()
+
+    @staticmethod
+    def _resposta(conexao: Any) -> Any:
+        status, conteudo = conexao.recv()
+        if status == "erro":
+            raise RuntimeError(f"Falha em processo de ilha:\n{conteudo}")
+        return conteudo
+
+
+if __name__ == "__main__":
+    import time
+
+    from core.fitness_modules import FitnessCalculator
+    from core.genetic_algorithm import GeneticOptimizer
+    from core.genetic_numpy import VectorizedGeneticOptimizer
+
+    logging.basicConfig(level=logging.WARNING)
+
+    calc = FitnessCalculator()
+    historico = {'frequencias': {d: random.randint(800, 1100) for d in range(1, 26)}}
+    pesos = {'soma': 1.5, 'frequencia': 2.0}
+    populacao = 700
+
+    # Cada ilha evolui uma população completa de 700: N ilhas fazem N vezes o
+    # trabalho de uma. Com núcleos livres o tempo deve ficar perto do de uma
+    # ilha; num único núcleo cresce ~N vezes. O motor clássico avalia jogo a
+    # jogo e roda menos gerações para caber no teste.
+    nucleos = os.cpu_count() or 1
+    ilhas = sorted(n for n in {1, 2, 4, 8, 16, nucleos} if n <= max(nucleos, 4))
+    for nome, classe, geracoes in (("vetorizado", VectorizedGeneticOptimizer, 350), ("clássico", GeneticOptimizer, 20)):
+        print(f"=== THROUGHPUT {nome} {populacao} x {geracoes} por ilha ({nucleos} núcleos) ===")
+        base = None
+        for n in ilhas:
+            otimizador = classe({"ga_islands": n, "ga_workers": n})
+            inicial = otimizador.gerar_populacao_inicial(tamanho=populacao)
+            inicio = time.perf_counter()
+            jogos = otimizador.evoluir(inicial, calc.calcular_fitness, geracoes=geracoes, pesos=pesos, historico=historico)
+            segundos = time.perf_counter() - inicio
+            vazao = n * populacao * geracoes / segundos
+            base = base or vazao
+            print(f"{n:>2} ilha(s): {segundos:6.2f}s  {vazao:>10,.0f} avaliações/s  "
+                  f"escala {vazao / base:4.2f}x  ({len(jogos)} jogos)")
@@ -0,0 +1,172 @@
+"""
+Lotofacil AI Engine v3.0 - Índice de Frequências
+Contagens acumuladas (N+1 x 25) do histórico: a frequência de cada dezena em
+qualquer janela [a, b] de concursos, ou nos últimos k, é uma subtração de
+duas linhas em vez de percorrer os concursos a cada consulta.
+Depende apenas de numpy (o mesmo módulo é usado pelo backend).
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+N_DEZENAS = 25
+_BITS = np.arange(N_DEZENAS, dtype=np.uint32)
+
+Dezenas = Union[int, Sequence[int]]
+
+
+def _presenca(dezenas: Iterable[Dezenas]) -> np.ndarray:
+    """Presença (n, 25) a partir de bitmasks ou listas de dezenas."""
+    if isinstance(dezenas, np.ndarray) and dezenas.ndim == 1:
+        return ((dezenas.astype(np.uint32)[:, None] >> _BITS) & 1).astype(np.int32)
+    linhas = list(dezenas)
+    presenca = np.zeros((len(linhas), N_DEZENAS), dtype=np.int32)
+    for i, d in enumerate(linhas):
+        if isinstance(d, (int, np.integer)):
+            presenca[i] = (np.uint32(d) >> _BITS) & 1
+        else:
+            presenca[i, np.asarray(list(d), dtype=np.intp) - 1] = 1
+    return presenca
+
+
+class IndiceFrequencias:
+    """
+    acumulado[i, d-1] = vezes que a dezena d saiu nos i primeiros concursos
+    (em ordem crescente de número). Linhas são reservadas em blocos para que
+    adicionar() seja append amortizado.
+    """
+
+    def __init__(self, numeros: Sequence[int] = (), dezenas: Iterable[Dezenas] = ()):
+        numeros = np.asarray(numeros, dtype=np.int64)
+        presenca = _presenca(dezenas)
+        if len(numeros) != len(presenca):
+            raise ValueError("numeros e dezenas devem ter o mesmo tamanho")
+        ordem = np.argsort(numeros, kind="stable")
+        self._numeros = numeros[ordem]
+        self._acumulado = np.zeros((len(numeros) + 1, N_DEZENAS), dtype=np.int32)
+        np.cumsum(presenca[ordem], axis=0, out=self._acumulado[1:])
+        self._n = len(numeros)
+
+    @classmethod
+    def dos_concursos(cls, concursos: Iterable[Dict[str, Any]]) -> "IndiceFrequencias":
+        """A partir de registros {'numero', 'dezenas'} (formato do SupabaseClient)."""
+        pares = [(c["numero"], c["dezenas"]) for c in concursos if c.get("dezenas")]
+        return cls([n for n, _ in pares], [d for _, d in pares])
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def numeros(self) -> np.ndarray:
+        return self._numeros[:self._n]
+
+    @property
+    def ultimo_numero(self) -> Optional[int]:
+        return int(self._numeros[self._n - 1]) if self._n else None
+
+    def adicionar(self, numero: int, dezenas: Dezenas) -> bool:
+        """Append de um concurso posterior ao último; False se não for posterior."""
+        if self._n and numero <= self._numeros[self._n - 1]:
+            return False
+        if self._n + 1 >= len(self._acumulado):
+            capacidade = max(2 * len(self._acumulado), 64)
+            acumulado = np.zeros((capacidade, N_DEZENAS), dtype=np.int32)
+            acumulado[:self._n + 1] = self._acumulado[:self._n + 1]
+            self._acumulado = acumulado
+            numeros = np.zeros(capacidade, dtype=np.int64)
+            numeros[:self._n] = self._numeros[:self._n]
+            self._numeros = numeros
+        self._numeros[self._n] = numero
+        self._acumulado[self._n + 1] = self._acumulado[self._n] + _presenca([dezenas])[0]
+        self._n += 1
+        return True
+
+    def sincronizar(self, numeros: Sequence[int], masks: Sequence[int]) -> bool:
+        """
+        Acompanha colunas crescentes (HistoricoSorteios.numeros/masks) das quais
+        este índice é prefixo, fazendo append só das linhas novas.
+        Retorna False se o índice não é prefixo delas (aí é preciso remontar).
+        """
+        if len(numeros) < self._n or (self._n and numeros[self._n - 1] != self._numeros[self._n - 1]):
+            return False
+        for numero, mask in zip(np.asarray(numeros[self._n:]).tolist(), np.asarray(masks[self._n:]).tolist()):
+            self.adicionar(numero, mask)
+        return True
+
+    def posicoes(self, a: int, b: int) -> Tuple[int, int]:
+        """Fatia [i, j) dos concursos com número entre a e b (inclusive)."""
+        numeros = self.numeros
+        return int(np.searchsorted(numeros, a, side="left")), int(np.searchsorted(numeros, b, side="right"))
+
+    def frequencia(self, a: int, b: int) -> np.ndarray:
+        """Ocorrências (25,) de cada dezena nos concursos de número a até b."""
+        i, j = self.posicoes(a, b)
+        return self._acumulado[max(j, i)] - self._acumulado[i]
+
+    def ultimos(self, k: int) -> np.ndarray:
+        """Ocorrências (25,) de cada dezena nos últimos k concursos."""
+        k = max(0, min(int(k), self._n))
+        return self._acumulado[self._n] - self._acumulado[self._n - k]
+
+    def janela(self, numeros: Sequence[int]) -> Optional[np.ndarray]:
+        """
+        Frequência (25,) dos concursos listados, se forem exatamente os do índice
+        entre o menor e o maior número; None se o índice não os cobre.
+        """
+        numeros = set(int(n) for n in numeros)
+        if not numeros:
+            return None
+        i, j = self.posicoes(min(numeros), max(numeros))
+        if j - i != len(numeros) or self._numeros[i] != min(numeros) or self._numeros[j - 1] != max(numeros):
+            return None
+        return self._acumulado[j] - self._acumulado[i]
+
+    def contador(self, frequencia: np.ndarray) -> Counter:
+        """Counter {dezena: ocorrências} só com as dezenas que saíram (formato dos geradores)."""
+        return Counter({d + 1: int(c) for d, c in enumerate(frequencia) if c})
+
+
+_indices: Dict[int, Tuple[Any, IndiceFrequencias]] = {}
+
+
+def obter_indice_frequencias(historico: Any) -> IndiceFrequencias:
+    """
+    Índice compartilhado de um histórico (HistoricoSorteios ou qualquer objeto
+    com colunas crescentes numeros/masks), acompanhando os concursos que forem
+    adicionados a ele desde a última consulta.
+    """
+    _, indice = _indices.get(id(historico), (None, None))
+    if indice is None or not indice.sincronizar(historico.numeros, historico.masks):
+        indice = IndiceFrequencias(historico.numeros, np.asarray(historico.masks))
+        _indices[id(historico)] = (historico, indice)
+    return indice
+
+
+if __name__ == "__main__":
+    import random
+    import timeit
+
+    concursos = [{"numero": n, "dezenas": sorted(random.sample(range(1, 26), 15))} for n in range(1, 3501)]
+    indice = IndiceFrequencias.dos_concursos(concursos)
+
+    def contagem_direta(janela):
+        return np.bincount([d - 1 for c in janela for d in c["dezenas"]], minlength=N_DEZENAS)
+
+    assert (indice.ultimos(10) == contagem_direta(concursos[-10:])).all()
+    assert (indice.frequencia(101, 600) == contagem_direta(concursos[100:600])).all()
+    assert (indice.ultimos(10_000) == contagem_direta(concursos)).all()
+    assert indice.frequencia(5000, 6000).sum() == 0
+    assert (indice.janela([c["numero"] for c in concursos[-10:]]) == indice.ultimos(10)).all()
+    assert indice.janela([3499, 3500, 3600]) is None
+
+    novo = {"numero": 3501, "dezenas": list(range(1, 16))}
+    assert indice.adicionar(novo["numero"], novo["dezenas"]) and not indice.adicionar(3501, novo["dezenas"])
+    assert (indice.ultimos(50) == contagem_direta((concursos + [novo])[-50:])).all()
+
+    n = 10_000
+    direto = timeit.timeit(lambda: contagem_direta(concursos[-500:]), number=100) / 100
+    indexado = timeit.timeit(lambda: indice.frequencia(3000, 3500), number=n) / n
+    print(f"Frequência em 500 concursos: direta {direto * 1e6:.0f} µs, índice {indexado * 1e6:.1f} µs")
+    print(indice.contador(indice.ultimos(10)).most_common(5))
@@ -0,0 +1,110 @@
+"""
+Lotofacil AI Engine v3.0 - Registro de Jogos Jogados
+Jogos já emitidos para cada concurso alvo, somando todos os lotes, para que o
+mesmo jogo nunca saia duas vezes para o mesmo concurso. Um BitmapCombinacoes
+por concurso (consulta O(1) pelo rank), persistido em disco a cada registro.
+"""
+
+import logging
+import os
+from typing import Dict, Iterable
+
+from core.bitmask import Jogo
+from core.historico import BitmapCombinacoes
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_JOGADOS = "data/jogos_jogados"
+
+
+class RegistroJogados:
+    """
+    Um bitmap por concurso alvo em <diretorio>/<concurso_alvo>.npz.
+    Os bitmaps ficam em memória depois da primeira consulta; marcar e consultar
+    alteram só a memória, e salvar()/registrar() gravam o arquivo.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_JOGADOS):
+        self.diretorio = diretorio
+        self._bitmaps: Dict[int, BitmapCombinacoes] = {}
+
+    def _caminho(self, concurso_alvo: int) -> str:
+        return os.path.join(self.diretorio, f"{int(concurso_alvo)}.npz")
+
+    def existe(self, concurso_alvo: int) -> bool:
+        """True se já há registro (em memória ou em disco) para o concurso."""
+        return concurso_alvo in self._bitmaps or os.path.exists(self._caminho(concurso_alvo))
+
+    def bitmap(self, concurso_alvo: int) -> BitmapCombinacoes:
+        """Bitmap dos jogos já emitidos para o concurso (vazio se ainda não houver nenhum)."""
+        if concurso_alvo not in self._bitmaps:
+            caminho = self._caminho(concurso_alvo)
+            try:
+                self._bitmaps[concurso_alvo] = BitmapCombinacoes.carregar(caminho)
+            except FileNotFoundError:
+                self._bitmaps[concurso_alvo] = BitmapCombinacoes()
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ Registro de jogados do concurso {concurso_alvo} ilegível ({e}); recomeçando vazio")
+                self._bitmaps[concurso_alvo] = BitmapCombinacoes()
+        return self._bitmaps[concurso_alvo]
+
+    def jogado(self, concurso_alvo: int, jogo: Jogo) -> bool:
+        return jogo in self.bitmap(concurso_alvo)
+
+    def salvar(self, concurso_alvo: int) -> None:
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.bitmap(concurso_alvo).salvar(self._caminho(concurso_alvo))
+
+    def registrar(self, concurso_alvo: int, jogos: Iterable[Jogo]) -> int:
+        """
+        Marca os jogos como emitidos para o concurso e grava o registro.
+
+        Returns:
+            Quantos jogos eram novos
+        """
+        bitmap = self.bitmap(concurso_alvo)
+        novos = sum(1 for jogo in jogos if bitmap.marcar(jogo))
+        self.salvar(concurso_alvo)
+        logger.info(f"🧾 Concurso {concurso_alvo}: {novos} jogos registrados como emitidos")
+        return novos
+
+    def liberar(self, concurso_alvo: int, jogos: Iterable[Jogo]) -> None:
+        """Desfaz registrar() (por exemplo, quando o lote não chegou a ser salvo)."""
+        bitmap = self.bitmap(concurso_alvo)
+        for jogo in jogos:
+            bitmap.desmarcar(jogo)
+        self.salvar(concurso_alvo)
+
+
+_registros: Dict[str, RegistroJogados] = {}
+
+
+def obter_registro_jogados(diretorio: str = DIRETORIO_JOGADOS) -> RegistroJogados:
+    """Registro compartilhado por diretório."""
+    if diretorio not in _registros:
+        _registros[diretorio] = RegistroJogados(diretorio)
+    return _registros[diretorio]
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    logging.basicConfig(level=logging.INFO)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        registro = RegistroJogados(diretorio)
+        lote = [sorted(random.sample(range(1, 26), 15)) for _ in range(1000)]
+        unicos = len({tuple(j) for j in lote})
+        assert registro.registrar(3600, lote) == unicos
+        assert registro.registrar(3600, lote[:10]) == 0
+        print(f"Arquivo do concurso 3600: {os.path.getsize(registro._caminho(3600)) / 1024:.1f} KB")
+
+        # Sobrevive a reinício
+        reaberto = RegistroJogados(diretorio)
+        assert all(reaberto.jogado(3600, j) for j in lote)
+        assert not reaberto.existe(3601) and len(reaberto.bitmap(3601)) == 0
+
+        reaberto.liberar(3600, lote[:1])
+        assert not RegistroJogados(diretorio).jogado(3600, lote[0])
+        print("OK")
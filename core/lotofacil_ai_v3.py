@@ -21,15 +21,23 @@ backend_dir = os.path.dirname(current_dir)
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
+from core.historico import DIRETORIO_STORE, HistoricoSorteios, obter_historico
+
 # Importar módulos auxiliares com fallback
 try:
     from core.genetic_algorithm import GeneticOptimizer
+    from core.genetic_numpy import VectorizedGeneticOptimizer
     from core.fitness_modules import FitnessCalculator
     from core.mazusoft_integration import MazusoftAnalyzer
     from core.event_detector import EventDetector
     from core.reinforcement_learning import QLearningAgent
     from database.supabase_manager import SupabaseManager
     from utils.validators import GameValidator
+    from core.feature_index import COLUNAS_FAIXA, FeatureIndex
+    from core.busca_exaustiva import BuscaExaustiva
+    from core.amostrador import AmostradorRestrito
+    from core.combinadic import rank_jogo
+    from core.jogos_jogados import obter_registro_jogados
     MODO_COMPLETO = True
 except ImportError as e:
     logging.warning(f"Módulos auxiliares não encontrados: {e}. Usando modo simplificado.")
@@ -41,9 +49,11 @@ except ImportError as e:
         def gerar_populacao_inicial(self, **kwargs): return []
         def evoluir(self, **kwargs): return kwargs.get('populacao', [])
     
+    VectorizedGeneticOptimizer = GeneticOptimizer
+    
     class FitnessCalculator:
         def __init__(self): pass
-        def calcular(self, jogo, pesos=None): return 0.75
+        def calcular_fitness(self, jogo, pesos=None, **kwargs): return 0.75, {}
         def calcular_confianca(self, jogo, validacao, contexto): return 0.75
     
     class MazusoftAnalyzer:
@@ -53,7 +63,8 @@ except ImportError as e:
         def get_probabilidades_ciclo(self): return {n: 0.5 for n in range(1, 26)}
         def get_probabilidades_gap(self): return {n: 0.5 for n in range(1, 26)}
         def calcular_temperatura_atual(self): return 'normal'
-        def atualizar_com_resultado(self, resultado): pass
+        def carregar_historico(self, historico): pass
+        def atualizar_com_resultado(self, resultado, concurso=None): pass
     
     class EventDetector:
         def __init__(self, **kwargs): pass
@@ -77,6 +88,7 @@ except ImportError as e:
         def load_weights(self): return {}
         def choose_action(self, state): return {}
         def apply_action(self, action, weights): return weights
+        def registrar_ouvinte_pesos(self, callback): pass
         def calculate_reward(self, acertos): return 0.0
         def update(self, state, action, reward, next_state): pass
         def save_weights(self, weights): pass
@@ -100,6 +112,20 @@ except ImportError as e:
             soma = sum(jogo)
             pares = sum(1 for n in jogo if n % 2 == 0)
             return True, {'soma': soma, 'pares': pares, 'impares': 15-pares}
+    
+    COLUNAS_FAIXA = ()
+
+    class FeatureIndex:
+        def __init__(self, diretorio=None):
+            raise FileNotFoundError("Índice de features indisponível")
+    
+    class BuscaExaustiva:
+        def __init__(self, feature_index=None, fitness_calc=None):
+            raise FileNotFoundError("Busca exaustiva indisponível")
+    
+    class AmostradorRestrito:
+        def __init__(self, feature_index=None):
+            raise FileNotFoundError("Amostrador restrito indisponível")
 
 logging.basicConfig(
     level=logging.INFO,
@@ -152,12 +178,14 @@ class LotofacilAIv3:
             logger.error(f"❌ Erro ao carregar Mazusoft: {e}")
             self.mazusoft = MazusoftAnalyzer(mazusoft_data_path)
         
+        # 'vetorizado' (padrão, população como matriz NumPy) ou 'classico'
+        otimizador_ga = GeneticOptimizer if self.config.get('ga_engine') == 'classico' else VectorizedGeneticOptimizer
         try:
-            self.genetic = GeneticOptimizer(config)
+            self.genetic = otimizador_ga(config)
             logger.info("✅ Otimizador Genético inicializado")
         except Exception as e:
             logger.warning(f"⚠️ Otimizador Genético não disponível: {e}")
-            self.genetic = GeneticOptimizer(config)
+            self.genetic = otimizador_ga(config)
         
         try:
             self.fitness_calc = FitnessCalculator()
@@ -204,6 +232,11 @@ class LotofacilAIv3:
             logger.error(f"❌ Erro ao inicializar Q-Learning: {e}")
             self.q_agent = QLearningAgent()
         
+        # Mudanças de pesos pelo Q-Learning invalidam o cache de fitness do GA
+        fitness_cache = getattr(self.genetic, 'fitness_cache', None)
+        if self.q_agent and fitness_cache is not None:
+            self.q_agent.registrar_ouvinte_pesos(fitness_cache.invalidar)
+        
         # Inicializar validador
         try:
             self.validator = GameValidator()
@@ -212,6 +245,22 @@ class LotofacilAIv3:
             logger.warning(f"⚠️ Validador não disponível: {e}")
             self.validator = GameValidator()
         
+        # Índice de features pré-computado (opcional)
+        self.feature_index = self._carregar_feature_index()
+        self.busca_exaustiva = None
+        self.amostrador = None
+        if self.feature_index is not None:
+            try:
+                self.busca_exaustiva = BuscaExaustiva(self.feature_index, self.fitness_calc)
+                self.amostrador = AmostradorRestrito(self.feature_index)
+            except Exception as e:
+                logger.warning(f"⚠️ Busca exaustiva/amostrador não disponível: {e}")
+        
+        # Jogos já emitidos por concurso alvo (nenhum lote repete jogo de outro lote)
+        self.registro_jogados = None
+        if MODO_COMPLETO and self.config.get('deduplicar_lotes', True):
+            self.registro_jogados = obter_registro_jogados(self.config.get('jogos_jogados_dir', "data/jogos_jogados"))
+        
         # Carregar dados históricos
         self.historico = self._carregar_historico()
         self.mazusoft_stats = self._carregar_mazusoft_stats()
@@ -221,6 +270,7 @@ class LotofacilAIv3:
         self.eventos_raros = []
         self.contexto_atual = {}
         self.ultima_acao = {}
+        self.relatorio_gap = None
         
         logger.info("="*70)
         logger.info("✅ Sistema inicializado com sucesso!")
@@ -229,26 +279,45 @@ class LotofacilAIv3:
         logger.info(f"   Pesos ativos: {len(self.pesos_atuais)} critérios")
         logger.info("="*70)
 
-    def _carregar_historico(self) -> Dict[int, List[int]]:
-        """Carrega histórico de concursos"""
+    def _carregar_historico(self) -> "HistoricoSorteios":
+        """
+        Carrega histórico de concursos: Supabase (online) ou o store colunar
+        local (data/historico_store, montado do CSV completo)
+        """
         if not self.modo_offline and self.db:
             try:
-                return self.db.get_ultimos_concursos(500)
+                return HistoricoSorteios(self.db.get_ultimos_concursos(500))
             except Exception as e:
                 logger.warning(f"Erro ao carregar histórico do Supabase: {e}")
         
+        historico = obter_historico(diretorio=self.config.get('historico_store_dir', DIRETORIO_STORE))
+        if historico is not None:
+            return historico
+        
         try:
             with open("data/concursos_historico.json", 'r') as f:
                 data = json.load(f)
-                return {int(k): v for k, v in data.items()}
-        except FileNotFoundError:
+                return HistoricoSorteios((int(k), v) for k, v in data.items())
+        except (FileNotFoundError, json.JSONDecodeError):
             logger.warning("Arquivo de histórico não encontrado. Iniciando vazio.")
-            return {}
+            return HistoricoSorteios()
+    
+    def _carregar_feature_index(self) -> Optional[FeatureIndex]:
+        """Abre o índice de features se já tiver sido construído"""
+        diretorio = self.config.get('feature_index_dir', "data/feature_index")
+        try:
+            indice = FeatureIndex(diretorio)
+            logger.info("✅ Índice de features disponível")
+            return indice
+        except Exception as e:
+            logger.info(f"ℹ️ Índice de features indisponível ({e}). Construa com: python -m core.feature_index")
+            return None
     
     def _carregar_mazusoft_stats(self) -> Dict:
-        """Carrega estatísticas Mazusoft"""
+        """Carrega estatísticas Mazusoft (calculadas do histórico já carregado)"""
         if self.mazusoft:
             try:
+                self.mazusoft.carregar_historico(self.historico)
                 return self.mazusoft.load_all_stats()
             except Exception as e:
                 logger.warning(f"Erro ao carregar stats Mazusoft: {e}")
@@ -258,12 +327,19 @@ class LotofacilAIv3:
         self,
         num_jogos: int = 50,
         concurso_alvo: Optional[int] = None,
-        modo: str = "normal"
+        modo: str = "normal",
+        estrategia: str = "ga"
     ) -> List[Dict]:
-        """Gera jogos inteligentes com aprendizado contínuo"""
+        """
+        Gera jogos inteligentes com aprendizado contínuo
+        
+        Args:
+            estrategia: "ga" (algoritmo genético) ou "exaustivo" (top-K exato
+                sobre todas as combinações, requer o índice de features)
+        """
         logger.info(f"\n{'='*70}")
         logger.info(f" "*15 + f"GERANDO {num_jogos} JOGOS INTELIGENTES")
-        logger.info(f" "*20 + f"Modo: {modo.upper()}")
+        logger.info(f" "*20 + f"Modo: {modo.upper()} | Estratégia: {estrategia.upper()}")
         logger.info(f"{'='*70}\n")
         
         contexto = self._analisar_contexto()
@@ -297,8 +373,23 @@ class LotofacilAIv3:
         
         prob_matrix = self._calcular_probabilidades(contexto)
         constraints = self._definir_restricoes(modo)
+        constraints = self._calibrar_restricoes(
+            constraints, self.config.get('restricoes_minimo_jogos', num_jogos * 2)
+        )
         
-        if self.genetic:
+        if estrategia == "exaustivo" and self.busca_exaustiva is not None:
+            try:
+                melhores = self.busca_exaustiva.top_k(
+                    num_jogos * 2,
+                    self.pesos_atuais,
+                    constraints=constraints,
+                    max_sobreposicao=self.config.get('exaustivo_max_sobreposicao')
+                )
+                populacao_otimizada = [jogo for jogo, _ in melhores]
+            except Exception as e:
+                logger.error(f"Erro na busca exaustiva: {e}. Usando geração simples.")
+                populacao_otimizada = self._gerar_jogos_simples(num_jogos * 2, prob_matrix, constraints)
+        elif self.genetic:
             try:
                 populacao_inicial = self.genetic.gerar_populacao_inicial(
                     tamanho=700,
@@ -307,18 +398,29 @@ class LotofacilAIv3:
                 
                 populacao_otimizada = self.genetic.evoluir(
                     populacao=populacao_inicial,
-                    fitness_func=self.fitness_calc.calcular if self.fitness_calc else None,
+                    fitness_func=self.fitness_calc.calcular_fitness if self.fitness_calc else None,
                     geracoes=350,
                     pesos=self.pesos_atuais
                 )
             except Exception as e:
                 logger.error(f"Erro no GA: {e}. Usando geração simples.")
-                populacao_otimizada = self._gerar_jogos_simples(num_jogos * 2, prob_matrix)
+                populacao_otimizada = self._gerar_jogos_simples(num_jogos * 2, prob_matrix, constraints)
         else:
-            populacao_otimizada = self._gerar_jogos_simples(num_jogos * 2, prob_matrix)
+            populacao_otimizada = self._gerar_jogos_simples(num_jogos * 2, prob_matrix, constraints)
         
         jogos_validos = []
-        for jogo in populacao_otimizada:
+        jogados = None
+        if self.registro_jogados is not None and concurso_alvo is not None:
+            jogados = self.registro_jogados.bitmap(concurso_alvo)
+        # Se a população não render num_jogos válidos, completa com sorteio restrito
+        candidatos = itertools.chain(
+            populacao_otimizada,
+            self._completar_com_amostrador(jogos_validos, num_jogos, constraints, prob_matrix)
+        )
+        ultimos_5 = self.historico.ultimos_jogos(5)
+        for jogo in candidatos:
+            if jogados is not None and jogo in jogados:
+                continue
             if self.validator:
                 valido, validacao = self.validator.validar_completo(jogo, constraints)
             else:
@@ -337,8 +439,7 @@ class LotofacilAIv3:
                 if self.event_detector:
                     try:
                         eh_raro, tipo_raro, evento = self.event_detector.classificar(
-                            jogo, concurso_alvo, 
-                            list(self.historico.values())[-5:]
+                            jogo, concurso_alvo, ultimos_5
                         )
                     except Exception as e:
                         logger.warning(f"Erro ao classificar evento: {e}")
@@ -355,23 +456,37 @@ class LotofacilAIv3:
                 }
                 
                 jogos_validos.append(jogo_data)
+                if jogados is not None:
+                    jogados.marcar(jogo)
                 
                 if len(jogos_validos) >= num_jogos:
                     break
         
+        if jogados is not None:
+            self.registro_jogados.salvar(concurso_alvo)
+        
+        if estrategia != "exaustivo" and self.config.get('reportar_gap_ga') and jogos_validos:
+            self.comparar_com_otimo([j['jogo'] for j in jogos_validos], constraints)
+        
+        nao_salvos = []
         if not self.modo_offline and self.db:
             for i, jogo_data in enumerate(jogos_validos, 1):
                 try:
                     self.db.salvar_jogo_gerado(
-                        concurso_alvo=concurso_alvo or (max(self.historico.keys()) + 1 if self.historico else 3500),
+                        concurso_alvo=concurso_alvo or (self.historico.ultimo_numero + 1 if self.historico else 3500),
                         jogo=jogo_data['jogo'],
                         metadata=jogo_data,
                         algoritmo="LotofacilAI_v3.0"
                     )
                 except Exception as e:
                     logger.warning(f"Erro ao salvar jogo {i}: {e}")
-        else:
-            self._salvar_jogos_local(jogos_validos, concurso_alvo)
+                    nao_salvos.append(jogo_data['jogo'])
+        elif not self._salvar_jogos_local(jogos_validos, concurso_alvo):
+            nao_salvos = [j['jogo'] for j in jogos_validos]
+        
+        # Jogos que não chegaram a ser salvos voltam a ficar disponíveis para o concurso
+        if jogados is not None and nao_salvos:
+            self.registro_jogados.liberar(concurso_alvo, nao_salvos)
         
         logger.info(f"\n{'='*70}")
         logger.info(f" "*15 + f"✅ {len(jogos_validos)} JOGOS GERADOS!")
@@ -396,7 +511,7 @@ class LotofacilAIv3:
             except Exception as e:
                 logger.warning(f"Erro ao salvar concurso: {e}")
         
-        self.historico[concurso] = resultado
+        self.historico.adicionar(concurso, resultado)
         
         if not self.modo_offline and self.db:
             try:
@@ -440,7 +555,7 @@ class LotofacilAIv3:
             try:
                 eh_raro, tipo, evento = self.event_detector.classificar(
                     resultado, concurso,
-                    list(self.historico.values())[-5:]
+                    self.historico.ultimos_jogos(5)
                 )
                 
                 if eh_raro:
@@ -474,7 +589,7 @@ class LotofacilAIv3:
         
         if self.mazusoft:
             try:
-                self.mazusoft.atualizar_com_resultado(resultado)
+                self.mazusoft.atualizar_com_resultado(resultado, concurso)
             except Exception as e:
                 logger.warning(f"Erro ao atualizar Mazusoft: {e}")
         
@@ -482,6 +597,30 @@ class LotofacilAIv3:
         logger.info(f" "*15 + "✅ RESULTADO REGISTRADO COM SUCESSO!")
         logger.info(f"{'='*70}\n")
 
+    def comparar_com_otimo(
+        self,
+        jogos: List[List[int]],
+        constraints: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """
+        Compara o melhor dos jogos com o ótimo global exato (mesmos pesos e restrições).
+        
+        Returns:
+            Relatório da BuscaExaustiva.comparar ou None se o índice não estiver disponível
+        """
+        if self.busca_exaustiva is None:
+            logger.warning("⚠️ Índice de features indisponível: comparação com o ótimo ignorada")
+            return None
+        
+        relatorio = self.busca_exaustiva.comparar(jogos, self.pesos_atuais, constraints)
+        self.relatorio_gap = relatorio
+        logger.info(
+            f"📏 Distância ao ótimo: fitness {relatorio['fitness_melhor']:.4f} vs "
+            f"{relatorio['fitness_otimo']:.4f} (gap {relatorio['gap_percentual']:.2f}%, "
+            f"{relatorio['jogos_melhores']} jogos melhores)"
+        )
+        return relatorio
+
     def _analisar_contexto(self) -> Dict:
         """Analisa contexto atual para ajustar estratégia"""
         if not self.historico:
@@ -495,7 +634,7 @@ class LotofacilAIv3:
                 'resumo': 'Sem histórico disponível'
             }
         
-        ultimos_5 = list(self.historico.values())[-5:]
+        ultimos_5 = self.historico.ultimos_jogos(5)
         
         alerta_salto = False
         if self.event_detector:
@@ -585,14 +724,80 @@ class LotofacilAIv3:
         
         return base
 
-    def _gerar_jogos_simples(self, num: int, prob_matrix: Dict[int, float]) -> List[List[int]]:
+    def _calibrar_restricoes(self, constraints: Dict, minimo: int) -> Dict:
+        """
+        Conta o espaço exato das restrições no índice de features e, se couberem
+        menos de minimo jogos, afrouxa a restrição isolada mais seletiva (faixa
+        +1 de cada lado, max_consecutivo +1) até caber ou esgotar os passos.
+        """
+        if self.feature_index is None:
+            return constraints
+        
+        calibradas = dict(constraints)
+        total = self.feature_index.contar(calibradas)
+        for _ in range(self.config.get('calibracao_max_passos', 10)):
+            if total >= minimo:
+                break
+            ajustaveis = [nome for nome in COLUNAS_FAIXA + ('max_consecutivo',) if nome in calibradas]
+            if not ajustaveis:
+                break
+            nome = min(ajustaveis, key=lambda n: self.feature_index.contar({n: calibradas[n]}))
+            if nome == 'max_consecutivo':
+                calibradas[nome] += 1
+            else:
+                faixa_min, faixa_max = calibradas[nome]
+                calibradas[nome] = (max(faixa_min - 1, 0), faixa_max + 1)
+            logger.info(f"📐 Restrição '{nome}' afrouxada para {calibradas[nome]}")
+            total = self.feature_index.contar(calibradas)
+        
+        logger.info(f"📐 Espaço das restrições: {total} jogos ({total / len(self.feature_index):.2%})")
+        if total < minimo:
+            logger.warning(f"⚠️ Restrições admitem só {total} jogos (mínimo {minimo})")
+        return calibradas
+
+    def _gerar_jogos_simples(
+        self,
+        num: int,
+        prob_matrix: Dict[int, float],
+        constraints: Optional[Dict] = None
+    ) -> List[List[int]]:
         """Geração simples de jogos (fallback)"""
+        if self.amostrador is not None and constraints:
+            try:
+                jogos = self.amostrador.amostrar(num, constraints, prob_matrix)
+                if jogos:
+                    return jogos
+            except Exception as e:
+                logger.warning(f"Erro no amostrador restrito: {e}")
+        
         jogos = []
         for _ in range(num):
             jogo = sorted(random.sample(range(1, 26), 15))
             jogos.append(jogo)
         return jogos
 
+    def _completar_com_amostrador(
+        self,
+        jogos_validos: List[Dict],
+        num_jogos: int,
+        constraints: Dict,
+        prob_matrix: Dict[int, float]
+    ):
+        """
+        Gerador (avaliado só quando necessário) de jogos sorteados do conjunto
+        exato que satisfaz as restrições, sem repetir os já aceitos.
+        """
+        faltam = num_jogos - len(jogos_validos)
+        if faltam <= 0 or self.amostrador is None:
+            return
+        
+        logger.info(f"🎲 Completando {faltam} jogos com o amostrador restrito")
+        usados = [rank_jogo(j['jogo']) for j in jogos_validos]
+        try:
+            yield from self.amostrador.amostrar(faltam, constraints, prob_matrix, excluir=usados)
+        except Exception as e:
+            logger.warning(f"Erro no amostrador restrito: {e}")
+
     def _validar_simples(self, jogo: List[int], constraints: Dict) -> Tuple[bool, Dict]:
         """Validação simples (fallback)"""
         soma = sum(jogo)
@@ -611,8 +816,8 @@ class LotofacilAIv3:
         
         return valido, validacao
 
-    def _salvar_jogos_local(self, jogos: List[Dict], concurso: Optional[int]):
-        """Salva jogos em arquivo local"""
+    def _salvar_jogos_local(self, jogos: List[Dict], concurso: Optional[int]) -> bool:
+        """Salva jogos em arquivo local (False se não conseguiu)"""
         try:
             # Criar diretório data se não existir
             os.makedirs("data", exist_ok=True)
@@ -626,8 +831,10 @@ class LotofacilAIv3:
                     'jogos': jogos
                 }, f, ensure_ascii=False, indent=2)
             logger.info(f"💾 Jogos salvos em: {filename}")
+            return True
         except Exception as e:
             logger.error(f"Erro ao salvar jogos localmente: {e}")
+            return False
 
 
 if __name__ == "__main__":
@@ -1,20 +1,76 @@
 """
 Integração com dados estatísticos Mazusoft
+Probabilidades por dezena (frequência, ciclo, atraso) calculadas do histórico
+de concursos e do Ciclo_das_Dezenas_Completo.csv, guardadas como vetores de
+25 posições e atualizadas em O(25) a cada resultado novo; as consultas só
+leem o que já está calculado e não gravam nada. Concursos posteriores à
+última linha da planilha de ciclos são acrescentados a ela só por
+atualizar_com_resultado().
 """
 
+import csv
 import json
 import logging
-from typing import Dict, List
+import math
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.bitmask import mask_para_jogo, normalizar_mask
+from core.estatisticas import EstatisticasDezenas
+from core.historico import HistoricoSorteios, obter_historico
 
 logger = logging.getLogger(__name__)
 
+CAMINHO_CICLO = "data/Ciclo_das_Dezenas_Completo.csv"
+COLUNAS_AUSENTES = 10     # ausente1..ausente10 na planilha de ciclos
+N_DEZENAS = 25
+TAXA_BASE = 15 / N_DEZENAS
+JANELA_FREQUENCIA = 100   # concursos da janela de frequência
+JANELA_TEMPERATURA = 10   # concursos comparados com a média histórica de repetidas
+ATRASO_MAXIMO = 30        # atrasos a partir daqui dividem a mesma taxa
+SUAVIZACAO = 20           # pseudo-contagens puxando as taxas empíricas para 15/25
+_BITS = np.arange(N_DEZENAS, dtype=np.uint32)
+
+
+def _presenca(mask: int) -> np.ndarray:
+    return ((np.uint32(mask) >> _BITS) & 1).astype(bool)
+
+
+def _taxa(acertos, tentativas):
+    return (acertos + SUAVIZACAO * TAXA_BASE) / (tentativas + SUAVIZACAO)
+
+
 class MazusoftAnalyzer:
-    """Analisador dos dados Mazusoft (frequência, ciclo, atraso)."""
+    """
+    Analisador dos dados Mazusoft (frequência, ciclo, atraso).
+
+    - frequência: taxa de saída da dezena nos últimos JANELA_FREQUENCIA concursos;
+    - ciclo: taxa com que dezenas ausentes (ou já sorteadas) no ciclo corrente
+      saíram no concurso seguinte, no histórico, com o mesmo número de ausentes;
+    - gap: taxa com que dezenas com o mesmo atraso atual saíram no concurso seguinte;
+    - temperatura: repetidas dos últimos concursos contra a média histórica.
 
-    def __init__(self, data_path: str = "data/mazusoft_data.json"):
+    O histórico é lido na primeira consulta (o do motor, via carregar_historico,
+    ou o store local); atualizar_com_resultado() soma um concurso sem reler nada.
+    """
+
+    def __init__(
+        self,
+        data_path: str = "data/mazusoft_data.json",
+        historico: Optional[HistoricoSorteios] = None,
+        caminho_ciclo: str = CAMINHO_CICLO
+    ):
         self.data_path = data_path
         self.data = self._carregar_dados()
-        logger.info(f"✅ Mazusoft carregado: {len(self.data)} registros")
+        self.caminho_ciclo = caminho_ciclo
+        self.ultimo_concurso_ciclo: Optional[int] = None  # última linha da planilha (None = sem planilha)
+        self._linhas_pendentes: List[List[object]] = []  # concursos do histórico além da planilha, ainda não gravados
+        self.ciclos = self._carregar_ciclos()
+        self._historico = historico
+        self.estatisticas: Optional[EstatisticasDezenas] = None
+        logger.info(f"✅ Mazusoft carregado: {len(self.data)} registros, {len(self.ciclos)} ciclos fechados")
 
     def _carregar_dados(self) -> Dict:
         """Carrega os dados do arquivo local JSON."""
@@ -28,26 +84,243 @@ class MazusoftAnalyzer:
             logger.error(f"Erro ao ler {self.data_path}.")
             return {}
 
+    def _carregar_ciclos(self) -> List[Tuple[int, int, int]]:
+        """Fechamentos de ciclo da planilha: (concurso, ciclo, qtd de concursos)."""
+        try:
+            with open(self.caminho_ciclo, "r", encoding="utf-8-sig", newline="") as f:
+                linhas = [linha for linha in csv.reader(f, delimiter=";") if linha and linha[0].isdigit()]
+        except FileNotFoundError:
+            logger.warning(f"Arquivo {self.caminho_ciclo} não encontrado.")
+            return []
+        self.ultimo_concurso_ciclo = max((int(linha[0]) for linha in linhas), default=0)
+        return [
+            (int(linha[0]), int(linha[4]), int(linha[5]))
+            for linha in linhas
+            if len(linha) > 5 and linha[4].strip() and linha[5].strip()
+        ]
+
+    def _linha_ciclo(self, numero: int, mask: int, repetidas: int) -> List[object]:
+        """Linha da planilha de ciclos para o concurso recém-contabilizado."""
+        estatisticas = self.estatisticas
+        dezenas = mask_para_jogo(mask)
+        fechou = estatisticas.ciclo_fechou
+        ausentes = estatisticas.ausentes()
+        return [
+            numero, repetidas, sum(dezenas), sum(1 for d in dezenas if d % 2 == 0),
+            estatisticas.ciclo_numero if fechou else "",
+            estatisticas.ultimo_fechamento[1] if fechou else "",
+            *ausentes, *([""] * (COLUNAS_AUSENTES - len(ausentes))),
+        ]
+
+    def _gravar_linhas_ciclo(self) -> None:
+        """Append dos concursos pendentes na planilha de ciclos (ficam pendentes se a gravação falhar)."""
+        if not self._linhas_pendentes:
+            return
+        try:
+            with open(self.caminho_ciclo, "a", encoding="utf-8", newline="") as f:
+                csv.writer(f, delimiter=";", lineterminator="\n").writerows(self._linhas_pendentes)
+        except OSError as e:
+            logger.error(f"❌ Erro ao gravar concursos em {self.caminho_ciclo}: {e}")
+            return
+        self.ultimo_concurso_ciclo = int(self._linhas_pendentes[-1][0])
+        self._linhas_pendentes = []
+
+    def carregar_historico(self, historico: Optional[HistoricoSorteios]) -> None:
+        """Troca o histórico de origem; os vetores são remontados na próxima consulta."""
+        self._historico = historico
+        self.estatisticas = None
+
+    def _garantir(self) -> None:
+        if self.estatisticas is not None:
+            return
+        historico = self._historico if self._historico is not None else obter_historico()
+        self.estatisticas = EstatisticasDezenas()
+        self._janela: deque = deque(maxlen=JANELA_FREQUENCIA)
+        self._freq_janela = np.zeros(N_DEZENAS, dtype=np.int64)
+        self._gap_tentativas = np.zeros(ATRASO_MAXIMO + 1, dtype=np.int64)
+        self._gap_acertos = np.zeros(ATRASO_MAXIMO + 1, dtype=np.int64)
+        # [ausentes no ciclo antes do sorteio, dezena ausente?]
+        self._ciclo_tentativas = np.zeros((N_DEZENAS + 1, 2), dtype=np.int64)
+        self._ciclo_acertos = np.zeros((N_DEZENAS + 1, 2), dtype=np.int64)
+        self._repetidas: deque = deque(maxlen=JANELA_TEMPERATURA)
+        self._repetidas_n = 0
+        self._repetidas_soma = 0
+        self._repetidas_soma2 = 0
+        self._ultimo_mask: Optional[int] = None
+        self._linhas_pendentes = []
+        if historico is not None:
+            for numero, mask in zip(historico.numeros.tolist(), historico.masks.tolist()):
+                self._contabilizar(numero, mask)
+        self._recalcular()
+
+    def _contabilizar(self, numero: int, mask: int) -> bool:
+        """
+        Soma um concurso a todos os contadores em O(25). Se ele está além da
+        planilha de ciclos, a linha dele fica pendente (gravada só por
+        atualizar_com_resultado).
+        """
+        estatisticas = self.estatisticas
+        if estatisticas.ultimo_numero is not None and numero <= estatisticas.ultimo_numero:
+            return False
+        saiu = _presenca(mask)
+        repetidas = 0
+
+        if estatisticas.concursos:
+            faixa = np.minimum(estatisticas.atraso, ATRASO_MAXIMO)
+            np.add.at(self._gap_tentativas, faixa, 1)
+            np.add.at(self._gap_acertos, faixa, saiu)
+
+            ausente = _presenca(estatisticas.ausentes_ciclo)
+            k = int(ausente.sum())
+            self._ciclo_tentativas[k] += (int((~ausente).sum()), k)
+            self._ciclo_acertos[k] += (int((saiu & ~ausente).sum()), int((saiu & ausente).sum()))
+
+            repetidas = bin(mask & self._ultimo_mask).count("1")
+            self._repetidas.append(repetidas)
+            self._repetidas_n += 1
+            self._repetidas_soma += repetidas
+            self._repetidas_soma2 += repetidas * repetidas
+
+        estatisticas.atualizar(numero, mask)
+        if estatisticas.ciclo_fechou and (not self.ciclos or self.ciclos[-1][0] < numero):
+            self.ciclos.append((numero, estatisticas.ciclo_numero, estatisticas.ultimo_fechamento[1]))
+        # Concursos além da planilha: fechamento de ciclo e ausentes do ciclo corrente, a gravar
+        if self.ultimo_concurso_ciclo is not None and numero > self.ultimo_concurso_ciclo:
+            self._linhas_pendentes.append(self._linha_ciclo(numero, mask, repetidas))
+
+        if len(self._janela) == self._janela.maxlen:
+            self._freq_janela -= self._janela[0]
+        self._janela.append(saiu)
+        self._freq_janela += saiu
+        self._ultimo_mask = mask
+        return True
+
+    def _recalcular(self) -> None:
+        """Atualiza os vetores de probabilidade e a temperatura a partir dos contadores (O(25))."""
+        estatisticas = self.estatisticas
+        self.prob_frequencia = (
+            self._freq_janela / len(self._janela) if self._janela else np.full(N_DEZENAS, TAXA_BASE)
+        )
+        self.prob_gap = _taxa(self._gap_acertos, self._gap_tentativas)[np.minimum(estatisticas.atraso, ATRASO_MAXIMO)]
+
+        ausente = _presenca(estatisticas.ausentes_ciclo)
+        k = int(ausente.sum())
+        taxas_ciclo = _taxa(self._ciclo_acertos[k], self._ciclo_tentativas[k])
+        self.prob_ciclo = np.where(ausente, taxas_ciclo[1], taxas_ciclo[0])
+
+        self.temperatura = "normal"
+        if len(self._repetidas) == self._repetidas.maxlen and self._repetidas_n > 1:
+            media = self._repetidas_soma / self._repetidas_n
+            variancia = max(self._repetidas_soma2 / self._repetidas_n - media * media, 1e-9)
+            z = (sum(self._repetidas) / len(self._repetidas) - media) / math.sqrt(variancia / len(self._repetidas))
+            self.temperatura = "quente" if z > 1.0 else "fria" if z < -1.0 else "normal"
+
+        self._probabilidades = {
+            nome: {n: float(vetor[n - 1]) for n in range(1, N_DEZENAS + 1)}
+            for nome, vetor in (("frequencia", self.prob_frequencia), ("ciclo", self.prob_ciclo), ("gap", self.prob_gap))
+        }
+        ausentes = set(mask_para_jogo(estatisticas.ausentes_ciclo)) if not estatisticas.ciclo_fechou else set()
+        self.data["ciclo_dezenas"] = {
+            n: {
+                "status": "quente" if n in ausentes else "normal",
+                "atraso": int(estatisticas.atraso[n - 1]),
+                "atraso_max": int(estatisticas.atraso_max[n - 1]),
+            }
+            for n in range(1, N_DEZENAS + 1)
+        }
+        duracoes = [qtd for _, _, qtd in self.ciclos]
+        self.data["ciclo"] = {
+            "numero": estatisticas.ciclo_numero,
+            "qtd": estatisticas.ciclo_qtd,
+            "ausentes": sorted(ausentes),
+            "duracao_media": sum(duracoes) / len(duracoes) if duracoes else None,
+        }
+        self.data["temperatura"] = self.temperatura
+
     def load_all_stats(self) -> Dict:
         """Retorna todas as estatísticas brutas."""
+        self._garantir()
         return self.data
 
     def get_probabilidades_frequencia(self) -> Dict[int, float]:
         """Probabilidade de cada dezena baseada em frequência."""
-        return {n: 0.5 for n in range(1, 26)}  # placeholder até ter dados reais
+        self._garantir()
+        return self._probabilidades["frequencia"]
 
     def get_probabilidades_ciclo(self) -> Dict[int, float]:
         """Probabilidade de cada dezena baseada em ciclo."""
-        return {n: 0.5 for n in range(1, 26)}
+        self._garantir()
+        return self._probabilidades["ciclo"]
 
     def get_probabilidades_gap(self) -> Dict[int, float]:
         """Probabilidade de cada dezena baseada em atraso (gap)."""
-        return {n: 0.5 for n in range(1, 26)}
+        self._garantir()
+        return self._probabilidades["gap"]
 
     def calcular_temperatura_atual(self) -> str:
         """Determina se o ambiente estatístico está quente/normal/frio."""
-        return "normal"
+        self._garantir()
+        return self.temperatura
+
+    def atualizar_com_resultado(self, resultado: List[int], concurso: Optional[int] = None):
+        """
+        Atualiza o dataset Mazusoft com novo resultado (concurso seguinte ao
+        último, se não informado) e grava na planilha de ciclos os concursos
+        que ainda não estão nela.
+        """
+        self._garantir()
+        if concurso is None:
+            concurso = (self.estatisticas.ultimo_numero or 0) + 1
+        if self._contabilizar(concurso, normalizar_mask(resultado)):
+            self._recalcular()
+            self._gravar_linhas_ciclo()
+            logger.info(f"Atualizando Mazusoft com resultado: {resultado} (concurso {concurso}, temperatura {self.temperatura})")
+
+
+if __name__ == "__main__":
+    import os
+    import shutil
+    import tempfile
+    import time
+    import timeit
+
+    logging.basicConfig(level=logging.INFO)
+
+    # O teste acrescenta um concurso fictício: trabalha numa cópia da planilha
+    planilha = os.path.join(tempfile.mkdtemp(), os.path.basename(CAMINHO_CICLO))
+    shutil.copy(CAMINHO_CICLO, planilha)
+
+    historico = obter_historico()
+    mazusoft = MazusoftAnalyzer(caminho_ciclo=planilha)
+    inicio = time.perf_counter()
+    mazusoft.load_all_stats()
+    print(f"{mazusoft.estatisticas.concursos} concursos processados em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    # Os fechamentos reproduzidos do histórico batem com a planilha
+    assert mazusoft.ciclos[-1] == (mazusoft.estatisticas.ultimo_fechamento[0], mazusoft.estatisticas.ciclo_numero,
+                                   mazusoft.estatisticas.ultimo_fechamento[1])
+    freq = mazusoft.get_probabilidades_frequencia()
+    assert abs(sum(freq.values()) - 15) < 1e-9
+    assert np.allclose(mazusoft.prob_frequencia, historico.presenca(JANELA_FREQUENCIA).mean(axis=0))
+    print(f"Ciclo: {mazusoft.data['ciclo']}")
+    print(f"Temperatura: {mazusoft.calcular_temperatura_atual()}")
+    print(f"Gap (5 maiores): {sorted(mazusoft.get_probabilidades_gap().items(), key=lambda x: -x[1])[:5]}")
+    print(f"Ciclo (5 maiores): {sorted(mazusoft.get_probabilidades_ciclo().items(), key=lambda x: -x[1])[:5]}")
 
-    def atualizar_com_resultado(self, resultado: List[int]):
-        """Atualiza o dataset Mazusoft com novo resultado."""
-        logger.info(f"Atualizando Mazusoft com resultado: {resultado}")
+    # Incremental == remontado com o concurso a mais
+    novo = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+    n = 200
+    print(f"get_probabilidades_ciclo(): {timeit.timeit(mazusoft.get_probabilidades_ciclo, number=n) / n * 1e6:.2f} µs")
+    mazusoft.atualizar_com_resultado(novo)
+    completo = HistoricoSorteios(
+        (numero, mask_para_jogo(mask)) for numero, mask in zip(historico.numeros.tolist(), historico.masks.tolist())
+    )
+    completo.adicionar(int(historico.ultimo_numero) + 1, novo)
+    remontado = MazusoftAnalyzer(historico=completo, caminho_ciclo=planilha)
+    remontado.load_all_stats()
+    for nome in ("prob_frequencia", "prob_ciclo", "prob_gap"):
+        assert np.allclose(getattr(mazusoft, nome), getattr(remontado, nome)), nome
+    assert mazusoft.temperatura == remontado.temperatura
+    assert mazusoft.ultimo_concurso_ciclo == int(historico.ultimo_numero) + 1
+    assert remontado._carregar_ciclos() == mazusoft.ciclos
+    print("OK")
@@ -0,0 +1,228 @@
+"""
+Lotofacil AI Engine v3.0 - Otimizador de Portfólio
+Escolhe M jogos de um conjunto de candidatos maximizando um objetivo do LOTE
+(e não de cada jogo isolado): P(algum jogo com >= nivel acertos), prêmio
+esperado ou prêmio esperado ajustado ao risco.
+A busca (guloso + trocas conscientes de sobreposição) roda sobre uma amostra
+fixa de sorteios; o lote final é avaliado de forma exata em todo o espaço.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.bitmask import jogos_para_masks, masks_para_jogos, popcount_array
+from core.combinadic import TOTAL_JOGOS
+from core.distribuicao_acertos import AvaliadorDistribuicao
+from core.feature_index import obter_indice
+
+logger = logging.getLogger(__name__)
+
+OBJETIVOS = ("cobertura", "premio_esperado", "misto")
+
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class OtimizadorPortfolio:
+    """
+    Otimização de lotes sobre uma amostra uniforme de sorteios.
+
+    Objetivos:
+        cobertura: P(ao menos um jogo com >= nivel acertos)
+        premio_esperado: E[prêmio total do lote]. Com sorteios equiprováveis e
+            tabela fixa todo jogo tem o mesmo valor esperado; útil como base do misto
+        misto: E[prêmio] - aversao * desvio padrão do prêmio (penaliza lotes correlacionados)
+    """
+
+    def __init__(
+        self,
+        avaliador: Optional[AvaliadorDistribuicao] = None,
+        amostra_sorteios: int = 32_768,
+        seed: Optional[int] = None
+    ):
+        self.avaliador = avaliador or AvaliadorDistribuicao(obter_indice())
+        self.rng = np.random.default_rng(seed)
+        ranks = np.sort(self.rng.choice(TOTAL_JOGOS, size=min(amostra_sorteios, TOTAL_JOGOS), replace=False))
+        self.sorteios = self.avaliador.masks_sorteios()[ranks]
+
+    def _acertos(self, masks: np.ndarray, bloco: int = 256) -> np.ndarray:
+        """Matriz uint8 (C, S) de acertos de cada candidato em cada sorteio da amostra."""
+        acertos = np.empty((len(masks), len(self.sorteios)), dtype=np.uint8)
+        for ini in range(0, len(masks), bloco):
+            acertos[ini:ini + bloco] = popcount_array(masks[ini:ini + bloco, None] & self.sorteios[None, :])
+        return acertos
+
+    def _valores(
+        self,
+        dados: np.ndarray,
+        base: np.ndarray,
+        objetivo: str,
+        aversao: float,
+        bloco: int = 64
+    ) -> np.ndarray:
+        """
+        Valor do objetivo na amostra para 'base' + cada candidato.
+        cobertura: dados/base são bitsets compactados (np.packbits) dos sorteios cobertos;
+        demais: dados são acertos (C, S) e base é o prêmio por sorteio do resto do lote.
+        """
+        if objetivo == "cobertura":
+            cobertos = _POPCOUNT_8[dados | base].sum(axis=1, dtype=np.int64)
+            return cobertos / len(self.sorteios)
+
+        valores = np.empty(len(dados), dtype=np.float64)
+        for ini in range(0, len(dados), bloco):
+            premio = base + self.avaliador.tabela_premios[dados[ini:ini + bloco]]
+            valores[ini:ini + bloco] = premio.mean(axis=1)
+            if objetivo == "misto":
+                valores[ini:ini + bloco] -= aversao * premio.std(axis=1)
+        return valores
+
+    def _base(self, dados: np.ndarray, escolhidos: Sequence[int], objetivo: str) -> np.ndarray:
+        if objetivo == "cobertura":
+            base = np.zeros(dados.shape[1], dtype=np.uint8)
+            for i in escolhidos:
+                base |= dados[i]
+            return base
+        base = np.zeros(dados.shape[1], dtype=np.float64)
+        for i in escolhidos:
+            base += self.avaliador.tabela_premios[dados[i]]
+        return base
+
+    def _melhor_candidato(
+        self,
+        dados: np.ndarray,
+        base: np.ndarray,
+        livres: np.ndarray,
+        objetivo: str,
+        aversao: float
+    ) -> Tuple[int, float]:
+        idx = np.flatnonzero(livres)
+        valores = self._valores(dados[idx], base, objetivo, aversao)
+        melhor = int(valores.argmax())
+        return int(idx[melhor]), float(valores[melhor])
+
+    def otimizar(
+        self,
+        candidatos: Sequence[Union[Sequence[int], int]],
+        m: int,
+        objetivo: str = "cobertura",
+        nivel: int = 11,
+        aversao: float = 0.5,
+        tempo_max: float = 10.0,
+        avaliar_exato: bool = True,
+        comparar_base: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Seleciona m jogos dos candidatos.
+
+        Args:
+            candidatos: Jogos (listas ou bitmasks), em ordem de preferência individual
+            m: Tamanho do lote
+            objetivo: 'cobertura', 'premio_esperado' ou 'misto'
+            nivel: Número de acertos do objetivo 'cobertura'
+            aversao: Peso do desvio padrão no objetivo 'misto'
+            tempo_max: Tempo máximo (s) da fase de trocas
+            avaliar_exato: Avalia o lote final em todos os 3.268.760 sorteios
+            comparar_base: Avalia também os m primeiros candidatos (ranking individual)
+
+        Returns:
+            {'jogos', 'indices', 'objetivo', 'valor_amostra', 'trocas', 'tempo_s'
+             [, 'avaliacao'][, 'avaliacao_base']}
+        """
+        if objetivo not in OBJETIVOS:
+            raise ValueError(f"Objetivo desconhecido: {objetivo} (use {', '.join(OBJETIVOS)})")
+        inicio = time.perf_counter()
+        masks = jogos_para_masks(candidatos) if not isinstance(candidatos, np.ndarray) else candidatos.astype(np.uint32)
+        masks, primeira = np.unique(masks, return_index=True)
+        ordem = np.argsort(primeira)
+        masks, primeira = masks[ordem], primeira[ordem]
+        m = min(m, len(masks))
+        if m <= 0:
+            raise ValueError("Nenhum candidato para montar o lote")
+
+        acertos = self._acertos(masks)
+        dados = np.packbits(acertos >= nivel, axis=1) if objetivo == "cobertura" else acertos
+
+        # Guloso: a cada passo o candidato que mais melhora o lote
+        escolhidos: List[int] = []
+        livres = np.ones(len(masks), dtype=bool)
+        valor = 0.0
+        for _ in range(m):
+            i, valor = self._melhor_candidato(dados, self._base(dados, escolhidos, objetivo), livres, objetivo, aversao)
+            escolhidos.append(i)
+            livres[i] = False
+
+        # Trocas: substitui um jogo do lote pelo melhor candidato de fora enquanto houver ganho
+        trocas = 0
+        limite = time.perf_counter() + tempo_max
+        melhorou = len(escolhidos) < len(masks)
+        while melhorou and time.perf_counter() < limite:
+            melhorou = False
+            for posicao in range(len(escolhidos)):
+                if time.perf_counter() >= limite:
+                    break
+                resto = escolhidos[:posicao] + escolhidos[posicao + 1:]
+                i, novo = self._melhor_candidato(dados, self._base(dados, resto, objetivo), livres, objetivo, aversao)
+                if novo > valor + 1e-12:
+                    livres[escolhidos[posicao]] = True
+                    livres[i] = False
+                    escolhidos[posicao] = i
+                    valor = novo
+                    trocas += 1
+                    melhorou = True
+
+        lote = masks[escolhidos]
+        resultado: Dict[str, Any] = {
+            "jogos": masks_para_jogos(lote),
+            "indices": primeira[escolhidos].tolist(),
+            "objetivo": objetivo,
+            "valor_amostra": round(valor, 6),
+            "trocas": trocas,
+        }
+        if avaliar_exato:
+            resultado["avaliacao"] = self.avaliador.avaliar(lote)
+        if comparar_base:
+            resultado["avaliacao_base"] = self.avaliador.avaliar(masks[:m])
+        resultado["tempo_s"] = round(time.perf_counter() - inicio, 2)
+        logger.info(f"💼 Lote de {m} jogos ({objetivo}) escolhido entre {len(masks)} candidatos: "
+                    f"{valor:.6f} na amostra, {trocas} trocas")
+        return resultado
+
+
+_otimizador_padrao: Optional[OtimizadorPortfolio] = None
+
+
+def obter_otimizador() -> Optional[OtimizadorPortfolio]:
+    """
+    Otimizador compartilhado sobre o FeatureIndex padrão.
+    Retorna None se o índice ainda não foi construído (python -m core.feature_index).
+    """
+    global _otimizador_padrao
+    if _otimizador_padrao is None:
+        indice = obter_indice()
+        if indice is None:
+            logger.warning("⚠️ Otimizador de portfólio indisponível")
+            return None
+        _otimizador_padrao = OtimizadorPortfolio(AvaliadorDistribuicao(indice))
+    return _otimizador_padrao
+
+
+if __name__ == "__main__":
+    from core.amostrador import obter_amostrador
+
+    logging.basicConfig(level=logging.INFO)
+
+    # Candidatos muito parecidos entre si, como um top por score individual
+    amostrador = obter_amostrador()
+    candidatos = amostrador.amostrar(600, {'soma': (190, 205), 'pares': (7, 8), 'dezenas_fixas': [1, 2, 3, 4, 5]})
+
+    otimizador = OtimizadorPortfolio(seed=3)
+    r = otimizador.otimizar(candidatos, 30, objetivo="cobertura", nivel=13, comparar_base=True)
+    print(f"\nP(>=13) lote otimizado: {r['avaliacao']['prob_pelo_menos']['13']:.4f} "
+          f"x primeiros 30: {r['avaliacao_base']['prob_pelo_menos']['13']:.4f} ({r['tempo_s']}s)")
+
+    r = otimizador.otimizar(candidatos, 30, objetivo="misto", tempo_max=5.0)
+    print(f"Misto: E[prêmio] = {r['avaliacao']['premio_esperado']:.2f}, "
+          f"desvio = {r['avaliacao']['desvio_premio']:.2f} ({r['tempo_s']}s)")
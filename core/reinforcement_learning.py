@@ -8,7 +8,7 @@ Data: Novembro 2025
 import json
 import logging
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 import os
 from collections import defaultdict
@@ -82,6 +82,7 @@ class QLearningAgent:
         self.episode_count = 0
         self.performance_history = []
         self.ultima_acao = None
+        self._ouvintes_pesos: List[Callable[[Dict[str, float]], None]] = []
 
         if not self.load_q_table():
             logger.info("📝 Q-table nova inicializada")
@@ -257,9 +258,21 @@ class QLearningAgent:
         
         self.ultima_acao = action
         self.current_weights = new_weights
+        self._notificar_pesos(new_weights)
         
         return new_weights
 
+    def registrar_ouvinte_pesos(self, callback: Callable[[Dict[str, float]], None]) -> None:
+        """Registra uma função chamada com os novos pesos sempre que eles mudam."""
+        self._ouvintes_pesos.append(callback)
+
+    def _notificar_pesos(self, weights: Dict[str, float]) -> None:
+        for callback in self._ouvintes_pesos:
+            try:
+                callback(weights)
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao notificar mudança de pesos: {e}")
+
     def update_q_value(
         self,
         state: Dict[str, float],
@@ -358,4 +371,5 @@ class QLearningAgent:
         logger.warning(f"   consec: {anti_salto_weights['consec']:.2f}")
         logger.warning(f"   diversity: {anti_salto_weights['diversity']:.2f}")
 
+        self._notificar_pesos(anti_salto_weights)
         return anti_salto_weights
@@ -19,6 +19,7 @@ logger = logging.getLogger(__name__)
 
 sys.path.append(os.path.dirname(__file__))
 from config_supabase import SUPABASE_DB_URL
+from core.estatisticas import estatisticas_do_banco
 
 PRIMOS = {2, 3, 5, 7, 11, 13, 17, 19, 23}
 FIBONACCI = {1, 2, 3, 5, 8, 13, 21}
@@ -168,38 +169,9 @@ async def recalcular_frequencias_e_padroes(conn: asyncpg.Connection):
     """Recalcula frequências e padrões."""
     logger.info("\n🔄 Recalculando frequências...")
 
-    for dezena in range(1, 26):
-        count = await conn.fetchval(
-            """
-            SELECT COUNT(*)
-            FROM concursos c, jsonb_array_elements(c.dezenas) AS d
-            WHERE d::int = $1
-            """,
-            dezena,
-        )
-        ultima = await conn.fetchval(
-            """
-            SELECT MAX(c.numero)
-            FROM concursos c, jsonb_array_elements(c.dezenas) AS d
-            WHERE d::int = $1
-            """,
-            dezena,
-        )
-        await conn.execute(
-            """
-            UPDATE frequencias
-            SET ocorrencias = $1, ultima_aparicao = $2, updated_at = NOW()
-            WHERE dezena = $3
-            """,
-            count, ultima, dezena,
-        )
-
-    freq_data = await conn.fetch(
-        "SELECT dezena, ocorrencias FROM frequencias ORDER BY ocorrencias DESC, dezena"
-    )
-    dezenas_ordenadas = [row["dezena"] for row in freq_data]
-    dezenas_quentes = dezenas_ordenadas[:15]
-    dezenas_frias = dezenas_ordenadas[-5:]
+    estatisticas = await estatisticas_do_banco(conn)
+    await estatisticas.gravar_frequencias(conn)
+    dezenas_quentes, dezenas_frias = estatisticas.quentes_frias()
 
     await conn.execute(
         """
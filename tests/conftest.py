@@ -0,0 +1,36 @@
+"""
+Fixtures compartilhadas dos testes.
+Nada aqui lê ou grava em data/: concursos são sintéticos e o índice de
+features é construído num diretório temporário (uma vez por sessão).
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from core.feature_index import construir_indice
+
+logging.getLogger("core").setLevel(logging.WARNING)
+
+
+def sortear_jogos(rng: np.random.Generator, quantidade: int) -> np.ndarray:
+    """Matriz (quantidade, 15) de jogos uniformes, dezenas em ordem crescente."""
+    return np.sort(np.argsort(rng.random((quantidade, 25)), axis=1)[:, :15] + 1, axis=1)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(20251104)
+
+
+@pytest.fixture
+def concursos(rng):
+    """300 concursos sintéticos (numero, dezenas) em ordem crescente, começando no 1."""
+    return [(numero, jogo.tolist()) for numero, jogo in enumerate(sortear_jogos(rng, 300), start=1)]
+
+
+@pytest.fixture(scope="session")
+def feature_index(tmp_path_factory):
+    """FeatureIndex completo (3.268.760 jogos) construído num diretório temporário."""
+    return construir_indice(str(tmp_path_factory.mktemp("feature_index")))
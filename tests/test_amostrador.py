@@ -0,0 +1,99 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from core.amostrador import AmostradorRestrito
+from core.bitmask import jogo_para_mask
+from core.combinadic import rank_jogo
+
+RESTRICOES = {'soma': (185, 200), 'pares': (7, 8), 'max_consecutivo': 4}
+# 13 dezenas fixas: sobram C(12, 2) = 66 jogos, pequeno o bastante para medir uniformidade
+FIXAS = {'dezenas_fixas': list(range(1, 14))}
+
+
+@pytest.fixture
+def amostrador(feature_index):
+    return AmostradorRestrito(feature_index, seed=3)
+
+
+def _satisfaz(jogo):
+    consecutivo, maior = 1, 1
+    for a, b in zip(jogo, jogo[1:]):
+        consecutivo = consecutivo + 1 if b == a + 1 else 1
+        maior = max(maior, consecutivo)
+    pares = sum(1 for d in jogo if d % 2 == 0)
+    return 185 <= sum(jogo) <= 200 and 7 <= pares <= 8 and maior <= 4
+
+
+def test_validos(amostrador, feature_index):
+    validos = amostrador.validos(RESTRICOES)
+    assert (np.diff(validos) > 0).all()
+    assert amostrador.contar(RESTRICOES) == len(validos) == feature_index.contar(RESTRICOES)
+    assert amostrador.validos(dict(RESTRICOES)) is validos  # cache por conteúdo
+    assert all(_satisfaz(jogo) for jogo in feature_index.jogos(validos[::97]))
+    assert amostrador.contar(FIXAS) == 66
+
+
+def test_amostras_distintas_e_validas(amostrador):
+    validos = set(amostrador.validos(RESTRICOES).tolist())
+    ranks = amostrador.amostrar_ranks(500, RESTRICOES)
+    assert len(ranks) == len(set(ranks.tolist())) == 500
+    assert set(ranks.tolist()) <= validos
+    jogos = amostrador.amostrar(200, RESTRICOES)
+    assert all(_satisfaz(jogo) and rank_jogo(jogo) in validos for jogo in jogos)
+
+
+def test_quantidade_limitada_ao_disponivel(amostrador):
+    assert len(amostrador.amostrar_ranks(1000, FIXAS)) == 66
+    excluir = amostrador.validos(FIXAS)[:60]
+    assert sorted(amostrador.amostrar_ranks(1000, FIXAS, excluir=excluir).tolist()) == \
+        amostrador.validos(FIXAS)[60:].tolist()
+    tudo = amostrador.validos(FIXAS)
+    assert len(amostrador.amostrar_ranks(5, FIXAS, excluir=tudo)) == 0
+
+
+def test_excluir(amostrador):
+    validos = amostrador.validos(FIXAS)
+    excluir = validos[::3].tolist() + [0, 10**7]  # ranks fora do conjunto são ignorados
+    for _ in range(50):
+        ranks = amostrador.amostrar_ranks(10, FIXAS, excluir=excluir)
+        assert len(ranks) == 10
+        assert not set(ranks.tolist()) & set(excluir)
+
+
+@pytest.mark.parametrize("excluir", [None, "terco"])
+def test_uniforme(amostrador, excluir):
+    validos = amostrador.validos(FIXAS)
+    proibidos = validos[::3] if excluir else np.zeros(0, dtype=np.int64)
+    disponiveis = sorted(set(validos.tolist()) - set(proibidos.tolist()))
+    contagem = Counter()
+    rodadas = 3000
+    for _ in range(rodadas):
+        contagem.update(amostrador.amostrar_ranks(10, FIXAS, excluir=proibidos if excluir else None).tolist())
+    assert sorted(contagem) == disponiveis
+    esperado = rodadas * 10 / len(disponiveis)
+    assert all(abs(c - esperado) < 0.2 * esperado for c in contagem.values())
+
+
+def test_ponderado(amostrador):
+    # Dezena 25 com probabilidade 0: nenhum jogo sorteado a contém
+    probs = {d: 1.0 for d in range(1, 25)} | {25: 0.0}
+    masks = [jogo_para_mask(jogo) for jogo in amostrador.amostrar(300, RESTRICOES, prob_matrix=probs)]
+    assert len(set(masks)) == 300
+    assert not any(mask >> 24 & 1 for mask in masks)
+    # Peso maior para as dezenas baixas puxa a soma para baixo
+    baixas = [2.0 if d <= 12 else 1.0 for d in range(1, 26)]
+    uniformes = amostrador.amostrar(2000)
+    ponderados = amostrador.amostrar(2000, prob_matrix=baixas)
+    assert np.mean([sum(j) for j in ponderados]) < np.mean([sum(j) for j in uniformes]) - 5
+
+
+def test_sortear(amostrador):
+    conjunto = np.arange(1000, 2000)
+    amostra = amostrador.sortear(conjunto, 100)
+    assert len(set(amostra.tolist())) == 100 and set(amostra.tolist()) <= set(conjunto.tolist())
+    assert len(amostrador.sortear(conjunto[:5], 100)) == 5
+    a = AmostradorRestrito(amostrador.indice, seed=11).sortear(conjunto, 20)
+    b = AmostradorRestrito(amostrador.indice, seed=11).sortear(conjunto, 20)
+    assert a.tolist() == b.tolist()
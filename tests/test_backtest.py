@@ -0,0 +1,161 @@
+import json
+import os
+
+import pytest
+
+from core.backtest import (
+    Backtester, CacheBacktest, Estrategia, EstrategiaAleatoria, EstrategiaGA, EstrategiaGeradorJogos, chave_estrategia
+)
+from core.bitmask import jogos_para_masks
+
+PREMIOS = {11: 6.0, 12: 12.0, 13: 30.0, 14: 2000.0, 15: 1_800_000.0}
+
+
+class Espia(Estrategia):
+    """Lote fixo; registra o que viu do histórico a cada concurso."""
+
+    nome = "espia"
+
+    def __init__(self, jogos):
+        self.jogos = jogos
+        self._vistos = []
+
+    def gerar(self, anteriores, quantidade, semente):
+        self._vistos.append((len(anteriores), anteriores[-1][0]))
+        return self.jogos[:quantidade]
+
+
+class AleatoriaContada(EstrategiaAleatoria):
+    """EstrategiaAleatoria que conta os lotes gerados (atributo privado, fora da chave)."""
+
+    def __init__(self):
+        self._gerados = 0
+
+    def gerar(self, anteriores, quantidade, semente):
+        self._gerados += 1
+        return super().gerar(anteriores, quantidade, semente)
+
+
+def test_walk_forward_sem_olhar_o_futuro(concursos):
+    espia = Espia([list(range(1, 16))])
+    Backtester([espia], historico=concursos[:70], quantidade=1, workers=1, cache=None).executar()
+    # Concurso alvo na posição p (51..70) vê exatamente os p concursos anteriores
+    assert espia._vistos == [(p, p) for p in range(50, 70)]
+
+
+def test_resumo_igual_a_conferencia_direta(concursos):
+    jogos = [list(range(1, 16)), list(range(11, 26)), [1, 3, 5, 7, 9, 11, 13, 15, 17, 19, 21, 23, 25, 2, 4]]
+    historico = concursos[:120]
+    backtester = Backtester([Espia(jogos)], historico=historico, quantidade=3, premios=PREMIOS,
+                            valor_aposta=3.0, workers=1, cache=None)
+    resumo = backtester.executar()["espia"]
+
+    acertos = [len(set(j) & set(sorteio)) for _, sorteio in historico[50:] for j in jogos]
+    premio = sum(PREMIOS.get(a, 0.0) for a in acertos)
+    assert resumo["concursos"] == 70 and resumo["jogos"] == 210
+    assert resumo["distribuicao_acertos"] == {str(k): acertos.count(k) for k in range(11, 16)} | \
+        {"0-10": sum(1 for a in acertos if a <= 10)}
+    assert resumo["media_acertos"] == round(sum(acertos) / len(acertos), 4)
+    assert resumo["premio_total"] == round(premio, 2) and resumo["custo_total"] == 630.0
+    assert resumo["lucro"] == round(premio - 630.0, 2)
+    assert resumo["roi"] == round((premio - 630.0) / 630.0, 4)
+    melhores = [max(len(set(j) & set(s)) for j in jogos) for _, s in historico[50:]]
+    assert resumo["melhor_acerto"] == max(melhores)
+    assert resumo["concursos_premiados"] == sum(1 for m in melhores if m >= 11)
+
+
+def test_intervalo_e_min_historico(concursos):
+    backtester = Backtester([EstrategiaAleatoria()], historico=concursos[:100], quantidade=2,
+                            workers=1, cache=None, min_historico=80)
+    assert backtester.executar()["aleatoria"]["concursos"] == 20
+    assert backtester.executar(inicio=90, fim=95)["aleatoria"]["concursos"] == 6
+    assert {r["concurso"] for r in backtester.resultados} == set(range(90, 96))
+
+
+def test_pool_igual_ao_sequencial(concursos):
+    """Sementes por concurso: o resultado não depende de workers nem do tamanho do bloco."""
+    historico = concursos[:90]
+    sequencial = Backtester([EstrategiaAleatoria()], historico=historico, quantidade=4, workers=1, cache=None)
+    pool = Backtester([EstrategiaAleatoria()], historico=historico, quantidade=4, workers=2, bloco=7, cache=None)
+    resumos = [sequencial.executar()["aleatoria"], pool.executar()["aleatoria"]]
+    for resumo in resumos:
+        del resumo["tempo_medio_s"]
+    assert resumos[0] == resumos[1]
+    linhas = [sorted(({**r, "tempo_s": 0} for r in b.resultados), key=lambda r: r["concurso"])
+              for b in (sequencial, pool)]
+    assert linhas[0] == linhas[1]
+
+
+def test_nomes_repetidos():
+    with pytest.raises(ValueError):
+        Backtester([EstrategiaAleatoria(), EstrategiaAleatoria()], historico=[], cache=None)
+
+
+def test_chave_estavel():
+    assert chave_estrategia(EstrategiaGA(), 30, 0) == chave_estrategia(EstrategiaGA(), 30, 0)
+    assert chave_estrategia(EstrategiaAleatoria(), 30, 0) == chave_estrategia(AleatoriaContada(), 30, 0)
+
+
+def test_chave_muda_com_o_que_altera_os_jogos():
+    base = chave_estrategia(EstrategiaGA(), 30, 0)
+    assert chave_estrategia(EstrategiaGA(janela=50), 30, 0) != base
+    assert chave_estrategia(EstrategiaGA(pesos={"soma": 2.0}), 30, 0) != base
+    assert chave_estrategia(EstrategiaGA(), 31, 0) != base
+    assert chave_estrategia(EstrategiaGA(), 30, 1) != base
+    assert chave_estrategia(EstrategiaGeradorJogos(), 30, 0) != \
+        chave_estrategia(EstrategiaGeradorJogos(soma_min=190), 30, 0)
+
+
+def test_chave_ignora_atributos_privados():
+    estrategia = EstrategiaGA()
+    antes = chave_estrategia(estrategia, 30, 0)
+    estrategia._fitness_calc = object()
+    assert "_fitness_calc" not in estrategia.configuracao()
+    assert chave_estrategia(estrategia, 30, 0) == antes
+
+
+def test_cache_gravar_carregar(tmp_path):
+    cache = CacheBacktest(str(tmp_path))
+    estrategia = EstrategiaAleatoria()
+    chave = chave_estrategia(estrategia, 2, 0)
+    assert cache.carregar(estrategia, chave) == {}
+
+    registros = [{"concurso": n, "jogos": jogos_para_masks([list(range(n, n + 15))]).tolist(), "tempo_s": 0.1}
+                 for n in (1, 2)]
+    cache.gravar(estrategia, chave, registros)
+    assert cache.carregar(estrategia, chave) == {r["concurso"]: r for r in registros}
+    with open(tmp_path / f"aleatoria-{chave}.json", encoding="utf-8") as f:
+        assert json.load(f)["estrategia"] == "aleatoria"
+
+    # Linha truncada por interrupção: ignorada na leitura e fechada no próximo append
+    caminho = tmp_path / f"aleatoria-{chave}.jsonl"
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write('{"concurso": 3, "jog')
+    assert set(cache.carregar(estrategia, chave)) == {1, 2}
+    novo = {"concurso": 4, "jogos": [], "tempo_s": 0.0}
+    cache.gravar(estrategia, chave, [novo])
+    assert cache.carregar(estrategia, chave) == {1: registros[0], 2: registros[1], 4: novo}
+
+
+def test_backtester_reaproveita_o_cache(tmp_path, concursos):
+    historico = concursos[:80]
+    estrategia = AleatoriaContada()
+    primeiro = Backtester([estrategia], historico=historico, quantidade=5, workers=1, bloco=7,
+                          cache=str(tmp_path), min_historico=50)
+    resumo = primeiro.executar()
+    assert estrategia._gerados == 30
+    assert resumo["aleatoria"]["concursos"] == 30 and resumo["aleatoria"]["jogos"] == 150
+    assert resumo["aleatoria"]["custo_total"] == 150 * 3.0
+
+    # Mesma configuração: nada é gerado, a conferência é refeita e dá o mesmo resumo
+    outra = AleatoriaContada()
+    segundo = Backtester([outra], historico=historico, quantidade=5, workers=1, cache=str(tmp_path))
+    assert segundo.executar() == resumo
+    assert outra._gerados == 0
+
+    # Intervalo parcial e quantidade nova (outra chave, outro arquivo)
+    assert segundo.executar(inicio=60, fim=69)["aleatoria"]["concursos"] == 10
+    terceiro = Backtester([outra], historico=historico, quantidade=6, workers=1, cache=str(tmp_path))
+    terceiro.executar(fim=55)
+    assert outra._gerados == 5  # concursos 51..55
+    assert len([n for n in os.listdir(tmp_path) if n.endswith(".jsonl")]) == 2
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from core.bitmask import (
+    MASK_TODAS, features_array, jogo_para_mask, jogos_para_masks, mask_para_jogo, masks_para_jogos,
+    masks_para_matriz, matriz_para_masks, max_consecutivo_mask, normalizar_mask, popcount,
+    popcount_array, soma_mask, soma_ponderada_array, spread_array, spread_mask
+)
+from tests.conftest import sortear_jogos
+from utils.validators import GameValidator
+
+RESTRICOES = {
+    'soma': (175, 235), 'pares': (6, 9), 'primos': (4, 7), 'fibonacci': (3, 5),
+    'multiplos_3': (4, 6), 'moldura': (9, 12), 'centro': (3, 6), 'max_consecutivo': 6
+}
+
+
+def _max_consecutivo(jogo):
+    seq, maior = 1, 1
+    for a, b in zip(jogo, jogo[1:]):
+        seq = seq + 1 if b == a + 1 else 1
+        maior = max(maior, seq)
+    return maior
+
+
+@pytest.fixture(scope="module")
+def validador():
+    return GameValidator()
+
+
+def test_ida_e_volta(rng):
+    jogos = sortear_jogos(rng, 1000)
+    masks = jogos_para_masks(jogos)
+    assert masks.dtype == np.uint32
+    assert masks.tolist() == jogos_para_masks(jogos.tolist()).tolist() == [jogo_para_mask(j) for j in jogos.tolist()]
+    assert masks_para_jogos(masks) == jogos.tolist()
+    assert [mask_para_jogo(m) for m in masks[:50].tolist()] == jogos[:50].tolist()
+    assert (matriz_para_masks(masks_para_matriz(masks)) == masks).all()
+    assert normalizar_mask(np.uint32(masks[0])) == normalizar_mask(jogos[0].tolist()) == int(masks[0])
+    assert jogo_para_mask(range(1, 26)) == MASK_TODAS
+
+
+def test_escalares_conferem_com_listas(rng):
+    for jogo in sortear_jogos(rng, 500).tolist():
+        mask = jogo_para_mask(jogo)
+        assert popcount(mask) == 15
+        assert soma_mask(mask) == sum(jogo)
+        assert max_consecutivo_mask(mask) == _max_consecutivo(jogo)
+        assert spread_mask(mask) == jogo[-1] - jogo[0]
+    assert max_consecutivo_mask(0) == spread_mask(0) == 0
+
+
+def test_vetorizadas_conferem_com_escalares(rng):
+    jogos = sortear_jogos(rng, 2000)
+    masks = jogos_para_masks(jogos)
+    features = features_array(masks)
+    assert features['soma'].tolist() == jogos.sum(axis=1).tolist()
+    assert features['pares'].tolist() == (jogos % 2 == 0).sum(axis=1).tolist()
+    assert features['max_consecutivo'].tolist() == [_max_consecutivo(j) for j in jogos.tolist()]
+    assert features['consecutivos'].tolist() == (np.diff(jogos, axis=1) == 1).sum(axis=1).tolist()
+    assert spread_array(masks).tolist() == (jogos[:, -1] - jogos[:, 0]).tolist()
+    assert popcount_array(masks).tolist() == [15] * len(masks)
+    valores = rng.random(25)
+    assert np.allclose(soma_ponderada_array(masks, valores), valores[jogos - 1].sum(axis=1))
+
+
+def test_validador_aceita_mask(validador, rng):
+    for jogo in sortear_jogos(rng, 500).tolist():
+        assert validador.validar_completo(jogo_para_mask(jogo), RESTRICOES) == \
+            validador.validar_completo(jogo, RESTRICOES)
+
+
+def test_validar_lote_igual_ao_completo(validador, rng):
+    masks = jogos_para_masks(sortear_jogos(rng, 3000))
+    masks[:3] = [jogo_para_mask(range(1, 15)), 1 << 25 | jogo_para_mask(range(1, 15)), 0]
+    lote = validador.validar_lote(masks, RESTRICOES)
+    assert lote.tolist() == [validador.validar_completo(int(m), RESTRICOES)[0] for m in masks]
+    assert not lote[:3].any() and lote.any()
+    assert validador.validar_lote(masks[3:]).all()
+
+
+@pytest.mark.parametrize("jogo, erro", [
+    (jogo_para_mask(range(1, 15)), "15 dezenas"),
+    (jogo_para_mask(range(1, 16)) | 1 << 25, "entre 1 e 25"),
+    (list(range(1, 15)) + [1], "repetidas"),
+])
+def test_validador_rejeita(validador, jogo, erro):
+    valido, detalhes = validador.validar_completo(jogo)
+    assert not valido and erro in detalhes['erro']
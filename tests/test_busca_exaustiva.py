@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from core.bitmask import jogo_para_mask
+from core.busca_exaustiva import BuscaExaustiva
+from core.fitness_modules import FitnessCalculator
+
+PESOS = {'soma': 1.5, 'frequencia': 2.0}
+HISTORICO = {'frequencias': {d: 900 + 7 * d for d in range(1, 26)}}
+RESTRICOES = {'soma': (185, 200), 'pares': (7, 8), 'max_consecutivo': 4}
+
+
+@pytest.fixture(scope="module")
+def busca(feature_index):
+    return BuscaExaustiva(feature_index, FitnessCalculator())
+
+
+@pytest.fixture(scope="module")
+def scores(busca):
+    return busca.pontuar(PESOS, historico=HISTORICO)
+
+
+def test_pontuar_igual_ao_escalar(busca, scores, rng):
+    linhas = rng.integers(0, len(scores), size=500)
+    for linha, jogo in zip(linhas.tolist(), busca.indice.jogos(linhas)):
+        assert scores[linha] == busca.fitness_calc.calcular_fitness(jogo, PESOS, HISTORICO)[0]
+    # Mesmo contexto: o resultado anterior é reaproveitado
+    assert busca.pontuar(PESOS, historico=HISTORICO, temperatura=0.5) is scores
+
+
+def test_top_k_exato(busca, scores):
+    melhores = busca.top_k(20, PESOS, historico=HISTORICO)
+    ordem = np.lexsort((np.arange(len(scores)), -scores))[:20]
+    assert [jogo for jogo, _ in melhores] == busca.indice.jogos(ordem)
+    assert [fitness for _, fitness in melhores] == scores[ordem].tolist()
+    assert melhores[0][1] == scores.max()
+
+
+def test_top_k_com_restricoes(busca, feature_index):
+    melhores = busca.top_k(10, PESOS, constraints=RESTRICOES, historico=HISTORICO)
+    restritos = busca.pontuar(PESOS, RESTRICOES, historico=HISTORICO)
+    validos = feature_index.filtrar(RESTRICOES)
+    assert np.isneginf(restritos[~validos]).all()
+    assert melhores[0][1] == restritos[validos].max()
+    assert all(feature_index.filtrar(RESTRICOES)[feature_index.linha(jogo)] for jogo, _ in melhores)
+    impossivel = {'soma': (10, 20)}
+    assert busca.top_k(5, PESOS, constraints=impossivel, historico=HISTORICO) == []
+
+
+def test_top_k_diverso(busca, scores):
+    diversos = busca.top_k(8, PESOS, max_sobreposicao=10, historico=HISTORICO)
+    assert len(diversos) == 8 and diversos[0][1] == scores.max()
+    masks = [jogo_para_mask(jogo) for jogo, _ in diversos]
+    assert all(bin(a & b).count("1") <= 10 for i, a in enumerate(masks) for b in masks[i + 1:])
+    fitness = [f for _, f in diversos]
+    assert fitness == sorted(fitness, reverse=True)
+
+
+def test_comparar(busca, scores):
+    otimo = busca.top_k(1, PESOS, historico=HISTORICO)[0][0]
+    assert busca.comparar([otimo], PESOS, historico=HISTORICO)['gap'] == 0
+    qualquer = list(range(1, 16))
+    comparacao = busca.comparar([qualquer], PESOS, historico=HISTORICO)
+    fitness = busca.fitness_calc.calcular_fitness(qualquer, PESOS, HISTORICO)[0]
+    assert comparacao['jogos_melhores'] == int((scores > fitness).sum())
+    assert comparacao['gap'] == round(scores.max() - fitness, 4)
@@ -0,0 +1,70 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from core.combinadic import (
+    TOTAL_JOGOS, deduplicar_jogos, rank_jogo, rank_jogos, unrank_jogo, unrank_jogos
+)
+
+
+def test_extremos():
+    assert TOTAL_JOGOS == 3_268_760
+    assert rank_jogo(range(1, 16)) == 0
+    assert rank_jogo(range(11, 26)) == TOTAL_JOGOS - 1
+    assert unrank_jogo(0) == list(range(1, 16))
+    assert unrank_jogo(TOTAL_JOGOS - 1) == list(range(11, 26))
+
+
+def test_ordem_lexicografica_de_itertools():
+    primeiros = list(itertools.islice(itertools.combinations(range(1, 26), 15), 2000))
+    assert [rank_jogo(jogo) for jogo in primeiros] == list(range(2000))
+    assert rank_jogos(np.array(primeiros)).tolist() == list(range(2000))
+
+
+def test_rank_independe_da_ordem_das_dezenas():
+    jogo = [25, 1, 13, 7, 2, 20, 3, 18, 4, 9, 11, 5, 16, 22, 6]
+    assert rank_jogo(jogo) == rank_jogo(sorted(jogo))
+
+
+def test_ida_e_volta(rng):
+    ranks = rng.integers(0, TOTAL_JOGOS, size=5000)
+    jogos = unrank_jogos(ranks)
+    assert jogos.shape == (5000, 15)
+    assert (np.diff(jogos.astype(np.int16), axis=1) > 0).all()
+    assert rank_jogos(jogos).tolist() == ranks.tolist()
+    for rank, jogo in zip(ranks[:200].tolist(), jogos[:200].tolist()):
+        assert unrank_jogo(rank) == jogo
+        assert rank_jogo(jogo) == rank
+
+
+def test_vazios():
+    assert rank_jogos(np.zeros((0, 15), dtype=np.int64)).shape == (0,)
+    assert unrank_jogos([]).shape == (0, 15)
+
+
+@pytest.mark.parametrize("jogo", [
+    list(range(1, 15)),              # 14 dezenas
+    list(range(1, 15)) + [1],        # repetida
+    list(range(0, 15)),              # dezena 0
+    list(range(12, 27)),             # dezena 26
+])
+def test_jogo_invalido(jogo):
+    with pytest.raises(ValueError):
+        rank_jogo(jogo)
+
+
+def test_rank_invalido():
+    with pytest.raises(ValueError):
+        unrank_jogo(-1)
+    with pytest.raises(ValueError):
+        unrank_jogo(TOTAL_JOGOS)
+    with pytest.raises(ValueError):
+        unrank_jogos([0, TOTAL_JOGOS])
+    with pytest.raises(ValueError):
+        rank_jogos([list(range(15, 0, -1))])  # fora de ordem
+
+
+def test_deduplicar_preserva_ordem():
+    a, b = list(range(1, 16)), list(range(2, 17))
+    assert deduplicar_jogos([a, b, list(reversed(a)), b]) == [a, b]
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from core.bitmask import jogos_para_masks
+from core.conferencia import (
+    conferir, conferir_sorteios, contar_acertos, contar_acertos_sorteios, distribuicao,
+    matriz_presenca, tabela_premios
+)
+from tests.conftest import sortear_jogos
+
+PREMIOS = {11: 6.0, 12: 12.0, 13: 30.0, 14: 2000.0, 15: 1_800_000.0}
+
+
+@pytest.fixture
+def lote(rng):
+    jogos = sortear_jogos(rng, 3000)
+    sorteio = sortear_jogos(rng, 1)[0].tolist()
+    # Garante todas as faixas: o próprio sorteio e vizinhos com 14..11 acertos
+    fora = [d for d in range(1, 26) if d not in sorteio]
+    jogos[:5] = [sorted(sorteio[k:] + fora[:k]) for k in range(5)]
+    return jogos, sorteio
+
+
+def _acertos_por_conjunto(jogos, sorteio):
+    return [len(set(jogo) & set(sorteio)) for jogo in jogos]
+
+
+def test_formatos_de_entrada(lote):
+    jogos, sorteio = lote
+    esperado = _acertos_por_conjunto(jogos.tolist(), sorteio)
+    masks = jogos_para_masks(jogos)
+    assert contar_acertos(jogos, sorteio).tolist() == esperado
+    assert contar_acertos(jogos.tolist(), sorteio).tolist() == esperado
+    assert contar_acertos(masks, sorteio).tolist() == esperado
+    assert contar_acertos(matriz_presenca(jogos), sorteio).tolist() == esperado
+    assert contar_acertos(jogos, int(jogos_para_masks([sorteio])[0])).tolist() == esperado
+    assert (matriz_presenca(masks) == matriz_presenca(jogos)).all()
+
+
+def test_apostas_com_mais_dezenas():
+    jogos = [list(range(1, 16)), list(range(1, 19)), list(range(5, 25))]
+    sorteio = list(range(1, 16))
+    assert contar_acertos(jogos, sorteio).tolist() == [15, 15, 11]
+
+
+def test_conferir(lote):
+    jogos, sorteio = lote
+    resultado = conferir(jogos, sorteio, PREMIOS, 3.0)
+    acertos = _acertos_por_conjunto(jogos.tolist(), sorteio)
+    assert resultado["acertos"].tolist() == acertos
+    dist = resultado["distribuicao_acertos"]
+    assert [dist[str(k)] for k in (15, 14, 13, 12, 11)] == [acertos.count(k) for k in (15, 14, 13, 12, 11)]
+    assert dist["0-10"] == sum(1 for a in acertos if a <= 10)
+    assert sum(dist.values()) == len(jogos)
+    assert resultado["premio_total"] == sum(PREMIOS.get(a, 0.0) for a in acertos)
+    assert resultado["total_gasto"] == 3.0 * len(jogos)
+    assert resultado["lucro"] == resultado["premio_total"] - resultado["total_gasto"]
+
+
+def test_conferir_lote_vazio():
+    resultado = conferir(np.zeros((0, 15), dtype=np.int64), list(range(1, 16)), PREMIOS, 3.0)
+    assert resultado["premio_total"] == resultado["total_gasto"] == resultado["lucro"] == 0
+    assert distribuicao(resultado["acertos"]) == {"15": 0, "14": 0, "13": 0, "12": 0, "11": 0, "0-10": 0}
+
+
+def test_tabela_premios():
+    tabela = tabela_premios({"11": 6, 12: "12", "quadra": 1.0, 20: 5.0, 13: None})
+    assert tabela.shape == (16,)
+    assert tabela[11] == 6.0 and tabela[12] == 12.0 and tabela[13] == 0.0
+    assert tabela.sum() == 18.0
+    assert tabela_premios(None).sum() == 0.0
+
+
+def test_conferir_sorteios(lote, rng):
+    jogos, _ = lote
+    sorteios = sortear_jogos(rng, 7).tolist()
+    resultado = conferir_sorteios(jogos, sorteios, PREMIOS)
+    assert resultado["acertos"].shape == (len(jogos), 7)
+    assert (resultado["acertos"] == contar_acertos_sorteios(jogos, sorteios, bloco=512)).all()
+    for d, sorteio in enumerate(sorteios):
+        individual = conferir(jogos, sorteio, PREMIOS)
+        assert resultado["acertos"][:, d].tolist() == individual["acertos"].tolist()
+        assert resultado["contagem"][d].tolist() == np.bincount(individual["acertos"], minlength=16).tolist()
+        assert resultado["premio_total"][d] == individual["premio_total"]
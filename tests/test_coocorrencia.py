@@ -0,0 +1,100 @@
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from core.bitmask import jogo_para_mask
+from core.coocorrencia import (
+    MatrizCoocorrencia, contar_pares_fortes, matriz_pares, obter_coocorrencia
+)
+from core.historico import HistoricoSorteios
+from tests.conftest import sortear_jogos
+
+
+def _pares_diretos(concursos):
+    contagem = Counter()
+    for _, dezenas in concursos:
+        contagem.update(combinations(sorted(dezenas), 2))
+    return contagem
+
+
+def _registros(concursos):
+    return [{"numero": n, "dezenas": d} for n, d in concursos]
+
+
+def _iguais(a, b):
+    return (
+        a.concursos == b.concursos and a.ultimo_numero == b.ultimo_numero
+        and (a.pares == b.pares).all()
+        and all((a.pares_janela[j] == b.pares_janela[j]).all() for j in a.janelas)
+        and (a.ternos is None) == (b.ternos is None)
+        and (a.ternos is None or (a.ternos == b.ternos).all())
+    )
+
+
+def test_pares_conferem_com_contagem_direta(concursos):
+    matriz = MatrizCoocorrencia.dos_concursos(_registros(concursos), janelas=(10, 50))
+    assert matriz.contador_pares() == _pares_diretos(concursos)
+    assert matriz.contador_pares(50) == _pares_diretos(concursos[-50:])
+    assert matriz.contador_pares(10) == _pares_diretos(concursos[-10:])
+    assert (np.diag(matriz.pares) == np.bincount(np.concatenate([d for _, d in concursos]), minlength=26)[1:]).all()
+    with pytest.raises(ValueError):
+        matriz.matriz(30)
+
+
+def test_incremental_igual_a_remontar(concursos):
+    incremental = MatrizCoocorrencia.dos_concursos(_registros(concursos[:20]), janelas=(10, 50), ternos=True)
+    for i, (numero, dezenas) in enumerate(concursos[20:], start=21):
+        assert incremental.atualizar(numero, jogo_para_mask(dezenas) if i % 2 else dezenas)
+        if i in (30, 60, 170):
+            remontada = MatrizCoocorrencia.dos_concursos(_registros(concursos[:i]), janelas=(10, 50), ternos=True)
+            assert _iguais(incremental, remontada)
+    assert not incremental.atualizar(*concursos[-1])
+    assert _iguais(incremental, MatrizCoocorrencia.dos_concursos(_registros(concursos), (10, 50), True))
+
+
+def test_ternos(concursos):
+    matriz = MatrizCoocorrencia.dos_concursos(_registros(concursos[:60]), ternos=True)
+    contagem = Counter()
+    for _, dezenas in concursos[:60]:
+        contagem.update(combinations(sorted(dezenas), 3))
+    fortes = matriz.ternos_fortes(5)
+    assert [(a, b, c) for a, b, c, _ in fortes] == \
+        [t for t, _ in sorted(contagem.items(), key=lambda item: (-item[1], item[0]))[:5]]
+    assert all(vezes == contagem[(a, b, c)] for a, b, c, vezes in fortes)
+    with pytest.raises(ValueError):
+        MatrizCoocorrencia().ternos_fortes()
+
+
+def test_duques_fortes_desempate(concursos):
+    matriz = MatrizCoocorrencia.dos_concursos(_registros(concursos))
+    esperado = sorted(_pares_diretos(concursos).items(), key=lambda item: (-item[1], item[0]))[:10]
+    assert matriz.duques_fortes(10) == [(d1, d2, vezes) for (d1, d2), vezes in esperado]
+
+
+def test_contar_pares_fortes(concursos, rng):
+    duques = MatrizCoocorrencia.dos_concursos(_registros(concursos)).duques_fortes(10)
+    jogos = sortear_jogos(rng, 500)
+    esperado = [sum(1 for d1, d2, _ in duques if d1 in jogo and d2 in jogo) for jogo in jogos.tolist()]
+    assert contar_pares_fortes(jogos, matriz_pares(duques)).tolist() == esperado
+    assert contar_pares_fortes(np.zeros((0, 15), dtype=np.int64), matriz_pares(duques)).shape == (0,)
+
+
+def test_compartilhada_acompanha_o_historico(concursos):
+    historico = HistoricoSorteios(concursos[:250])
+    matriz = obter_coocorrencia(historico, janelas=(50,))
+    assert obter_coocorrencia(historico, janelas=(50,)) is matriz
+    for numero, dezenas in concursos[250:]:
+        historico.adicionar(numero, dezenas)
+    atualizada = obter_coocorrencia(historico, janelas=(50,))
+    assert atualizada is matriz
+    assert _iguais(atualizada, MatrizCoocorrencia.das_masks(historico.numeros, historico.masks, (50,)))
+
+    # Concurso inserido no meio: não é prefixo, a matriz é remontada
+    outro = HistoricoSorteios([c for c in concursos if c[0] != 5])
+    antes = obter_coocorrencia(outro)
+    outro.adicionar(*concursos[4])
+    depois = obter_coocorrencia(outro)
+    assert depois is not antes
+    assert _iguais(depois, MatrizCoocorrencia.dos_concursos(_registros(concursos), janelas=(50,)))
@@ -0,0 +1,116 @@
+from math import comb
+
+import numpy as np
+import pytest
+
+from core.bitmask import jogos_para_masks, popcount_array
+from core.combinadic import TOTAL_JOGOS
+from core.distribuicao_acertos import PREMIOS_PADRAO, AvaliadorDistribuicao, EstadoCobertura
+from tests.conftest import sortear_jogos
+
+
+@pytest.fixture(scope="module")
+def avaliador(feature_index):
+    return AvaliadorDistribuicao(feature_index)
+
+
+@pytest.fixture(scope="module")
+def lote():
+    return sortear_jogos(np.random.default_rng(11), 6).tolist()
+
+
+def _acertos(feature_index, jogos):
+    """Matriz (sorteios, jogos) de acertos pela contagem direta de bits."""
+    return np.stack([popcount_array(feature_index['mask'] & np.uint32(m)) for m in jogos_para_masks(jogos)], axis=1)
+
+
+def test_jogo_unico_hipergeometrico(avaliador):
+    r = avaliador.avaliar([list(range(1, 16))])
+    contagem = {k: comb(15, k) * comb(10, 15 - k) for k in range(5, 16)}
+    assert r["distribuicao_melhor_acerto"] == {str(k): c for k, c in contagem.items()}
+    for k in (11, 12, 13, 14, 15):
+        assert r["prob_pelo_menos"][str(k)] == pytest.approx(sum(contagem[a] for a in range(k, 16)) / TOTAL_JOGOS, abs=1e-15)
+    esperado = sum(contagem[k] * PREMIOS_PADRAO[k] for k in PREMIOS_PADRAO) / TOTAL_JOGOS
+    assert r["premio_esperado"] == round(esperado, 4)
+    assert r["custo"] == 3.0 and r["total_sorteios"] == TOTAL_JOGOS
+
+
+def test_lote_igual_a_contagem_direta(avaliador, feature_index, lote):
+    acertos = _acertos(feature_index, lote)
+    r = avaliador.avaliar(lote)
+    melhor = np.bincount(acertos.max(axis=1), minlength=16)
+    assert r["distribuicao_melhor_acerto"] == {str(k): int(c) for k, c in enumerate(melhor) if c}
+    premio = avaliador.tabela_premios[acertos].sum(axis=1)
+    assert r["premio_esperado"] == round(float(premio.mean()), 4)
+    valores, contagens = np.unique(premio, return_counts=True)
+    assert r["distribuicao_premio"] == {float(v): c / TOTAL_JOGOS for v, c in zip(valores, contagens)}
+    assert sum(r["distribuicao_premio"].values()) == pytest.approx(1.0)
+    assert r["prob_premio"] == pytest.approx(float((premio > 0).mean()))
+    assert r["prob_lucro"] == pytest.approx(float((premio > 6 * 3.0).mean()))
+
+
+def test_premios_com_chave_str(feature_index, lote):
+    # Tabelas vindas de JSON têm chaves str: o prêmio não pode virar 0
+    por_str = AvaliadorDistribuicao(feature_index, {str(k): v for k, v in PREMIOS_PADRAO.items()})
+    por_int = AvaliadorDistribuicao(feature_index, PREMIOS_PADRAO)
+    assert por_str.tabela_premios.tolist() == por_int.tabela_premios.tolist()
+    assert por_str.tabela_premios[11:].tolist() == [6.0, 12.0, 30.0, 2000.0, 1800000.0]
+    assert por_str.avaliar(lote[:2])["premio_esperado"] == por_int.avaliar(lote[:2])["premio_esperado"] > 0
+
+
+def test_acertos_e_sorteios_sem_indice(avaliador, feature_index):
+    jogo = list(range(5, 20))
+    assert np.array_equal(avaliador.acertos_jogo(jogo), _acertos(feature_index, [jogo])[:, 0])
+    sem_indice = AvaliadorDistribuicao(bloco=500_000)
+    assert np.array_equal(sem_indice.masks_sorteios(), feature_index['mask'])
+    with pytest.raises(ValueError):
+        avaliador.avaliar([])
+
+
+def test_estado_incremental_igual_a_avaliacao(avaliador, lote):
+    estado = EstadoCobertura(avaliador)
+    for jogo in lote:
+        estado.adicionar(jogo)
+    for jogo in lote[:3]:
+        estado.remover(jogo)
+    assert len(estado) == 3
+    incremental, completo = estado.resumo(), avaliador.avaliar(lote[3:])
+    for chave in ("distribuicao_melhor_acerto", "prob_pelo_menos", "premio_esperado", "distribuicao_premio"):
+        assert incremental[chave] == completo[chave], chave
+    assert estado.prob_pelo_menos(11) == completo["prob_pelo_menos"]["11"]
+    assert estado.premio_esperado() == pytest.approx(completo["premio_esperado"], abs=1e-4)
+
+
+def test_estado_jogo_repetido_e_remocao_total(avaliador, lote):
+    estado = EstadoCobertura(avaliador)
+    acertos = estado.adicionar(lote[0])
+    estado.adicionar(lote[0], acertos)
+    estado.remover(lote[0])
+    assert estado.resumo()["distribuicao_melhor_acerto"] == avaliador.avaliar(lote[:1])["distribuicao_melhor_acerto"]
+    estado.remover(lote[0])
+    assert len(estado) == 0 and not estado.melhor.any() and not estado.contagens.any()
+    assert estado.histograma[0] == TOTAL_JOGOS and not estado.premio.any()
+    with pytest.raises(ValueError):
+        estado.remover(lote[0])
+
+
+def test_ganho_e_perda(avaliador, feature_index, lote):
+    estado = EstadoCobertura(avaliador)
+    for jogo in lote[:3]:
+        estado.adicionar(jogo)
+    acertos = _acertos(feature_index, lote[:4])
+    melhor = acertos[:, :3].max(axis=1)
+    assert estado.ganho(lote[3]) == int(((acertos[:, 3] >= 11) & (melhor < 11)).sum())
+    assert estado.ganho(lote[3], nivel=13) == int(((acertos[:, 3] >= 13) & (melhor < 13)).sum())
+    # Perda de um jogo do lote: sorteios em que só ele fazia 11+
+    outros = acertos[:, [1, 2]].max(axis=1)
+    assert estado.perda(lote[0]) == int(((acertos[:, 0] >= 11) & (outros < 11)).sum())
+
+
+def test_estado_capacidade(avaliador, lote):
+    estado = EstadoCobertura(avaliador, capacidade=2)
+    estado.adicionar(lote[0])
+    estado.adicionar(lote[1])
+    with pytest.raises(ValueError):
+        estado.adicionar(lote[2])
+    assert EstadoCobertura(avaliador, capacidade=300).contagens.dtype == np.uint16
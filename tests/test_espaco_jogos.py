@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.api import espaco as api_espaco
+from app.services.espaco_jogos import EspacoJogos
+from core.bitmask import jogo_para_mask
+from core.feature_index import TOTAL_COMBINACOES
+
+ULTIMO = [1, 2, 3, 5, 6, 8, 10, 11, 13, 14, 17, 19, 20, 23, 25]
+RESTRICOES = {
+    'soma': (180, 220), 'pares': (6, 9), 'primos': (4, 7), 'moldura': (9, 11), 'max_consecutivo': 6,
+    'repetidas': (8, 10), 'ultimo_concurso': ULTIMO, 'dezenas_fixas': [13], 'dezenas_excluidas': [4],
+}
+
+
+@pytest.fixture(scope="module")
+def espaco(feature_index):
+    return EspacoJogos(feature_index)
+
+
+def test_contar(espaco, feature_index):
+    resultado = espaco.contar(dict(RESTRICOES))
+    assert resultado['total'] == feature_index.contar(RESTRICOES)
+    assert resultado['total_espaco'] == TOTAL_COMBINACOES
+    assert resultado['fracao'] == resultado['total'] / TOTAL_COMBINACOES
+    assert 'por_restricao' not in resultado
+    assert espaco.contar({})['total'] == TOTAL_COMBINACOES
+    # 13 fixas: sobram C(12, 2) jogos
+    assert espaco.contar({'dezenas_fixas': list(range(1, 14))})['total'] == 66
+
+
+def test_detalhar(espaco, feature_index):
+    resultado = espaco.contar(dict(RESTRICOES), detalhar=True)
+    assert resultado['total'] == feature_index.contar(RESTRICOES)
+    assert set(resultado['por_restricao']) == set(RESTRICOES) - {'ultimo_concurso'}
+    for nome, total in resultado['por_restricao'].items():
+        isolada = {nome: RESTRICOES[nome], 'ultimo_concurso': ULTIMO} if nome == 'repetidas' else {nome: RESTRICOES[nome]}
+        assert total == feature_index.contar(isolada)
+    assert espaco.contar({}, detalhar=True)['total'] == TOTAL_COMBINACOES
+
+
+@pytest.mark.parametrize("constraints", [
+    {'soma': (200, 180)},
+    {'repetidas': (8, 10)},
+    {'repetidas': (8, 10), 'ultimo_concurso': ULTIMO[:14]},
+    {'repetidas': (8, 10), 'ultimo_concurso': ULTIMO[:14] + [1]},
+    {'ultimo_concurso': ULTIMO[:14] + [26]},
+    {'ultimo_concurso': jogo_para_mask(ULTIMO[:14]) | 1 << 25},
+    {'dezenas_fixas': [0]},
+    {'dezenas_fixas': [3], 'dezenas_excluidas': [3]},
+    {'dezenas_excluidas': list(range(1, 12))},
+])
+def test_restricoes_invalidas(espaco, constraints):
+    with pytest.raises(ValueError):
+        espaco.contar(constraints)
+
+
+def test_ultimo_concurso_como_bitmask(espaco):
+    por_lista = espaco.contar({'repetidas': (9, 9), 'ultimo_concurso': ULTIMO})['total']
+    assert espaco.contar({'repetidas': (9, 9), 'ultimo_concurso': np.uint32(jogo_para_mask(ULTIMO))})['total'] == por_lista
+
+
+def test_endpoint(espaco, monkeypatch):
+    monkeypatch.setattr(api_espaco, "_espaco", espaco)
+    request = api_espaco.ContarEspacoRequest(
+        soma_min=180, soma_max=220, pares_min=6, pares_max=9, repetidas_min=8, repetidas_max=10,
+        ultimo_concurso=ULTIMO, dezenas_fixas=[13, 13], detalhar=True,
+    )
+    resposta = asyncio.run(api_espaco.contar_espaco(request))
+    assert resposta.restricoes['dezenas_fixas'] == [13]
+    assert resposta.total == espaco.contar(resposta.restricoes)['total']
+    assert set(resposta.por_restricao) == {'soma', 'pares', 'repetidas', 'dezenas_fixas'}
+
+    # Último concurso com dezena repetida: 400, não uma contagem silenciosa
+    request = api_espaco.ContarEspacoRequest(repetidas_min=8, ultimo_concurso=ULTIMO[:14] + [1])
+    with pytest.raises(HTTPException) as erro:
+        asyncio.run(api_espaco.contar_espaco(request))
+    assert erro.value.status_code == 400
+
+
+def test_calibracao_no_motor(feature_index):
+    from core.lotofacil_ai_v3 import LotofacilAIv3
+
+    motor = SimpleNamespace(feature_index=feature_index, config={})
+    apertadas = {'soma': (195, 195), 'pares': (7, 8), 'max_consecutivo': 3}
+    assert LotofacilAIv3._calibrar_restricoes(motor, apertadas, 1000) == apertadas
+    calibradas = LotofacilAIv3._calibrar_restricoes(motor, apertadas, 50000)
+    assert feature_index.contar(calibradas) >= 50000 > feature_index.contar(apertadas)
+    # Só afrouxa: cada faixa contém a original
+    assert calibradas['soma'][0] <= 195 <= calibradas['soma'][1]
+    assert calibradas['pares'][0] <= 7 and calibradas['pares'][1] >= 8 and calibradas['max_consecutivo'] >= 3
+    assert LotofacilAIv3._calibrar_restricoes(SimpleNamespace(feature_index=None, config={}), apertadas, 10**7) is apertadas
@@ -0,0 +1,117 @@
+import asyncio
+import copy
+import json
+
+import numpy as np
+
+from core.bitmask import jogo_para_mask
+from core.estatisticas import SQL_ATUALIZAR_FREQUENCIAS, EstatisticasDezenas, estatisticas_do_banco
+
+
+class ConexaoGravada:
+    """Conexão mínima (fetch/execute) que guarda os comandos recebidos."""
+
+    def __init__(self, linhas=()):
+        self.linhas = list(linhas)
+        self.comandos = []
+
+    async def fetch(self, sql, *args):
+        self.comandos.append((sql, args))
+        return self.linhas
+
+    async def execute(self, sql, *args):
+        self.comandos.append((sql, args))
+
+
+def _contagem_direta(concursos):
+    """Ocorrências, última aparição, atraso e atraso máximo recontados do zero."""
+    presenca = np.zeros((len(concursos), 25), dtype=bool)
+    for i, (_, dezenas) in enumerate(concursos):
+        presenca[i, np.asarray(dezenas) - 1] = True
+    numeros = np.array([n for n, _ in concursos])
+    ultima, atraso, atraso_max = np.zeros(25, int), np.zeros(25, int), np.zeros(25, int)
+    for d in range(25):
+        saidas = np.flatnonzero(presenca[:, d])
+        ultima[d] = numeros[saidas[-1]] if len(saidas) else 0
+        corrente = 0
+        for saiu in presenca[:, d]:
+            corrente = 0 if saiu else corrente + 1
+            atraso_max[d] = max(atraso_max[d], corrente)
+        atraso[d] = corrente
+    return presenca.sum(axis=0), ultima, atraso, atraso_max
+
+
+def _iguais(a, b):
+    return (
+        a.concursos == b.concursos and a.ultimo_numero == b.ultimo_numero
+        and (a.ocorrencias == b.ocorrencias).all() and (a.ultima_aparicao == b.ultima_aparicao).all()
+        and (a.atraso == b.atraso).all() and (a.atraso_max == b.atraso_max).all()
+        and a.ausentes_ciclo == b.ausentes_ciclo and a.ciclo_numero == b.ciclo_numero
+        and a.ciclo_qtd == b.ciclo_qtd and a.ultimo_fechamento == b.ultimo_fechamento
+    )
+
+
+def test_contagem_confere_com_recontagem(concursos):
+    estatisticas = EstatisticasDezenas.dos_concursos(concursos)
+    ocorrencias, ultima, atraso, atraso_max = _contagem_direta(concursos)
+    assert estatisticas.concursos == len(concursos)
+    assert (estatisticas.ocorrencias == ocorrencias).all()
+    assert (estatisticas.ultima_aparicao == ultima).all()
+    assert (estatisticas.atraso == atraso).all()
+    assert (estatisticas.atraso_max == atraso_max).all()
+
+
+def test_incremental_igual_a_remontar(concursos):
+    incremental = EstatisticasDezenas.dos_concursos(concursos[:100])
+    for i, (numero, dezenas) in enumerate(concursos[100:], start=101):
+        assert incremental.atualizar(numero, jogo_para_mask(dezenas) if i % 2 else dezenas)
+        if i % 50 == 0:
+            assert _iguais(incremental, EstatisticasDezenas.dos_concursos(concursos[:i]))
+    numeros = [n for n, _ in concursos]
+    masks = [jogo_para_mask(d) for _, d in concursos]
+    assert _iguais(incremental, EstatisticasDezenas.das_masks(numeros, masks))
+    assert _iguais(incremental, EstatisticasDezenas.dos_concursos(reversed(concursos)))
+
+
+def test_concurso_repetido_ou_anterior_e_ignorado(concursos):
+    estatisticas = EstatisticasDezenas.dos_concursos(concursos)
+    antes = copy.deepcopy(estatisticas)
+    assert not estatisticas.atualizar(*concursos[-1])
+    assert not estatisticas.atualizar(concursos[0][0], concursos[5][1])
+    assert _iguais(estatisticas, antes)
+
+
+def test_ciclo():
+    estatisticas = EstatisticasDezenas()
+    assert estatisticas.atualizar(1, list(range(1, 16)))
+    assert estatisticas.ausentes() == list(range(16, 26)) and not estatisticas.ciclo_fechou
+    assert estatisticas.atualizar(2, list(range(6, 21)))
+    assert estatisticas.ausentes() == [21, 22, 23, 24, 25]
+    assert estatisticas.atualizar(3, list(range(11, 26)))
+    assert estatisticas.ciclo_fechou and estatisticas.ausentes() == []
+    assert estatisticas.ultimo_fechamento == (3, 3) and estatisticas.ciclo_numero == 2
+    assert estatisticas.atualizar(4, list(range(1, 16)))
+    assert not estatisticas.ciclo_fechou and estatisticas.ciclo_qtd == 1
+
+
+def test_quentes_frias(concursos):
+    estatisticas = EstatisticasDezenas.dos_concursos(concursos)
+    # Mais ocorrências primeiro, empate pela menor dezena
+    ordem = sorted(range(1, 26), key=lambda d: (-estatisticas.ocorrencias[d - 1], d))
+    assert estatisticas.quentes_frias() == (ordem[:15], ordem[-5:])
+    assert estatisticas.quentes_frias(3, 2) == (ordem[:3], ordem[-2:])
+
+
+def test_banco(concursos):
+    # dezenas chegam como jsonb (lista) ou como texto JSON
+    linhas = [{"numero": n, "dezenas": json.dumps(d) if n % 2 else d} for n, d in concursos]
+    conexao = ConexaoGravada(linhas)
+    estatisticas = asyncio.run(estatisticas_do_banco(conexao))
+    assert _iguais(estatisticas, EstatisticasDezenas.dos_concursos(concursos))
+
+    asyncio.run(estatisticas.gravar_frequencias(conexao))
+    sql, (dezenas, ocorrencias, ultima) = conexao.comandos[-1]
+    assert sql == SQL_ATUALIZAR_FREQUENCIAS
+    assert dezenas == list(range(1, 26))
+    assert ocorrencias == estatisticas.ocorrencias.tolist()
+    assert ultima == [int(u) or None for u in estatisticas.ultima_aparicao]
@@ -0,0 +1,109 @@
+import itertools
+import json
+import os
+from math import comb
+
+import numpy as np
+import pytest
+
+from core.feature_index import (
+    COLUNAS, TOTAL_COMBINACOES, FeatureIndex, calcular_features, obter_indice
+)
+
+PRIMOS = {2, 3, 5, 7, 11, 13, 17, 19, 23}
+RESTRICOES = {
+    'soma': (175, 235), 'pares': (6, 9), 'fibonacci': (3, 5), 'multiplos_3': (4, 6),
+    'primos': (4, 7), 'moldura': (10, 12), 'centro': (3, 5), 'max_consecutivo': 7
+}
+
+
+def _features_diretas(jogo):
+    """Features de um jogo recontadas dezena a dezena."""
+    seq, maior, consecutivos = 1, 1, 0
+    for a, b in zip(jogo, jogo[1:]):
+        seq = seq + 1 if b == a + 1 else 1
+        maior = max(maior, seq)
+        consecutivos += b == a + 1
+    return {
+        'mask': sum(1 << (d - 1) for d in jogo),
+        'soma': sum(jogo),
+        'pares': sum(d % 2 == 0 for d in jogo),
+        'primos': sum(d in PRIMOS for d in jogo),
+        'fibonacci': sum(d in {1, 2, 3, 5, 8, 13, 21} for d in jogo),
+        'multiplos_3': sum(d % 3 == 0 for d in jogo),
+        'moldura': sum(d in {1, 2, 3, 4, 5, 6, 10, 11, 15, 16, 20, 21, 22, 23, 24, 25} for d in jogo),
+        'centro': sum(d in {7, 8, 9, 12, 13, 14, 17, 18, 19} for d in jogo),
+        'max_consecutivo': maior,
+        'consecutivos': consecutivos,
+        'spread': jogo[-1] - jogo[0],
+        'linhas': [sum((d - 1) // 5 == r for d in jogo) for r in range(5)],
+        'colunas': [sum((d - 1) % 5 == c for d in jogo) for c in range(5)],
+    }
+
+
+def test_arquivos_e_meta(feature_index):
+    assert len(feature_index) == TOTAL_COMBINACOES
+    assert isinstance(feature_index['mask'], np.memmap)
+    with open(os.path.join(feature_index.diretorio, "meta.json"), encoding="utf-8") as f:
+        assert json.load(f)['colunas'] == list(COLUNAS)
+    assert feature_index['linhas'].shape == (TOTAL_COMBINACOES, 5)
+    assert (feature_index['linhas'].sum(axis=1) == 15).all()
+
+
+def test_features_conferem_com_recontagem(feature_index, rng):
+    linhas = np.sort(rng.integers(0, TOTAL_COMBINACOES, size=300))
+    for linha, jogo in zip(linhas.tolist(), feature_index.jogos(linhas)):
+        esperado = _features_diretas(jogo)
+        for nome, valor in esperado.items():
+            assert np.asarray(feature_index[nome][linha]).tolist() == valor, nome
+    jogos = np.array(feature_index.jogos(linhas))
+    assert (calcular_features(jogos)['mask'] == feature_index['mask'][linhas]).all()
+
+
+def test_linha_segue_itertools(feature_index):
+    primeiros = list(itertools.islice(itertools.combinations(range(1, 26), 15), 500))
+    assert feature_index.jogos(np.arange(500)) == [list(jogo) for jogo in primeiros]
+    assert feature_index.jogos([TOTAL_COMBINACOES - 1]) == [list(range(11, 26))]
+    assert [feature_index.linha(jogo) for jogo in primeiros[::50]] == list(range(0, 500, 50))
+
+
+def test_filtrar_confere_com_amostra(feature_index, rng):
+    selecao = feature_index.filtrar(RESTRICOES)
+    linhas = rng.integers(0, TOTAL_COMBINACOES, size=3000)
+    for linha, jogo in zip(linhas.tolist(), feature_index.jogos(linhas)):
+        f = _features_diretas(jogo)
+        faixas = {nome: faixa for nome, faixa in RESTRICOES.items() if nome != 'max_consecutivo'}
+        esperado = all(minimo <= f[nome] <= maximo for nome, (minimo, maximo) in faixas.items()) \
+            and f['max_consecutivo'] <= RESTRICOES['max_consecutivo']
+        assert bool(selecao[linha]) == esperado
+    assert feature_index.contar(RESTRICOES) == len(feature_index.indices_validos(RESTRICOES))
+    assert feature_index.contar() == feature_index.contar({'desconhecida': 1}) == TOTAL_COMBINACOES
+
+
+def test_repetidas_fixas_e_excluidas(feature_index):
+    ultimo = list(range(1, 16))
+    # k repetidas do último concurso: C(15, k) * C(10, 15 - k)
+    for k in (8, 10, 15):
+        quantidade = feature_index.contar({'repetidas': (k, k), 'ultimo_concurso': ultimo})
+        assert quantidade == comb(15, k) * comb(10, 15 - k)
+    # Sem 'ultimo_concurso' a faixa de repetidas é ignorada
+    assert feature_index.contar({'repetidas': (15, 15)}) == TOTAL_COMBINACOES
+
+    fixas, excluidas = [1, 2, 3], [24, 25]
+    validos = feature_index.jogos(feature_index.indices_validos({'dezenas_fixas': fixas, 'dezenas_excluidas': excluidas}))
+    assert len(validos) == comb(20, 12)
+    assert all(set(fixas) <= set(j) and not set(excluidas) & set(j) for j in validos[::997])
+
+
+def test_restricoes_como_arrays(feature_index):
+    por_lista = feature_index.contar({'repetidas': (9, 9), 'ultimo_concurso': list(range(5, 20)),
+                                      'dezenas_fixas': [5]})
+    por_array = feature_index.contar({'repetidas': (9, 9), 'ultimo_concurso': np.arange(5, 20),
+                                      'dezenas_fixas': np.array([5])})
+    assert por_lista == por_array > 0
+
+
+def test_indice_ausente(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FeatureIndex(str(tmp_path))
+    assert obter_indice(str(tmp_path / "nada")) is None
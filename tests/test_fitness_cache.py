@@ -0,0 +1,104 @@
+import pickle
+
+import numpy as np
+
+from core.fitness_cache import FitnessCache, ImpressaoDigital, _congelar
+from core.fitness_modules import FitnessCalculator
+from core.genetic_algorithm import GeneticOptimizer
+from core.genetic_numpy import VectorizedGeneticOptimizer
+
+PESOS = {'soma': 1.5, 'frequencia': 2.0}
+HISTORICO = {'frequencias': {d: 900 + 7 * d for d in range(1, 26)}}
+
+
+def _evoluir(config, semente=7, geracoes=15):
+    calc = FitnessCalculator()
+    ga = VectorizedGeneticOptimizer({"ga_population_size": 120, **config}, calc, seed=semente)
+    jogos = ga.evoluir(ga.gerar_populacao_inicial(), calc.calcular_fitness, geracoes, PESOS, historico=HISTORICO)
+    return ga, jogos
+
+
+def test_cache_nao_muda_o_resultado():
+    com_cache, jogos = _evoluir({})
+    sem_cache, jogos_sem_cache = _evoluir({"ga_fitness_cache_size": 0})
+    assert sem_cache.fitness_cache is None
+    assert jogos == jogos_sem_cache
+    # Elites e filhos repetidos não são reavaliados
+    assert com_cache.fitness_cache.hits > 0
+    assert len(com_cache.fitness_cache) <= com_cache.fitness_cache.misses
+
+
+def test_cache_no_motor_classico():
+    chamadas = []
+
+    def fitness(jogo, **kwargs):
+        chamadas.append(jogo)
+        return float(sum(jogo))
+
+    ga = GeneticOptimizer({"ga_population_size": 40})
+    populacao = ga.gerar_populacao_inicial(40, HISTORICO['frequencias'])
+    scores = ga.ga.calcular_fitness_populacao(populacao + populacao[:10], fitness, pesos=PESOS)
+    assert scores == [float(sum(jogo)) for jogo in populacao + populacao[:10]]
+    assert len(chamadas) == len({tuple(jogo) for jogo in populacao})
+
+
+def test_cache_invalidado_ao_trocar_de_funcao():
+    cache = FitnessCache(capacidade=2)
+    chave = FitnessCache.fingerprint()
+    cache.vincular(len)
+    cache.put(1, chave, 1.0)
+    cache.vincular(len)
+    assert len(cache) == 1
+    cache.vincular(sum)
+    assert len(cache) == 0 and cache.invalidacoes == 1
+
+
+def test_cache_lru_e_lote():
+    cache = FitnessCache(capacidade=2)
+    chave = FitnessCache.fingerprint(pesos=PESOS)
+    chamadas = []
+
+    def calcular(masks):
+        chamadas.append(masks.tolist())
+        return masks * 0.5
+
+    masks = np.array([4, 6, 4], dtype=np.uint32)
+    assert cache.obter_lote(masks, chave, calcular).tolist() == [2.0, 3.0, 2.0]
+    assert cache.obter_lote(masks[:2], chave, calcular).tolist() == [2.0, 3.0]
+    assert chamadas == [[4, 6, 4]]
+    cache.put(8, chave, 4.0)
+    assert cache.get(4, chave) is None and cache.evictions == 1
+
+
+def test_contextos_com_o_mesmo_hash_nao_se_misturam():
+    # hash(-1) == hash(-2) no CPython: os contextos congelados colidem no hash
+    a, b = FitnessCache.fingerprint(limite=-1), FitnessCache.fingerprint(limite=-2)
+    assert hash(a) == hash(b) and a != b
+    cache = FitnessCache()
+    cache.put(7, a, 1.0)
+    assert cache.get(7, b) is None
+    cache.put(7, b, 2.0)
+    assert cache.get(7, a) == 1.0 and cache.get(7, b) == 2.0
+
+
+def test_fingerprint_pelo_conteudo():
+    assert FitnessCache.fingerprint(pesos={'soma': 1.0}) == FitnessCache.fingerprint(pesos={'soma': 1.0})
+    assert FitnessCache.fingerprint(pesos={'soma': 1.0}) != FitnessCache.fingerprint(pesos={'soma': 2.0})
+    # Frequências com chave int e com chave str (vindas de JSON) dão fitness diferentes
+    por_str = {'frequencias': {str(d): f for d, f in HISTORICO['frequencias'].items()}}
+    assert FitnessCache.fingerprint(historico=HISTORICO) != FitnessCache.fingerprint(historico=por_str)
+    assert FitnessCache.fingerprint(prob=np.arange(3)) != FitnessCache.fingerprint(prob=np.arange(3.0))
+    impressao = FitnessCache.fingerprint(historico=HISTORICO, pesos=PESOS)
+    copia = pickle.loads(pickle.dumps(impressao))
+    assert isinstance(copia, ImpressaoDigital) and copia == impressao and hash(copia) == hash(impressao)
+
+
+def test_fingerprint_de_contexto_nao_hasheavel():
+    class Historico:
+        pass
+
+    contexto = {'pesos': {'soma': 1.0}, 'concurso_anterior': [1, 2, 3], 'historico': Historico(),
+                'prob': np.arange(3), 'dezenas': {3, 1, 2}}
+    assert FitnessCache.fingerprint(**contexto) == FitnessCache.fingerprint(**dict(contexto))
+    assert _congelar({3, 1, 2}) == (1, 2, 3)
+    hash(_congelar(Historico()))
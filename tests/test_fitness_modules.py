@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from core.bitmask import jogo_para_mask, jogos_para_masks
+from core.fitness_modules import FitnessCalculator
+from tests.conftest import sortear_jogos
+
+PESOS = {
+    'par_impar': 1.3, 'primos': 0.8, 'fibonacci': 1.1, 'linhas': 0.9, 'colunas': 1.2,
+    'consecutivos': 0.7, 'frequencia': 2.0, 'diversidade': 1.0, 'soma': 1.5, 'repeticao': 1.4,
+}
+
+
+@pytest.fixture(scope="module")
+def calc():
+    return FitnessCalculator()
+
+
+@pytest.fixture
+def contexto(rng):
+    return {
+        'historico': {'frequencias': {d: int(rng.integers(800, 1100)) for d in range(1, 26)}},
+        'concurso_anterior': sortear_jogos(rng, 1)[0].tolist(),
+    }
+
+
+@pytest.mark.parametrize("com_contexto", [True, False])
+def test_mask_igual_a_lista(calc, rng, contexto, com_contexto):
+    kwargs = contexto if com_contexto else {}
+    for jogo in sortear_jogos(rng, 300).tolist():
+        por_lista, scores_lista = calc.calcular_fitness(jogo, PESOS, **kwargs)
+        por_mask, scores_mask = calc.calcular_fitness(jogo_para_mask(jogo), PESOS, **kwargs)
+        assert por_mask == por_lista
+        assert scores_mask == scores_lista
+        assert len(scores_lista) == 10
+
+
+def test_jogo_invalido(calc):
+    assert calc.calcular_fitness(list(range(1, 15)), PESOS) == (0.0, {})
+    assert calc.calcular_fitness(jogo_para_mask(range(1, 15)), PESOS) == (0.0, {})
+
+
+@pytest.mark.parametrize("com_contexto", [True, False])
+def test_lote_igual_ao_escalar(calc, rng, contexto, com_contexto):
+    kwargs = contexto if com_contexto else {}
+    jogos = sortear_jogos(rng, 2000)
+    lote = calc.calcular_fitness_lote(jogos_para_masks(jogos), PESOS, **kwargs)
+    escalar = [calc.calcular_fitness(jogo, PESOS, **kwargs)[0] for jogo in jogos.tolist()]
+    assert lote.dtype == np.float64
+    assert lote.tolist() == escalar
+
+
+def test_lote_zera_invalidos(calc):
+    masks = np.array([jogo_para_mask(range(1, 16)), jogo_para_mask(range(1, 15)), 0], dtype=np.uint32)
+    lote = calc.calcular_fitness_lote(masks, PESOS)
+    assert lote[0] > 0
+    assert lote[1:].tolist() == [0.0, 0.0]
+
+
+def test_delta_igual_ao_recalculo(calc, rng, contexto):
+    for jogo in sortear_jogos(rng, 40).tolist():
+        features = calc.extrair_features(jogo, contexto['historico'], contexto['concurso_anterior'])
+        fora = [d for d in range(1, 26) if d not in jogo]
+        for removida in jogo:
+            for adicionada in fora:
+                fitness, scores, novas = calc.calcular_fitness_delta(
+                    features, removida, adicionada, PESOS, contexto['historico']
+                )
+                vizinho = sorted(set(jogo) - {removida} | {adicionada})
+                assert novas == calc.extrair_features(vizinho, contexto['historico'], contexto['concurso_anterior'])
+                assert (fitness, scores) == calc.calcular_fitness(vizinho, PESOS, **contexto)
+
+
+def test_delta_troca_invalida(calc):
+    features = calc.extrair_features(list(range(1, 16)))
+    with pytest.raises(ValueError):
+        calc.atualizar_features(features, 16, 17)  # 16 não está no jogo
+    with pytest.raises(ValueError):
+        calc.atualizar_features(features, 1, 2)    # 2 já está no jogo
+
+
+def test_busca_local_nao_piora(calc, rng, contexto):
+    for jogo in sortear_jogos(rng, 5).tolist():
+        inicial, _ = calc.calcular_fitness(jogo, PESOS, **contexto)
+        melhor, fitness = calc.busca_local(jogo, PESOS, **contexto)
+        assert len(set(melhor)) == 15
+        assert fitness >= inicial
+        assert fitness == calc.calcular_fitness(melhor, PESOS, **contexto)[0]
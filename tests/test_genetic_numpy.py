@@ -0,0 +1,106 @@
+import functools
+
+import numpy as np
+import pytest
+
+from core.bitmask import jogos_para_masks, mask_para_jogo, masks_para_matriz, matriz_para_masks
+from core.fitness_modules import FitnessCalculator
+from core.genetic_numpy import VectorizedGeneticOptimizer
+from tests.conftest import sortear_jogos
+
+PESOS = {'soma': 1.5, 'frequencia': 2.0}
+HISTORICO = {'frequencias': {d: 900 + 7 * d for d in range(1, 26)}}
+
+
+@pytest.fixture(scope="module")
+def calc():
+    return FitnessCalculator()
+
+
+def _motor(calc, semente=7, **config):
+    return VectorizedGeneticOptimizer({"ga_population_size": 120, **config}, calc, seed=semente)
+
+
+def test_populacao_inicial(calc):
+    ga = _motor(calc)
+    matriz = ga.gerar_populacao_inicial()
+    assert matriz.shape == (120, 25) and (matriz.sum(axis=1) == 15).all()
+    # Probabilidade zero: a dezena nunca aparece
+    sem_25 = ga.gerar_populacao_inicial(200, {d: 1.0 for d in range(1, 25)} | {25: 0.0})
+    assert not sem_25[:, 24].any()
+
+
+def test_operadores_mantem_15_dezenas(calc, rng):
+    ga = _motor(calc, ga_mutation_rate=1.0)
+    pais_a, pais_b = (masks_para_matriz(jogos_para_masks(sortear_jogos(rng, 300))) for _ in range(2))
+    filhos = ga.crossover(pais_a, pais_b)
+    assert (filhos.sum(axis=1) == 15).all()
+    assert ((pais_a & pais_b) <= filhos).all()  # dezenas comuns são herdadas
+    mutados = ga.mutacao(filhos.copy())
+    assert (mutados.sum(axis=1) == 15).all()
+    assert ((mutados != filhos).sum(axis=1) == 2).all()
+    reparada = ga.reparar(np.ones((5, 25), dtype=bool))
+    assert (reparada.sum(axis=1) == 15).all()
+
+
+def test_evoluir_deterministico(calc):
+    jogos = []
+    for _ in range(2):
+        ga = _motor(calc)
+        jogos.append(ga.evoluir(ga.gerar_populacao_inicial(), calc.calcular_fitness, 15, PESOS, historico=HISTORICO))
+    assert jogos[0] == jogos[1]
+    assert all(len(set(jogo)) == 15 and 1 <= min(jogo) and max(jogo) <= 25 for jogo in jogos[0])
+    assert len({tuple(jogo) for jogo in jogos[0]}) == len(jogos[0])
+    fitness = [calc.calcular_fitness(jogo, PESOS, HISTORICO)[0] for jogo in jogos[0]]
+    assert fitness == sorted(fitness, reverse=True)
+
+
+def test_elite_nao_piora(calc):
+    ga = _motor(calc)
+    inicial = ga.gerar_populacao_inicial()
+    antes = calc.calcular_fitness_lote(matriz_para_masks(inicial), PESOS, HISTORICO)
+    _, fitness = ga.evolve(inicial, calc.calcular_fitness, 10, pesos=PESOS, historico=HISTORICO)
+    assert fitness.max() >= antes.max()
+
+
+def test_populacao_vazia(calc):
+    ga = _motor(calc)
+    assert ga.evoluir([], calc.calcular_fitness, 5, PESOS) == []
+    matriz, fitness = ga.evolve(np.zeros((0, 25), dtype=bool), None, 5)
+    assert matriz.shape == (0, 25) and fitness.shape == (0,)
+
+
+def test_resolver_fitness_usa_o_lote(calc):
+    ga = _motor(calc)
+    assert ga._resolver_fitness(None) == ga.fitness_calc.calcular_fitness_lote
+    assert ga._resolver_fitness(calc.calcular_fitness) == calc.calcular_fitness_lote
+
+    # Método renomeado, envolvido por decorator ou objeto com a versão em lote
+    class Calculadora(FitnessCalculator):
+        avaliar = FitnessCalculator.calcular_fitness
+
+    outro = Calculadora()
+    assert ga._resolver_fitness(outro.avaliar) == outro.calcular_fitness_lote
+
+    @functools.wraps(calc.calcular_fitness)
+    def registrado(*args, **kwargs):
+        return calc.calcular_fitness(*args, **kwargs)
+
+    assert ga._resolver_fitness(registrado) == calc.calcular_fitness_lote
+    assert ga._resolver_fitness(calc) == calc.calcular_fitness_lote
+
+    def escalar(mask, **kwargs):
+        return calc.calcular_fitness(mask, **kwargs)
+
+    escalar.calcular_fitness_lote = calc.calcular_fitness_lote
+    assert ga._resolver_fitness(escalar) == calc.calcular_fitness_lote
+
+
+def test_fitness_escalar_jogo_a_jogo(calc, rng):
+    ga = _motor(calc)
+    masks = jogos_para_masks(sortear_jogos(rng, 500))
+    escalar = ga._resolver_fitness(lambda mask, **kw: calc.calcular_fitness(mask_para_jogo(mask), **kw))
+    assert escalar(masks, pesos=PESOS, historico=HISTORICO).tolist() == \
+        calc.calcular_fitness_lote(masks, PESOS, HISTORICO).tolist()
+    somente_valor = ga._resolver_fitness(lambda mask, **kw: float(mask % 7))
+    assert somente_valor(masks).tolist() == (masks % 7).astype(float).tolist()
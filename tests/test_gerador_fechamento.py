@@ -0,0 +1,60 @@
+from itertools import combinations
+from math import comb
+
+import pytest
+
+from app.services.gerador_fechamento import GeradorFechamento, _masks_subconjuntos
+
+
+def _garante(jogos, pool, d, k):
+    """Força bruta: todo subconjunto de d dezenas do pool tem um jogo com ao menos k acertos."""
+    conjuntos = [set(j) for j in jogos]
+    return all(any(len(c & set(alvo)) >= k for c in conjuntos) for alvo in combinations(pool, d))
+
+
+def test_masks_subconjuntos():
+    masks = _masks_subconjuntos(6, 3).tolist()
+    esperado = [sum(1 << i for i in c) for c in combinations(range(6), 3)]
+    assert masks == esperado and len(masks) == comb(6, 3)
+
+
+@pytest.mark.parametrize("dezenas, d, k", [
+    (range(1, 15), 15, 14),      # pool menor que um jogo
+    (range(0, 16), 15, 14),      # dezena fora de 1..25
+    (range(1, 17), 15, 16),      # k > d
+    (range(1, 17), 16, 14),      # d > 15
+    (range(1, 26), 5, 0),        # k < 1
+])
+def test_parametros_invalidos(dezenas, d, k):
+    with pytest.raises(ValueError):
+        GeradorFechamento(list(dezenas), d, k)
+
+
+def test_fechamento_garante_e_confere_com_forca_bruta():
+    pool = [1, 3, 4, 6, 7, 9, 10, 12, 14, 15, 17, 19, 21, 23, 25, 2, 8]
+    gerador = GeradorFechamento(pool, 15, 14, seed=1)
+    r = gerador.gerar(tempo_max=0.5)
+    assert r["verificado"] and r["dezenas"] == sorted(pool)
+    assert r["quantidade"] == len(r["jogos"]) <= r["quantidade_gulosa"]
+    assert all(len(set(j)) == 15 and set(j) <= set(pool) for j in r["jogos"])
+    assert _garante(r["jogos"], sorted(pool), 15, 14)
+    assert r["garantia"] == {"acertos_no_pool": 15, "acertos_garantidos": 14}
+
+
+def test_verificar():
+    pool = list(range(1, 17))
+    gerador = GeradorFechamento(pool, 15, 15, seed=2)
+    todos = [list(c) for c in combinations(pool, 15)]
+    assert gerador.verificar(todos)
+    # 15 acertos garantidos exige os 16 jogos: sem um deles a garantia cai
+    assert not gerador.verificar(todos[1:])
+    assert not gerador.verificar([])
+    assert not gerador.verificar(todos + [list(range(2, 17))[:14] + [20]])  # dezena fora do pool
+    assert len(gerador.gerar(tempo_max=0.2)["jogos"]) == 16
+
+
+def test_deterministico_com_semente():
+    pool = list(range(3, 21))
+    a = GeradorFechamento(pool, 15, 13, seed=5).construir_guloso()
+    b = GeradorFechamento(pool, 15, 13, seed=5).construir_guloso()
+    assert a == b
@@ -0,0 +1,89 @@
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from app.services.gerador_jogos import GeradorJogos
+from core.amostrador import AmostradorRestrito
+from core.historico import BitmapCombinacoes
+from tests.conftest import sortear_jogos
+
+# Soma 175, fora da faixa de 180-235: só o critério de soma zera
+JOGO_NA_FAIXA = [1, 2, 3, 4, 5, 6, 7, 8, 14, 18, 20, 22, 23, 24, 25]
+
+
+def _gerador(concursos, feature_index=None, ja_sorteados=None):
+    """Como core.backtest.EstrategiaGeradorJogos: janela de 10, duques dos últimos 50."""
+    ultimos = concursos[-10:]
+    saidas = {d for _, dezenas in ultimos for d in dezenas}
+    duques = Counter(par for _, dezenas in concursos[-50:] for par in combinations(dezenas, 2))
+    return GeradorJogos(
+        dezenas_ultimo=concursos[-1][1],
+        ausentes_ultimos=sorted(set(range(1, 26)) - saidas),
+        ultimos_concursos=[{"numero": n, "dezenas": d} for n, d in reversed(ultimos)],
+        duques_fortes=[(d1, d2, f) for (d1, d2), f in duques.most_common(50)],
+        amostrador=AmostradorRestrito(feature_index, seed=5) if feature_index is not None else None,
+        ja_sorteados=ja_sorteados,
+    )
+
+
+@pytest.fixture(scope="module")
+def sorteados():
+    return list(enumerate(sortear_jogos(np.random.default_rng(20251104), 300).tolist(), start=1))
+
+
+@pytest.fixture(scope="module")
+def gerador(sorteados, feature_index):
+    bitmap = BitmapCombinacoes()
+    for _, dezenas in sorteados:
+        bitmap.marcar(dezenas)
+    return _gerador(sorteados, feature_index, bitmap)
+
+
+@pytest.fixture(scope="module")
+def scores(gerador):
+    return gerador.scores_lote(gerador.amostrador.indice['mask'])
+
+
+def test_scores_lote_igual_ao_escalar(gerador, scores, rng):
+    ranks = rng.integers(0, len(scores), size=3000)
+    for score, jogo in zip(scores[ranks].tolist(), gerador.amostrador.indice.jogos(ranks)):
+        assert round(score, 2) == gerador.avaliar_jogo(jogo)["score_total"]
+
+
+def test_ranks_aceitos_igual_ao_corte_escalar(gerador, scores, sorteados, rng):
+    aceitos = gerador.ranks_aceitos()
+    assert (np.diff(aceitos) > 0).all()
+    # Amostra uniforme, os jogos na faixa de arredondamento e o que cai fora das faixas rígidas
+    faixa = np.flatnonzero((scores >= 0.69) & (scores < 0.71))
+    ranks = np.concatenate([
+        rng.integers(0, len(scores), size=20000),
+        rng.choice(faixa, size=min(5000, len(faixa)), replace=False),
+        [gerador.amostrador.indice.linha(JOGO_NA_FAIXA)],
+        [gerador.amostrador.indice.linha(dezenas) for _, dezenas in sorteados[:20]],
+    ])
+    dentro = np.isin(ranks, aceitos)
+    for rank, jogo, aceito in zip(ranks.tolist(), gerador.amostrador.indice.jogos(ranks), dentro.tolist()):
+        esperado = gerador.avaliar_jogo(jogo)["score_total"] >= 0.70 and jogo not in gerador.ja_sorteados
+        assert aceito == esperado, (jogo, float(scores[rank]))
+    # Nenhum jogo acima do corte fica de fora por soma, pares ou repetidas
+    acima = np.flatnonzero(scores >= 0.70)
+    assert np.isin(acima[~gerador.ja_sorteados.contem_ranks(acima)], aceitos).all()
+
+
+def test_aceitos_lote_arredonda_como_o_escalar():
+    gerador = GeradorJogos(dezenas_ultimo=list(range(1, 16)), ausentes_ultimos=[])
+    # round() de Python e np.round() divergem nos empates: 0.695 -> 0.69 / 0.70, 0.525 -> 0.53 / 0.52
+    scores = np.array([0.6949, 0.695, 0.69500001, 0.6999, 0.70, 0.71, 0.2])
+    assert gerador.aceitos_lote(scores).tolist() == [round(s, 2) >= 0.70 for s in scores.tolist()]
+    assert np.round(0.695, 2) == 0.70 and round(0.525, 2) == 0.53 and np.round(0.525, 2) == 0.52
+
+
+def test_gerar_jogos_com_amostrador(gerador):
+    jogos = gerador.gerar_jogos(quantidade=25)
+    assert len(jogos) == 25
+    assert all(j["score_total"] >= 0.70 and j["jogo"] not in gerador.ja_sorteados for j in jogos)
+    assert len({tuple(j["jogo"]) for j in jogos}) == 25
+    scores = [j["score_total"] for j in jogos]
+    assert scores == sorted(scores, reverse=True)
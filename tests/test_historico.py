@@ -0,0 +1,197 @@
+import asyncio
+import os
+import random
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.api.jogos import DesempenhoJogoRequest, desempenho_historico
+from app.services.gerador_jogos import GeradorJogos
+from core.bitmask import jogo_para_mask
+from core.combinadic import TOTAL_JOGOS
+from core.estatisticas import EstatisticasDezenas
+from core.fitness_modules import FitnessCalculator
+from core.genetic_algorithm import GeneticOptimizer
+from core.historico import (
+    SEM_DATA, BitmapCombinacoes, HistoricoSorteios, _dia, carregar_historico_csv, carregar_store
+)
+
+
+def _gravar_csv(caminho, concursos, dia_inicial=date(2020, 1, 1)):
+    """CSV no formato do histórico oficial (mais recente primeiro, ';', datas dd/mm/aaaa)."""
+    with open(caminho, "w", encoding="utf-8-sig") as f:
+        f.write("Concurso;Data;" + ";".join(f"bola {i}" for i in range(1, 16)) + "\n")
+        for numero, dezenas in reversed(concursos):
+            dia = date.fromordinal(dia_inicial.toordinal() + numero)
+            f.write(f"{numero};{dia:%d/%m/%Y};" + ";".join(map(str, dezenas)) + "\n")
+
+
+def _colunas(historico):
+    return historico.numeros.tolist(), historico.datas.tolist(), historico.masks.tolist()
+
+
+def test_csv(tmp_path, concursos):
+    caminho = tmp_path / "historico.csv"
+    _gravar_csv(caminho, concursos)
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write("999;01/01/2030;1;1;2;3;4;5;6;7;8;9;10;11;12;13;14\n")  # dezena repetida: ignorada
+        f.write("linha inválida\n")
+    assert carregar_historico_csv(str(caminho)) == concursos
+    historico = HistoricoSorteios.do_csv(str(caminho))
+    assert historico.numeros.tolist() == [n for n, _ in concursos]
+    assert historico.masks.tolist() == [jogo_para_mask(d) for _, d in concursos]
+    assert historico.ultimo_numero == concursos[-1][0]
+
+
+def test_desempenho(concursos):
+    historico = HistoricoSorteios(concursos)
+    jogo = concursos[42][1]
+    acertos = [len(set(jogo) & set(d)) for _, d in concursos]
+    assert historico.acertos(jogo).tolist() == acertos
+    assert historico.acertos(jogo_para_mask(jogo)).tolist() == acertos
+
+    desempenho = historico.desempenho(jogo)
+    assert desempenho["concursos_analisados"] == len(concursos)
+    assert desempenho["melhor_acerto"] == 15
+    assert desempenho["acertos"] == {str(k): acertos.count(k) for k in range(11, 16)}
+    assert desempenho["vezes_premiado"] == sum(1 for a in acertos if a >= 11)
+    assert desempenho["concursos_13_mais"] == [
+        {"concurso": n, "acertos": a} for (n, _), a in zip(concursos, acertos) if a >= 13
+    ]
+    outro = concursos[7][1]
+    assert historico.desempenho_lote([jogo, outro]) == [desempenho, historico.desempenho(outro)]
+
+    # Concurso novo entra no desempenho
+    assert historico.adicionar(10_000, jogo)
+    assert historico.desempenho(jogo)["acertos"]["15"] == desempenho["acertos"]["15"] + 1
+    assert not historico.adicionar(10_000, jogo)
+
+
+@pytest.mark.parametrize("jogo", [list(range(1, 15)) + [1], list(range(12, 27))])
+def test_endpoint_rejeita_jogo_invalido(jogo):
+    # 15 dezenas, mas repetidas ou fora de 1..25: 400 antes de qualquer acesso ao banco
+    with pytest.raises(HTTPException) as erro:
+        asyncio.run(desempenho_historico(DesempenhoJogoRequest(jogo=jogo)))
+    assert erro.value.status_code == 400
+
+
+def test_bitmap():
+    bitmap = BitmapCombinacoes()
+    jogo = list(range(1, 16))
+    assert bitmap.marcar(jogo) and not bitmap.marcar(jogo_para_mask(jogo))
+    assert jogo in bitmap and jogo_para_mask(jogo) in bitmap and len(bitmap) == 1
+    assert bitmap.contem_jogos([jogo, list(range(2, 17))]).tolist() == [True, False]
+    ranks = np.array([0, 17, TOTAL_JOGOS - 1])
+    bitmap.marcar_ranks(ranks)
+    assert bitmap.contem_ranks(np.array([0, 1, 17, TOTAL_JOGOS - 1])).tolist() == [True, False, True, True]
+    assert len(bitmap) == 3  # o rank 0 é o próprio jogo 1..15
+    assert list(range(11, 26)) in bitmap
+
+
+def test_ja_sorteado(concursos):
+    historico = HistoricoSorteios(concursos)
+    jogo = concursos[42][1]
+    assert historico.ja_sorteado(jogo) and historico.ja_sorteado(jogo_para_mask(jogo))
+    assert len(historico.sorteados) == len({tuple(d) for _, d in concursos})
+    nunca = next(j for j in ([d for d in range(1, 26) if d != k][:15] for k in range(25))
+                 if not historico.ja_sorteado(j))
+    # adicionar() mantém o bitmap em dia
+    assert historico.adicionar(10_000, nunca) and historico.ja_sorteado(nunca)
+
+
+def test_gerador_e_ga_descartam_sorteados(concursos):
+    bitmap = BitmapCombinacoes()
+    ultimos = concursos[-10:]
+    gerador = GeradorJogos(
+        dezenas_ultimo=concursos[-1][1],
+        ausentes_ultimos=sorted(set(range(1, 26)) - {d for _, dezenas in ultimos[-3:] for d in dezenas}),
+        ultimos_concursos=[{"numero": n, "dezenas": d} for n, d in reversed(ultimos)],
+        ja_sorteados=bitmap,
+    )
+    random.seed(3)
+    primeiros = [j["jogo"] for j in gerador.gerar_jogos(quantidade=10)]
+    assert len(primeiros) == 10
+    for jogo in primeiros:
+        bitmap.marcar(jogo)
+    random.seed(3)
+    segundos = [j["jogo"] for j in gerador.gerar_jogos(quantidade=10)]
+    assert segundos and not any(jogo in bitmap for jogo in segundos)
+
+    frequencias = {d: 900 + 7 * d for d in range(1, 26)}
+    calc = FitnessCalculator()
+    ga = GeneticOptimizer({"ga_population_size": 40, "ga_generations": 5})
+    random.seed(5)
+    melhores = ga.run(5, frequencias, calc.calcular_fitness, {'soma': 1.5, 'frequencia': 2.0})
+    ga.ja_sorteados = BitmapCombinacoes()
+    for jogo in melhores:
+        ga.ja_sorteados.marcar(jogo)
+    random.seed(5)
+    novos = ga.run(5, frequencias, calc.calcular_fitness, {'soma': 1.5, 'frequencia': 2.0})
+    assert len(novos) == 5 and not any(jogo in ga.ja_sorteados for jogo in novos)
+
+
+@pytest.mark.parametrize("data", ["05/01/2020", "2020-01-05", "05-01-2020", "05-01-20", date(2020, 1, 5)])
+def test_datas(data):
+    assert _dia(data) == (date(2020, 1, 5) - date(1970, 1, 1)).days
+    assert _dia(None) == _dia("") == _dia("sem data") == SEM_DATA
+
+
+def test_salvar_abrir_e_append(tmp_path, concursos):
+    diretorio = str(tmp_path / "store")
+    historico = HistoricoSorteios(concursos[:-2], datas={n: f"{n % 28 + 1:02d}/03/2021" for n, _ in concursos})
+    historico.salvar(diretorio)
+
+    reaberto = HistoricoSorteios.abrir(diretorio)
+    assert isinstance(reaberto.masks, np.memmap)
+    assert _colunas(reaberto) == _colunas(historico)
+
+    # Append: só o fim de cada coluna é escrito; repetir o concurso não faz nada
+    penultimo, ultimo = concursos[-2:]
+    assert reaberto.adicionar(*penultimo, "20/12/2021")
+    assert not reaberto.adicionar(*penultimo)
+    assert reaberto.adicionar(*ultimo)
+    outra_vez = HistoricoSorteios.abrir(diretorio, mmap=False)
+    assert _colunas(outra_vez) == _colunas(reaberto)
+    assert outra_vez.numeros.tolist() == [n for n, _ in concursos]
+    assert outra_vez.datas[-2] == _dia("20/12/2021") and outra_vez.datas[-1] == SEM_DATA
+    assert os.path.getsize(os.path.join(diretorio, "masks.bin")) == 4 * len(concursos)
+    assert outra_vez.ultimos_jogos(3) == [d for _, d in concursos[-3:]]
+    presenca = outra_vez.presenca(2)
+    assert presenca.shape == (2, 25)
+    assert [(np.flatnonzero(linha) + 1).tolist() for linha in presenca] == [d for _, d in concursos[-2:]]
+
+
+def test_concurso_fora_de_ordem_regrava(tmp_path, concursos):
+    diretorio = str(tmp_path / "store")
+    sem_o_10 = [c for c in concursos if c[0] != 10]
+    historico = HistoricoSorteios(sem_o_10)
+    historico.salvar(diretorio)
+    historico.estatisticas  # montadas antes da inclusão
+    assert historico.adicionar(*concursos[9])
+    assert _colunas(HistoricoSorteios.abrir(diretorio)) == _colunas(HistoricoSorteios(concursos))
+    completas = EstatisticasDezenas.dos_concursos(concursos)
+    assert (historico.estatisticas.ocorrencias == completas.ocorrencias).all()
+    assert (historico.estatisticas.atraso == completas.atraso).all()
+
+
+def test_store_sincroniza_com_o_csv(tmp_path, concursos):
+    caminho, diretorio = str(tmp_path / "historico.csv"), str(tmp_path / "store")
+    _gravar_csv(caminho, concursos[:200])
+    criado = carregar_store(caminho, diretorio)
+    assert len(criado) == 200 and criado.diretorio == diretorio
+
+    # CSV atualizado depois da sincronização: entram só os concursos novos
+    _gravar_csv(caminho, concursos)
+    mtime = os.path.getmtime(caminho) + 10
+    os.utime(caminho, (mtime, mtime))
+    sincronizado = carregar_store(caminho, diretorio)
+    assert _colunas(sincronizado) == _colunas(HistoricoSorteios.do_csv(caminho))
+    assert sincronizado.meta["csv_mtime"] == mtime
+
+    # Sem CSV, o store basta; sem os dois, FileNotFoundError
+    os.remove(caminho)
+    assert len(carregar_store(caminho, diretorio)) == len(concursos)
+    with pytest.raises(FileNotFoundError):
+        carregar_store(caminho, str(tmp_path / "outro"))
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from core.bitmask import matriz_para_masks
+from core.fitness_modules import FitnessCalculator
+from core.genetic_algorithm import GeneticOptimizer
+from core.genetic_numpy import VectorizedGeneticOptimizer
+from core.ilhas import ModeloIlhas, _melhores, _receber
+
+PESOS = {'soma': 1.5, 'frequencia': 2.0}
+HISTORICO = {'frequencias': {d: 900 + 7 * d for d in range(1, 26)}}
+CONFIG = {"ga_islands": 2, "ga_workers": 2, "ga_migration_interval": 4}
+
+
+@pytest.fixture(scope="module")
+def calc():
+    return FitnessCalculator()
+
+
+def test_migrantes_substituem_os_piores():
+    populacao, scores = ["a", "b", "c", "d"], [3.0, 1.0, 4.0, 2.0]
+    assert _melhores(populacao, scores, 2) == [("c", 4.0), ("a", 3.0)]
+    assert _melhores(populacao, scores, 0) == [] and _melhores(populacao, None, 2) == []
+    _receber(populacao, scores, [("x", 9.0), ("y", 8.0)])
+    assert populacao == ["a", "x", "c", "y"] and scores == [3.0, 9.0, 4.0, 8.0]
+
+
+def test_populacao_completa_por_ilha(calc):
+    vetorizado = VectorizedGeneticOptimizer({"ga_islands": 3}, calc, seed=1)
+    inicial = vetorizado.gerar_populacao_inicial(90, {d: 1.0 for d in range(1, 25)} | {25: 0.0})
+    ilhas = vetorizado._populacoes_ilhas(inicial)
+    assert len(ilhas) == 3 and ilhas[0] is inicial
+    assert all(ilha.shape == (90, 25) and (ilha.sum(axis=1) == 15).all() for ilha in ilhas)
+    assert not any(ilha[:, 24].any() for ilha in ilhas)
+
+    classico = GeneticOptimizer({"ga_islands": 3})
+    inicial = classico.gerar_populacao_inicial(60, HISTORICO['frequencias'])
+    ilhas = classico._populacoes_ilhas(inicial)
+    assert [len(ilha) for ilha in ilhas] == [60, 60, 60] and ilhas[0] == inicial
+    assert all(len(set(jogo)) == 15 for ilha in ilhas for jogo in ilha)
+
+
+def test_vetorizado_com_ilhas(calc):
+    ga = VectorizedGeneticOptimizer({"ga_population_size": 80, **CONFIG}, calc, seed=3)
+    jogos = ga.evoluir(ga.gerar_populacao_inicial(), calc.calcular_fitness, 10, PESOS, historico=HISTORICO)
+    # Duas populações completas de 80: mais jogos distintos do que cabem em uma
+    assert 80 < len(jogos) <= 160
+    assert len({tuple(jogo) for jogo in jogos}) == len(jogos)
+    fitness = [calc.calcular_fitness(jogo, PESOS, HISTORICO)[0] for jogo in jogos]
+    assert fitness == sorted(fitness, reverse=True)
+
+
+def test_classico_com_ilhas(calc):
+    ga = GeneticOptimizer({"ga_population_size": 40, **CONFIG})
+    inicial = ga.gerar_populacao_inicial(40, HISTORICO['frequencias'])
+    jogos = ga.evoluir(inicial, calc.calcular_fitness, 6, PESOS, historico=HISTORICO)
+    assert len(jogos) == 80
+    assert all(len(set(jogo)) == 15 for jogo in jogos)
+    fitness = [calc.calcular_fitness(jogo, PESOS, HISTORICO)[0] for jogo in jogos]
+    assert fitness == sorted(fitness, reverse=True)
+
+
+def test_erro_na_ilha_chega_ao_chamador(calc):
+    def quebra(mask, **kwargs):
+        raise ZeroDivisionError("fitness")
+
+    ga = VectorizedGeneticOptimizer({"ga_population_size": 20, "ga_fitness_cache_size": 0}, calc, seed=1)
+    modelo = ModeloIlhas(intervalo_migracao=2, max_workers=2)
+    with pytest.raises(RuntimeError, match="ZeroDivisionError"):
+        modelo.evoluir(ga, [ga.gerar_populacao_inicial(), ga.gerar_populacao_inicial()], quebra, 4)
+
+
+def test_ilhas_recebem_todas_as_geracoes(calc):
+    ga = VectorizedGeneticOptimizer({"ga_population_size": 30}, calc, seed=5)
+    populacoes = [ga.gerar_populacao_inicial() for _ in range(3)]
+    resultados = ModeloIlhas(intervalo_migracao=3, n_migrantes=1, max_workers=2).evoluir(
+        ga, populacoes, calc.calcular_fitness, 7, pesos=PESOS, historico=HISTORICO
+    )
+    assert len(resultados) == 3
+    for matriz, fitness in resultados:
+        assert matriz.shape == (30, 25) and (matriz.sum(axis=1) == 15).all()
+        assert np.array_equal(fitness, calc.calcular_fitness_lote(matriz_para_masks(matriz), PESOS, HISTORICO))
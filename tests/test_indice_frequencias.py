@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from core.bitmask import jogo_para_mask
+from core.historico import HistoricoSorteios
+from core.indice_frequencias import IndiceFrequencias, obter_indice_frequencias
+
+
+def _contagem_direta(concursos):
+    return np.bincount(np.concatenate([d for _, d in concursos]), minlength=26)[1:].tolist()
+
+
+def test_incremental_igual_a_remontar(concursos):
+    numeros = [n for n, _ in concursos]
+    indice = IndiceFrequencias(numeros[:100], [d for _, d in concursos[:100]])
+    for numero, dezenas in concursos[100:]:
+        assert indice.adicionar(numero, dezenas)
+    assert not indice.adicionar(*concursos[50])
+    completo = IndiceFrequencias(numeros, [d for _, d in concursos])
+    assert indice.numeros.tolist() == completo.numeros.tolist() == numeros
+    for k in (0, 1, 10, 100, 300, 1000):
+        direta = _contagem_direta(concursos[-k:]) if k else [0] * 25
+        assert indice.ultimos(k).tolist() == completo.ultimos(k).tolist() == direta
+
+
+def test_janelas_por_numero(concursos):
+    # Entrada fora de ordem e como bitmasks: o índice ordena pelo número
+    embaralhados = concursos[::-1]
+    indice = IndiceFrequencias([n for n, _ in embaralhados], np.array([jogo_para_mask(d) for _, d in embaralhados]))
+    assert indice.ultimo_numero == concursos[-1][0]
+    assert indice.frequencia(101, 200).tolist() == _contagem_direta(concursos[100:200])
+    assert indice.frequencia(290, 10_000).tolist() == _contagem_direta(concursos[289:])
+    assert indice.frequencia(500, 600).sum() == 0 and indice.frequencia(200, 100).sum() == 0
+    assert indice.janela([c[0] for c in concursos[-10:]]).tolist() == indice.ultimos(10).tolist()
+    assert indice.janela([]) is None and indice.janela([298, 300]) is None
+    assert indice.contador(indice.ultimos(1)) == {d: 1 for d in concursos[-1][1]}
+
+
+def test_dos_concursos_e_erros(concursos):
+    registros = [{"numero": n, "dezenas": d} for n, d in concursos[:20]] + [{"numero": 999, "dezenas": []}]
+    indice = IndiceFrequencias.dos_concursos(registros)
+    assert len(indice) == 20 and indice.ultimos(20).tolist() == _contagem_direta(concursos[:20])
+    assert IndiceFrequencias().ultimo_numero is None and len(IndiceFrequencias()) == 0
+    with pytest.raises(ValueError):
+        IndiceFrequencias([1, 2], [concursos[0][1]])
+
+
+def test_compartilhado_acompanha_o_historico(concursos):
+    historico = HistoricoSorteios(concursos[:250])
+    indice = obter_indice_frequencias(historico)
+    for numero, dezenas in concursos[250:]:
+        historico.adicionar(numero, dezenas)
+    assert obter_indice_frequencias(historico) is indice
+    assert indice.ultimos(300).tolist() == _contagem_direta(concursos)
+
+    # Concurso inserido no meio: não é prefixo, o índice é remontado
+    outro = HistoricoSorteios([c for c in concursos if c[0] != 5])
+    antes = obter_indice_frequencias(outro)
+    outro.adicionar(*concursos[4])
+    depois = obter_indice_frequencias(outro)
+    assert depois is not antes and depois.numeros.tolist() == [n for n, _ in concursos]
+    assert depois.ultimos(300).tolist() == _contagem_direta(concursos)
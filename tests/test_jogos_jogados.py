@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+
+from app.services.gerador_jogos import GeradorJogos
+from core.amostrador import AmostradorRestrito
+from core.jogos_jogados import RegistroJogados, obter_registro_jogados
+from tests.conftest import sortear_jogos
+
+
+def test_registrar_e_reabrir(tmp_path, rng):
+    registro = RegistroJogados(str(tmp_path))
+    lote = sortear_jogos(rng, 500).tolist()
+    unicos = len({tuple(j) for j in lote})
+    assert not registro.existe(3600)
+    assert registro.registrar(3600, lote) == unicos
+    assert registro.registrar(3600, lote[:10]) == 0
+    assert registro.existe(3600) and os.path.exists(tmp_path / "3600.npz")
+
+    # Sobrevive a reinício; concursos são independentes
+    reaberto = RegistroJogados(str(tmp_path))
+    assert all(reaberto.jogado(3600, j) for j in lote)
+    assert not reaberto.existe(3601) and len(reaberto.bitmap(3601)) == 0
+    assert not reaberto.jogado(3601, lote[0])
+
+
+def test_liberar(tmp_path, rng):
+    registro = RegistroJogados(str(tmp_path))
+    lote = sortear_jogos(rng, 20).tolist()
+    registro.registrar(10, lote)
+    registro.liberar(10, lote[:5])
+    reaberto = RegistroJogados(str(tmp_path))
+    assert [reaberto.jogado(10, j) for j in lote] == [False] * 5 + [True] * 15
+
+
+def test_arquivo_ilegivel_recomeca_vazio(tmp_path):
+    (tmp_path / "7.npz").write_bytes(b"corrompido")
+    registro = RegistroJogados(str(tmp_path))
+    assert registro.existe(7) and len(registro.bitmap(7)) == 0
+
+
+def test_registro_compartilhado(tmp_path):
+    assert obter_registro_jogados(str(tmp_path)) is obter_registro_jogados(str(tmp_path))
+
+
+def test_lotes_seguidos_nao_repetem_jogos(tmp_path, concursos, feature_index):
+    """Dois lotes para o mesmo concurso alvo, cada um registrado ao sair: nenhum jogo se repete."""
+    registro = RegistroJogados(str(tmp_path))
+    ultimos = concursos[-10:]
+    emitidos = []
+    for semente in (1, 1):  # mesma semente: sem o registro, o segundo lote repetiria o primeiro
+        gerador = GeradorJogos(
+            dezenas_ultimo=concursos[-1][1],
+            ausentes_ultimos=sorted(set(range(1, 26)) - {d for _, dezenas in ultimos[-3:] for d in dezenas}),
+            ultimos_concursos=[{"numero": n, "dezenas": d} for n, d in reversed(ultimos)],
+            amostrador=AmostradorRestrito(feature_index, seed=semente),
+            ja_jogados=registro.bitmap(301),
+        )
+        lote = [j["jogo"] for j in gerador.gerar_jogos(quantidade=40)]
+        assert len(lote) == 40
+        registro.registrar(301, lote)
+        emitidos.extend(lote)
+    assert len({tuple(j) for j in emitidos}) == 80
+    assert np.all(RegistroJogados(str(tmp_path)).bitmap(301).contem_jogos(emitidos))
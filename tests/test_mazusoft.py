@@ -0,0 +1,85 @@
+import csv
+
+import numpy as np
+import pytest
+
+from core.bitmask import mask_para_jogo
+from core.estatisticas import EstatisticasDezenas
+from core.historico import HistoricoSorteios
+from core.mazusoft_integration import JANELA_FREQUENCIA, MazusoftAnalyzer
+
+CABECALHO = "concurso;repetidas;soma;pares;ciclo;qtd;" + ";".join(f"ausente{i}" for i in range(1, 11))
+
+
+@pytest.fixture
+def planilha(tmp_path, concursos):
+    """Planilha de ciclos com os 200 primeiros concursos sintéticos."""
+    caminho = tmp_path / "ciclos.csv"
+    caminho.write_text(CABECALHO + "\n", encoding="utf-8")
+    _analisador(tmp_path, caminho, concursos[:199]).atualizar_com_resultado(*reversed(concursos[199]))
+    assert len(_linhas(caminho)) == 200
+    return caminho
+
+
+def _analisador(tmp_path, planilha, concursos):
+    return MazusoftAnalyzer(str(tmp_path / "mazusoft.json"), HistoricoSorteios(concursos), str(planilha))
+
+
+def _linhas(planilha):
+    with open(planilha, encoding="utf-8") as f:
+        return [linha for linha in csv.reader(f, delimiter=";") if linha and linha[0].isdigit()]
+
+
+def test_consultas_nao_gravam(tmp_path, planilha, concursos):
+    antes = planilha.read_bytes()
+    analisador = _analisador(tmp_path, planilha, concursos)
+    analisador.load_all_stats()
+    analisador.get_probabilidades_frequencia()
+    analisador.get_probabilidades_ciclo()
+    analisador.get_probabilidades_gap()
+    analisador.calcular_temperatura_atual()
+    analisador.carregar_historico(HistoricoSorteios(concursos[:250]))
+    analisador.load_all_stats()
+    assert planilha.read_bytes() == antes
+    assert analisador.ultimo_concurso_ciclo == 200
+
+
+def test_atualizar_grava_pendentes_e_resultado(tmp_path, planilha, concursos):
+    analisador = _analisador(tmp_path, planilha, concursos)
+    novo = list(range(1, 16))
+    analisador.atualizar_com_resultado(novo)
+    linhas = _linhas(planilha)
+    assert [int(l[0]) for l in linhas] == list(range(1, 302))
+    assert analisador.ultimo_concurso_ciclo == 301
+    # Cada linha traz os ausentes e os fechamentos de ciclo do estado após aquele concurso
+    estatisticas = EstatisticasDezenas()
+    for linha, (numero, dezenas) in zip(linhas, concursos + [(301, novo)]):
+        estatisticas.atualizar(numero, dezenas)
+        assert [int(a) for a in linha[6:] if a] == estatisticas.ausentes(), numero
+        assert linha[4] == (str(estatisticas.ciclo_numero) if estatisticas.ciclo_fechou else ""), numero
+    assert analisador._carregar_ciclos() == analisador.ciclos
+
+    # Resultado já contabilizado não grava de novo
+    analisador.atualizar_com_resultado(novo, 301)
+    assert len(_linhas(planilha)) == 301
+
+
+def test_incremental_igual_a_remontar(tmp_path, planilha, concursos):
+    analisador = _analisador(tmp_path, planilha, concursos[:299])
+    analisador.atualizar_com_resultado(concursos[299][1])
+    remontado = _analisador(tmp_path, planilha, concursos)
+    remontado.load_all_stats()
+    for nome in ("prob_frequencia", "prob_ciclo", "prob_gap"):
+        assert np.allclose(getattr(analisador, nome), getattr(remontado, nome)), nome
+    assert analisador.temperatura == remontado.temperatura
+    assert analisador.data["ciclo"] == remontado.data["ciclo"]
+    presenca = np.array([[d in dezenas for d in range(1, 26)] for _, dezenas in concursos[-JANELA_FREQUENCIA:]])
+    assert np.allclose(remontado.prob_frequencia, presenca.mean(axis=0))
+    assert sum(remontado.get_probabilidades_frequencia().values()) == pytest.approx(15)
+
+
+def test_sem_planilha(tmp_path, concursos):
+    analisador = MazusoftAnalyzer(str(tmp_path / "mazusoft.json"), HistoricoSorteios(concursos), str(tmp_path / "nao.csv"))
+    analisador.atualizar_com_resultado(mask_para_jogo(0b111111111111111))
+    assert analisador.ultimo_concurso_ciclo is None and not (tmp_path / "nao.csv").exists()
+    assert analisador.estatisticas.ultimo_numero == 301
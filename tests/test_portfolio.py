@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from core.bitmask import jogos_para_masks, popcount_array
+from core.distribuicao_acertos import AvaliadorDistribuicao
+from core.portfolio import OtimizadorPortfolio
+from tests.conftest import sortear_jogos
+
+
+@pytest.fixture(scope="module")
+def otimizador(feature_index):
+    return OtimizadorPortfolio(AvaliadorDistribuicao(feature_index), amostra_sorteios=4096, seed=3)
+
+
+@pytest.fixture(scope="module")
+def candidatos():
+    return sortear_jogos(np.random.default_rng(21), 80).tolist()
+
+
+def _acertos(otimizador, jogos):
+    return popcount_array(jogos_para_masks(jogos)[:, None] & otimizador.sorteios[None, :])
+
+
+def test_amostra_de_sorteios(otimizador, feature_index):
+    assert len(otimizador.sorteios) == 4096
+    assert np.isin(otimizador.sorteios, feature_index['mask']).all()
+    assert len(np.unique(otimizador.sorteios)) == 4096
+
+
+def test_cobertura(otimizador, candidatos):
+    r = otimizador.otimizar(candidatos + candidatos[:10], 8, objetivo="cobertura", nivel=11, avaliar_exato=False)
+    assert len(r["jogos"]) == 8 == len({tuple(j) for j in r["jogos"]})
+    # Índices apontam para a primeira ocorrência de cada jogo na lista original
+    assert [candidatos[i] for i in r["indices"]] == r["jogos"]
+    cobertura = (_acertos(otimizador, r["jogos"]).max(axis=0) >= 11).mean()
+    assert r["valor_amostra"] == round(float(cobertura), 6)
+    primeiros = (_acertos(otimizador, candidatos[:8]).max(axis=0) >= 11).mean()
+    assert cobertura >= primeiros
+
+
+@pytest.mark.parametrize("objetivo, aversao", [("premio_esperado", 0.5), ("misto", 0.5), ("misto", 2.0)])
+def test_objetivos_de_premio(otimizador, candidatos, objetivo, aversao):
+    r = otimizador.otimizar(candidatos, 6, objetivo=objetivo, aversao=aversao, avaliar_exato=False)
+    premio = otimizador.avaliador.tabela_premios[_acertos(otimizador, r["jogos"])].sum(axis=0)
+    esperado = premio.mean() - (aversao * premio.std() if objetivo == "misto" else 0.0)
+    assert r["valor_amostra"] == pytest.approx(round(float(esperado), 6), abs=1e-6)
+
+
+def test_avaliacao_exata(otimizador, candidatos):
+    r = otimizador.otimizar(candidatos, 4, objetivo="cobertura", nivel=12, tempo_max=1.0, comparar_base=True)
+    assert r["avaliacao"] == otimizador.avaliador.avaliar(r["jogos"])
+    assert r["avaliacao_base"]["total_jogos"] == 4
+
+
+def test_poucos_candidatos_e_erros(otimizador, candidatos):
+    r = otimizador.otimizar(candidatos[:3], 10, avaliar_exato=False)
+    assert sorted(r["indices"]) == [0, 1, 2] and r["trocas"] == 0
+    with pytest.raises(ValueError):
+        otimizador.otimizar(candidatos, 5, objetivo="lucro")
+    with pytest.raises(ValueError):
+        otimizador.otimizar(candidatos, 0)
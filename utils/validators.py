@@ -5,7 +5,17 @@ Data: Novembro 2025
 """
 
 import logging
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
+
+import numpy as np
+
+from core.bitmask import (
+    PRIMOS, FIBONACCI, MOLDURA, CENTRO, MASK_TODAS,
+    MASK_PARES, MASK_PRIMOS, MASK_FIBONACCI, MASK_MULTIPLOS_3, MASK_MOLDURA, MASK_CENTRO,
+    eh_mask, jogo_para_mask, popcount, soma_mask, max_consecutivo_mask,
+    popcount_array, features_array
+)
+from core.historico import HistoricoSorteios
 
 logger = logging.getLogger(__name__)
 
@@ -27,23 +37,23 @@ class GameValidator:
     
     def __init__(self):
         """Inicializa validador com conjuntos de referência"""
-        self.primos = {2, 3, 5, 7, 11, 13, 17, 19, 23}
-        self.fibonacci = {1, 2, 3, 5, 8, 13, 21}
-        self.moldura = {1, 2, 3, 4, 5, 6, 10, 11, 15, 16, 20, 21, 22, 23, 24, 25}
-        self.centro = {7, 8, 9, 12, 13, 14, 17, 18, 19}
+        self.primos = set(PRIMOS)
+        self.fibonacci = set(FIBONACCI)
+        self.moldura = set(MOLDURA)
+        self.centro = set(CENTRO)
         
         logger.info("✅ Validador de Jogos inicializado")
     
     def validar_completo(
         self, 
-        jogo: List[int], 
+        jogo: Union[List[int], int], 
         constraints: Optional[Dict] = None
     ) -> Tuple[bool, Dict]:
         """
         Valida jogo contra todas as restrições
         
         Args:
-            jogo: Lista de 15 dezenas
+            jogo: Lista de 15 dezenas ou bitmask de 25 bits
             constraints: Dicionário de restrições (opcional)
                 {
                     'soma': (min, max),
@@ -60,38 +70,51 @@ class GameValidator:
             (valido: bool, validacao: Dict)
         """
         # Validações estruturais básicas
-        if len(jogo) != 15:
-            return False, {
-                'valido': False,
-                'erro': f'Jogo deve ter 15 dezenas (tem {len(jogo)})'
-            }
-        
-        if len(set(jogo)) != 15:
-            return False, {
-                'valido': False,
-                'erro': 'Jogo contém dezenas repetidas'
-            }
-        
-        if not all(1 <= n <= 25 for n in jogo):
-            return False, {
-                'valido': False,
-                'erro': 'Dezenas devem estar entre 1 e 25'
-            }
-        
-        # Calcular métricas do jogo
-        jogo_sorted = sorted(jogo)
+        if eh_mask(jogo):
+            mask = int(jogo)
+            if mask < 0 or mask & ~MASK_TODAS:
+                return False, {
+                    'valido': False,
+                    'erro': 'Dezenas devem estar entre 1 e 25'
+                }
+            if popcount(mask) != 15:
+                return False, {
+                    'valido': False,
+                    'erro': f'Jogo deve ter 15 dezenas (tem {popcount(mask)})'
+                }
+        else:
+            if len(jogo) != 15:
+                return False, {
+                    'valido': False,
+                    'erro': f'Jogo deve ter 15 dezenas (tem {len(jogo)})'
+                }
+            
+            if len(set(jogo)) != 15:
+                return False, {
+                    'valido': False,
+                    'erro': 'Jogo contém dezenas repetidas'
+                }
+            
+            if not all(1 <= n <= 25 for n in jogo):
+                return False, {
+                    'valido': False,
+                    'erro': 'Dezenas devem estar entre 1 e 25'
+                }
+            
+            mask = jogo_para_mask(jogo)
         
-        soma = sum(jogo)
-        pares = sum(1 for n in jogo if n % 2 == 0)
+        # Calcular métricas do jogo (AND + popcount sobre o bitmask)
+        soma = soma_mask(mask)
+        pares = popcount(mask & MASK_PARES)
         impares = 15 - pares
-        primos = sum(1 for n in jogo if n in self.primos)
-        fib = sum(1 for n in jogo if n in self.fibonacci)
-        mult_3 = sum(1 for n in jogo if n % 3 == 0)
-        moldura = sum(1 for n in jogo if n in self.moldura)
-        centro = sum(1 for n in jogo if n in self.centro)
+        primos = popcount(mask & MASK_PRIMOS)
+        fib = popcount(mask & MASK_FIBONACCI)
+        mult_3 = popcount(mask & MASK_MULTIPLOS_3)
+        moldura = popcount(mask & MASK_MOLDURA)
+        centro = popcount(mask & MASK_CENTRO)
         
         # Calcular sequências consecutivas
-        max_consecutivo = self._calcular_max_consecutivo(jogo_sorted)
+        max_consecutivo = max_consecutivo_mask(mask)
         
         # Montar dicionário de validação
         validacao = {
@@ -171,6 +194,33 @@ class GameValidator:
         # Todas as validações passaram
         return True, validacao
     
+    def validar_lote(self, masks, constraints: Optional[Dict] = None) -> np.ndarray:
+        """
+        Versão vetorizada de validar_completo para um array de bitmasks
+        
+        Args:
+            masks: Array de bitmasks de 25 bits
+            constraints: Mesmo formato de validar_completo
+        
+        Returns:
+            Array booleano indicando quais jogos são válidos
+        """
+        masks = np.asarray(masks, dtype=np.uint32)
+        valido = ((masks & ~np.uint32(MASK_TODAS)) == 0) & (popcount_array(masks) == 15)
+        features = features_array(masks & np.uint32(MASK_TODAS))  # bits acima de 25 já invalidaram o jogo
+        
+        if not constraints:
+            return valido
+        
+        for nome, limite in constraints.items():
+            if nome == 'max_consecutivo':
+                valido &= features['max_consecutivo'] <= limite
+            elif nome in features:
+                minimo, maximo = limite
+                valido &= (features[nome] >= minimo) & (features[nome] <= maximo)
+        
+        return valido
+    
     def _calcular_max_consecutivo(self, jogo_sorted: List[int]) -> int:
         """
         Calcula a maior sequência de números consecutivos
@@ -267,7 +317,8 @@ class GameValidator:
     def comparar_com_historico(
         self, 
         jogo: List[int], 
-        historico: List[List[int]]
+        historico: List[List[int]],
+        historico_completo: Optional[HistoricoSorteios] = None
     ) -> Dict:
         """
         Compara jogo com histórico de resultados
@@ -275,16 +326,21 @@ class GameValidator:
         Args:
             jogo: Jogo a validar
             historico: Lista de resultados anteriores
+            historico_completo: Se informado, inclui o desempenho do jogo em
+                todos os concursos passados ('desempenho_historico')
         
         Returns:
             Dicionário com análise comparativa
         """
         if not historico:
-            return {
+            resultado = {
                 'recorrencia': 0.0,
                 'novidade': 1.0,
                 'similaridade_media': 0.0
             }
+            if historico_completo is not None:
+                resultado['desempenho_historico'] = historico_completo.desempenho(jogo)
+            return resultado
         
         jogo_set = set(jogo)
         
@@ -305,9 +361,12 @@ class GameValidator:
         
         similaridade_media = sum(similaridades) / len(similaridades) if similaridades else 0.0
         
-        return {
+        resultado = {
             'recorrencia': recorrencia,
             'novidade': 1.0 - recorrencia,
             'similaridade_media': similaridade_media,
             'dezenas_recorrentes': len(jogo_set & dezenas_recentes)
         }
+        if historico_completo is not None:
+            resultado['desempenho_historico'] = historico_completo.desempenho(jogo)
+        return resultado